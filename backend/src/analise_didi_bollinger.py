@@ -11,61 +11,28 @@ from managers.data_manager import prepare_market_data
 from indicadores.padroes_velas import engolfo_alta, piercing_line_alta
 from indicadores.bandas_bollinger import bandas_bollinger
 from indicadores.indicadores_osciladores import calcula_rsi
+from indicadores.didi import calcular_didi, COMPRA, VENDA
 from utils.notifications.telegram_client import get_telegram_client
 import pandas as pd
 import numpy as np
 
 def calcular_didi_index(df):
     """Calcula o Didi Index"""
-    df['didi_curta'] = df['fechamento'].rolling(window=3).mean()
-    df['didi_media'] = df['fechamento'].rolling(window=8).mean()
-    df['didi_longa'] = df['fechamento'].rolling(window=20).mean()
+    didi = calcular_didi(df['fechamento'])
+    df['didi_curta'] = didi.curta
+    df['didi_media'] = didi.media
+    df['didi_longa'] = didi.longa
     return df
 
 def detectar_agulhada(df, tolerancia=0.01):
     """Detecta Agulhada"""
-    agulhadas_compra = []
-    agulhadas_venda = []
-    
-    for i in range(21, len(df)):
-        curta = df['didi_curta'].iloc[i]
-        media = df['didi_media'].iloc[i]
-        longa = df['didi_longa'].iloc[i]
-        
-        curta_ant = df['didi_curta'].iloc[i-1]
-        longa_ant = df['didi_longa'].iloc[i-1]
-        
-        max_val = max(curta, media, longa)
-        min_val = min(curta, media, longa)
-        spread = (max_val - min_val) / max_val
-        
-        if spread < tolerancia:
-            if (curta_ant < longa_ant and curta > longa):
-                agulhadas_compra.append(i)
-            elif (curta_ant > longa_ant and curta < longa):
-                agulhadas_venda.append(i)
-    
-    return agulhadas_compra, agulhadas_venda
+    didi = calcular_didi(df['fechamento'], tolerancia=tolerancia)
+    return didi.agulhadas(COMPRA), didi.agulhadas(VENDA)
 
 def detectar_punto(df):
     """Detecta Punto"""
-    puntos_compra = []
-    puntos_venda = []
-    
-    for i in range(2, len(df)):
-        curta = df['didi_curta'].iloc[i]
-        media = df['didi_media'].iloc[i]
-        longa = df['didi_longa'].iloc[i]
-        
-        curta_ant = df['didi_curta'].iloc[i-1]
-        media_ant = df['didi_media'].iloc[i-1]
-        
-        if curta_ant <= media_ant and curta > media and curta < longa:
-            puntos_compra.append(i)
-        elif curta_ant >= media_ant and curta < media and curta > longa:
-            puntos_venda.append(i)
-    
-    return puntos_compra, puntos_venda
+    didi = calcular_didi(df['fechamento'])
+    return didi.puntos(COMPRA), didi.puntos(VENDA)
 
 def analisar_didi_bollinger(simbolo='BTCUSDT'):
     print(f"\n🇧🇷 ANÁLISE DIDI + BOLLINGER - {simbolo}")
@@ -11,6 +11,7 @@ from corretoras.funcoes_bybit import busca_velas
 from managers.data_manager import prepare_market_data
 from indicadores.padroes_velas import engolfo_alta, piercing_line_alta
 from indicadores.indicadores_osciladores import calcula_rsi
+from indicadores.didi import calcular_didi, COMPRA, VENDA
 from utils.notifications.telegram_client import get_telegram_client
 import pandas as pd
 import numpy as np
@@ -20,9 +21,10 @@ def calcular_didi_index(df):
     Calcula o Didi Index
     Médias: 3, 8, 20 períodos
     """
-    df['didi_curta'] = df['fechamento'].rolling(window=3).mean()  # Rápida
-    df['didi_media'] = df['fechamento'].rolling(window=8).mean()  # Intermediária
-    df['didi_longa'] = df['fechamento'].rolling(window=20).mean() # Lenta
+    didi = calcular_didi(df['fechamento'])
+    df['didi_curta'] = didi.curta  # Rápida
+    df['didi_media'] = didi.media  # Intermediária
+    df['didi_longa'] = didi.longa  # Lenta
     return df
 
 def detectar_agulhada(df, tolerancia=0.005):
@@ -30,80 +32,22 @@ def detectar_agulhada(df, tolerancia=0.005):
     Detecta Agulhada (cruzamento das 3 médias)
     tolerancia: % de variação aceita para considerar "juntas"
     """
-    agulhadas_compra = []
-    agulhadas_venda = []
-    
-    for i in range(21, len(df)):
-        curta = df['didi_curta'].iloc[i]
-        media = df['didi_media'].iloc[i]
-        longa = df['didi_longa'].iloc[i]
-        
-        curta_ant = df['didi_curta'].iloc[i-1]
-        media_ant = df['didi_media'].iloc[i-1]
-        longa_ant = df['didi_longa'].iloc[i-1]
-        
-        # Verificar se as médias estão próximas (formando agulhada)
-        max_val = max(curta, media, longa)
-        min_val = min(curta, media, longa)
-        spread = (max_val - min_val) / max_val
-        
-        if spread < tolerancia:  # Médias muito próximas
-            # Verificar se houve cruzamento
-            # Agulhada de COMPRA: médias cruzam para cima
-            if (curta_ant < longa_ant and curta > longa):
-                agulhadas_compra.append(i)
-            # Agulhada de VENDA: médias cruzam para baixo
-            elif (curta_ant > longa_ant and curta < longa):
-                agulhadas_venda.append(i)
-    
-    return agulhadas_compra, agulhadas_venda
+    didi = calcular_didi(df['fechamento'], tolerancia=tolerancia)
+    return didi.agulhadas(COMPRA), didi.agulhadas(VENDA)
 
 def detectar_punto(df):
     """
     Detecta Punto (ponto)
     Curta cruza Média, mas ainda longe da Longa
     """
-    puntos_compra = []
-    puntos_venda = []
-    
-    for i in range(2, len(df)):
-        curta = df['didi_curta'].iloc[i]
-        media = df['didi_media'].iloc[i]
-        longa = df['didi_longa'].iloc[i]
-        
-        curta_ant = df['didi_curta'].iloc[i-1]
-        media_ant = df['didi_media'].iloc[i-1]
-        
-        # Punto de COMPRA: curta cruza média para cima
-        if curta_ant <= media_ant and curta > media:
-            # Mas ainda abaixo da longa (não é agulhada ainda)
-            if curta < longa:
-                puntos_compra.append(i)
-        
-        # Punto de VENDA: curta cruza média para baixo
-        elif curta_ant >= media_ant and curta < media:
-            # Mas ainda acima da longa
-            if curta > longa:
-                puntos_venda.append(i)
-    
-    return puntos_compra, puntos_venda
+    didi = calcular_didi(df['fechamento'])
+    return didi.puntos(COMPRA), didi.puntos(VENDA)
 
 def calcular_separacao_medias(df):
     """
     Calcula separação entre médias (força da tendência)
     """
-    separacao = []
-    for i in range(len(df)):
-        curta = df['didi_curta'].iloc[i]
-        longa = df['didi_longa'].iloc[i]
-        
-        if pd.notna(curta) and pd.notna(longa) and longa != 0:
-            sep = ((curta - longa) / longa) * 100
-            separacao.append(sep)
-        else:
-            separacao.append(0)
-    
-    df['didi_separacao'] = separacao
+    df['didi_separacao'] = calcular_didi(df['fechamento']).separacao
     return df
 
 def analisar_didi_index(simbolo='BTCUSDT'):
@@ -13,12 +13,12 @@ from indicadores.bandas_bollinger import bandas_bollinger
 from indicadores.indicadores_osciladores import calcula_rsi
 from utils.notifications.telegram_client import get_telegram_client
 import pandas as pd
-import pandas_ta as ta
+from indicadores import compilados
 import numpy as np
 
 def calcular_stochastic_rsi(df, periodo=14, smooth_k=3, smooth_d=3):
     """Stochastic RSI - Mais sensível para reversões"""
-    rsi = ta.rsi(df['fechamento'], length=periodo)
+    rsi = calcula_rsi(df, periodo)
     stoch_rsi = (rsi - rsi.rolling(periodo).min()) / (rsi.rolling(periodo).max() - rsi.rolling(periodo).min()) * 100
     k = stoch_rsi.rolling(smooth_k).mean()
     d = k.rolling(smooth_d).mean()
@@ -29,14 +29,10 @@ def calcular_mfi(df, periodo=14):
     typical_price = (df['maxima'] + df['minima'] + df['fechamento']) / 3
     money_flow = typical_price * df['volume']
     
-    positive_flow = pd.Series(0.0, index=df.index)
-    negative_flow = pd.Series(0.0, index=df.index)
-    
-    for i in range(1, len(df)):
-        if typical_price.iloc[i] > typical_price.iloc[i-1]:
-            positive_flow.iloc[i] = money_flow.iloc[i]
-        elif typical_price.iloc[i] < typical_price.iloc[i-1]:
-            negative_flow.iloc[i] = money_flow.iloc[i]
+    # Preço típico igual ao anterior (e a primeira vela) não entra em nenhum dos fluxos
+    variacao = typical_price.diff()
+    positive_flow = money_flow.where(variacao > 0, 0.0)
+    negative_flow = money_flow.where(variacao < 0, 0.0)
     
     positive_mf = positive_flow.rolling(periodo).sum()
     negative_mf = negative_flow.rolling(periodo).sum()
@@ -76,10 +72,10 @@ def analisar_reversao_avancada(simbolo='BTCUSDT'):
     df['vwap'] = calcular_vwap(df)
     
     # MACD
-    macd_result = ta.macd(df['fechamento'])
-    df['macd'] = macd_result['MACD_12_26_9']
-    df['macd_signal'] = macd_result['MACDs_12_26_9']
-    df['macd_histogram'] = macd_result['MACDh_12_26_9']
+    macd_result = compilados.macd(df['fechamento'])
+    df['macd'] = macd_result.macd
+    df['macd_signal'] = macd_result.sinal
+    df['macd_histogram'] = macd_result.histograma
     
     # EMAs
     df['ema_20'] = df['fechamento'].ewm(span=20, adjust=False).mean()
@@ -6,9 +6,11 @@ import asyncio
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from api.routes import trading, websocket, monitor, scanner, config, optimization, analise, market, ai, trade, bot
+from api.routes import trading, websocket, monitor, scanner, config, optimization, analise, market, ai, trade, bot, jobs, logs
 from api.services.log_stream_manager import get_log_stream_manager
 from api.services.scanner_service import get_scanner_service
+from api.services.job_service import get_job_service
+from api.services import job_tasks
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -29,6 +31,7 @@ async def lifespan(app: FastAPI):
     yield  # API está rodando
     
     # Shutdown: Limpeza se necessário
+    get_job_service().shutdown()
     # print("🛑 API encerrando...")
 
 app = FastAPI(
@@ -70,6 +73,8 @@ app.include_router(market.router, prefix="/api/v1", tags=["market"])
 app.include_router(ai.router, prefix="/api/v1", tags=["ai"])
 app.include_router(trade.router, prefix="/api/v1", tags=["trade"])
 app.include_router(bot.router, prefix="/api/v1", tags=["bot"])
+app.include_router(jobs.router, prefix="/api/v1", tags=["jobs"])
+app.include_router(logs.router, prefix="/api/v1", tags=["logs"])
 
 # Standardized endpoints (Passo 5)
 @app.get("/api/v1/opportunities", tags=["standard"])
@@ -106,8 +111,12 @@ async def analyze_crypto(request: AnalyzeRequest):
     Analisa uma moeda específica (Fallback/Dev).
     """
     try:
-        from varredura_didi_bollinger import analisar_moeda
-        res = analisar_moeda(request.symbol)
+        # Em um processo do JobService; pedidos iguais no mesmo minuto reaproveitam o resultado
+        resposta = await get_job_service().cached(
+            'analyze', f"analyze:{request.symbol}", 60,
+            lambda: [(job_tasks.analisar_moeda, (request.symbol,))], job_tasks.primeiro
+        )
+        res = resposta['result']
         if res:
             return {
                 "symbol": request.symbol,
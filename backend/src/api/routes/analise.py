@@ -9,41 +9,30 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../.
 
 router = APIRouter(prefix="/analise", tags=["analise"])
 
-# Cache de resultados
-_cache_varredura = {
-    'timestamp': None,
-    'dados': None
-}
+from api.services.job_service import get_job_service
+from api.services import job_tasks
+
+jobs = get_job_service()
+
+TTL_VARREDURA = 300  # 5 minutos
 
 @router.get("/varredura")
 async def get_varredura() -> List[Dict]:
     """
     Retorna varredura completa Didi + Bollinger
+    
+    A varredura roda como job em segundo plano (GET /jobs/{id} mostra o progresso):
+    com o cache vencido, devolve a última varredura e agenda a próxima.
     """
     try:
-        import time
-        from varredura_didi_bollinger import analisar_moeda, MOEDAS
-        
-        # Verificar cache (válido por 5 minutos)
-        agora = time.time()
-        if _cache_varredura['timestamp'] and (agora - _cache_varredura['timestamp']) < 300:
-            return _cache_varredura['dados']
-        
-        # Executar varredura
-        resultados = []
-        for moeda in MOEDAS:
-            resultado = analisar_moeda(moeda)
-            if resultado:
-                resultados.append(resultado)
-        
-        # Ordenar por score
-        resultados.sort(key=lambda x: x['score'], reverse=True)
-        
-        # Atualizar cache
-        _cache_varredura['timestamp'] = agora
-        _cache_varredura['dados'] = resultados
-        
-        return resultados
+        from varredura_didi_bollinger import MOEDAS
+        
+        resposta = await jobs.cached(
+            'varredura', 'analise:varredura', TTL_VARREDURA,
+            lambda: [(job_tasks.analisar_moeda, (moeda,)) for moeda in MOEDAS],
+            job_tasks.ordenar_por_score
+        )
+        return resposta['result']
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,22 @@
+from fastapi import APIRouter, HTTPException
+from api.services.job_service import get_job_service
+
+router = APIRouter()
+job_service = get_job_service()
+
+@router.get("/jobs")
+async def list_jobs():
+    """
+    Lista os jobs recentes (varredura, análise, otimização), do mais novo ao mais antigo.
+    """
+    return job_service.list_jobs()
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """
+    Status e progresso (partes concluídas / total) de um job.
+    """
+    job = job_service.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job não encontrado")
+    return job
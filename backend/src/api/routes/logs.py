@@ -0,0 +1,55 @@
+import asyncio
+from datetime import datetime
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Query
+from utils.logging import LogCategory, LogLevel, get_log_store
+
+router = APIRouter()
+
+# Grupos de categorias aceitos em `group`
+GRUPOS = {
+    'agent': LogCategory.get_agent_categories,
+    'trading': LogCategory.get_trading_categories,
+    'error': LogCategory.get_error_categories,
+    'system': LogCategory.get_system_categories,
+}
+
+@router.get("/logs/query")
+async def query_logs(
+    bot_id: Optional[str] = None,
+    category: Optional[List[str]] = Query(None),
+    group: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    level: Optional[str] = None,
+    limit: int = Query(500, ge=1, le=5000)
+):
+    """
+    Consulta o histórico de logs (store estruturado, sobrevive a restarts).
+
+    Ex.: eventos de agente do bot X numa terça: `?bot_id=X&group=agent&start=2025-01-07&end=2025-01-08`.
+    Devolve os `limit` eventos mais recentes do filtro, em ordem cronológica.
+    """
+    categorias = set(category or [])
+    if group:
+        if group not in GRUPOS:
+            raise HTTPException(status_code=400, detail=f"Grupo inválido: {group} (use {', '.join(GRUPOS)})")
+        categorias |= {c.value for c in GRUPOS[group]()}
+    nivel = None
+    if level:
+        try:
+            nivel = LogLevel[level.upper()].value
+        except KeyError:
+            raise HTTPException(status_code=400, detail=f"Nível inválido: {level}")
+
+    eventos = await asyncio.to_thread(
+        get_log_store().query, bot_id=bot_id, categories=sorted(categorias) or None,
+        start=start, end=end, min_level=nivel, limit=limit)
+    return {"count": len(eventos), "events": eventos}
+
+@router.get("/logs/stats")
+async def log_store_stats():
+    """
+    Eventos indexados e segmentos (brutos / compactados) do store de logs.
+    """
+    return await asyncio.to_thread(get_log_store().stats)
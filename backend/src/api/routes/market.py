@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Query, HTTPException
 from typing import List, Dict, Any, Optional
+import asyncio
 import random
 from datetime import datetime, timedelta
 import sys
@@ -16,7 +17,10 @@ except Exception as e:
     print(f"⚠️  Bybit client not available: {e}")
     BYBIT_AVAILABLE = False
 
+from api.services.market_data_service import get_market_data_service
+
 router = APIRouter()
+market_data = get_market_data_service()
 
 # Mock base prices
 BASE_PRICES = {
@@ -164,8 +168,8 @@ async def get_candles(
             
             bybit_tf = tf_map.get(timeframe, '60')
             
-            # Get candles from Bybit
-            response = cliente.get_kline(
+            # Get candles from Bybit (coalesced + cached until the candle closes)
+            response = await market_data.get_kline(
                 symbol=symbol,
                 interval=bybit_tf,
                 limit=limit
@@ -227,8 +231,7 @@ async def get_orderbook(
     try:
         if BYBIT_AVAILABLE:
             # Get orderbook from Bybit
-            response = cliente.get_orderbook(
-                category='linear',
+            response = await market_data.get_orderbook(
                 symbol=symbol,
                 limit=depth
             )
@@ -292,8 +295,7 @@ async def get_trades(
     try:
         if BYBIT_AVAILABLE:
             # Get recent trades from Bybit
-            response = cliente.get_public_trade_history(
-                category='linear',
+            response = await market_data.get_public_trade_history(
                 symbol=symbol,
                 limit=limit
             )
@@ -363,16 +365,18 @@ async def scan_market():
                     'LTCUSDT', 'UNIUSDT', 'ATOMUSDT', 'ARBUSDT', 'OPUSDT'
                 ]
                 
+                # Fetch all symbols concurrently; the market data layer paces them
+                responses = await asyncio.gather(
+                    *(market_data.get_kline(symbol=symbol, interval='60', limit=200) for symbol in symbols),  # 1h
+                    return_exceptions=True
+                )
+                
                 opportunities = []
                 
-                for symbol in symbols:
+                for symbol, response in zip(symbols, responses):
                     try:
-                        # Get market data from Bybit
-                        response = cliente.get_kline(
-                            symbol=symbol,
-                            interval='60',  # 1h
-                            limit=200
-                        )
+                        if isinstance(response, Exception):
+                            raise response
                         
                         if response['retCode'] == 0:
                             # Get current price
@@ -460,3 +464,11 @@ async def scan_market():
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get('/market/metrics')
+async def get_market_metrics():
+    """
+    Cache hits, coalesced requests and upstream calls of the market data layer.
+    """
+    return market_data.get_metrics()
@@ -7,8 +7,11 @@ import os
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
 
-from fastapi import APIRouter, HTTPException
-from api.services.monitor_state import get_monitor_state
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from api.services.monitor_state import get_monitor_state, SERIES
 from api.services.bot_manager import get_bot_manager
 
 router = APIRouter()
@@ -51,3 +54,26 @@ async def get_monitor_bot(bot_id: str):
         state["meta"]["subconta"] = status["subconta"]
 
     return state
+
+
+@router.get("/monitor/bots/{bot_id}/series")
+async def get_monitor_bot_series(
+    bot_id: str,
+    metric: Optional[List[str]] = Query(None),
+    points: int = Query(200, ge=1, le=2000),
+    since: Optional[datetime] = None,
+):
+    """
+    Retorna series recentes do bot (price, pnl, signals, agent_latency) reamostradas.
+
+    Cada ponto e um balde de tempo: `t` (fim do balde, epoch), `value` (ultimo
+    valor; soma para signals; media para agent_latency), `min`, `max` e `count`.
+    """
+    invalid = [m for m in metric or [] if m not in SERIES]
+    if invalid:
+        raise HTTPException(status_code=400, detail=f"Metricas invalidas: {invalid} (use {list(SERIES)})")
+
+    series = monitor_state.get_series(bot_id, metric, points, since)
+    if series is None:
+        raise HTTPException(status_code=404, detail="Bot nao encontrado no monitor")
+    return series
@@ -1,9 +1,16 @@
 from fastapi import APIRouter, HTTPException, Query
-from api.services.optimization_service import get_optimization_service
+from api.services.job_service import JobFalhou, get_job_service
+from api.services import job_tasks
 from typing import List, Dict, Any
 
 router = APIRouter()
-opt_service = get_optimization_service()
+jobs = get_job_service()
+
+TTL_OTIMIZACAO = 3600  # 1 hora
+SEM_RESULTADOS = "Nenhum resultado encontrado ou falha na otimização."
+
+def _tarefas(symbol: str, interval: str, days: int):
+    return [(job_tasks.otimizar_simbolo, (symbol, interval, days))]
 
 @router.get("/optimization/top/{symbol}")
 async def get_top_parameters(
@@ -11,12 +18,19 @@ async def get_top_parameters(
     interval: str = "15", 
     days: int = Query(7, gt=0, le=30)
 ):
-    """Retorna os melhores parâmetros encontrados para um símbolo."""
+    """Retorna os melhores parâmetros encontrados para um símbolo (o último resultado, se a próxima otimização ainda roda)."""
     try:
-        results = opt_service.optimize_symbol(symbol, interval, days)
+        resposta = await jobs.cached(
+            'optimization', f"optimization:{symbol}_{interval}_{days}", TTL_OTIMIZACAO,
+            lambda: _tarefas(symbol, interval, days), job_tasks.primeiro
+        )
+        results = resposta['result']
         if not results:
-            return {"success": False, "message": "Nenhum resultado encontrado ou falha na otimização."}
-        return {"success": True, "results": results}
+            return {"success": False, "message": SEM_RESULTADOS, "job": resposta['job']}
+        return {"success": True, "results": results, "stale": resposta['stale'], "job": resposta['job']}
+    except JobFalhou as e:
+        # Sem resultado anterior e o job falhou: mesma resposta de quando a otimização não achava nada
+        return {"success": False, "message": SEM_RESULTADOS, "job": e.job.to_dict()}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -26,14 +40,10 @@ async def run_optimization(
     interval: str = "15", 
     days: int = 7
 ):
-    """Inicia uma otimização sob demanda (útil para limpar cache ou forçar atualização)."""
+    """Agenda uma otimização sob demanda (força atualização); acompanhe em GET /jobs/{id}."""
     try:
-        # Força limpeza de cache para este par
-        cache_key = f"{symbol}_{interval}_{days}"
-        if cache_key in opt_service.cache:
-            del opt_service.cache[cache_key]
-            
-        results = opt_service.optimize_symbol(symbol, interval, days)
-        return {"success": True, "results": results}
+        job = jobs.submit('optimization', f"optimization:{symbol}_{interval}_{days}",
+                          _tarefas(symbol, interval, days), job_tasks.primeiro)
+        return {"success": True, "job": job.to_dict()}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -16,6 +16,13 @@ async def get_scanner_results():
     """
     return scanner_service.get_results()
 
+@router.get("/scanner/metrics")
+async def get_scanner_metrics():
+    """
+    Retorna as métricas da última varredura (latência, universo, pré-filtro).
+    """
+    return scanner_service.get_metrics()
+
 @router.post("/scanner/config")
 async def update_scanner_config(limit: int):
     """
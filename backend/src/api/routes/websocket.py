@@ -18,27 +18,17 @@ bot_manager = get_bot_manager()
 
 
 @router.websocket("/ws/logs")
-async def websocket_logs_all(websocket: WebSocket):
+async def websocket_logs_all(websocket: WebSocket, batch: bool = False):
     """
     WebSocket para receber logs de todos os bots.
     
-    Envia buffer de logs recentes ao conectar.
+    Envia buffer de logs recentes ao conectar. Com `?batch=true`, cada frame
+    é um array JSON com os logs dos últimos ~100 ms em vez de um log por frame.
     """
     await websocket.accept()
     
-    # Callback para enviar via WebSocket
-    async def send_log(message: dict):
-        try:
-            await websocket.send_json(message)
-        except Exception:
-            pass
-    
-    # Enviar buffer de logs recentes
-    for log in log_manager.get_buffer():
-        await websocket.send_json(log)
-    
-    # Registrar subscriber para novos logs
-    log_manager.subscribe_global(send_log)
+    # Buffer recente + novos logs, pela fila própria da conexão
+    subscriber = log_manager.connect(websocket.send_text, batch=batch, on_close=websocket.close)
     
     try:
         while True:
@@ -46,15 +36,17 @@ async def websocket_logs_all(websocket: WebSocket):
             data = await websocket.receive_text()
             # Pode processar comandos do cliente aqui (filtros, etc)
     except WebSocketDisconnect:
-        log_manager.unsubscribe_global(send_log)
+        pass
+    finally:
+        log_manager.disconnect(subscriber)
 
 
 @router.websocket("/ws/logs/{bot_id}")
-async def websocket_logs_bot(websocket: WebSocket, bot_id: str):
+async def websocket_logs_bot(websocket: WebSocket, bot_id: str, batch: bool = False):
     """
     WebSocket para receber logs de um bot específico.
     
-    Filtra logs pelo bot_id.
+    Filtra logs pelo bot_id; `?batch=true` como em /ws/logs.
     """
     # Validar se o bot existe antes de aceitar conexão
     bot_status = bot_manager.get_bot_status(bot_id)
@@ -64,26 +56,17 @@ async def websocket_logs_bot(websocket: WebSocket, bot_id: str):
     
     await websocket.accept()
     
-    # Callback para enviar via WebSocket
-    async def send_log(message: dict):
-        try:
-            await websocket.send_json(message)
-        except Exception:
-            pass
-    
-    # Enviar buffer específico desse bot (eficiente - O(1))
-    for log in log_manager.get_buffer(bot_id=bot_id):
-        await websocket.send_json(log)
-    
-    # Registrar subscriber para novos logs desse bot
-    log_manager.subscribe_to_bot(bot_id, send_log)
+    # Buffer desse bot (O(1)) + novos logs dele
+    subscriber = log_manager.connect(websocket.send_text, bot_id=bot_id, batch=batch, on_close=websocket.close)
     
     try:
         while True:
             data = await websocket.receive_text()
             # Pode processar comandos do cliente aqui
     except WebSocketDisconnect:
-        log_manager.unsubscribe_from_bot(bot_id, send_log)
+        pass
+    finally:
+        log_manager.disconnect(subscriber)
 
 
 @router.get("/ws/connections")
@@ -104,6 +87,10 @@ async def get_connections_info():
             "buffer_size": log_stats['buffer_size'],
             "buffer_max": log_stats['buffer_max'],
             "total_bot_subscribers": log_stats['total_bot_subscribers'],
-            "bots_with_subscribers": log_stats['bots_with_subscribers']
+            "bots_with_subscribers": log_stats['bots_with_subscribers'],
+            "queued": log_stats['queued'],
+            "messages_sent": log_stats['messages_sent'],
+            "frames_sent": log_stats['frames_sent'],
+            "dropped": log_stats['dropped']
         }
     }
\ No newline at end of file
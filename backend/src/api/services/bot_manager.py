@@ -3,7 +3,7 @@ Bot Manager para API - Gerencia lifecycle de bots.
 
 Focado apenas em:
 - Iniciar/parar bots
-- Gerenciar threads
+- Registrar bots como tarefas do BotRuntime (um event loop para todos)
 - Status dos bots
 
 Logs são automaticamente capturados pelo LogStreamManager via Event Emitter.
@@ -11,6 +11,7 @@ Logs são automaticamente capturados pelo LogStreamManager via Event Emitter.
 
 import uuid
 import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
 from datetime import datetime
 from typing import Dict, Optional
 import sys
@@ -18,7 +19,8 @@ import os
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
-from live_trading.double_ema_breakout_orders_long_short_dual_params_agent_evaluator import start_live_trading_bot
+from live_trading.double_ema_breakout_orders_long_short_dual_params_agent_evaluator import BotEntryEvaluator
+from live_trading.bot_runtime import get_bot_runtime
 from entidades.lado_operacao import LadoOperacao
 from entidades.risco_operacao import RiscoOperacao
 from utils.logging import get_logger, LogCategory
@@ -28,19 +30,19 @@ class BotManager:
     """
     Gerenciador de bots - focado em lifecycle.
     
-    - Inicia/para bots em threads separadas
+    - Inicia/para bots como tarefas do BotRuntime (sem uma thread por bot)
     - Rastreia status e configurações
     - Logs são automáticos via sistema de logging existente
     """
     
     def __init__(self):
         self.bots: Dict[str, dict] = {}
-        self.threads: Dict[str, threading.Thread] = {}
+        self.tarefas: Dict[str, Future] = {}
         self.stop_flags: Dict[str, threading.Event] = {}
     
     def start_bot(self, config) -> str:
         """
-        Inicia um bot em uma thread separada.
+        Inicia um bot como tarefa do BotRuntime compartilhado.
         
         O bot usa o sistema de logging existente (sem modificações).
         LogStreamManager captura automaticamente todos os logs.
@@ -55,39 +57,29 @@ class BotManager:
         stop_flag = threading.Event()
         self.stop_flags[bot_id] = stop_flag
         
-        # Criar thread para executar o bot
-        thread = threading.Thread(
-            target=self._run_bot_safely,
-            kwargs={
-                'stop_flag': stop_flag,
-                'bot_id': bot_id,
-                'subconta': config.subconta,
-                'cripto': config.cripto,
-                'tempo_grafico': config.tempo_grafico,
-                'lado_operacao': lado_op,
-                'frequencia_agente_horas': config.frequencia_agente_horas,
-                'executar_agente_no_start': config.executar_agente_no_start,
-                'ema_rapida_compra': config.ema_rapida_compra,
-                'ema_lenta_compra': config.ema_lenta_compra,
-                'ema_rapida_venda': config.ema_rapida_venda,
-                'ema_lenta_venda': config.ema_lenta_venda,
-                'risco_por_operacao': risco_op,
-                'is_simulator': config.is_simulator,
-            },
-            daemon=True,
-            name=f"Bot_{config.cripto}_{config.tempo_grafico}"
+        estrategia = BotEntryEvaluator(
+            bot_id=bot_id,
+            subconta=config.subconta,
+            cripto=config.cripto,
+            tempo_grafico=config.tempo_grafico,
+            lado_operacao=lado_op,
+            frequencia_agente_horas=config.frequencia_agente_horas,
+            executar_agente_no_start=config.executar_agente_no_start,
+            ema_rapida_compra=config.ema_rapida_compra,
+            ema_lenta_compra=config.ema_lenta_compra,
+            ema_rapida_venda=config.ema_rapida_venda,
+            ema_lenta_venda=config.ema_lenta_venda,
+            risco_por_operacao=risco_op,
+            is_simulator=config.is_simulator,
         )
         
         self.bots[bot_id] = {
             'config': config.model_dump(),
             'status': 'running',
             'started_at': datetime.now().isoformat(),
-            'thread_id': thread.ident,
-            'thread_name': thread.name,
         }
         
-        self.threads[bot_id] = thread
-        thread.start()
+        self.tarefas[bot_id] = get_bot_runtime().adicionar(estrategia, stop_flag)
         
         # Log de sistema (da API, não do bot)
         logger = get_logger("BotManagerAPI")
@@ -103,24 +95,6 @@ class BotManager:
         
         return bot_id
     
-    def _run_bot_safely(self, bot_id: str, stop_flag: threading.Event, **kwargs):
-        """
-        Executa o bot com tratamento de erro.
-        
-        Passa stop_flag para o bot permitir parada graciosa.
-        """
-        try:
-            start_live_trading_bot(bot_id=bot_id, stop_flag=stop_flag, **kwargs)
-        except Exception as e:
-            logger = get_logger("BotManagerAPI")
-            logger.error(
-                LogCategory.EXECUTION_ERROR,
-                f"❌ Erro ao executar bot",
-                "bot_manager",
-                exception=e,
-                api_bot_id=bot_id
-            )
-    
     def stop_bot(self, bot_id: str, timeout: int = 10) -> bool:
         """Para um bot específico com timeout."""
         if bot_id not in self.bots:
@@ -128,17 +102,21 @@ class BotManager:
         
         bot_info = self.bots[bot_id]
         
-        # Sinalizar parada
+        # Sinalizar parada e acordar a tarefa para ela enxergar o sinal
         if bot_id in self.stop_flags:
             self.stop_flags[bot_id].set()
+        get_bot_runtime().acordar(bot_id)
         
-        # Aguardar thread parar graciosamente
-        thread = self.threads.get(bot_id)
-        if thread and thread.is_alive():
-            thread.join(timeout=timeout)
+        # Aguardar tarefa encerrar graciosamente (termina a passada em andamento)
+        tarefa = self.tarefas.get(bot_id)
+        if tarefa and not tarefa.done():
+            try:
+                tarefa.result(timeout=timeout)
+            except FutureTimeoutError:
+                pass
         
         # Verificar se parou
-        stopped = not (thread and thread.is_alive())
+        stopped = not (tarefa and not tarefa.done())
         
         # Log de sistema
         logger = get_logger("BotManagerAPI")
@@ -175,11 +153,11 @@ class BotManager:
             return None
         
         bot_info = self.bots[bot_id]
-        thread = self.threads.get(bot_id)
+        tarefa = self.tarefas.get(bot_id)
         
         return {
             'bot_id': bot_id,
-            'status': 'running' if (thread and thread.is_alive()) else 'stopped',
+            'status': 'running' if (tarefa and not tarefa.done()) else 'stopped',
             'subconta': bot_info['config']['subconta'],
             'cripto': bot_info['config']['cripto'],
             'tempo_grafico': bot_info['config']['tempo_grafico'],
@@ -0,0 +1,277 @@
+"""
+Jobs em segundo plano para as computações pesadas da API.
+
+Varredura, análise e otimização rodam em um pool de processos (fora do event
+loop e do GIL do uvicorn). Cada job é uma lista de partes independentes (ex.:
+uma moeda da varredura), o que dá o progresso `done/total`, e uma função que
+combina os resultados das partes quando todas terminam.
+
+Sobre os jobs, `cached` implementa stale-while-revalidate: com resultado
+dentro do TTL devolve na hora; vencido, devolve o resultado antigo e agenda a
+atualização (um job por chave); só sem resultado nenhum o pedido espera o job,
+sem travar o loop. Os resultados ficam em um SQLite local, então um restart
+não esfria todos os caches. Uma chave cujo job falhou só é reagendada depois de
+um backoff exponencial (BACKOFF_INICIAL dobrando até BACKOFF_MAXIMO), para que
+cada pedido com resultado vencido não dispare a varredura inteira de novo.
+"""
+
+import asyncio
+import json
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from utils.logging import get_logger, LogCategory
+
+MAX_WORKERS = int(os.getenv('JOBS_MAX_WORKERS', '2'))  # cada processo tem seu próprio limitador de requisições
+CAMINHO_RESULTADOS = 'data/jobs/resultados.sqlite'
+MAX_JOBS_HISTORICO = 200
+BACKOFF_INICIAL = 30.0   # segundos até reagendar uma chave após a primeira falha
+BACKOFF_MAXIMO = 900.0
+
+Tarefa = Tuple[Callable, tuple]
+
+
+class JobFalhou(RuntimeError):
+    """Erro de um job que falhou; `job` é o Job, para a rota devolver o status dele."""
+
+    def __init__(self, job: 'Job'):
+        super().__init__(job.error)
+        self.job = job
+
+
+@dataclass
+class Job:
+    id: str
+    kind: str
+    key: str
+    total: int
+    done: int = 0
+    submitted_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+    error: Optional[str] = None
+    future: Future = field(default_factory=Future, repr=False)
+    partes: List[Future] = field(default_factory=list, repr=False)
+
+    @property
+    def status(self) -> str:
+        if self.finished_at is not None:
+            return 'failed' if self.error else 'done'
+        if self.done or any(parte.running() for parte in self.partes):
+            return 'running'
+        return 'queued'
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "key": self.key,
+            "status": self.status,
+            "progress": round(self.done / self.total, 3) if self.total else 1.0,
+            "done": self.done,
+            "total": self.total,
+            "submitted_at": self.submitted_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+        }
+
+
+class ResultStore:
+    """Último resultado de cada chave em SQLite (JSON), com cópia em memória."""
+
+    def __init__(self, caminho: str = CAMINHO_RESULTADOS):
+        self.caminho = caminho
+        self._memoria: Dict[str, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(caminho) or '.', exist_ok=True)
+        with self._conectar() as conexao:
+            conexao.execute(
+                "CREATE TABLE IF NOT EXISTS resultados ("
+                "chave TEXT PRIMARY KEY, atualizado_em REAL NOT NULL, resultado TEXT NOT NULL)")
+
+    def _conectar(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.caminho, timeout=10)
+
+    def obter(self, chave: str) -> Optional[Tuple[float, Any]]:
+        with self._lock:
+            if chave not in self._memoria:
+                with self._conectar() as conexao:
+                    linha = conexao.execute(
+                        "SELECT atualizado_em, resultado FROM resultados WHERE chave = ?", (chave,)).fetchone()
+                if linha is None:
+                    return None
+                self._memoria[chave] = (linha[0], json.loads(linha[1]))
+            return self._memoria[chave]
+
+    def guardar(self, chave: str, resultado: Any) -> Any:
+        """Grava e devolve o resultado como sai do JSON, igual ao que um restart leria."""
+        texto = json.dumps(resultado, default=_para_json)
+        atualizado_em = time.time()
+        with self._lock:
+            with self._conectar() as conexao:
+                conexao.execute("INSERT OR REPLACE INTO resultados VALUES (?, ?, ?)", (chave, atualizado_em, texto))
+            self._memoria[chave] = (atualizado_em, json.loads(texto))
+            return self._memoria[chave][1]
+
+
+def _para_json(valor):
+    # escalares numpy/pandas (np.float64, np.bool_, Timestamp...)
+    if hasattr(valor, 'item'):
+        return valor.item()
+    if hasattr(valor, 'isoformat'):
+        return valor.isoformat()
+    return str(valor)
+
+
+class JobService:
+    def __init__(self, max_workers: int = MAX_WORKERS, store: Optional[ResultStore] = None):
+        self.max_workers = max_workers
+        self.store = store or ResultStore()
+        self.jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._ativos: Dict[str, Job] = {}  # chave -> job em andamento
+        self._falhas: Dict[str, Tuple[int, float, Job]] = {}  # chave -> (falhas seguidas, próxima tentativa, último job)
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.logger = get_logger("JobService")
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: o processo da API tem threads (scanner, bots), e fork com threads não é seguro
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                 mp_context=multiprocessing.get_context('spawn'))
+        return self._executor
+
+    def submit(self, kind: str, key: str, tarefas: Sequence[Tarefa], combinar: Callable[[List[Any]], Any]) -> Job:
+        """Agenda o job da chave (ou devolve o que já está em andamento para ela)."""
+        with self._lock:
+            if key in self._ativos:
+                return self._ativos[key]
+            job = Job(id=uuid.uuid4().hex[:12], kind=kind, key=key, total=len(tarefas))
+            self._ativos[key] = job
+            self.jobs[job.id] = job
+            while len(self.jobs) > MAX_JOBS_HISTORICO:
+                self.jobs.popitem(last=False)
+
+        self.logger.info(LogCategory.SYSTEM, f"🧮 Job {kind} agendado ({key}, {len(tarefas)} partes)", job_id=job.id)
+        resultados: List[Any] = [None] * len(tarefas)
+        if not tarefas:
+            self._concluir(job, combinar, resultados)
+            return job
+
+        pool = self._pool()
+        for i, (funcao, args) in enumerate(tarefas):
+            parte = pool.submit(funcao, *args)
+            job.partes.append(parte)
+            parte.add_done_callback(lambda f, i=i: self._parte_concluida(job, i, f, combinar, resultados))
+        return job
+
+    def _parte_concluida(self, job: Job, i: int, parte: Future, combinar, resultados: List[Any]) -> None:
+        # Roda na thread de gerenciamento do pool
+        if job.finished_at is not None:
+            return
+        if parte.cancelled() or parte.exception() is not None:
+            # As demais partes terminam no pool e são ignoradas (finished_at já marcado)
+            excecao = None if parte.cancelled() else parte.exception()
+            if isinstance(excecao, BrokenProcessPool):
+                self._executor = None  # um processo morreu: o próximo job cria um pool novo
+            self._finalizar(job, erro=repr(excecao) if excecao else 'cancelado')
+            return
+        with self._lock:
+            resultados[i] = parte.result()
+            job.done += 1
+            completo = job.done == job.total
+        if completo:
+            self._concluir(job, combinar, resultados)
+
+    def _concluir(self, job: Job, combinar, resultados: List[Any]) -> None:
+        try:
+            resultado = self.store.guardar(job.key, combinar(resultados))
+        except Exception as e:
+            self._finalizar(job, erro=repr(e))
+            return
+        self._finalizar(job, resultado=resultado)
+
+    def _finalizar(self, job: Job, resultado: Any = None, erro: Optional[str] = None) -> None:
+        with self._lock:
+            if job.finished_at is not None:
+                return
+            job.error = erro
+            job.finished_at = time.time()
+            if self._ativos.get(job.key) is job:
+                del self._ativos[job.key]
+            if erro:
+                falhas = self._falhas.get(job.key, (0, 0.0, job))[0] + 1
+                espera = min(BACKOFF_INICIAL * 2 ** (falhas - 1), BACKOFF_MAXIMO)
+                self._falhas[job.key] = (falhas, job.finished_at + espera, job)
+            else:
+                self._falhas.pop(job.key, None)
+        duracao = job.finished_at - job.submitted_at
+        if erro:
+            self.logger.error(LogCategory.EXECUTION_ERROR, f"❌ Job {job.kind} falhou ({job.key}): {erro}", job_id=job.id)
+            job.future.set_exception(JobFalhou(job))
+        else:
+            self.logger.info(LogCategory.PERFORMANCE_METRIC, f"✅ Job {job.kind} concluído em {duracao:.1f}s ({job.key})",
+                             job_id=job.id, duracao_s=round(duracao, 3))
+            job.future.set_result(resultado)
+
+    async def cached(self, kind: str, key: str, ttl: float, tarefas: Callable[[], Sequence[Tarefa]],
+                     combinar: Callable[[List[Any]], Any], aguardar: bool = True) -> Dict[str, Any]:
+        """
+        Stale-while-revalidate sobre `submit`.
+
+        Returns:
+            {'result', 'updated_at', 'stale', 'job'}; `result` é None só quando a chave
+            nunca foi calculada e `aguardar` é False (o job fica em `job`)
+
+        Raises:
+            JobFalhou: a chave nunca foi calculada e o job aguardado falhou
+        """
+        entrada = self.store.obter(key)
+        job = self._ativos.get(key)
+        if entrada is None or time.time() - entrada[0] >= ttl:
+            falha = self._falhas.get(key)
+            if job is None and falha is not None and time.time() < falha[1]:
+                job = falha[2]  # em backoff: devolve o job que falhou em vez de reagendar
+            else:
+                job = self.submit(kind, key, tarefas(), combinar)
+        if entrada is None and aguardar:
+            await asyncio.wrap_future(job.future)
+            entrada = self.store.obter(key)
+
+        return {
+            "result": entrada[1] if entrada else None,
+            "updated_at": entrada[0] if entrada else None,
+            "stale": entrada is None or time.time() - entrada[0] >= ttl,
+            "job": job.to_dict() if job else None,
+        }
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = self.jobs.get(job_id)
+        return job.to_dict() if job else None
+
+    def list_jobs(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            jobs = list(self.jobs.values())
+        return [job.to_dict() for job in reversed(jobs)]
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+_job_service_instance = None
+
+def get_job_service() -> JobService:
+    global _job_service_instance
+    if _job_service_instance is None:
+        _job_service_instance = JobService()
+    return _job_service_instance
@@ -0,0 +1,31 @@
+"""
+Tarefas executadas nos processos do JobService.
+
+Ficam em um módulo leve e no nível de módulo para que o pool (spawn) consiga
+importá-las e serializá-las por referência; cada uma importa o que precisa só
+dentro do processo de trabalho.
+"""
+
+from typing import Any, Dict, List, Optional
+
+
+def analisar_moeda(simbolo: str) -> Optional[Dict[str, Any]]:
+    """Didi + Bollinger de uma moeda (varredura_didi_bollinger.analisar_moeda)."""
+    from varredura_didi_bollinger import analisar_moeda as analisar
+    return analisar(simbolo)
+
+
+def otimizar_simbolo(symbol: str, interval: str, days: int) -> List[Dict[str, Any]]:
+    """Top 5 do grid da Double EMA Breakout, sem o cache em memória do OptimizationService."""
+    from api.services.optimization_service import otimizar_simbolo as otimizar
+    return otimizar(symbol, interval, days)
+
+
+def ordenar_por_score(resultados: List[Optional[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """Combina as partes da varredura: descarta moedas sem resultado e ordena por score."""
+    return sorted((r for r in resultados if r), key=lambda r: r['score'], reverse=True)
+
+
+def primeiro(resultados: List[Any]) -> Any:
+    """Combina um job de uma parte só."""
+    return resultados[0]
@@ -14,26 +14,146 @@ import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
 import asyncio
-from typing import Dict, List, Optional, Callable, Awaitable
+import json
+import threading
+from typing import Dict, List, Optional, Callable, Awaitable, Set, Tuple
 from collections import deque
-from utils.logging import LogEvent
+from utils.logging import LogEvent, LogLevel
 from utils.notifications.events import get_event_emitter
 
+INTERVALO_FRAME = 0.1        # janela (s) em que as mensagens de uma conexão viram um frame
+CAPACIDADE_FILA = 1000       # mensagens pendentes por conexão (as mais antigas saem primeiro)
+LIMIAR_AMOSTRAGEM = 0.5      # fila acima dessa fração: só entram logs de TRADING para cima
+TIMEOUT_ENVIO = 5.0          # um envio parado por mais que isso derruba a conexão lenta
+TIMEOUT_FECHAMENTO = 2.0     # o close da conexão lenta também pode travar no mesmo buffer cheio
+
+
+class LogSubscriber:
+    """
+    Uma conexão de logs: fila limitada própria + task de envio.
+    
+    As mensagens chegam já serializadas; a cada `intervalo` a task envia tudo
+    o que acumulou (um frame com array JSON se `batch`, senão um frame por
+    mensagem). Uma conexão lenta só enche a própria fila: acima de
+    `LIMIAR_AMOSTRAGEM` ela passa a receber só os logs prioritários, cheia
+    descarta os mais antigos, e um envio travado por `TIMEOUT_ENVIO` a derruba.
+    """
+    
+    def __init__(
+        self,
+        send_text: Callable[[str], Awaitable[None]],
+        bot_id: Optional[str] = None,
+        batch: bool = False,
+        capacity: int = CAPACIDADE_FILA,
+        interval: float = INTERVALO_FRAME,
+        on_close: Optional[Callable[[], Awaitable[None]]] = None
+    ):
+        self.send_text = send_text
+        self.bot_id = bot_id
+        self.batch = batch
+        self.capacity = capacity
+        self.interval = interval
+        self.on_close = on_close
+        self.queue: deque = deque(maxlen=capacity)
+        self.dropped = 0
+        self.sent = 0
+        self.frames = 0
+        self.closed = False
+        self._dropped_notified = 0
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+    
+    def start(self, manager: 'LogStreamManager') -> None:
+        self._task = asyncio.get_running_loop().create_task(self._send_loop(manager))
+    
+    def offer(self, text: str, priority: bool) -> None:
+        """Enfileira uma mensagem (roda no event loop; nunca espera)."""
+        if self.closed:
+            return
+        size = len(self.queue)
+        if not priority and size >= self.capacity * LIMIAR_AMOSTRAGEM:
+            self.dropped += 1  # amostragem: atrasada, a conexão só recebe os prioritários
+            return
+        if size >= self.capacity:
+            self.dropped += 1  # cheia: o deque descarta o mais antigo
+        self.queue.append(text)
+        self._wakeup.set()
+    
+    async def _send_loop(self, manager: 'LogStreamManager') -> None:
+        try:
+            while True:
+                await self._wakeup.wait()
+                self._wakeup.clear()
+                texts = list(self.queue)
+                self.queue.clear()
+                if self.dropped > self._dropped_notified:
+                    texts.append(json.dumps(_drop_notice(self.dropped - self._dropped_notified, self.bot_id)))
+                    self._dropped_notified = self.dropped
+                if self.batch:
+                    await asyncio.wait_for(self.send_text('[' + ','.join(texts) + ']'), TIMEOUT_ENVIO)
+                    self.frames += 1
+                else:
+                    for text in texts:
+                        await asyncio.wait_for(self.send_text(text), TIMEOUT_ENVIO)
+                    self.frames += len(texts)
+                self.sent += len(texts)
+                # Janela de coalescência: o que chegar até lá sai no próximo frame
+                await asyncio.sleep(self.interval)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            slow = isinstance(e, asyncio.TimeoutError)
+            print(f"Conexão de logs encerrada ({'lenta' if slow else e})")
+            manager.disconnect(self, slow=slow)
+            if self.on_close:
+                try:
+                    # O handshake de close passa pelo mesmo socket travado: sem limite a task nunca termina
+                    await asyncio.wait_for(self.on_close(), TIMEOUT_FECHAMENTO)
+                except Exception:
+                    pass
+    
+    def stop(self) -> None:
+        self.closed = True
+        if self._task and not self._task.done() and self._task is not asyncio.current_task():
+            self._task.cancel()
+
+
+def _drop_notice(count: int, bot_id: Optional[str]) -> dict:
+    # No formato de um log, para os clientes atuais exibirem sem tratamento especial
+    return {
+        'timestamp': None,
+        'level': 'WARNING',
+        'category': 'SYSTEM',
+        'message': f"⚠️ {count} logs não enviados (conexão lenta)",
+        'module': 'LogStreamManager',
+        'agent_name': None,
+        'bot_id': bot_id,
+        'cripto': None,
+        'tempo_grafico': None,
+        'subconta': None,
+        'context': {'dropped': count},
+        'exception': None,
+    }
+
+
 class LogStreamManager:
     """
     Gerencia streaming de logs via WebSocket.
     
     - Escuta TODOS os LogEvents do sistema
     - Mantém buffer de logs recentes
-    - Broadcasting assíncrono para WebSocket
+    - Serializa cada log uma vez e o repassa ao event loop em lotes
+      (um salto de thread por lote, não por linha)
+    - Cada conexão tem fila e task de envio próprias (LogSubscriber): uma aba
+      lenta não atrasa as demais nem segura quem loga
     """
     
     def __init__(self, buffer_size: int = 500):
-        # Subscribers por bot_id (para /ws/logs/{bot_id})
-        self._bot_subscribers: Dict[str, List[Callable[[dict], Awaitable[None]]]] = {}
+        # Conexões por bot_id (para /ws/logs/{bot_id})
+        self._bot_subscribers: Dict[str, List[LogSubscriber]] = {}
         
-        # Subscribers globais (para /ws/logs)
-        self._global_subscribers: List[Callable[[dict], Awaitable[None]]] = []
+        # Conexões globais (para /ws/logs)
+        self._global_subscribers: List[LogSubscriber] = []
         
         # Buffers organizados por bot_id (mais eficiente)
         self._buffers_by_bot: Dict[str, deque] = {}
@@ -45,6 +165,13 @@ class LogStreamManager:
         # Event loop principal do FastAPI (para broadcast thread-safe)
         self._main_loop = None
         
+        # Logs serializados aguardando o próximo salto para o event loop
+        self._pending: List[Tuple[Optional[str], str, bool]] = []
+        self._pending_lock = threading.Lock()
+        self._scheduled = False
+        self._hops = 0
+        self._slow_disconnects = 0
+        
         # Conectar ao Event Emitter do sistema de logging
         get_event_emitter().subscribe('log_event', self._on_log_event)
     
@@ -58,8 +185,8 @@ class LogStreamManager:
     
     def _on_log_event(self, event):
         """
-        Callback quando um LogEvent é emitido (síncrono).
-        Converte para dict e agenda broadcast assíncrono.
+        Callback quando um LogEvent é emitido (síncrono, fora do event loop).
+        Converte para dict, serializa uma vez e agenda a distribuição em lote.
         """
         log_event = event.data  # Extrair LogEvent do Event
         message = self._log_event_to_dict(log_event)
@@ -74,19 +201,27 @@ class LogStreamManager:
                 self._buffers_by_bot[bot_id] = deque(maxlen=self._buffer_size)
             self._buffers_by_bot[bot_id].append(message)
         
-        # Broadcast via WebSocket (thread-safe)
-        if self._main_loop and not self._main_loop.is_closed():
-            try:
-                # Agendar corrotina no loop principal de forma thread-safe
-                # Funciona mesmo quando chamado de threads diferentes (bots)
-                asyncio.run_coroutine_threadsafe(
-                    self._broadcast_async(message),
-                    self._main_loop
-                )
-            except Exception:
-                # Silenciosamente ignora se não conseguir agendar
-                # (ex: loop fechado, erro de thread)
-                pass
+        if not (self._global_subscribers or self._bot_subscribers.get(bot_id)):
+            return
+        loop = self._main_loop
+        if loop is None or loop.is_closed():
+            return
+        
+        text = json.dumps(message, default=str)
+        priority = log_event.level.value >= LogLevel.TRADING.value
+        with self._pending_lock:
+            self._pending.append((bot_id, text, priority))
+            if self._scheduled:
+                return
+            self._scheduled = True
+        try:
+            # Um único salto de thread leva todos os logs acumulados até ele rodar
+            loop.call_soon_threadsafe(self._distribute)
+        except RuntimeError:
+            # Loop fechado entre a checagem e o agendamento
+            with self._pending_lock:
+                self._pending.clear()
+                self._scheduled = False
     
     def _log_event_to_dict(self, log_event: LogEvent) -> dict:
         """Converte LogEvent para dict para WebSocket."""
@@ -106,61 +241,59 @@ class LogStreamManager:
             'exception': str(log_event.exception) if log_event.exception else None,
         }
     
-    async def _broadcast_async(self, message: dict):
-        """Envia mensagem para todos os subscribers apropriados."""
-        bot_id = message.get('bot_id')
+    def _distribute(self):
+        """Repassa o lote pendente às filas das conexões (roda no event loop)."""
+        with self._pending_lock:
+            pending, self._pending = self._pending, []
+            self._scheduled = False
+        self._hops += 1
+        
+        for bot_id, text, priority in pending:
+            # Conexões específicas do bot
+            for subscriber in self._bot_subscribers.get(bot_id, ()) if bot_id else ():
+                subscriber.offer(text, priority)
+            # Conexões globais
+            for subscriber in self._global_subscribers:
+                subscriber.offer(text, priority)
+    
+    # ============= Métodos públicos para gerenciar conexões =============
+    
+    def connect(
+        self,
+        send_text: Callable[[str], Awaitable[None]],
+        bot_id: Optional[str] = None,
+        batch: bool = False,
+        on_close: Optional[Callable[[], Awaitable[None]]] = None
+    ) -> LogSubscriber:
+        """
+        Registra uma conexão (global ou de um bot) e inicia sua task de envio.
+        
+        O buffer de logs recentes entra na fila da conexão antes dos novos.
+        Deve ser chamado dentro do event loop.
+        """
+        subscriber = LogSubscriber(send_text, bot_id=bot_id, batch=batch, on_close=on_close)
+        for message in self.get_buffer(max_items=subscriber.capacity, bot_id=bot_id):
+            subscriber.offer(json.dumps(message, default=str), priority=True)
         
-        # Broadcast para subscribers específicos do bot
-        if bot_id and bot_id in self._bot_subscribers:
-            await self._send_to_subscribers(self._bot_subscribers[bot_id], message)
-        
-        # Broadcast para subscribers globais
-        await self._send_to_subscribers(self._global_subscribers, message)
-    
-    async def _send_to_subscribers(self, subscribers: List, message: dict):
-        """Envia mensagem para lista de subscribers e remove os mortos."""
-        dead_subscribers = []
-        
-        for subscriber in subscribers:
-            try:
-                await subscriber(message)
-            except Exception as e:
-                print(f"Erro ao enviar log via WebSocket: {e}")
-                dead_subscribers.append(subscriber)
-        
-        # Remover subscribers mortos
-        for subscriber in dead_subscribers:
-            try:
-                subscribers.remove(subscriber)
-            except ValueError:
-                pass
-    
-    # ============= Métodos públicos para gerenciar subscribers =============
-    
-    def subscribe_to_bot(self, bot_id: str, callback: Callable[[dict], Awaitable[None]]):
-        """Registra callback para receber logs de um bot específico."""
-        if bot_id not in self._bot_subscribers:
-            self._bot_subscribers[bot_id] = []
-        self._bot_subscribers[bot_id].append(callback)
-    
-    def unsubscribe_from_bot(self, bot_id: str, callback: Callable[[dict], Awaitable[None]]):
-        """Remove callback de um bot específico."""
-        if bot_id in self._bot_subscribers:
-            try:
-                self._bot_subscribers[bot_id].remove(callback)
-            except ValueError:
-                pass  # Callback já foi removido
-    
-    def subscribe_global(self, callback: Callable[[dict], Awaitable[None]]):
-        """Registra callback para receber logs de todos os bots."""
-        self._global_subscribers.append(callback)
-    
-    def unsubscribe_global(self, callback: Callable[[dict], Awaitable[None]]):
-        """Remove callback global."""
+        if bot_id:
+            self._bot_subscribers.setdefault(bot_id, []).append(subscriber)
+        else:
+            self._global_subscribers.append(subscriber)
+        subscriber.start(self)
+        return subscriber
+    
+    def disconnect(self, subscriber: LogSubscriber, slow: bool = False):
+        """Remove a conexão e encerra sua task de envio."""
+        if slow:
+            self._slow_disconnects += 1
+        subscriber.stop()
+        subscribers = self._bot_subscribers.get(subscriber.bot_id, []) if subscriber.bot_id else self._global_subscribers
         try:
-            self._global_subscribers.remove(callback)
+            subscribers.remove(subscriber)
         except ValueError:
-            pass  # Callback já foi removido
+            pass  # Já foi removida
+        if subscriber.bot_id and not subscribers:
+            self._bot_subscribers.pop(subscriber.bot_id, None)
     
     # ============= Métodos de consulta =============
     
@@ -213,6 +346,7 @@ class LogStreamManager:
     
     def get_stats(self) -> dict:
         """Retorna estatísticas do sistema de streaming."""
+        subscribers = self._global_subscribers + [s for subs in self._bot_subscribers.values() for s in subs]
         return {
             'total_global_subscribers': len(self._global_subscribers),
             'total_bot_subscribers': sum(len(subs) for subs in self._bot_subscribers.values()),
@@ -222,6 +356,13 @@ class LogStreamManager:
             # Estatísticas por bot
             'total_bots_with_buffer': len(self._buffers_by_bot),
             'bot_ids': list(self._buffers_by_bot.keys()),
+            # Fan-out
+            'loop_hops': self._hops,
+            'queued': sum(len(s.queue) for s in subscribers),
+            'messages_sent': sum(s.sent for s in subscribers),
+            'frames_sent': sum(s.frames for s in subscribers),
+            'dropped': sum(s.dropped for s in subscribers),
+            'slow_disconnects': self._slow_disconnects,
         }
 
 
@@ -0,0 +1,126 @@
+"""
+Acesso a dados de mercado da Bybit para as rotas da API.
+
+As chamadas do pybit são síncronas; aqui elas rodam no pool de threads do
+`ClienteBybitAsync`, depois de um token do `limitador_publico`, sem travar o
+event loop do uvicorn. Em cima disso:
+
+- singleflight: pedidos iguais simultâneos aguardam a mesma chamada à corretora;
+- cache com TTL curto: velas expiram no fechamento da vela corrente (ou antes,
+  em `TTL_VELAS`), livro de ofertas e negócios em ~1 s.
+
+Assim, o polling do dashboard em várias abas vira no máximo uma chamada por
+chave e por TTL.
+"""
+
+import asyncio
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from utils.logging import get_logger, LogCategory
+
+TTL_VELAS = 5.0          # teto para a vela corrente, que muda a cada negócio
+TTL_LIVRO = 1.0
+TTL_NEGOCIOS = 1.0
+MAX_ENTRADAS = 1024      # acima disso, as entradas vencidas são descartadas
+
+# Duração de cada intervalo da Bybit em segundos
+SEGUNDOS_POR_INTERVALO = {
+    '1': 60, '3': 180, '5': 300, '15': 900, '30': 1800, '60': 3600, '120': 7200,
+    '240': 14400, '360': 21600, '720': 43200, 'D': 86400, 'W': 604800,
+}
+
+
+def ttl_ate_fechamento(intervalo: str, teto: float = TTL_VELAS) -> float:
+    """Segundos até o fechamento da vela corrente de `intervalo`, limitado a `teto`."""
+    duracao = SEGUNDOS_POR_INTERVALO.get(intervalo)
+    if not duracao:
+        return teto
+    return min(teto, duracao - time.time() % duracao)
+
+
+class MarketDataService:
+    def __init__(self, cliente_http=None, limitador=None, executar: Optional[Callable] = None):
+        self.cliente_http = cliente_http
+        self.limitador = limitador
+        self._executar = executar
+        self._cache: Dict[Hashable, Tuple[float, Any]] = {}
+        self._em_voo: Dict[Hashable, asyncio.Future] = {}
+        self.metrics = {"hits": 0, "upstream_calls": 0, "coalesced": 0, "errors": 0}
+        self.logger = get_logger("MarketDataService")
+
+    def _dependencias(self):
+        if self.cliente_http is None:
+            from corretoras.funcoes_bybit import cliente, limitador_publico
+            self.cliente_http, self.limitador = cliente, self.limitador or limitador_publico
+        if self._executar is None:
+            from corretoras.cliente_bybit_async import get_cliente_bybit_async
+            self._executar = get_cliente_bybit_async().executar
+
+    async def _obter(self, chave: Hashable, ttl: Callable[[], float], metodo: str, **parametros) -> dict:
+        agora = time.monotonic()
+        entrada = self._cache.get(chave)
+        if entrada and entrada[0] > agora:
+            self.metrics["hits"] += 1
+            return entrada[1]
+
+        futuro = self._em_voo.get(chave)
+        if futuro is None:
+            self._dependencias()
+            futuro = asyncio.ensure_future(self._buscar(chave, ttl, metodo, parametros))
+            self._em_voo[chave] = futuro
+        else:
+            self.metrics["coalesced"] += 1
+        # shield: um cliente que desconecta não cancela a chamada dos demais
+        return await asyncio.shield(futuro)
+
+    async def _buscar(self, chave: Hashable, ttl: Callable[[], float], metodo: str, parametros: dict) -> dict:
+        try:
+            if self.limitador:
+                await self.limitador.adquirir_async()  # espera o token sem ocupar uma thread do pool
+            self.metrics["upstream_calls"] += 1
+            resposta = await self._executar(getattr(self.cliente_http, metodo), **parametros)
+            # Só respostas de sucesso entram no cache; erros da corretora são repetidos no próximo pedido
+            if resposta.get('retCode') == 0:
+                self._guardar(chave, time.monotonic() + ttl(), resposta)
+            return resposta
+        except Exception as e:
+            self.metrics["errors"] += 1
+            self.logger.warning(LogCategory.SYSTEM, f"⚠️ Falha em {metodo} {parametros}: {e}")
+            raise
+        finally:
+            self._em_voo.pop(chave, None)
+
+    def _guardar(self, chave: Hashable, expira_em: float, resposta: dict) -> None:
+        if len(self._cache) >= MAX_ENTRADAS:
+            agora = time.monotonic()
+            self._cache = {k: v for k, v in self._cache.items() if v[0] > agora}
+        self._cache[chave] = (expira_em, resposta)
+
+    async def get_kline(self, symbol: str, interval: str, limit: int, **parametros) -> dict:
+        """Resposta de `get_kline` (velas da mais nova para a mais antiga), em cache até o fechamento da vela."""
+        chave = ('kline', symbol, interval, limit, tuple(sorted(parametros.items())))
+        return await self._obter(chave, lambda: ttl_ate_fechamento(interval), 'get_kline',
+                                 symbol=symbol, interval=interval, limit=limit, **parametros)
+
+    async def get_orderbook(self, symbol: str, limit: int, category: str = 'linear') -> dict:
+        chave = ('orderbook', category, symbol, limit)
+        return await self._obter(chave, lambda: TTL_LIVRO, 'get_orderbook',
+                                 category=category, symbol=symbol, limit=limit)
+
+    async def get_public_trade_history(self, symbol: str, limit: int, category: str = 'linear') -> dict:
+        chave = ('trades', category, symbol, limit)
+        return await self._obter(chave, lambda: TTL_NEGOCIOS, 'get_public_trade_history',
+                                 category=category, symbol=symbol, limit=limit)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {**self.metrics, "cached": len(self._cache), "in_flight": len(self._em_voo)}
+
+
+_market_data_instance = None
+
+def get_market_data_service() -> MarketDataService:
+    global _market_data_instance
+    if _market_data_instance is None:
+        _market_data_instance = MarketDataService()
+    return _market_data_instance
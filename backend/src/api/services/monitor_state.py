@@ -4,14 +4,24 @@ MonitorState - Agrega estado dos bots a partir de LogEvents.
 Responsabilidades:
 - Escutar eventos do logging (log_event)
 - Consolidar estado por bot (trade, sinais, decisao de agentes)
+- Manter series por bot (preco, PnL, sinais, latencia dos agentes) em buffers circulares
 - Expor dados para endpoints REST do monitor
+
+Quem loga so enfileira o evento; uma thread propria agrega em lote e publica
+um snapshot imutavel. Leitores (dashboard) leem o snapshot publicado sem lock,
+entao o polling nunca segura a chamada de log de um bot. As respostas dos
+agentes so sao parseadas quando uma view pede a decisao.
 """
 
 from __future__ import annotations
 
 import threading
+import time
+from collections import deque
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
 
 from utils.notifications.events import get_event_emitter
 from utils.logging import LogCategory
@@ -19,6 +29,24 @@ from utils.logging.models import LogEvent
 from agentes.parsers.trade_entry_evaluator_parser import TradeEntryEvaluatorParser
 from agentes.parsers.trade_conductor_parser import TradeConductorParser
 
+CAPACIDADE_SERIE = 4096      # pontos por serie e por bot
+CAPACIDADE_FILA = 65536      # eventos aguardando a thread de agregacao
+INTERVALO_AGREGACAO = 0.25   # atraso maximo do snapshot em relacao aos logs (s)
+
+# Series por bot e como cada uma e reduzida ao reamostrar
+SERIES = {
+    "price": "last",
+    "pnl": "last",
+    "signals": "sum",
+    "agent_latency": "mean",
+}
+
+# Agentes cujas respostas sao parseadas sob demanda
+AGENTES_PARSEADOS = {
+    "Entry Evaluator": "entry_evaluator",
+    "Trade Conductor": "trade_conductor",
+}
+
 
 def _to_iso(ts: Optional[datetime]) -> Optional[str]:
     if not ts:
@@ -32,18 +60,141 @@ def _safe_value(value: Any) -> Any:
     return value
 
 
+def _to_float(value: Any) -> Optional[float]:
+    try:
+        return float(_safe_value(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def _first(context: Dict[str, Any], *keys: str) -> Any:
+    """Primeiro valor presente entre chaves equivalentes (bots logam em portugues, o parser em ingles)."""
+    for key in keys:
+        value = context.get(key)
+        if value is not None:
+            return value
+    return None
+
+
+def _side_from_prices(entry: Any, stop: Any, target: Any) -> Optional[str]:
+    """Lado deduzido dos precos da ordem: stop abaixo (ou alvo acima) da entrada e compra."""
+    entry, stop, target = _to_float(entry), _to_float(stop), _to_float(target)
+    if entry is None:
+        return None
+    if stop is not None and stop != entry:
+        return "compra" if stop < entry else "venda"
+    if target is not None and target != entry:
+        return "compra" if target > entry else "venda"
+    return None
+
+
+def _pnl(trade: Dict[str, Any], price: float) -> Optional[float]:
+    """PnL nao realizado da posicao aberta ao preco dado (None sem posicao conhecida)."""
+    entry, size = _to_float(trade.get("entry_price")), _to_float(trade.get("position_size"))
+    if entry is None or not size:
+        return None
+    # "aberto" (POSITION_OPEN) nao diz o lado: vale o side da abertura
+    estado = str(trade.get("estado") or "").lower()
+    side = estado if estado in ("comprado", "vendido") else str(trade.get("side") or "").lower()
+    if side in ("comprado", "compra", "buy", "long"):
+        return (price - entry) * size
+    if side in ("vendido", "venda", "sell", "short"):
+        return (entry - price) * size
+    return None
+
+
+class RingSeries:
+    """
+    Serie temporal de tamanho fixo (um escritor: a thread de agregacao).
+
+    Leitura sem lock: o leitor copia os arrays e descarta os pontos que o
+    escritor pode ter sobrescrito durante a copia (contador lido antes e depois).
+    """
+
+    def __init__(self, capacity: int = CAPACIDADE_SERIE):
+        self.capacity = capacity
+        self._ts = np.zeros(capacity)
+        self._values = np.zeros(capacity)
+        self._written = 0
+
+    def append(self, ts: float, value: float) -> None:
+        i = self._written % self.capacity
+        self._ts[i] = ts
+        self._values[i] = value
+        self._written += 1
+
+    def snapshot(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(timestamps, valores) em ordem cronologica."""
+        while True:
+            before = self._written
+            ts, values = self._ts.copy(), self._values.copy()
+            after = self._written
+            # Pontos validos: os `n` ultimos escritos antes da copia, menos os sobrescritos durante ela
+            n = min(before, self.capacity) - (after - before)
+            if n > 0 or after == before:
+                break
+        if n <= 0:
+            return np.empty(0), np.empty(0)
+        order = (np.arange(before - n, before)) % self.capacity
+        return ts[order], values[order]
+
+    def downsample(self, points: int, aggregation: str, since: Optional[float] = None) -> List[Dict[str, float]]:
+        """Reamostra em ate `points` baldes de tempo iguais (last | sum | mean, com min/max)."""
+        ts, values = self.snapshot()
+        if since is not None:
+            keep = ts >= since
+            ts, values = ts[keep], values[keep]
+        if not len(ts):
+            return []
+        edges = np.linspace(ts[0], ts[-1], points + 1)
+        ends = np.searchsorted(ts, edges[1:], side="right")
+        starts = np.r_[0, ends[:-1]]
+        filled = ends > starts
+        starts, ends, buckets_end = starts[filled], ends[filled], edges[1:][filled]
+        counts = ends - starts
+        sums = np.add.reduceat(values, starts)
+        if aggregation == "sum":
+            agg = sums
+        elif aggregation == "mean":
+            agg = sums / counts
+        else:
+            agg = values[ends - 1]
+        mins = np.minimum.reduceat(values, starts)
+        maxs = np.maximum.reduceat(values, starts)
+        return [
+            {"t": float(t), "value": float(v), "min": float(lo), "max": float(hi), "count": int(c)}
+            for t, v, lo, hi, c in zip(buckets_end, agg, mins, maxs, counts)
+        ]
+
+
 class MonitorState:
     """
     Agregador de estado em memoria para monitoria.
 
-    Observacao: mantem apenas ultimo estado relevante por bot.
+    Observacao: mantem apenas ultimo estado relevante por bot, mais as series
+    recentes (buffers circulares de CAPACIDADE_SERIE pontos).
     """
 
     def __init__(self) -> None:
-        self._lock = threading.Lock()
+        # Estado mutavel: so a thread de agregacao toca
         self._bots: Dict[str, Dict[str, Any]] = {}
-        self._entry_parser = TradeEntryEvaluatorParser()
-        self._conductor_parser = TradeConductorParser()
+        self._agent_started: Dict[Tuple[str, str], float] = {}
+        # Publicado a cada lote (dict novo a cada vez; leitores nao usam lock)
+        self._snapshot: Dict[str, Dict[str, Any]] = {}
+        self._series: Dict[str, Dict[str, RingSeries]] = {}
+        # Decisoes parseadas sob demanda: (bot_id, agente) -> (resposta, decisao)
+        self._parsed: Dict[Tuple[str, str], Tuple[str, Optional[Dict]]] = {}
+        self._parsers = {
+            "entry_evaluator": TradeEntryEvaluatorParser(),
+            "trade_conductor": TradeConductorParser(),
+        }
+
+        self._queue: deque = deque(maxlen=CAPACIDADE_FILA)
+        self._wakeup = threading.Event()
+        self._idle = threading.Event()
+        self._idle.set()
+        self._thread = threading.Thread(target=self._run, name="MonitorState", daemon=True)
+        self._thread.start()
 
         get_event_emitter().subscribe("log_event", self._on_log_event)
 
@@ -119,17 +270,60 @@ class MonitorState:
         return log_event.bot_id
 
     def _on_log_event(self, event) -> None:
+        # Roda em quem emite o log: so enfileira
         log_event = event.data
         if not isinstance(log_event, LogEvent):
             return
-
-        bot_id = self._resolve_target_bot_id(log_event)
-        if not bot_id:
-            return
-
-        with self._lock:
-            state = self._bots.setdefault(bot_id, self._default_state(bot_id))
-            self._apply_log_event(state, log_event)
+        self._queue.append(log_event)
+        if not self._wakeup.is_set():
+            self._wakeup.set()
+
+    def _run(self) -> None:
+        while True:
+            self._wakeup.wait(INTERVALO_AGREGACAO)
+            self._wakeup.clear()
+            if not self._queue:
+                continue
+            self._idle.clear()
+            changed = set()
+            while self._queue:
+                log_event = self._queue.popleft()
+                bot_id = self._resolve_target_bot_id(log_event)
+                if not bot_id:
+                    continue
+                try:
+                    state = self._bots.get(bot_id)
+                    if state is None:
+                        state = self._bots[bot_id] = self._default_state(bot_id)
+                        self._series[bot_id] = {metric: RingSeries() for metric in SERIES}
+                    self._apply_log_event(state, log_event)
+                    self._update_series(bot_id, state, log_event)
+                    changed.add(bot_id)
+                except Exception as e:
+                    print(f"Erro ao agregar log no monitor: {e}")
+            self._publish(changed)
+            if not self._queue:
+                self._idle.set()
+
+    def _publish(self, changed: set) -> None:
+        snapshot = dict(self._snapshot)
+        for bot_id in changed:
+            # Copia dos dicts aninhados: a agregacao segue alterando o estado mutavel
+            snapshot[bot_id] = {
+                key: dict(value) if isinstance(value, dict) else value
+                for key, value in self._bots[bot_id].items()
+            }
+        self._snapshot = snapshot
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Espera a agregacao alcancar os eventos ja enfileirados (scripts e testes)."""
+        self._wakeup.set()
+        deadline = time.monotonic() + timeout
+        while self._queue or not self._idle.is_set():
+            if time.monotonic() > deadline:
+                return False
+            self._idle.wait(0.01)
+        return True
 
     def _apply_log_event(self, state: Dict[str, Any], log_event: LogEvent) -> None:
         category = log_event.category
@@ -190,14 +384,27 @@ class MonitorState:
             })
 
         if category == LogCategory.POSITION_OPEN:
+            # Parser do Entry Evaluator: entry_price/position_size/operation; bots: preco_entrada/tamanho_posicao
+            entry = _first(context, "entry_price", "preco_entrada")
+            stop = _first(context, "stop_price", "preco_stop")
+            target = _first(context, "target_price", "preco_alvo")
             state["trade"].update({
                 "estado": "aberto",
-                "side": context.get("operation"),
-                "entry_price": context.get("entry_price"),
-                "stop_price": context.get("stop_price"),
-                "target_price": context.get("target_price"),
-                "position_size": context.get("position_size"),
-                "risk_reward": context.get("risk_reward"),
+                "side": _safe_value(_first(context, "operation", "side", "lado_operacao"))
+                        or _side_from_prices(entry, stop, target),
+                "entry_price": entry,
+                "stop_price": stop,
+                "target_price": target,
+                "position_size": _first(context, "position_size", "tamanho_posicao"),
+                "risk_reward": _first(context, "risk_reward", "risco_retorno", "risco_retorno_compra",
+                                      "risco_retorno_venda"),
+                "updated_at": _to_iso(log_event.timestamp),
+            })
+
+        if category == LogCategory.POSITION_UPDATE and context.get("preco_stop") is not None:
+            # Break-even / trailing stop
+            state["trade"].update({
+                "stop_price": context.get("preco_stop"),
                 "updated_at": _to_iso(log_event.timestamp),
             })
 
@@ -214,24 +421,12 @@ class MonitorState:
                 "detected_at": _to_iso(log_event.timestamp),
             })
 
-        if category == LogCategory.AGENT_RESPONSE:
-            response_content = context.get("response_content") or ""
-            if log_event.agent_name == "Entry Evaluator":
-                parsed = self._entry_parser.parse_response(response_content)
-                state["entry_evaluator"].update({
-                    "last_response": response_content,
-                    "last_decision": parsed,
-                    "received_at": _to_iso(log_event.timestamp),
-                    "parse_ok": parsed is not None,
-                })
-            elif log_event.agent_name == "Trade Conductor":
-                parsed = self._conductor_parser.parse_response(response_content)
-                state["trade_conductor"].update({
-                    "last_response": response_content,
-                    "last_decision": parsed,
-                    "received_at": _to_iso(log_event.timestamp),
-                    "parse_ok": parsed is not None,
-                })
+        if category == LogCategory.AGENT_RESPONSE and log_event.agent_name in AGENTES_PARSEADOS:
+            # Decisao parseada so quando uma view pede (_with_decision)
+            state[AGENTES_PARSEADOS[log_event.agent_name]].update({
+                "last_response": context.get("response_content") or "",
+                "received_at": _to_iso(log_event.timestamp),
+            })
 
         if category == LogCategory.AGENT_DECISION:
             state["last_action"] = {
@@ -264,32 +459,97 @@ class MonitorState:
                 "details": context,
             }
 
+    def _update_series(self, bot_id: str, state: Dict[str, Any], log_event: LogEvent) -> None:
+        series = self._series[bot_id]
+        category = log_event.category
+        context = log_event.context or {}
+        ts = log_event.timestamp.timestamp()
+
+        price = _to_float(_first(context, "preco_atual", "current_price"))
+        if price is None and category == LogCategory.POSITION_OPEN:
+            price = _to_float(state["trade"]["entry_price"])
+        if price is not None:
+            series["price"].append(ts, price)
+            if state["trade"]["estado"] not in (None, "de fora"):
+                pnl = _pnl(state["trade"], price)
+                if pnl is not None:
+                    series["pnl"].append(ts, pnl)
+
+        if category == LogCategory.TRADE_SIGNAL or (
+                category == LogCategory.AGENT_EXECUTION and log_event.agent_name == "Entry Evaluator"):
+            series["signals"].append(ts, 1.0)
+
+        if log_event.agent_name:
+            key = (bot_id, log_event.agent_name)
+            if category == LogCategory.AGENT_EXECUTION:
+                self._agent_started[key] = ts
+            elif category == LogCategory.AGENT_RESPONSE and key in self._agent_started:
+                series["agent_latency"].append(ts, ts - self._agent_started.pop(key))
+
+    def _with_decision(self, bot_id: str, data: Dict[str, Any], agent: str) -> Dict[str, Any]:
+        """Estado do agente com a decisao parseada (uma vez por resposta, no leitor)."""
+        agent_state = data[agent]
+        response = agent_state["last_response"]
+        if response is None:
+            return dict(agent_state)
+        cached = self._parsed.get((bot_id, agent))
+        if cached is None or cached[0] is not response:
+            parsed = self._parsers[agent].parse_response(response) if response else None
+            cached = self._parsed[(bot_id, agent)] = (response, parsed)
+        return {**agent_state, "last_decision": cached[1], "parse_ok": cached[1] is not None}
+
     def get_summary(self) -> list:
-        with self._lock:
-            return [
-                {
-                    "bot_id": bot_id,
-                    "status": data["status"],
-                    "cripto": data["meta"]["cripto"],
-                    "tempo_grafico": data["meta"]["tempo_grafico"],
-                    "subconta": data["meta"]["subconta"],
-                    "last_log": data["last_log"],
-                    "trade": data["trade"],
-                    "entry_evaluator": {
-                        "received_at": data["entry_evaluator"]["received_at"],
-                        "last_decision": data["entry_evaluator"]["last_decision"],
-                    },
-                    "trade_conductor": {
-                        "received_at": data["trade_conductor"]["received_at"],
-                        "last_decision": data["trade_conductor"]["last_decision"],
-                    },
-                }
-                for bot_id, data in self._bots.items()
-            ]
+        summaries = []
+        for bot_id, data in self._snapshot.items():
+            entry_evaluator = self._with_decision(bot_id, data, "entry_evaluator")
+            trade_conductor = self._with_decision(bot_id, data, "trade_conductor")
+            summaries.append({
+                "bot_id": bot_id,
+                "status": data["status"],
+                "cripto": data["meta"]["cripto"],
+                "tempo_grafico": data["meta"]["tempo_grafico"],
+                "subconta": data["meta"]["subconta"],
+                "last_log": data["last_log"],
+                "trade": data["trade"],
+                "entry_evaluator": {
+                    "received_at": entry_evaluator["received_at"],
+                    "last_decision": entry_evaluator["last_decision"],
+                },
+                "trade_conductor": {
+                    "received_at": trade_conductor["received_at"],
+                    "last_decision": trade_conductor["last_decision"],
+                },
+            })
+        return summaries
 
     def get_bot(self, bot_id: str) -> Optional[Dict[str, Any]]:
-        with self._lock:
-            return self._bots.get(bot_id)
+        data = self._snapshot.get(bot_id)
+        if data is None:
+            return None
+        # Copia rasa: quem chama pode ajustar status/meta sem tocar no snapshot
+        return {
+            **data,
+            "meta": dict(data["meta"]),
+            "entry_evaluator": self._with_decision(bot_id, data, "entry_evaluator"),
+            "trade_conductor": self._with_decision(bot_id, data, "trade_conductor"),
+        }
+
+    def get_series(
+        self,
+        bot_id: str,
+        metrics: Optional[List[str]] = None,
+        points: int = 200,
+        since: Optional[datetime] = None
+    ) -> Optional[Dict[str, List[Dict[str, float]]]]:
+        """Series do bot reamostradas em ate `points` baldes (None se o bot nao existe)."""
+        series = self._series.get(bot_id)
+        if series is None:
+            return None
+        since_ts = since.timestamp() if since else None
+        return {
+            metric: series[metric].downsample(points, SERIES[metric], since_ts)
+            for metric in (metrics or SERIES)
+        }
 
 
 _monitor_state_instance: Optional[MonitorState] = None
@@ -20,6 +20,8 @@ from typing import List, Dict, Any
 import os
 
 from corretoras.funcoes_bybit import carregar_dados_historicos
+from vectorbt_project.fast_metrics import calcular_metricas
+from vectorbt_project.indicator_cache import ema
 from utils.logging import get_logger, LogCategory
 
 # Reutilizando o core Numba acelerado
@@ -85,6 +87,83 @@ def double_ema_breakout_long_short_nb(close, high, low, ema1_long, ema2_long, em
 
     return entries, exits, size
 
+def otimizar_simbolo(symbol: str, interval: str = '15', days: int = 7) -> List[Dict[str, Any]]:
+    """Grid de parâmetros da Double EMA Breakout; devolve os 5 melhores por fitness (sem cache)."""
+    end_date = datetime.now()
+    start_date = end_date - timedelta(days=days)
+    
+    # Carregar dados (necessário pular velas o suficiente para as EMAs estabilizarem)
+    df = carregar_dados_historicos(
+        symbol, interval, [20, 200], 
+        start_date.strftime('%Y-%m-%d'), 
+        end_date.strftime('%Y-%m-%d'),
+        pular_velas=500
+    )
+    df.columns = df.columns.str.lower()
+    
+    close = df['fechamento'].values
+    high = df['maxima'].values
+    low = df['minima'].values
+    
+    # Espaço de busca otimizado para velocidade
+    ema_short_range = [9, 12, 15, 21]
+    ema_long_range = [34, 50, 89, 100]
+    stop_range = [10, 15, 20]
+    rr_range = [2.0, 3.0, 4.0]
+    
+    results = []
+    
+    # Grid Search
+    for es in ema_short_range:
+        for el in ema_long_range:
+            if el <= es: continue
+            
+            # EMAs do cache de indicadores (cada período é calculado uma vez por dataset)
+            e_s = ema(df, es)
+            e_l = ema(df, el)
+            
+            for s in stop_range:
+                for r in rr_range:
+                    entries, exits, sizes = double_ema_breakout_long_short_nb(
+                        close, high, low, e_s, e_l, e_s, e_l, s, s, r, r
+                    )
+                    
+                    # Avaliar performance com o kernel de métricas (sem montar Portfolio)
+                    order_price = np.where(np.isnan(entries), exits, entries)
+                    stats = calcular_metricas(
+                        close, order_price, sizes,
+                        alvo_percentual=True,
+                        intervalo=interval,
+                        saldo_inicial=1000,
+                        taxa=0.00055
+                    )
+                    total_return = stats['Total Return [%]']
+                    drawdown = stats['Max Drawdown [%]']
+                    win_rate = stats['Win Rate [%]']
+                    
+                    # Métrica de "Fitness" equilibrada
+                    fitness = total_return * (1 - abs(drawdown)/100) if total_return > 0 else total_return
+                    
+                    results.append({
+                        "parameters": {
+                            "ema_short": es,
+                            "ema_long": el,
+                            "stop_candles": s,
+                            "risk_reward": r
+                        },
+                        "metrics": {
+                            "return": round(total_return, 2),
+                            "drawdown": round(drawdown, 2),
+                            "win_rate": round(win_rate, 2),
+                            "trades": int(stats['Total Trades']),
+                            "fitness": round(fitness, 2)
+                        }
+                    })
+    
+    # Ordenar por fitness e pegar os top 5
+    return sorted(results, key=lambda x: x['metrics']['fitness'], reverse=True)[:5]
+
+
 class OptimizationService:
     def __init__(self):
         self.logger = get_logger("OptimizationService")
@@ -104,83 +183,7 @@ class OptimizationService:
         self.logger.info(LogCategory.SYSTEM, f"🔍 Iniciando otimização para {symbol} ({days} dias)...")
         
         try:
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=days)
-            
-            # Carregar dados (necessário pular velas o suficiente para as EMAs estabilizarem)
-            df = carregar_dados_historicos(
-                symbol, interval, [20, 200], 
-                start_date.strftime('%Y-%m-%d'), 
-                end_date.strftime('%Y-%m-%d'),
-                pular_velas=500
-            )
-            df.columns = df.columns.str.lower()
-            
-            close = df['fechamento'].values
-            high = df['maxima'].values
-            low = df['minima'].values
-            
-            # Espaço de busca otimizado para velocidade
-            ema_short_range = [9, 12, 15, 21]
-            ema_long_range = [34, 50, 89, 100]
-            stop_range = [10, 15, 20]
-            rr_range = [2.0, 3.0, 4.0]
-            
-            results = []
-            
-            # Grid Search
-            for es in ema_short_range:
-                for el in ema_long_range:
-                    if el <= es: continue
-                    
-                    # Calcular EMAs uma vez por combinação
-                    e_s = pd.Series(close).ewm(span=es).mean().values
-                    e_l = pd.Series(close).ewm(span=el).mean().values
-                    
-                    for s in stop_range:
-                        for r in rr_range:
-                            entries, exits, sizes = double_ema_breakout_long_short_nb(
-                                close, high, low, e_s, e_l, e_s, e_l, s, s, r, r
-                            )
-                            
-                            # Avaliar performance usando vectorbt
-                            order_price = pd.Series(entries).combine_first(pd.Series(exits))
-                            pf = vbt.Portfolio.from_orders(
-                                close=pd.Series(close),
-                                price=order_price,
-                                size=pd.Series(sizes),
-                                size_type='targetpercent',
-                                init_cash=1000,
-                                fees=0.00055,
-                                direction='both'
-                            )
-                            
-                            stats = pf.stats()
-                            total_return = stats['Total Return [%]']
-                            drawdown = stats['Max Drawdown [%]']
-                            win_rate = stats['Win Rate [%]']
-                            
-                            # Métrica de "Fitness" equilibrada
-                            fitness = total_return * (1 - abs(drawdown)/100) if total_return > 0 else total_return
-                            
-                            results.append({
-                                "parameters": {
-                                    "ema_short": es,
-                                    "ema_long": el,
-                                    "stop_candles": s,
-                                    "risk_reward": r
-                                },
-                                "metrics": {
-                                    "return": round(total_return, 2),
-                                    "drawdown": round(drawdown, 2),
-                                    "win_rate": round(win_rate, 2),
-                                    "trades": int(stats['Total Trades']),
-                                    "fitness": round(fitness, 2)
-                                }
-                            })
-            
-            # Ordenar por fitness e pegar os top 5
-            top_results = sorted(results, key=lambda x: x['metrics']['fitness'], reverse=True)[:5]
+            top_results = otimizar_simbolo(symbol, interval, days)
             
             with self._lock:
                 self.cache[cache_key] = {
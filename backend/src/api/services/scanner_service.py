@@ -1,24 +1,35 @@
 import time
 import pandas as pd
-import pandas_ta as ta
 import numpy as np
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import threading
-from corretoras.funcoes_bybit import cliente
+from concurrent.futures import ThreadPoolExecutor
+from corretoras.funcoes_bybit import cliente, limitador_publico
 from scanner.symbols import SYMBOLS
 from utils.logging import get_logger, LogCategory
+from indicadores import compilados
 from api.services.notification_service import notify_high_score_signal
 from api.services.config_manager import get_config_manager
 from api.services.signal_service import get_signal_service
 import asyncio
 
+# Universo sem repetições, na ordem de scanner/symbols.py
+UNIVERSE = list(dict.fromkeys(SYMBOLS))
+
+MAX_WORKERS = 8                  # requisições de velas simultâneas (o ritmo real é o do limitador_publico)
+MIN_TURNOVER_24H = 1_000_000     # volume financeiro mínimo em 24h (USDT) para entrar na varredura
+MIN_CHANGE_24H = 0.0             # variação absoluta mínima em 24h (0.02 = 2%)
+
 class ScannerService:
     def __init__(self):
         self.results: List[Dict[str, Any]] = []
         self._lock = threading.Lock()
         self.is_running = False
         self.scan_limit = 20
+        self.min_turnover_24h = MIN_TURNOVER_24H
+        self.min_change_24h = MIN_CHANGE_24H
+        self.metrics: Dict[str, Any] = {}
         self.logger = get_logger("ScannerService")
         self._thread = None
         self.notified_signals = set() # Track already notified symbols for current score 5
@@ -44,17 +55,68 @@ class ScannerService:
                 self.logger.error(LogCategory.EXECUTION_ERROR, f"❌ Erro no loop do scanner: {e}")
             time.sleep(60)
 
+    def _fetch_tickers(self) -> Optional[Dict[str, Dict[str, float]]]:
+        """Snapshot de todos os perpétuos lineares em uma chamada: {symbol: {turnover_24h, change_24h}}."""
+        try:
+            limitador_publico.adquirir()
+            resp = cliente.get_tickers(category="linear")
+            return {
+                t['symbol']: {
+                    "turnover_24h": float(t.get('turnover24h') or 0),
+                    "change_24h": float(t.get('price24hPcnt') or 0),
+                }
+                for t in resp['result']['list']
+            }
+        except Exception as e:
+            self.logger.warning(LogCategory.SYSTEM, f"⚠️ Falha ao buscar tickers; varrendo o universo sem pré-filtro: {e}")
+            return None
+
+    def _shortlist(self, tickers: Optional[Dict[str, Dict[str, float]]]) -> List[str]:
+        """Símbolos do universo listados e acima dos mínimos de volume/variação, do maior volume ao menor."""
+        if tickers is None:
+            return UNIVERSE[:self.scan_limit]
+        candidates = [
+            symbol for symbol in UNIVERSE
+            if symbol in tickers
+            and tickers[symbol]['turnover_24h'] >= self.min_turnover_24h
+            and abs(tickers[symbol]['change_24h']) >= self.min_change_24h
+        ]
+        candidates.sort(key=lambda symbol: tickers[symbol]['turnover_24h'], reverse=True)
+        return candidates[:self.scan_limit]
+
     def _scan_all_symbols_sync(self):
+        start = time.perf_counter()
+        tickers = self._fetch_tickers()
+        active_symbols = self._shortlist(tickers)
+
+        # Velas em paralelo; o limitador_publico (compartilhado com o resto do processo) dita o ritmo
         new_results = []
-        active_symbols = SYMBOLS[:self.scan_limit]
-        
-        for symbol in active_symbols:
-            if not self.is_running:
-                break
-            result = self._scan_symbol_sync(symbol)
-            if result:
-                new_results.append(result)
-            time.sleep(0.5) # Rate limit protection (2 requests per second)
+        with ThreadPoolExecutor(max_workers=max(1, min(MAX_WORKERS, len(active_symbols))),
+                                thread_name_prefix="Scanner") as executor:
+            futures = [executor.submit(self._scan_symbol_sync, symbol) for symbol in active_symbols]
+            for symbol, future in zip(active_symbols, futures):
+                if not self.is_running:
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    break
+                result = future.result()
+                if result:
+                    if tickers is not None:
+                        result.update(tickers[symbol])
+                    new_results.append(result)
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.metrics = {
+            "sweep_ms": round(elapsed_ms, 1),
+            "universe": len(UNIVERSE),
+            "shortlisted": len(active_symbols),
+            "scanned": len(new_results),
+            "errors": len(active_symbols) - len(new_results),
+            "prefiltered": tickers is not None,
+            "last_sweep": datetime.now().isoformat(),
+        }
+        self.logger.info(LogCategory.PERFORMANCE_METRIC,
+                         f"⏱️ Varredura em {elapsed_ms:.0f} ms ({len(new_results)}/{len(active_symbols)} símbolos)",
+                         **self.metrics)
 
         with self._lock:
             if new_results:
@@ -72,6 +134,7 @@ class ScannerService:
 
     def _scan_symbol_sync(self, symbol: str) -> Dict[str, Any]:
         try:
+            limitador_publico.adquirir()
             resp = cliente.get_kline(
                 category="linear", symbol=symbol, interval="60", limit=200
             )
@@ -83,18 +146,19 @@ class ScannerService:
             df = pd.DataFrame(klines, columns=['ts', 'open', 'high', 'low', 'close', 'vol', 'turnover'])
             df[['open', 'high', 'low', 'close', 'vol']] = df[['open', 'high', 'low', 'close', 'vol']].astype(float)
 
-            ema20 = ta.ema(df['close'], length=20)
-            ema50 = ta.ema(df['close'], length=50)
-            ema200 = ta.ema(df['close'], length=200)
-            rsi = ta.rsi(df['close'], length=14)
+            close = df['close'].to_numpy()
+            ema20 = compilados.ema(close, 20, ultimos=1)
+            ema50 = compilados.ema(close, 50, ultimos=1)
+            ema200 = compilados.ema(close, 200, ultimos=1)
+            rsi = compilados.rsi(close, 14, ultimos=1)
             
             last_close = df['close'].iloc[-1]
             last_vol = df['vol'].iloc[-1]
             avg_vol = df['vol'].tail(20).mean()
             
-            s1 = 1 if last_close > ema200.iloc[-1] else 0 
-            s2 = 1 if ema20.iloc[-1] > ema50.iloc[-1] else 0 
-            s3 = 1 if 45 <= rsi.iloc[-1] <= 65 else 0 
+            s1 = 1 if last_close > ema200[-1] else 0 
+            s2 = 1 if ema20[-1] > ema50[-1] else 0 
+            s3 = 1 if 45 <= rsi[-1] <= 65 else 0 
             s4 = 1 if last_vol > (avg_vol * 1.2) else 0 
             
             prev_high = df['high'].iloc[-2]
@@ -114,7 +178,7 @@ class ScannerService:
                     "vol_surge": bool(s4),
                     "setup_prox": bool(s5)
                 },
-                "rsi": round(rsi.iloc[-1], 2),
+                "rsi": round(float(rsi[-1]), 2),
                 "last_update": datetime.now().isoformat()
             }
         except Exception as e:
@@ -146,8 +210,11 @@ class ScannerService:
         with self._lock:
             return self.results
 
+    def get_metrics(self) -> Dict[str, Any]:
+        return self.metrics
+
     def set_limit(self, limit: int):
-        self.scan_limit = max(1, min(limit, len(SYMBOLS)))
+        self.scan_limit = max(1, min(limit, len(UNIVERSE)))
         self.logger.info(LogCategory.SYSTEM, f"⚙️ Limite do scanner atualizado para {self.scan_limit}")
 
 _scanner_instance = None
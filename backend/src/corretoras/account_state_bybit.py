@@ -0,0 +1,386 @@
+"""
+Estado da conta em memória por subconta (posições, saldo) e metadados de instrumentos.
+
+Em vez de uma chamada assinada por consulta, cada subconta mantém:
+- todas as posições `linear` (perpétuos USDT e USDC) obtidas por REST paginado
+  por cursor, chaveadas por (símbolo, positionIdx) para que as duas pernas do
+  modo hedge não se sobrescrevam;
+- o saldo da carteira UNIFIED;
+- ambos atualizados em tempo real pelos tópicos privados `position.linear` e
+  `wallet` do WebSocket v5 da Bybit.
+
+Leituras são servidas da memória. O REST só é usado na primeira leitura, após
+reconexão do WebSocket, quando o snapshot foi invalidado por uma ordem enviada
+pelo próprio processo ou, sem WebSocket, quando passa de `ttl_segundos`. A
+chamada REST roda fora do lock (leitores e pushes seguem atendidos da memória)
+e só a troca do resultado é feita sob ele; o que chegou por push depois que o
+REST começou prevalece sobre o snapshot, que é mais antigo.
+
+Metadados de instrumento (lot size etc.) são públicos e mudam raramente: vêm de
+uma única listagem de `get_instruments_info` com TTL longo.
+"""
+
+import hashlib
+import hmac
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional, Set, Tuple
+
+import websocket
+
+from utils.logging import get_logger, LogCategory
+
+URL_PRIVADA = 'wss://stream.bybit.com/v5/private'
+INTERVALO_PING_SEGUNDOS = 20
+TTL_SEM_WEBSOCKET_SEGUNDOS = 2.0
+TTL_INSTRUMENTOS_SEGUNDOS = 6 * 60 * 60
+
+MOEDAS_LIQUIDACAO = ('USDT', 'USDC')
+
+# Posição zerada no formato de `get_positions` (símbolos sem posição não vêm na listagem)
+POSICAO_VAZIA = {'side': '', 'size': '0', 'avgPrice': '', 'stopLoss': '', 'takeProfit': '', 'trailingStop': ''}
+
+ChavePosicao = Tuple[str, int]  # (símbolo, positionIdx: 0 = one-way, 1/2 = pernas compra/venda do hedge)
+
+
+def _chave_posicao(dados: dict) -> ChavePosicao:
+    return dados['symbol'], int(dados.get('positionIdx') or 0)
+
+
+def _assinatura_websocket(api_secret: str, expira_ms: int) -> str:
+    return hmac.new(api_secret.encode(), f'GET/realtime{expira_ms}'.encode(), hashlib.sha256).hexdigest()
+
+
+class EstadoDaConta:
+    """Posições e carteira de uma subconta, servidas da memória e mantidas pelo WebSocket privado."""
+
+    def __init__(self, subconta: int, cliente_http, url: str = None,
+                 ttl_segundos: float = TTL_SEM_WEBSOCKET_SEGUNDOS):
+        self.subconta = subconta
+        self.cliente_http = cliente_http
+        self.url = url or os.getenv('BYBIT_WS_PRIVATE_URL', URL_PRIVADA)
+        self.ttl_segundos = ttl_segundos
+        self.logger = get_logger("EstadoDaConta")
+
+        self._lock = threading.RLock()
+        self._posicoes: Dict[ChavePosicao, dict] = {}
+        self._carteira: Optional[dict] = None
+        self._posicoes_em: Optional[float] = None
+        self._carteira_em: Optional[float] = None
+
+        # Sequência de pushes: o snapshot REST não sobrescreve o que chegou depois que ele começou
+        self._sequencia = 0
+        self._push_posicao: Dict[ChavePosicao, int] = {}
+        self._push_carteira = 0
+        # Uma chamada REST por recurso de cada vez (os demais leitores esperam o resultado dela)
+        self._rest_posicoes = threading.Lock()
+        self._rest_carteira = threading.Lock()
+
+        self._ws: Optional[websocket.WebSocketApp] = None
+        self._conectado = threading.Event()
+        self._rodando = False
+        self._thread: Optional[threading.Thread] = None
+
+    # ------------------------------------------------------------------
+    # Leitura
+    # ------------------------------------------------------------------
+
+    def posicao(self, simbolo: str, position_idx: Optional[int] = None) -> dict:
+        """
+        Posição `linear` do símbolo no formato de `get_positions` (zerada se não houver).
+
+        Sem `position_idx`, devolve a perna aberta de menor positionIdx (no modo
+        one-way, a única), como o primeiro item de `get_positions(symbol=...)`.
+        """
+        self._garantir_websocket()
+        if not self._fresco(self._posicoes_em):
+            self._atualizar_posicoes(self._posicoes_em)
+        with self._lock:
+            if position_idx is not None:
+                return dict(self._posicoes.get((simbolo, position_idx), POSICAO_VAZIA))
+            pernas = sorted((chave[1], dados) for chave, dados in self._posicoes.items() if chave[0] == simbolo)
+            abertas = [dados for _, dados in pernas if float(dados.get('size') or 0) != 0]
+            if abertas:
+                return dict(abertas[0])
+            return dict(pernas[0][1]) if pernas else dict(POSICAO_VAZIA)
+
+    def posicoes(self) -> Dict[ChavePosicao, dict]:
+        self._garantir_websocket()
+        if not self._fresco(self._posicoes_em):
+            self._atualizar_posicoes(self._posicoes_em)
+        with self._lock:
+            return {chave: dict(dados) for chave, dados in self._posicoes.items()}
+
+    def carteira(self) -> dict:
+        """Conta UNIFIED no formato de `get_wallet_balance(...)['result']['list'][0]`."""
+        self._garantir_websocket()
+        if self._carteira is None or not self._fresco(self._carteira_em):
+            self._atualizar_carteira(self._carteira_em)
+        with self._lock:
+            return dict(self._carteira)
+
+    def invalidar(self) -> None:
+        """Força a próxima leitura a ir ao REST (ex.: logo após enviar uma ordem)."""
+        with self._lock:
+            self._posicoes_em = None
+            self._carteira_em = None
+
+    def _fresco(self, atualizado_em: Optional[float]) -> bool:
+        if atualizado_em is None:
+            return False
+        # Com o WebSocket privado conectado, o snapshot em memória é mantido por push
+        return self._conectado.is_set() or time.monotonic() - atualizado_em < self.ttl_segundos
+
+    # ------------------------------------------------------------------
+    # REST
+    # ------------------------------------------------------------------
+
+    def _atualizar_posicoes(self, visto_em: Optional[float] = None) -> None:
+        """
+        Snapshot REST das posições, trocado na memória sem segurar o lock durante as chamadas.
+
+        `visto_em` é o `_posicoes_em` que o leitor encontrou vencido: se outro leitor
+        já atualizou enquanto este esperava a vez, não repete a chamada.
+        """
+        from corretoras.funcoes_bybit import limitadores_privados
+
+        with self._rest_posicoes:
+            if self._posicoes_em is not None and self._posicoes_em != visto_em and self._fresco(self._posicoes_em):
+                return
+            with self._lock:
+                inicio = self._sequencia
+
+            posicoes = {}
+            for moeda in MOEDAS_LIQUIDACAO:
+                cursor = None
+                while True:
+                    limitador = limitadores_privados.get(self.subconta)
+                    if limitador:
+                        limitador.adquirir()
+                    parametros = dict(category='linear', settleCoin=moeda, limit=200)
+                    if cursor:
+                        parametros['cursor'] = cursor
+                    resultado = self.cliente_http.get_positions(**parametros)['result']
+                    for dados in resultado['list']:
+                        posicoes[_chave_posicao(dados)] = dados
+                    cursor = resultado.get('nextPageCursor')
+                    if not cursor or not resultado['list']:
+                        break
+
+            with self._lock:
+                # Pernas com push posterior ao início do REST ficam com o valor do push
+                for chave, sequencia in self._push_posicao.items():
+                    if sequencia > inicio:
+                        posicoes[chave] = self._posicoes[chave]
+                self._posicoes = posicoes
+                self._posicoes_em = time.monotonic()
+
+    def _atualizar_carteira(self, visto_em: Optional[float] = None) -> None:
+        from corretoras.funcoes_bybit import limitadores_privados
+
+        with self._rest_carteira:
+            if self._carteira_em is not None and self._carteira_em != visto_em and self._fresco(self._carteira_em):
+                return
+            with self._lock:
+                inicio = self._sequencia
+
+            limitador = limitadores_privados.get(self.subconta)
+            if limitador:
+                limitador.adquirir()
+            resposta = self.cliente_http.get_wallet_balance(accountType='UNIFIED', coin='USDT')
+
+            with self._lock:
+                if self._push_carteira <= inicio:
+                    self._carteira = resposta['result']['list'][0]
+                self._carteira_em = time.monotonic()
+
+    # ------------------------------------------------------------------
+    # WebSocket privado
+    # ------------------------------------------------------------------
+
+    def _garantir_websocket(self) -> None:
+        if self._rodando or not getattr(self.cliente_http, 'api_key', None):
+            return
+        with self._lock:
+            if self._rodando:
+                return
+            self._rodando = True
+            self._thread = threading.Thread(target=self._loop_conexao, daemon=True,
+                                            name=f"EstadoDaConta{self.subconta}")
+            self._thread.start()
+
+    def parar(self) -> None:
+        self._rodando = False
+        if self._ws:
+            self._ws.close()
+
+    def _loop_conexao(self) -> None:
+        espera = 1
+        while self._rodando:
+            self._ws = websocket.WebSocketApp(
+                self.url,
+                on_open=self._ao_abrir,
+                on_message=lambda ws, texto: self._processar_mensagem(texto),
+                on_error=lambda ws, erro: self.logger.warning(
+                    LogCategory.CONNECTION_ERROR, f"⚠️ Erro no WebSocket privado: {erro}", "account_state_bybit",
+                    subconta=self.subconta),
+                on_close=lambda ws, codigo, motivo: self._conectado.clear(),
+            )
+            inicio = time.monotonic()
+            self._ws.run_forever()
+            self._conectado.clear()
+
+            if not self._rodando:
+                break
+            espera = 1 if time.monotonic() - inicio > 60 else min(espera * 2, 30)
+            time.sleep(espera)
+
+    def _ao_abrir(self, ws) -> None:
+        expira_ms = int((time.time() + 10) * 1000)
+        assinatura = _assinatura_websocket(self.cliente_http.api_secret, expira_ms)
+        ws.send(json.dumps({'op': 'auth', 'args': [self.cliente_http.api_key, expira_ms, assinatura]}))
+
+    def _ao_autenticar(self, ws) -> None:
+        ws.send(json.dumps({'op': 'subscribe', 'args': ['position.linear', 'wallet']}))
+        # O que mudou enquanto estávamos desconectados vem do REST antes de confiar no push
+        try:
+            self._atualizar_posicoes()
+            self._atualizar_carteira()
+        except Exception as e:
+            self.logger.error(LogCategory.CONNECTION_ERROR, f"❌ Resync REST da conta falhou: {e}",
+                              "account_state_bybit", subconta=self.subconta, exception=e)
+            return
+        self._conectado.set()
+        threading.Thread(target=self._loop_ping, args=(ws,), daemon=True,
+                         name=f"EstadoDaContaPing{self.subconta}").start()
+
+    def _loop_ping(self, ws) -> None:
+        while self._rodando and self._ws is ws and self._conectado.is_set():
+            time.sleep(INTERVALO_PING_SEGUNDOS)
+            try:
+                ws.send(json.dumps({'op': 'ping'}))
+            except Exception:
+                return
+
+    def _processar_mensagem(self, texto: str) -> None:
+        mensagem = json.loads(texto)
+
+        if mensagem.get('op') == 'auth':
+            if mensagem.get('success'):
+                self._ao_autenticar(self._ws)
+            else:
+                self.logger.error(LogCategory.CONNECTION_ERROR, "❌ Autenticação do WebSocket privado recusada",
+                                  "account_state_bybit", subconta=self.subconta, resposta=mensagem.get('ret_msg'))
+                self._ws.close()
+            return
+
+        topico = mensagem.get('topic', '')
+        if topico.startswith('position'):
+            with self._lock:
+                for dados in mensagem.get('data', []):
+                    if dados.get('category', 'linear') != 'linear':
+                        continue
+                    dados = dict(dados)
+                    # O push usa `entryPrice` onde o REST usa `avgPrice`
+                    dados.setdefault('avgPrice', dados.get('entryPrice', ''))
+                    chave = _chave_posicao(dados)
+                    self._sequencia += 1
+                    self._posicoes[chave] = dados
+                    self._push_posicao[chave] = self._sequencia
+        elif topico == 'wallet':
+            with self._lock:
+                for conta in mensagem.get('data', []):
+                    if conta.get('accountType') == 'UNIFIED':
+                        self._sequencia += 1
+                        self._carteira = conta
+                        self._carteira_em = time.monotonic()
+                        self._push_carteira = self._sequencia
+
+
+class CacheInstrumentos:
+    """
+    Metadados de todos os instrumentos `linear`, recarregados de uma vez a cada `ttl_segundos`.
+
+    Um símbolo ausente recarrega a listagem uma vez (pode ter sido listado depois da
+    última carga); se continuar ausente fica marcado como desconhecido até a próxima
+    recarga pelo TTL, e as consultas seguintes levantam KeyError sem paginar de novo.
+    """
+
+    def __init__(self, cliente_http=None, limitador=None, ttl_segundos: float = TTL_INSTRUMENTOS_SEGUNDOS):
+        self.cliente_http = cliente_http
+        self.limitador = limitador
+        self.ttl_segundos = ttl_segundos
+        self._instrumentos: Dict[str, dict] = {}
+        self._desconhecidos: Set[str] = set()
+        self._carregado_em: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def instrumento(self, simbolo: str) -> dict:
+        with self._lock:
+            expirado = self._carregado_em is None or time.monotonic() - self._carregado_em > self.ttl_segundos
+            if expirado:
+                self._desconhecidos = set()
+            if expirado or (simbolo not in self._instrumentos and simbolo not in self._desconhecidos):
+                self._recarregar()
+                if simbolo not in self._instrumentos:
+                    self._desconhecidos.add(simbolo)
+            if simbolo not in self._instrumentos:
+                raise KeyError(f"Instrumento desconhecido: {simbolo}")
+            return self._instrumentos[simbolo]
+
+    def _recarregar(self) -> None:
+        if self.cliente_http is None:
+            from corretoras.funcoes_bybit import cliente, limitador_publico
+            self.cliente_http, self.limitador = cliente, self.limitador or limitador_publico
+
+        instrumentos = {}
+        cursor = None
+        while True:
+            if self.limitador:
+                self.limitador.adquirir()
+            parametros = dict(category='linear', limit=1000)
+            if cursor:
+                parametros['cursor'] = cursor
+            resultado = self.cliente_http.get_instruments_info(**parametros)['result']
+            for dados in resultado['list']:
+                instrumentos[dados['symbol']] = dados
+            cursor = resultado.get('nextPageCursor')
+            if not cursor or not resultado['list']:
+                break
+
+        self._instrumentos = instrumentos
+        self._carregado_em = time.monotonic()
+
+
+# ============= Singletons =============
+
+_estados: Dict[int, EstadoDaConta] = {}
+_cache_instrumentos: Optional[CacheInstrumentos] = None
+_singleton_lock = threading.Lock()
+
+
+def get_estado_da_conta(subconta: int) -> EstadoDaConta:
+    """Retorna o EstadoDaConta (singleton por subconta)."""
+    with _singleton_lock:
+        if subconta not in _estados:
+            from corretoras.funcoes_bybit import clientes_por_subconta
+            _estados[subconta] = EstadoDaConta(subconta, clientes_por_subconta[subconta])
+        return _estados[subconta]
+
+
+def get_cache_instrumentos() -> CacheInstrumentos:
+    """Retorna instância singleton do CacheInstrumentos."""
+    global _cache_instrumentos
+    with _singleton_lock:
+        if _cache_instrumentos is None:
+            _cache_instrumentos = CacheInstrumentos()
+        return _cache_instrumentos
+
+
+def invalidar_estado_da_conta(subconta: int) -> None:
+    """Descarta o snapshot da subconta, se já existir (usado após ordens enviadas pelo processo)."""
+    estado = _estados.get(subconta)
+    if estado is not None:
+        estado.invalidar()
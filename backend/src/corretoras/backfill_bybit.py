@@ -0,0 +1,130 @@
+"""
+Backfill incremental de velas históricas da Bybit.
+
+Calcula os trechos que faltam no CandleStore para [start, end), quebra cada
+trecho em páginas de 1000 velas e busca as páginas em paralelo por um pool de
+threads limitado, respeitando um token bucket compartilhado. As páginas são
+mescladas (dedupe + ordenação) e só as velas já fechadas são persistidas.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple
+
+import numpy as np
+
+from utils.candle_store import DTYPE_VELA, CandleStore, avancar_aberturas, mesclar_velas, velas_para_array
+from utils.rate_limiter import TokenBucket
+
+LIMITE_VELAS_POR_PAGINA = 1000
+MAX_WORKERS_PADRAO = 4
+# A paginação antiga avançava para `última vela + 1 s` e parava ao alcançar o end
+_AVANCO_PAGINACAO_MS = 1000
+
+
+def paginar_trechos(trechos: List[Tuple[int, int]], intervalo_ms: int,
+                    limite: int = LIMITE_VELAS_POR_PAGINA) -> List[Tuple[int, int]]:
+    """Quebra trechos [inicio, fim) em páginas de no máximo `limite` velas."""
+    tamanho_pagina = intervalo_ms * limite
+    paginas = []
+    for inicio, fim in trechos:
+        while inicio < fim:
+            paginas.append((inicio, min(inicio + tamanho_pagina, fim)))
+            inicio += tamanho_pagina
+    return paginas
+
+
+def _buscar_pagina(cliente_http, limitador: TokenBucket, cripto, tempo_grafico, inicio, fim):
+    limitador.adquirir()
+    resposta = cliente_http.get_kline(
+        symbol=cripto,
+        interval=tempo_grafico,
+        limit=LIMITE_VELAS_POR_PAGINA,
+        start=inicio,
+        end=fim - 1,
+    )
+    return velas_para_array(resposta['result']['list'])
+
+
+def preencher_lacunas(store: CandleStore, cliente_http, limitador: TokenBucket,
+                      start_ms: int, end_ms: int, max_workers: int = MAX_WORKERS_PADRAO) -> np.ndarray:
+    """
+    Baixa somente o que falta no `store` para [start_ms, end_ms).
+
+    Velas fechadas são gravadas no arquivo; trechos consultados que continuam
+    vazios (e já encerrados) são marcados para não serem pedidos de novo.
+
+    Returns:
+        Todas as velas baixadas, inclusive a vela em aberto, ordenadas e sem duplicatas.
+    """
+    agora_ms = int(time.time() * 1000)
+    faltantes = store.intervalos_faltantes(start_ms, min(end_ms, agora_ms))
+    paginas = paginar_trechos(faltantes, store.intervalo_ms)
+    if not paginas:
+        return np.empty(0, dtype=DTYPE_VELA)
+
+    print(f'Backfill {store.cripto} {store.tempo_grafico}: {len(faltantes)} lacuna(s), {len(paginas)} página(s)')
+
+    blocos = []
+    paginas_com_erro = []
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(paginas)))) as executor:
+        futuros = [
+            (pagina, executor.submit(_buscar_pagina, cliente_http, limitador,
+                                     store.cripto, store.tempo_grafico, *pagina))
+            for pagina in paginas
+        ]
+        for pagina, futuro in futuros:
+            try:
+                blocos.append(futuro.result())
+            except Exception as e:
+                paginas_com_erro.append(pagina)
+                print(f'Erro ao buscar velas {store.cripto} {pagina}: {e}')
+
+    baixadas = mesclar_velas(*blocos)
+    fechadas = baixadas[store.proxima_abertura(baixadas['tempo_abertura']) <= agora_ms]
+    store.gravar(fechadas)
+
+    # O que continua faltando em páginas que responderam sem erro não existe na corretora
+    paginas_ok = [pagina for pagina in paginas if pagina not in paginas_com_erro]
+    sem_dados = []
+    for inicio, fim in paginas_ok:
+        fim_encerrado = min(fim, agora_ms - store.intervalo_ms)
+        sem_dados += store.intervalos_faltantes(inicio, fim_encerrado)
+    store.marcar_sem_dados(sem_dados)
+
+    return baixadas
+
+
+def _no_periodo(velas: np.ndarray, start_ms: int, end_ms: int) -> np.ndarray:
+    tempos = velas['tempo_abertura']
+    return velas[(tempos >= start_ms) & (tempos < end_ms)]
+
+
+def carregar_periodo(store: CandleStore, cliente_http, limitador: TokenBucket, start_ms: int, end_ms: int,
+                     cortar_no_fim: bool = True, max_workers: int = MAX_WORKERS_PADRAO) -> Tuple[np.ndarray, int]:
+    """
+    Velas de [start_ms, end_ms), baixando antes só o que falta no `store`.
+
+    Com `cortar_no_fim=False` reproduz a busca paginada que existia antes do
+    store: as páginas de `LIMITE_VELAS_POR_PAGINA` velas contadas a partir de
+    start_ms iam até a que alcançava o end, e o resto dessa última página vinha
+    junto. Só essa sobra passa do end, não a cauda inteira do arquivo.
+
+    Returns:
+        (velas ordenadas, quantidade de velas baixadas da corretora)
+    """
+    baixadas = preencher_lacunas(store, cliente_http, limitador, start_ms, end_ms, max_workers)
+    velas = mesclar_velas(store.ler(start_ms, end_ms), _no_periodo(baixadas, start_ms, end_ms))
+    if cortar_no_fim:
+        return velas, len(baixadas)
+
+    antes_do_fim = int(np.searchsorted(velas['tempo_abertura'], end_ms - _AVANCO_PAGINACAO_MS))
+    total = (antes_do_fim // LIMITE_VELAS_POR_PAGINA + 1) * LIMITE_VELAS_POR_PAGINA
+    if len(velas):
+        fim_pagina = int(avancar_aberturas(velas['tempo_abertura'][-1], store.tempo_grafico, total - len(velas) + 1))
+    else:
+        fim_pagina = int(avancar_aberturas(start_ms, store.tempo_grafico, total))
+
+    sobra = preencher_lacunas(store, cliente_http, limitador, end_ms, fim_pagina, max_workers)
+    velas = mesclar_velas(velas, store.ler(end_ms, fim_pagina), _no_periodo(sobra, end_ms, fim_pagina))
+    return velas[:total], len(baixadas) + len(sobra)
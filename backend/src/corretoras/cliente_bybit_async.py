@@ -0,0 +1,59 @@
+"""
+Cliente assíncrono da Bybit compartilhado pelo runtime de bots.
+
+O pybit só tem transporte síncrono (requests), então as chamadas rodam em um
+único pool de threads limitado que reaproveita as sessões HTTP (keep-alive) de
+`funcoes_bybit`. O orçamento de requisições continua nos token buckets de
+`funcoes_bybit` (público por IP, privado por subconta), válidos para todos os
+bots do processo.
+
+Uso (dentro de um event loop):
+    cliente = get_cliente_bybit_async()
+    df = await cliente.executar(funcao_bloqueante, argumento)
+
+Trabalho longo (passadas de estratégia, agentes) não deve usar este pool: ele é
+dimensionado para chamadas curtas de I/O (ver `BotRuntime`). Hoje passam por ele
+a assinatura do feed e as rotas de mercado da API; o REST privado das
+estratégias (ordens, posições) ainda é chamado de forma síncrona dentro das
+passadas.
+"""
+
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+MAX_WORKERS_PADRAO = int(os.getenv('BYBIT_ASYNC_MAX_WORKERS', '16'))
+
+
+class ClienteBybitAsync:
+    """Fachada `async` para as funções síncronas da corretora, sobre um pool de threads único."""
+
+    def __init__(self, max_workers: int = MAX_WORKERS_PADRAO):
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="BybitIO")
+
+    async def executar(self, funcao: Callable, *args, **kwargs) -> Any:
+        """Executa uma função bloqueante no pool sem travar o event loop."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(funcao, *args, **kwargs))
+
+    def encerrar(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+# ============= Singleton =============
+
+_cliente_instance: Optional[ClienteBybitAsync] = None
+_cliente_lock = threading.Lock()
+
+
+def get_cliente_bybit_async() -> ClienteBybitAsync:
+    """Retorna instância singleton do ClienteBybitAsync."""
+    global _cliente_instance
+    with _cliente_lock:
+        if _cliente_instance is None:
+            _cliente_instance = ClienteBybitAsync()
+        return _cliente_instance
@@ -5,7 +5,12 @@ import numpy as np
 from dotenv import load_dotenv
 import os
 from utils.utilidades import ajusta_start_time
-from utils.data_loader import obter_caminho_velas, carregar_velas_json, salvar_velas_json
+from utils.data_loader import obter_caminho_velas, importar_velas_json_legado
+from utils.candle_store import CandleStore, array_para_dataframe
+from utils.rate_limiter import TokenBucket
+from corretoras.backfill_bybit import carregar_periodo
+from corretoras.account_state_bybit import get_estado_da_conta, get_cache_instrumentos, invalidar_estado_da_conta
+import functools
 
 load_dotenv()
 
@@ -31,56 +36,49 @@ cliente3 = HTTP(api_key=API_KEY3, api_secret=API_SECRET3, recv_window=50000)
 cliente4 = HTTP(api_key=API_KEY4, api_secret=API_SECRET4, recv_window=50000)
 cliente5 = HTTP(api_key=API_KEY5, api_secret=API_SECRET5, recv_window=50000)
 
+clientes_por_subconta = {1: cliente1, 2: cliente2, 3: cliente3, 4: cliente4, 5: cliente5}
+
+# Orçamento compartilhado para os endpoints públicos de mercado (limite da Bybit é por IP)
+TAXA_PUBLICA_POR_SEGUNDO = float(os.getenv('BYBIT_PUBLIC_RPS', '10'))
+limitador_publico = TokenBucket(taxa_por_segundo=TAXA_PUBLICA_POR_SEGUNDO, capacidade=2 * TAXA_PUBLICA_POR_SEGUNDO)
+
+# Endpoints privados: orçamento por subconta (limite da Bybit é por UID), dividido entre todos os bots dela
+limitadores_privados = {nro_subconta: TokenBucket(taxa_por_segundo=10) for nro_subconta in range(1, 6)}
+
 def busca_cliente(nro_subconta):
-    if nro_subconta == 1:
-        return cliente1
-    elif nro_subconta == 2:
-        return cliente2
-    elif nro_subconta == 3:
-        return cliente3
-    elif nro_subconta == 4:
-        return cliente4
-    elif nro_subconta == 5:
-        return cliente5
+    # Cada chamada privada passa por aqui uma vez antes da requisição (busca_pnl pagina e desconta o resto)
+    if nro_subconta in limitadores_privados:
+        limitadores_privados[nro_subconta].adquirir()
+
+    return clientes_por_subconta.get(nro_subconta)
+
+def altera_conta(funcao):
+    """Invalida o estado em cache da subconta (último argumento) após enviar ordens/ajustes."""
+    @functools.wraps(funcao)
+    def wrapper(*args, **kwargs):
+        try:
+            return funcao(*args, **kwargs)
+        finally:
+            invalidar_estado_da_conta(kwargs.get('nro_subconta', args[-1] if args else None))
+    return wrapper
 
 def carregar_dados_historicos(cripto, tempo_grafico, emas, start, end, pular_velas=999, remove_velas=True):
     print('Carregando dados históricos...')
     start_ajustado = ajusta_start_time(start, tempo_grafico, pular_velas)
     start_timestamp = int(pd.to_datetime(start_ajustado).timestamp() * 1000)
     end_timestamp =  int(pd.to_datetime(end).timestamp() * 1000)
-    
-    caminho_arquivo = obter_caminho_velas(cripto, tempo_grafico, start, end)
-    velas_sem_estrutura = carregar_velas_json(caminho_arquivo)
-
-    if velas_sem_estrutura is None:
-        velas_sem_estrutura = []
 
-        while start_timestamp < end_timestamp:
-            resposta = cliente.get_kline(symbol=cripto, interval=tempo_grafico, limit=1000, start=start_timestamp)
-            velas_sem_estrutura += resposta['result']['list'][::-1]
-            start_timestamp = int(velas_sem_estrutura[-1][0]) + 1000
+    store = CandleStore(cripto, tempo_grafico)
+    importar_velas_json_legado(store, obter_caminho_velas(cripto, tempo_grafico, start, end))
 
-        # Remove as velas com a data maior ou igual ao end_timestamp
-        if remove_velas:
-            while velas_sem_estrutura and int(velas_sem_estrutura[-1][0]) >= end_timestamp:
-                velas_sem_estrutura.pop()
-
-        salvar_velas_json(caminho_arquivo, velas_sem_estrutura)
-        print(f'Velas salvas no arquivo: {caminho_arquivo}')
+    velas, quantidade_baixada = carregar_periodo(store, cliente, limitador_publico, start_timestamp, end_timestamp,
+                                                 cortar_no_fim=remove_velas)
+    if quantidade_baixada:
+        print(f'{quantidade_baixada} velas baixadas da corretora (arquivo: {store.caminho})')
     else:
-        print(f'Velas carregadas do arquivo: {caminho_arquivo}')
-
-    colunas = ['tempo_abertura', 'abertura', 'maxima', 'minima', 'fechamento', 'volume', 'turnover']
-
-    df = pd.DataFrame(velas_sem_estrutura, columns=colunas)
+        print(f'Velas carregadas do arquivo: {store.caminho}')
 
-    df['tempo_abertura'] = pd.to_datetime(df['tempo_abertura'].astype(np.int64), unit='ms')
-    df.set_index('tempo_abertura', inplace=True)
-    df['abertura'] = df['abertura'].astype(float)
-    df['maxima'] = df['maxima'].astype(float)
-    df['minima'] = df['minima'].astype(float)
-    df['fechamento'] = df['fechamento'].astype(float)
-    df['volume'] = df['volume'].astype(float)
+    df = array_para_dataframe(velas)
 
     ema_rapida = emas[0]
     ema_lenta = emas[1]
@@ -114,8 +112,8 @@ def busca_velas(cripto, tempo_grafico, emas):
     return df
 
 def tem_trade_aberto(cripto, nro_subconta):
-    resposta = busca_cliente(nro_subconta).get_positions(category='linear', symbol=cripto)
-    dados = resposta['result']['list'][0]
+    # Servido da memória: snapshot de todas as posições + push do WebSocket privado
+    dados = get_estado_da_conta(nro_subconta).posicao(cripto)
 
     preco_entrada = dados['avgPrice']
     if preco_entrada == '':
@@ -158,8 +156,7 @@ def tem_trade_aberto(cripto, nro_subconta):
     return estado_de_trade, preco_entrada, preco_stop, preco_alvo, tamanho_posicao, trailing_stop
 
 def saldo_da_conta(nro_subconta):
-    resposta = busca_cliente(nro_subconta).get_wallet_balance(accountType='UNIFIED', coin='USDT')
-    resultado = resposta['result']['list'][0]
+    resultado = get_estado_da_conta(nro_subconta).carteira()
     
     for campo in ['totalAvailableBalance', 'totalMarginBalance', 'totalEquity']:
         try:
@@ -172,14 +169,15 @@ def saldo_da_conta(nro_subconta):
     return 0.0
 
 def quantidade_minima_para_operar(cripto, nro_subconta):
-    resposta = busca_cliente(nro_subconta).get_instruments_info(category='linear', symbol=cripto)
-    quantidade_minima_para_operar = resposta['result']['list'][0]['lotSizeFilter']['minOrderQty']
+    # Metadado público e estável: vem da listagem de instrumentos em cache (TTL longo)
+    quantidade_minima_para_operar = get_cache_instrumentos().instrumento(cripto)['lotSizeFilter']['minOrderQty']
     if quantidade_minima_para_operar == '':
         quantidade_minima_para_operar = 0
     else:
         quantidade_minima_para_operar = float(quantidade_minima_para_operar)
     return quantidade_minima_para_operar
 
+@altera_conta
 def abre_compra(cripto, qtd_cripto_para_operar, preco_stop, preco_alvo, nro_subconta):
     return busca_cliente(nro_subconta).place_order(
         category='linear',
@@ -191,6 +189,7 @@ def abre_compra(cripto, qtd_cripto_para_operar, preco_stop, preco_alvo, nro_subc
         takeProfit=preco_alvo
     )
 
+@altera_conta
 def abre_venda(cripto, qtd_cripto_para_operar, preco_stop, preco_alvo, nro_subconta):
     return busca_cliente(nro_subconta).place_order(
         category='linear',
@@ -204,6 +203,7 @@ def abre_venda(cripto, qtd_cripto_para_operar, preco_stop, preco_alvo, nro_subco
 
 # TODO: VALIDAR AS FUNÇÕES ABAIXO COM TESTES NO LIVE_TRADING
 # Para fechar posição sem alvo definido, geralmente por condução de trade
+@altera_conta
 def fecha_compra(cripto, nro_subconta):
     return busca_cliente(nro_subconta).place_order(
         category='linear',
@@ -216,6 +216,7 @@ def fecha_compra(cripto, nro_subconta):
     )
 
 # Para fechar posição sem alvo definido, geralmente por condução de trade
+@altera_conta
 def fecha_venda(cripto, nro_subconta):
     return busca_cliente(nro_subconta).place_order(
         category='linear',
@@ -228,6 +229,7 @@ def fecha_venda(cripto, nro_subconta):
     )
 
 # Para abrir posição de compra abaixo do preço atual
+@altera_conta
 def abre_compra_limit(cripto, preco, qtd_cripto_para_operar, preco_stop, preco_alvo, nro_subconta):
     return busca_cliente(nro_subconta).place_order(
         category='linear',
@@ -241,6 +243,7 @@ def abre_compra_limit(cripto, preco, qtd_cripto_para_operar, preco_stop, preco_a
     )
 
 # Para abrir posição de venda acima do preço atual
+@altera_conta
 def abre_venda_limit(cripto, preco, qtd_cripto_para_operar, preco_stop, preco_alvo, nro_subconta):
     return busca_cliente(nro_subconta).place_order(
         category='linear',
@@ -254,6 +257,7 @@ def abre_venda_limit(cripto, preco, qtd_cripto_para_operar, preco_stop, preco_al
     )
 
 # Para abrir posição de compra acima do preço atual (rompimento de resistência) - Limit Order (proteção contra slippage)
+@altera_conta
 def abre_compra_stop_limit(cripto, preco, qtd_cripto_para_operar, preco_stop, preco_alvo, nro_subconta):
     return busca_cliente(nro_subconta).place_order(
         category='linear',
@@ -269,6 +273,7 @@ def abre_compra_stop_limit(cripto, preco, qtd_cripto_para_operar, preco_stop, pr
     )
 
 # Para abrir posição de venda acima do preço atual (rompimento de suporte) - Limit Order (proteção contra slippage)
+@altera_conta
 def abre_venda_stop_limit(cripto, preco, qtd_cripto_para_operar, preco_stop, preco_alvo, nro_subconta):
     return busca_cliente(nro_subconta).place_order(
         category='linear',
@@ -284,6 +289,7 @@ def abre_venda_stop_limit(cripto, preco, qtd_cripto_para_operar, preco_stop, pre
     )
 
 # Para abrir posição de compra acima do preço atual (rompimento de resistência) - Market Order (execução imediata garantida)
+@altera_conta
 def abre_compra_stop_market(cripto, preco_trigger, qtd_cripto_para_operar, preco_stop, preco_alvo, nro_subconta):
     return busca_cliente(nro_subconta).place_order(
         category='linear',
@@ -299,6 +305,7 @@ def abre_compra_stop_market(cripto, preco_trigger, qtd_cripto_para_operar, preco
     )
 
 # Para abrir posição de venda abaixo do preço atual (rompimento de suporte) - Market Order (execução imediata garantida)
+@altera_conta
 def abre_venda_stop_market(cripto, preco_trigger, qtd_cripto_para_operar, preco_stop, preco_alvo, nro_subconta):
     return busca_cliente(nro_subconta).place_order(
         category='linear',
@@ -314,6 +321,7 @@ def abre_venda_stop_market(cripto, preco_trigger, qtd_cripto_para_operar, preco_
     )
 
 # Para cancelar ordens limit para o caso de atualização da vela referência ou quando ela deixa de existir
+@altera_conta
 def cancela_todas_ordens(cripto, nro_subconta):
     return busca_cliente(nro_subconta).cancel_all_orders(
         category='linear',
@@ -321,6 +329,7 @@ def cancela_todas_ordens(cripto, nro_subconta):
     )
 
 # Atualiza o stop_loss da posição aberta
+@altera_conta
 def ajusta_stop(cripto, preco_stop, nro_subconta):
     return busca_cliente(nro_subconta).set_trading_stop(
         category='linear',
@@ -331,6 +340,7 @@ def ajusta_stop(cripto, preco_stop, nro_subconta):
     )
 
 # Atualiza o take_profit da posição aberta
+@altera_conta
 def ajusta_alvo(cripto, preco_alvo, nro_subconta):
     return busca_cliente(nro_subconta).set_trading_stop(
         category='linear',
@@ -341,6 +351,7 @@ def ajusta_alvo(cripto, preco_alvo, nro_subconta):
     )
 
 # Aciona o trailing stop para uma posição aberta
+@altera_conta
 def aciona_trailing_stop_imediato(cripto, trailing_stop, nro_subconta):
     return busca_cliente(nro_subconta).set_trading_stop(
         category='linear',
@@ -351,6 +362,7 @@ def aciona_trailing_stop_imediato(cripto, trailing_stop, nro_subconta):
     )
 
 # Aciona o trailing stop para uma posição aberta
+@altera_conta
 def aciona_trailing_stop_preco(cripto, trailing_stop, preco_ativacao_trailing_stop, nro_subconta):
     return busca_cliente(nro_subconta).set_trading_stop(
         category='linear',
@@ -362,6 +374,7 @@ def aciona_trailing_stop_preco(cripto, trailing_stop, preco_ativacao_trailing_st
     )
 
 # Fecha parcialmente uma posição de compra
+@altera_conta
 def fecha_parcial_compra(cripto, qtd_cripto_para_vender, nro_subconta):
     return busca_cliente(nro_subconta).place_order(
         category='linear',
@@ -373,6 +386,7 @@ def fecha_parcial_compra(cripto, qtd_cripto_para_vender, nro_subconta):
     )
 
 # Fecha parcialmente uma posição de venda
+@altera_conta
 def fecha_parcial_venda(cripto, qtd_cripto_para_comprar, nro_subconta):
     return busca_cliente(nro_subconta).place_order(
         category='linear',
@@ -417,6 +431,8 @@ def busca_pnl(nro_subconta, dias=30):
         start_time = int((data_final - janela_dias).timestamp() * 1000)
         
         # Fazer a chamada à API
+        if i > 0 and nro_subconta in limitadores_privados:
+            limitadores_privados[nro_subconta].adquirir()
         resposta = cliente.get_closed_pnl(
             category='linear',
             limit=100,
@@ -0,0 +1,457 @@
+"""
+Feed de mercado em streaming compartilhado pelos bots.
+
+Mantém um buffer circular de velas por (símbolo, tempo gráfico), alimentado pelos
+tópicos públicos `kline.{intervalo}.{símbolo}` e `tickers.{símbolo}` do WebSocket
+v5 da Bybit. Os bots leem do buffer sem nenhuma chamada de rede; o REST só é usado
+para semear o buffer na assinatura e para preencher o que se perdeu a cada
+reconexão.
+
+Indicadores pedidos via `indicadores(...)` são mantidos por `MotorIndicadores`
+incrementais, avançados a cada mensagem de kline em O(1) por indicador.
+
+A URL do WebSocket e o cliente REST são injetáveis, então um
+`corretoras.replay_server_bybit.ServidorReplay` pode substituir a corretora em testes.
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import websocket
+
+from indicadores.incremental import MotorIndicadores
+from utils.candle_store import COLUNAS_VELAS, DTYPE_VELA, mesclar_velas, velas_para_array
+from utils.logging import get_logger, LogCategory
+
+URL_PUBLICA_LINEAR = 'wss://stream.bybit.com/v5/public/linear'
+CAPACIDADE_PADRAO = 1000
+INTERVALO_PING_SEGUNDOS = 20
+MAX_ARGS_POR_ASSINATURA = 10
+
+Chave = Tuple[str, str]
+OuvinteVela = Callable[[str, str, np.void, bool], None]
+
+
+class BufferDeVelas:
+    """Janela deslizante das últimas `capacidade` velas, com upsert da vela em formação."""
+
+    def __init__(self, capacidade: int = CAPACIDADE_PADRAO):
+        self.capacidade = capacidade
+        # Espaço dobrado: o deslocamento para o início só acontece a cada `capacidade` velas novas
+        self._dados = np.empty(capacidade * 2, dtype=DTYPE_VELA)
+        self._inicio = 0
+        self._fim = 0
+
+    def __len__(self) -> int:
+        return self._fim - self._inicio
+
+    def ultimo_tempo(self) -> Optional[int]:
+        return int(self._dados['tempo_abertura'][self._fim - 1]) if len(self) else None
+
+    def carregar(self, registros: np.ndarray) -> None:
+        """Mescla um bloco de velas (ex.: backfill REST) com o que já está no buffer."""
+        mescladas = mesclar_velas(self.ler(), registros)[-self.capacidade:]
+        self._dados[:len(mescladas)] = mescladas
+        self._inicio, self._fim = 0, len(mescladas)
+
+    def atualizar(self, registro: np.void) -> None:
+        tempo = int(registro['tempo_abertura'])
+        ultimo = self.ultimo_tempo()
+
+        if ultimo is None or tempo > ultimo:
+            if self._fim == len(self._dados):
+                manter = self.capacidade - 1
+                self._dados[:manter] = self._dados[self._fim - manter:self._fim]
+                self._inicio, self._fim = 0, manter
+            self._dados[self._fim] = registro
+            self._fim += 1
+            if len(self) > self.capacidade:
+                self._inicio += 1
+        else:
+            tempos = self._dados['tempo_abertura'][self._inicio:self._fim]
+            posicao = int(np.searchsorted(tempos, tempo))
+            if posicao < len(tempos) and tempos[posicao] == tempo:
+                self._dados[self._inicio + posicao] = registro
+
+    def ler(self) -> np.ndarray:
+        return self._dados[self._inicio:self._fim].copy()
+
+    def ler_desde(self, tempo: int) -> np.ndarray:
+        """Velas com abertura em `tempo` ou depois (copia só o final do buffer)."""
+        tempos = self._dados['tempo_abertura'][self._inicio:self._fim]
+        posicao = int(np.searchsorted(tempos, tempo))
+        return self._dados[self._inicio + posicao:self._fim].copy()
+
+
+class QuadroDeVelas:
+    """
+    DataFrame de `busca_velas` de um par e conjunto de EMAs, mantido entre leituras.
+
+    Velas e indicadores ficam numa matriz float64 pré-alocada (com espaço dobrado,
+    como o `BufferDeVelas`). A cada leitura só as velas que mudaram desde a anterior
+    (a em formação e as que abriram depois dela) são lidas do buffer e do motor: um
+    tick sobrescreve a última linha; uma vela nova acrescenta uma. A matriz só é
+    remontada quando o buffer é recarregado pelo REST, e o índice de datas só quando
+    entra vela nova.
+    """
+
+    def __init__(self, capacidade: int = CAPACIDADE_PADRAO):
+        self.capacidade = capacidade
+        self._colunas: List[str] = []
+        self._valores = np.empty((0, 0))
+        self._tempos = np.empty(0, dtype=np.int64)
+        self._inicio = 0
+        self._fim = 0
+        self._indice: Optional[pd.DatetimeIndex] = None
+        self._recarga = -1
+
+    def sincronizar(self, buffer: BufferDeVelas, motor: MotorIndicadores, recarga: int) -> pd.DataFrame:
+        if recarga != self._recarga or self._fim == self._inicio:
+            self._remontar(buffer, motor, recarga)
+        else:
+            novas = buffer.ler_desde(int(self._tempos[self._fim - 1]))
+            if not len(novas) or novas['tempo_abertura'][0] != self._tempos[self._fim - 1]:
+                self._remontar(buffer, motor, recarga)
+            else:
+                self._fim -= 1  # a última linha é reescrita junto com as novas
+                self._escrever(novas, self._linhas(novas, motor))
+        return self._dataframe()
+
+    def _linhas(self, velas: np.ndarray, motor: MotorIndicadores) -> np.ndarray:
+        linhas = np.full((len(velas), len(self._colunas)), np.nan)
+        for i, coluna in enumerate(COLUNAS_VELAS[1:]):
+            linhas[:, i] = velas[coluna]
+        deslocamento = len(COLUNAS_VELAS) - 1
+        for i, coluna in enumerate(motor.colunas(), start=deslocamento):
+            serie = motor.serie(coluna, len(velas))
+            linhas[len(velas) - len(serie):, i] = serie
+        return linhas
+
+    def _escrever(self, velas: np.ndarray, linhas: np.ndarray) -> None:
+        quantidade = len(velas)
+        if quantidade > 1:
+            self._indice = None  # entrou vela nova
+        if self._fim + quantidade > len(self._tempos):
+            manter = min(self._fim - self._inicio, self.capacidade - quantidade)
+            self._valores[:manter] = self._valores[self._fim - manter:self._fim]
+            self._tempos[:manter] = self._tempos[self._fim - manter:self._fim]
+            self._inicio, self._fim = 0, manter
+        self._valores[self._fim:self._fim + quantidade] = linhas
+        self._tempos[self._fim:self._fim + quantidade] = velas['tempo_abertura']
+        self._fim += quantidade
+        if self._fim - self._inicio > self.capacidade:
+            self._inicio = self._fim - self.capacidade
+
+    def _remontar(self, buffer: BufferDeVelas, motor: MotorIndicadores, recarga: int) -> None:
+        velas = buffer.ler()[-self.capacidade:]
+        self._colunas = COLUNAS_VELAS[1:] + motor.colunas()
+        self._valores = np.empty((self.capacidade * 2, len(self._colunas)))
+        self._tempos = np.empty(self.capacidade * 2, dtype=np.int64)
+        self._inicio = self._fim = 0
+        self._indice = None
+        self._recarga = recarga
+        if len(velas):
+            self._escrever(velas, self._linhas(velas, motor))
+
+    def _dataframe(self) -> pd.DataFrame:
+        """Cópia no formato de `array_para_dataframe` + colunas do motor."""
+        if self._indice is None:
+            self._indice = pd.to_datetime(self._tempos[self._inicio:self._fim], unit='ms')
+            self._indice.name = 'tempo_abertura'
+        return pd.DataFrame(self._valores[self._inicio:self._fim].copy(), index=self._indice,
+                            columns=self._colunas)
+
+
+def _registro_de_kline(item: dict) -> np.void:
+    registro = np.zeros((), dtype=DTYPE_VELA)
+    registro['tempo_abertura'] = int(item['start'])
+    registro['abertura'] = float(item['open'])
+    registro['maxima'] = float(item['high'])
+    registro['minima'] = float(item['low'])
+    registro['fechamento'] = float(item['close'])
+    registro['volume'] = float(item['volume'])
+    registro['turnover'] = float(item['turnover'])
+    return registro[()]
+
+
+class MarketDataFeed:
+    """
+    Serviço de dados de mercado: um WebSocket público para todos os bots do processo.
+
+    - `assinar(simbolo, intervalo)` registra o par, semeia o buffer via REST e assina os tópicos
+    - `busca_velas(...)` devolve o DataFrame no mesmo formato de `funcoes_bybit.busca_velas`,
+      atualizando só as velas que mudaram desde a leitura anterior
+    - `indicadores(...)` devolve o motor de indicadores incrementais do par
+    - `aguardar_atualizacao(...)` bloqueia até chegar uma nova mensagem para o par
+    """
+
+    def __init__(self, url: str = None, cliente_http=None, limitador=None,
+                 capacidade: int = CAPACIDADE_PADRAO):
+        if cliente_http is None or limitador is None:
+            from corretoras.funcoes_bybit import cliente, limitador_publico
+            cliente_http = cliente_http or cliente
+            limitador = limitador or limitador_publico
+
+        self.url = url or os.getenv('BYBIT_WS_PUBLIC_URL', URL_PUBLICA_LINEAR)
+        self.cliente_http = cliente_http
+        self.limitador = limitador
+        self.capacidade = capacidade
+        self.logger = get_logger("MarketDataFeed")
+
+        self._buffers: Dict[Chave, BufferDeVelas] = {}
+        self._versoes: Dict[Chave, int] = {}
+        self._tickers: Dict[str, dict] = {}
+        self._motores: Dict[Chave, Dict[tuple, MotorIndicadores]] = {}
+        self._quadros: Dict[Chave, Dict[tuple, QuadroDeVelas]] = {}
+        self._recargas: Dict[Chave, int] = {}
+        self._ouvintes: List[OuvinteVela] = []
+        self._condicao = threading.Condition()
+
+        self._ws: Optional[websocket.WebSocketApp] = None
+        self._conectado = threading.Event()
+        self._rodando = False
+        self._thread: Optional[threading.Thread] = None
+
+    # ------------------------------------------------------------------
+    # Ciclo de vida
+    # ------------------------------------------------------------------
+
+    def iniciar(self) -> None:
+        if self._rodando:
+            return
+        self._rodando = True
+        self._thread = threading.Thread(target=self._loop_conexao, daemon=True, name="MarketDataFeed")
+        self._thread.start()
+
+    def parar(self) -> None:
+        self._rodando = False
+        if self._ws:
+            self._ws.close()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    @property
+    def conectado(self) -> bool:
+        return self._conectado.is_set()
+
+    def _loop_conexao(self) -> None:
+        espera = 1
+        while self._rodando:
+            self._ws = websocket.WebSocketApp(
+                self.url,
+                on_open=self._ao_abrir,
+                on_message=lambda ws, texto: self._processar_mensagem(texto),
+                on_error=lambda ws, erro: self.logger.warning(
+                    LogCategory.CONNECTION_ERROR, f"⚠️ Erro no WebSocket de mercado: {erro}", "market_data_feed"),
+                on_close=lambda ws, codigo, motivo: self._conectado.clear(),
+            )
+            inicio = time.monotonic()
+            self._ws.run_forever()
+            self._conectado.clear()
+
+            if not self._rodando:
+                break
+            # Conexão que durou bastante zera o backoff; quedas em sequência esperam mais
+            espera = 1 if time.monotonic() - inicio > 60 else min(espera * 2, 30)
+            self.logger.warning(LogCategory.CONNECTION_ERROR,
+                                f"🔌 WebSocket de mercado desconectado, reconectando em {espera}s", "market_data_feed")
+            time.sleep(espera)
+
+    def _ao_abrir(self, ws) -> None:
+        # Reconexão: tudo o que chegou durante a queda vem do REST antes de voltar ao streaming
+        with self._condicao:
+            chaves = list(self._buffers.keys())
+        for simbolo, intervalo in chaves:
+            self._backfill_rest(simbolo, intervalo)
+
+        self._enviar_assinaturas(ws, chaves)
+        self._conectado.set()
+        threading.Thread(target=self._loop_ping, args=(ws,), daemon=True, name="MarketDataFeedPing").start()
+        self.logger.info(LogCategory.SYSTEM, f"📡 WebSocket de mercado conectado ({len(chaves)} pares)", "market_data_feed")
+
+    def _loop_ping(self, ws) -> None:
+        while self._rodando and self._ws is ws and self._conectado.wait(timeout=1):
+            time.sleep(INTERVALO_PING_SEGUNDOS)
+            try:
+                ws.send(json.dumps({'op': 'ping'}))
+            except Exception:
+                return
+
+    def _enviar_assinaturas(self, ws, chaves: List[Chave]) -> None:
+        topicos = []
+        for simbolo, intervalo in chaves:
+            topicos.append(f'kline.{intervalo}.{simbolo}')
+            topicos.append(f'tickers.{simbolo}')
+        topicos = list(dict.fromkeys(topicos))
+        for i in range(0, len(topicos), MAX_ARGS_POR_ASSINATURA):
+            ws.send(json.dumps({'op': 'subscribe', 'args': topicos[i:i + MAX_ARGS_POR_ASSINATURA]}))
+
+    # ------------------------------------------------------------------
+    # Assinaturas e leitura
+    # ------------------------------------------------------------------
+
+    def assinar(self, simbolo: str, intervalo) -> None:
+        chave = (simbolo, str(intervalo))
+        with self._condicao:
+            if chave in self._buffers:
+                return
+            self._buffers[chave] = BufferDeVelas(self.capacidade)
+            self._versoes[chave] = 0
+            self._recargas[chave] = 0
+
+        self._backfill_rest(*chave)
+        self.iniciar()
+        if self.conectado:
+            self._enviar_assinaturas(self._ws, [chave])
+
+    def adicionar_ouvinte(self, ouvinte: OuvinteVela) -> None:
+        """Registra um callback `ouvinte(simbolo, intervalo, vela, fechada)` chamado a cada kline."""
+        self._ouvintes.append(ouvinte)
+
+    def versao(self, simbolo: str, intervalo) -> int:
+        with self._condicao:
+            return self._versoes.get((simbolo, str(intervalo)), 0)
+
+    def aguardar_atualizacao(self, simbolo: str, intervalo, versao_vista: int, timeout: float = 1.0) -> int:
+        """Bloqueia até a versão do par mudar (ou até o timeout) e retorna a versão atual."""
+        chave = (simbolo, str(intervalo))
+        with self._condicao:
+            self._condicao.wait_for(lambda: self._versoes.get(chave, 0) != versao_vista, timeout=timeout)
+            return self._versoes.get(chave, 0)
+
+    def obter_velas(self, simbolo: str, intervalo) -> np.ndarray:
+        chave = (simbolo, str(intervalo))
+        with self._condicao:
+            buffer = self._buffers.get(chave)
+            return buffer.ler() if buffer else np.empty(0, dtype=DTYPE_VELA)
+
+    def indicadores(self, simbolo: str, intervalo, **configuracao) -> MotorIndicadores:
+        """
+        Motor de indicadores incrementais do par, com as opções de `MotorIndicadores`.
+
+        Pedidos com a mesma configuração compartilham o mesmo motor.
+        """
+        self.assinar(simbolo, intervalo)
+        chave = (simbolo, str(intervalo))
+        chave_configuracao = tuple(sorted(
+            (nome, tuple(valor) if isinstance(valor, (list, tuple, set)) else valor)
+            for nome, valor in configuracao.items()
+        ))
+        with self._condicao:
+            motores = self._motores.setdefault(chave, {})
+            motor = motores.get(chave_configuracao)
+            if motor is None:
+                motor = MotorIndicadores(capacidade=self.capacidade, **configuracao)
+                motor.semear(self._buffers[chave].ler())
+                motores[chave_configuracao] = motor
+            return motor
+
+    def busca_velas(self, simbolo: str, intervalo, emas) -> pd.DataFrame:
+        """
+        Equivalente a `funcoes_bybit.busca_velas`, lido do buffer local com EMAs incrementais.
+
+        O DataFrame do par é mantido por `QuadroDeVelas` e só as velas novas ou alteradas
+        desde a leitura anterior são convertidas; o chamador recebe uma cópia.
+        """
+        self.assinar(simbolo, intervalo)
+        if len(self.obter_velas(simbolo, intervalo)) < 2:
+            # Semeadura REST falhou (ou ainda não houve histórico): tenta de novo antes de entregar
+            self._backfill_rest(simbolo, str(intervalo))
+
+        emas_periods = tuple(sorted(set(emas)))
+        motor = self.indicadores(simbolo, intervalo, emas_periods=emas_periods)
+        chave = (simbolo, str(intervalo))
+        with self._condicao:
+            quadro = self._quadros.setdefault(chave, {}).setdefault(emas_periods, QuadroDeVelas(self.capacidade))
+            return quadro.sincronizar(self._buffers[chave], motor, self._recargas[chave])
+
+    def ultimo_ticker(self, simbolo: str) -> dict:
+        with self._condicao:
+            return dict(self._tickers.get(simbolo, {}))
+
+    # ------------------------------------------------------------------
+    # Entrada de dados
+    # ------------------------------------------------------------------
+
+    def _backfill_rest(self, simbolo: str, intervalo: str) -> None:
+        try:
+            self.limitador.adquirir()
+            resposta = self.cliente_http.get_kline(symbol=simbolo, interval=intervalo, limit=self.capacidade)
+            registros = velas_para_array(resposta['result']['list'])
+        except Exception as e:
+            self.logger.error(LogCategory.CONNECTION_ERROR, f"❌ Backfill REST falhou para {simbolo} {intervalo}: {e}",
+                              "market_data_feed", exception=e)
+            return
+
+        chave = (simbolo, intervalo)
+        with self._condicao:
+            self._buffers[chave].carregar(registros)
+            velas = self._buffers[chave].ler()
+            for motor in self._motores.get(chave, {}).values():
+                motor.reiniciar(velas)
+            self._recargas[chave] += 1
+            self._versoes[chave] += 1
+            self._condicao.notify_all()
+
+    def _processar_mensagem(self, texto: str) -> None:
+        mensagem = json.loads(texto)
+        topico = mensagem.get('topic')
+        if not topico:
+            return  # respostas de subscribe/pong
+
+        if topico.startswith('kline.'):
+            _, intervalo, simbolo = topico.split('.', 2)
+            chave = (simbolo, intervalo)
+            eventos = []
+            with self._condicao:
+                buffer = self._buffers.get(chave)
+                if buffer is None:
+                    return
+                motores = list(self._motores.get(chave, {}).values())
+                for item in mensagem.get('data', []):
+                    registro = _registro_de_kline(item)
+                    fechada = bool(item.get('confirm'))
+                    buffer.atualizar(registro)
+                    for motor in motores:
+                        motor.atualizar(int(registro['tempo_abertura']), float(registro['maxima']),
+                                        float(registro['minima']), float(registro['fechamento']),
+                                        float(registro['volume']), fechada)
+                    eventos.append((registro, fechada))
+                self._versoes[chave] += 1
+                self._condicao.notify_all()
+
+            for registro, fechada in eventos:
+                for ouvinte in list(self._ouvintes):
+                    try:
+                        ouvinte(simbolo, intervalo, registro, fechada)
+                    except Exception as e:
+                        self.logger.error(LogCategory.UNKNOWN_ERROR, f"Erro em ouvinte do feed: {e}",
+                                          "market_data_feed", exception=e)
+
+        elif topico.startswith('tickers.'):
+            simbolo = topico.split('.', 1)[1]
+            with self._condicao:
+                ticker = self._tickers.setdefault(simbolo, {})
+                if mensagem.get('type') == 'snapshot':
+                    ticker.clear()
+                ticker.update(mensagem.get('data', {}))
+
+
+# ============= Singleton =============
+
+_feed_instance: Optional[MarketDataFeed] = None
+_feed_lock = threading.Lock()
+
+
+def get_market_data_feed() -> MarketDataFeed:
+    """Retorna instância singleton do MarketDataFeed (compartilhada por todos os bots do processo)."""
+    global _feed_instance
+    with _feed_lock:
+        if _feed_instance is None:
+            _feed_instance = MarketDataFeed()
+        return _feed_instance
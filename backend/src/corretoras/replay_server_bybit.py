@@ -0,0 +1,167 @@
+"""
+Servidor local que imita o WebSocket público e o REST de klines da Bybit.
+
+Serve para testes e ensaios do `MarketDataFeed` sem rede: as velas vêm de um
+array (por exemplo, lido do CandleStore) e são reproduzidas como mensagens
+`kline.{intervalo}.{símbolo}` no protocolo v5, com respostas a subscribe/ping.
+
+Uso:
+    velas = CandleStore('BTCUSDT', '15').ler(start_ms, end_ms)
+    servidor = ServidorReplay({('BTCUSDT', '15'): velas}, atraso_segundos=0.01)
+    servidor.iniciar()
+    feed = MarketDataFeed(url=servidor.url, cliente_http=servidor.cliente_rest,
+                          limitador=TokenBucket(1000))
+"""
+
+import asyncio
+import json
+import threading
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from utils.candle_store import intervalo_em_ms
+
+Chave = Tuple[str, str]
+
+
+def mensagens_kline(simbolo: str, intervalo: str, velas: np.ndarray, parciais: int = 1) -> Iterator[dict]:
+    """
+    Converte velas históricas em mensagens de kline da Bybit.
+
+    Cada vela gera `parciais` atualizações em formação (`confirm=False`) seguidas
+    da mensagem de fechamento (`confirm=True`), como acontece no streaming real.
+    """
+    duracao = intervalo_em_ms(intervalo)
+    for vela in velas:
+        inicio = int(vela['tempo_abertura'])
+        for parcial in range(parciais + 1):
+            fechada = parcial == parciais
+            fracao = (parcial + 1) / (parciais + 1)
+            fechamento = vela['abertura'] + (vela['fechamento'] - vela['abertura']) * fracao
+            yield {
+                'topic': f'kline.{intervalo}.{simbolo}',
+                'type': 'snapshot',
+                'ts': inicio + int(duracao * fracao),
+                'data': [{
+                    'start': inicio,
+                    'end': inicio + duracao - 1,
+                    'interval': intervalo,
+                    'open': str(vela['abertura']),
+                    'close': str(vela['fechamento'] if fechada else fechamento),
+                    'high': str(vela['maxima']),
+                    'low': str(vela['minima']),
+                    'volume': str(vela['volume'] * fracao),
+                    'turnover': str(vela['turnover'] * fracao),
+                    'confirm': fechada,
+                    'timestamp': inicio + int(duracao * fracao),
+                }],
+            }
+
+
+class ClienteRestReplay:
+    """Substituto do `pybit.HTTP` que responde `get_kline` a partir das velas do replay."""
+
+    def __init__(self, velas: Dict[Chave, np.ndarray]):
+        self.velas = velas
+        self.cursor: Dict[Chave, int] = {}
+
+    def get_kline(self, symbol: str, interval, limit: int = 200, start: int = None, end: int = None, **kwargs):
+        chave = (symbol, str(interval))
+        velas = self.velas.get(chave, np.empty(0))
+        # Sem start/end o REST devolve as mais recentes: aqui, até o ponto já reproduzido
+        fim = self.cursor.get(chave, len(velas))
+        selecionadas = velas[:fim]
+        if start is not None:
+            selecionadas = selecionadas[selecionadas['tempo_abertura'] >= start]
+        if end is not None:
+            selecionadas = selecionadas[selecionadas['tempo_abertura'] <= end]
+        selecionadas = selecionadas[:limit] if start is not None else selecionadas[-limit:]
+
+        lista = [
+            [str(int(v['tempo_abertura'])), str(v['abertura']), str(v['maxima']), str(v['minima']),
+             str(v['fechamento']), str(v['volume']), str(v['turnover'])]
+            for v in selecionadas[::-1]
+        ]
+        return {'retCode': 0, 'retMsg': 'OK', 'result': {'symbol': symbol, 'category': 'linear', 'list': lista}}
+
+
+class ServidorReplay:
+    """Servidor WebSocket local (thread própria) que reproduz velas no protocolo público v5."""
+
+    def __init__(self, velas: Dict[Chave, np.ndarray], host: str = '127.0.0.1', porta: int = 0,
+                 atraso_segundos: float = 0.0, parciais: int = 1, velas_iniciais: int = 0):
+        self.velas = {(simbolo, str(intervalo)): v for (simbolo, intervalo), v in velas.items()}
+        self.host = host
+        self.porta = porta
+        self.atraso_segundos = atraso_segundos
+        self.parciais = parciais
+        self.cliente_rest = ClienteRestReplay(self.velas)
+        # As primeiras velas ficam "no passado": disponíveis via REST, fora do streaming
+        for chave in self.velas:
+            self.cliente_rest.cursor[chave] = velas_iniciais
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._servidor = None
+        self._pronto = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.conexoes = 0
+
+    @property
+    def url(self) -> str:
+        return f'ws://{self.host}:{self.porta}'
+
+    def iniciar(self) -> 'ServidorReplay':
+        self._thread = threading.Thread(target=self._rodar, daemon=True, name="ServidorReplayBybit")
+        self._thread.start()
+        self._pronto.wait(timeout=5)
+        return self
+
+    def parar(self) -> None:
+        if self._loop and self._servidor:
+            self._loop.call_soon_threadsafe(self._servidor.close)
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def _rodar(self) -> None:
+        import websockets
+
+        async def principal():
+            self._servidor = await websockets.serve(self._atender, self.host, self.porta)
+            self.porta = self._servidor.sockets[0].getsockname()[1]
+            self._pronto.set()
+            await self._servidor.wait_closed()
+
+        self._loop = asyncio.new_event_loop()
+        self._loop.run_until_complete(principal())
+        self._loop.close()
+
+    async def _atender(self, conexao) -> None:
+        self.conexoes += 1
+        tarefas: List[asyncio.Task] = []
+        try:
+            async for texto in conexao:
+                pedido = json.loads(texto)
+                if pedido.get('op') == 'ping':
+                    await conexao.send(json.dumps({'success': True, 'ret_msg': 'pong', 'op': 'ping'}))
+                elif pedido.get('op') == 'subscribe':
+                    await conexao.send(json.dumps({'success': True, 'ret_msg': '', 'op': 'subscribe'}))
+                    for topico in pedido.get('args', []):
+                        if topico.startswith('kline.'):
+                            _, intervalo, simbolo = topico.split('.', 2)
+                            if (simbolo, intervalo) in self.velas:
+                                tarefas.append(asyncio.create_task(self._reproduzir(conexao, simbolo, intervalo)))
+        finally:
+            for tarefa in tarefas:
+                tarefa.cancel()
+
+    async def _reproduzir(self, conexao, simbolo: str, intervalo: str) -> None:
+        chave = (simbolo, intervalo)
+        velas = self.velas[chave]
+        inicio = self.cliente_rest.cursor.get(chave, 0)
+        for indice in range(inicio, len(velas)):
+            for mensagem in mensagens_kline(simbolo, intervalo, velas[indice:indice + 1], self.parciais):
+                await conexao.send(json.dumps(mensagem))
+                if self.atraso_segundos:
+                    await asyncio.sleep(self.atraso_segundos)
+            self.cliente_rest.cursor[chave] = indice + 1
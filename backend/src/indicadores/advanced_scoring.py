@@ -14,11 +14,12 @@ from indicadores.market_trend import MarketTrendAnalyzer
 from indicadores.structure_analysis import StructureAnalyzer
 from indicadores.fibonacci_analysis import FibonacciAnalyzer
 from indicadores.wyckoff_analysis import WyckoffAnalyzer
-from indicadores.bandas_bollinger import bandas_bollinger
+from indicadores.didi import calcular_didi
 from indicadores.indicadores_osciladores import calcula_rsi
 from indicadores.padroes_velas import engolfo_alta, piercing_line_alta
+from indicadores.pontuacao_lote import PainelVelas, montar_painel, pontuar_painel
 import pandas as pd
-from typing import Dict, List
+from typing import Dict, List, Optional
 from dataclasses import dataclass
 
 @dataclass
@@ -52,16 +53,21 @@ class AdvancedScoringSystem:
         self.fibonacci_analyzer = FibonacciAnalyzer()
         self.wyckoff_analyzer = WyckoffAnalyzer()
     
-    def analyze_complete(self, simbolo: str) -> Dict[str, any]:
+    def analyze_complete(self, simbolo: str, df: Optional[pd.DataFrame] = None) -> Dict[str, any]:
         """
         Análise completa profissional
         
+        Args:
+            simbolo: Par a analisar
+            df: Velas já buscadas (ex.: as do painel de `analyze_batch`); sem ele, busca as de 1h
+        
         Returns:
             Dict com todos os indicadores e score final 0-100
         """
         try:
             # Buscar dados
-            df = busca_velas(simbolo, '60', [9, 21, 200])  # 1 hora
+            if df is None:
+                df = busca_velas(simbolo, '60', [9, 21, 200])  # 1 hora
             df = prepare_market_data(df, use_emas=True, emas_periods=[20, 50, 200])
             
             # ===== ANÁLISE DE TENDÊNCIA =====
@@ -132,24 +138,13 @@ class AdvancedScoringSystem:
     
     def _analyze_didi_bollinger(self, df: pd.DataFrame) -> Dict[str, any]:
         """Análise Didi + Bollinger (sistema existente)"""
-        # Didi
-        df['didi_curta'] = df['fechamento'].rolling(window=3).mean()
-        df['didi_media'] = df['fechamento'].rolling(window=8).mean()
-        df['didi_longa'] = df['fechamento'].rolling(window=20).mean()
-        
-        didi_curta = df['didi_curta'].iloc[-1]
-        didi_media = df['didi_media'].iloc[-1]
-        didi_longa = df['didi_longa'].iloc[-1]
-        
-        max_didi = max(didi_curta, didi_media, didi_longa)
-        min_didi = min(didi_curta, didi_media, didi_longa)
-        spread_didi = ((max_didi - min_didi) / max_didi) * 100
+        didi = calcular_didi(df['fechamento'])
+        spread_didi = didi.spread[-1] * 100
         
         # Bollinger
-        df = bandas_bollinger(df, periodo=20, desvios=2)
         preco_atual = df['fechamento'].iloc[-1]
-        bb_inferior = df['banda_inferior'].iloc[-1]
-        bb_superior = df['banda_superior'].iloc[-1]
+        bb_inferior = didi.banda_inferior[-1]
+        bb_superior = didi.banda_superior[-1]
         
         posicao_bb = ((preco_atual - bb_inferior) / (bb_superior - bb_inferior)) * 100
         
@@ -171,6 +166,33 @@ class AdvancedScoringSystem:
             'posicao_bb': posicao_bb
         }
     
+    def score_panel(self, painel: PainelVelas) -> pd.DataFrame:
+        """
+        Pontua todos os símbolos de um painel alinhado (símbolos x velas) de uma vez.
+        
+        Returns:
+            DataFrame ranqueado por score_final, com os scores por categoria
+            (mesmos valores de analyze_complete) e os fatores principais
+        """
+        tabela = pontuar_painel(painel, self.weights)
+        tabela['classification'] = [self._classify_score(score)['level'] for score in tabela['score_final']]
+        return tabela
+    
+    def analyze_batch(self, simbolos: List[str], velas: Optional[Dict[str, pd.DataFrame]] = None) -> pd.DataFrame:
+        """
+        Ranking do universo: busca as velas de 1h que faltarem e pontua tudo em um painel.
+        Símbolos cuja busca falha, ou sem histórico alinhado ao dos demais
+        (ver `montar_painel`), ficam fora da tabela.
+        """
+        velas = dict(velas or {})
+        for simbolo in simbolos:
+            if simbolo not in velas:
+                try:
+                    velas[simbolo] = busca_velas(simbolo, '60', [9, 21, 200])
+                except Exception as e:
+                    print(f"⚠️ Erro ao buscar {simbolo}: {e}")
+        return self.score_panel(montar_painel({s: velas[s] for s in simbolos if s in velas}))
+    
     def _analyze_momentum(self, df: pd.DataFrame) -> Dict[str, any]:
         """Análise de Momentum (RSI)"""
         df['rsi'] = calcula_rsi(df, 14)
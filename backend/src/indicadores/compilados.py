@@ -0,0 +1,673 @@
+"""
+Indicadores compilados (Numba) sobre arrays float64.
+
+Substitui o pandas_ta nos caminhos quentes (scanner, análise de tendência,
+scoring, `prepare_market_data`): cada indicador recebe arrays (ou Series) e
+devolve arrays, sem montar DataFrames intermediários. As fórmulas são as do
+pandas_ta 0.4.71b0 sem TA-Lib (EMA/ATR com semente SMA, RMA = `ewm(alpha=1/n,
+adjust=False)`, Bollinger com ddof=1, etc.). Médias exponenciais e RMAs repetem
+a aritmética do `ewm` do pandas e a soma por pares do numpy, então EMA, RSI, ATR,
+ADX, MACD, Supertrend e PSAR saem idênticos; médias e desvios de janela (SMA,
+Bollinger, estocástico, MFI) batem dentro do erro de arredondamento. Exceção: em
+janela de preço constante o `rolling().std()` do pandas deixa um resíduo (~1e-6,
+do algoritmo de soma/remoção online) que o desvio em duas passagens daqui não
+tem, então BBB/BBP divergem nessas velas (ambos são ruído sobre largura ~0).
+A paridade é conferida em `backend/tests/test_compilados.py`.
+
+Todos aceitam `ultimos=N` para devolver só as N últimas posições: indicadores de
+janela calculam apenas essas janelas; os recursivos ainda percorrem a série
+inteira (o valor depende de todo o histórico), mas só materializam o final.
+
+Como no pandas_ta, a função devolve None quando a série é mais curta que o
+mínimo do indicador.
+"""
+
+import sys
+from typing import NamedTuple, Optional
+
+import numpy as np
+from numba import njit
+
+EPSILON = sys.float_info.epsilon
+
+
+class MACD(NamedTuple):
+    macd: np.ndarray
+    histograma: np.ndarray
+    sinal: np.ndarray
+
+
+class ADX(NamedTuple):
+    adx: np.ndarray
+    adxr: np.ndarray
+    dmp: np.ndarray
+    dmn: np.ndarray
+
+
+class Bandas(NamedTuple):
+    inferior: np.ndarray
+    media: np.ndarray
+    superior: np.ndarray
+    largura: np.ndarray
+    percentual: np.ndarray
+
+
+class Estocastico(NamedTuple):
+    k: np.ndarray
+    d: np.ndarray
+    h: np.ndarray
+
+
+class Supertrend(NamedTuple):
+    valor: np.ndarray
+    direcao: np.ndarray
+    longa: np.ndarray
+    curta: np.ndarray
+
+
+class PSAR(NamedTuple):
+    longo: np.ndarray
+    curto: np.ndarray
+    af: np.ndarray
+    reversao: np.ndarray
+
+
+class Ichimoku(NamedTuple):
+    tenkan: np.ndarray
+    kijun: np.ndarray
+    span_a: np.ndarray  # já deslocados kijun - 1 barras, como ISA/ISB do pandas_ta
+    span_b: np.ndarray
+
+
+# ----------------------------------------------------------------------
+# Blocos básicos
+# ----------------------------------------------------------------------
+
+def _alpha_span(span):
+    # pandas: com = (span - 1) / 2; alpha = 1 / (1 + com)
+    return 1.0 / (1.0 + (span - 1) / 2.0)
+
+
+def _alpha_direto(alpha):
+    # pandas converte alpha em centro de massa e de volta
+    return 1.0 / (1.0 + (1.0 - alpha) / alpha)
+
+
+@njit(cache=True)
+def _ewm_passo(media, peso_antigo, valor, alpha, adjust):
+    # Um passo do ewm do pandas (ignore_na=False); media nan = ainda sem observação
+    if not np.isnan(media):
+        peso_antigo *= 1.0 - alpha
+        if not np.isnan(valor):
+            peso_novo = 1.0 if adjust else alpha
+            if media != valor:
+                media = peso_antigo * media + peso_novo * valor
+                media /= peso_antigo + peso_novo
+            peso_antigo = peso_antigo + peso_novo if adjust else 1.0
+    elif not np.isnan(valor):
+        media = valor
+    return media, peso_antigo
+
+
+@njit(cache=True)
+def _ewm_nb(x, alpha, adjust, inicio):
+    saida = np.full(len(x) - inicio, np.nan)
+    media, peso = np.nan, 1.0
+    for i in range(len(x)):
+        media, peso = _ewm_passo(media, peso, x[i], alpha, adjust)
+        if i >= inicio:
+            saida[i - inicio] = media
+    return saida
+
+
+@njit(cache=True)
+def _soma_bloco(x, inicio, n):
+    if n < 8:
+        soma = 0.0
+        for i in range(inicio, inicio + n):
+            soma += x[i]
+        return soma
+    r = np.empty(8)
+    for j in range(8):
+        r[j] = x[inicio + j]
+    i = 8
+    while i < n - (n % 8):
+        for j in range(8):
+            r[j] += x[inicio + i + j]
+        i += 8
+    soma = ((r[0] + r[1]) + (r[2] + r[3])) + ((r[4] + r[5]) + (r[6] + r[7]))
+    while i < n:
+        soma += x[inicio + i]
+        i += 1
+    return soma
+
+
+@njit(cache=True)
+def _soma_pares(x, inicio, n):
+    # Soma por pares do numpy (np.add.reduce sobre dados contíguos): blocos de até
+    # 128 com 8 acumuladores, metades somadas recursivamente (aqui com pilha explícita)
+    pilha_inicio = np.empty(64, dtype=np.int64)
+    pilha_n = np.empty(64, dtype=np.int64)
+    pilha_fase = np.empty(64, dtype=np.int64)
+    pilha_esquerda = np.empty(64)
+    topo = 0
+    pilha_inicio[0], pilha_n[0], pilha_fase[0] = inicio, n, 0
+    retorno = 0.0
+    while topo >= 0:
+        if pilha_n[topo] <= 128:
+            retorno = _soma_bloco(x, pilha_inicio[topo], pilha_n[topo])
+            topo -= 1
+            continue
+        metade = pilha_n[topo] // 2
+        metade -= metade % 8
+        fase = pilha_fase[topo]
+        if fase == 0:
+            pilha_fase[topo] = 1
+            topo += 1
+            pilha_inicio[topo], pilha_n[topo], pilha_fase[topo] = pilha_inicio[topo - 1], metade, 0
+        elif fase == 1:
+            pilha_esquerda[topo] = retorno
+            pilha_fase[topo] = 2
+            topo += 1
+            pilha_inicio[topo], pilha_n[topo], pilha_fase[topo] = pilha_inicio[topo - 1] + metade, pilha_n[topo - 1] - metade, 0
+        else:
+            retorno = pilha_esquerda[topo] + retorno
+            topo -= 1
+    return retorno
+
+
+@njit(cache=True)
+def _media_nan(x, inicio, fim):
+    # Series.mean(): nan vira 0 na soma e fica fora da contagem
+    valores = np.empty(fim - inicio)
+    contagem = 0
+    for i in range(inicio, fim):
+        if np.isnan(x[i]):
+            valores[i - inicio] = 0.0
+        else:
+            valores[i - inicio] = x[i]
+            contagem += 1
+    if contagem == 0:
+        return np.nan
+    return _soma_pares(valores, 0, len(valores)) / contagem
+
+
+@njit(cache=True)
+def _semear_com_sma(x, periodo):
+    # Semente do pandas_ta (presma): média das `periodo` primeiras, nan antes dela
+    y = x.copy()
+    semente = _media_nan(x, 0, periodo)
+    y[:periodo - 1] = np.nan
+    y[periodo - 1] = semente
+    return y
+
+
+@njit(cache=True)
+def _sma_nb(x, periodo, inicio):
+    saida = np.full(len(x) - inicio, np.nan)
+    fator = 1.0 / periodo
+    for i in range(max(inicio, periodo - 1), len(x)):
+        soma = 0.0
+        for j in range(i - periodo + 1, i + 1):
+            soma += x[j] * fator
+        saida[i - inicio] = soma
+    return saida
+
+
+@njit(cache=True)
+def _desvio_nb(x, periodo, ddof, inicio):
+    saida = np.full(len(x) - inicio, np.nan)
+    for i in range(max(inicio, periodo - 1), len(x)):
+        media = 0.0
+        for j in range(i - periodo + 1, i + 1):
+            media += x[j]
+        media /= periodo
+        quadrados = 0.0
+        for j in range(i - periodo + 1, i + 1):
+            quadrados += (x[j] - media) ** 2
+        saida[i - inicio] = np.sqrt(quadrados / (periodo - ddof))
+    return saida
+
+
+@njit(cache=True)
+def _extremo_janela_nb(x, periodo, maximo, inicio):
+    # rolling(periodo).max()/min() ignorando nan e exigindo `periodo` observações
+    saida = np.full(len(x) - inicio, np.nan)
+    for i in range(max(inicio, periodo - 1), len(x)):
+        extremo = np.nan
+        observacoes = 0
+        for j in range(i - periodo + 1, i + 1):
+            v = x[j]
+            if np.isnan(v):
+                continue
+            observacoes += 1
+            if np.isnan(extremo) or (maximo and v > extremo) or (not maximo and v < extremo):
+                extremo = v
+        if observacoes >= periodo:
+            saida[i - inicio] = extremo
+    return saida
+
+
+@njit(cache=True)
+def _tem_zero(a, b):
+    for i in range(len(a)):
+        if a[i] - b[i] == 0.0:
+            return True
+    return False
+
+
+@njit(cache=True)
+def _true_range_nb(maxima, minima, fechamento, prenan):
+    n = len(maxima)
+    tr = np.empty(n)
+    # non_zero_range: epsilon em toda a série se alguma amplitude for zero
+    epsilon = EPSILON if _tem_zero(maxima, minima) else 0.0
+    for i in range(n):
+        valor = abs((maxima[i] - minima[i]) + epsilon)
+        if i > 0:
+            # maior das três distâncias, ignorando nan
+            for distancia in (abs(maxima[i] - fechamento[i - 1]), abs(fechamento[i - 1] - minima[i])):
+                if np.isnan(valor) or distancia > valor:
+                    valor = distancia if not np.isnan(distancia) else valor
+        tr[i] = valor
+    if prenan and n > 0:
+        tr[0] = np.nan
+    return tr
+
+
+@njit(cache=True)
+def _todos_nan(x):
+    for v in x:
+        if not np.isnan(v):
+            return False
+    return True
+
+
+def _array(valores) -> np.ndarray:
+    return np.ascontiguousarray(valores, dtype=np.float64)
+
+
+def _inicio(n: int, ultimos: Optional[int]) -> int:
+    return 0 if ultimos is None else max(0, n - int(ultimos))
+
+
+# ----------------------------------------------------------------------
+# Médias
+# ----------------------------------------------------------------------
+
+def ema(fechamento, periodo: int = 10, presma: bool = True, ultimos: Optional[int] = None) -> Optional[np.ndarray]:
+    """`ta.ema`: ewm(span=periodo, adjust=False) com semente SMA nas `periodo` primeiras velas."""
+    x = _array(fechamento)
+    if len(x) < periodo:
+        return None
+    if presma:
+        x = _semear_com_sma(x, periodo)
+    return _ewm_nb(x, _alpha_span(periodo), False, _inicio(len(x), ultimos))
+
+
+def rma(valores, periodo: int = 10, ultimos: Optional[int] = None) -> Optional[np.ndarray]:
+    """`ta.rma`: média de Wilder, ewm(alpha=1/periodo, adjust=False)."""
+    x = _array(valores)
+    if len(x) < periodo:
+        return None
+    return _ewm_nb(x, _alpha_direto(1.0 / periodo), False, _inicio(len(x), ultimos))
+
+
+def sma(valores, periodo: int = 10, ultimos: Optional[int] = None) -> Optional[np.ndarray]:
+    """`ta.sma`."""
+    x = _array(valores)
+    if len(x) < periodo:
+        return None
+    return _sma_nb(x, periodo, _inicio(len(x), ultimos))
+
+
+# ----------------------------------------------------------------------
+# Osciladores
+# ----------------------------------------------------------------------
+
+# error_model='numpy': 0/0 sem variação vira nan, como no pandas
+@njit(cache=True, error_model='numpy')
+def _rsi_nb(fechamento, alpha, inicio):
+    saida = np.full(len(fechamento) - inicio, np.nan)
+    ganho, peso_ganho = np.nan, 1.0
+    perda, peso_perda = np.nan, 1.0
+    for i in range(len(fechamento)):
+        variacao = fechamento[i] - fechamento[i - 1] if i > 0 else np.nan
+        positivo = 0.0 if variacao < 0 else variacao
+        negativo = 0.0 if variacao > 0 else variacao
+        ganho, peso_ganho = _ewm_passo(ganho, peso_ganho, positivo, alpha, False)
+        perda, peso_perda = _ewm_passo(perda, peso_perda, negativo, alpha, False)
+        if i >= inicio:
+            saida[i - inicio] = 100.0 * ganho / (ganho + abs(perda))
+    return saida
+
+
+def rsi(fechamento, periodo: int = 14, ultimos: Optional[int] = None) -> Optional[np.ndarray]:
+    """`ta.rsi`: RMA dos ganhos sobre RMA dos ganhos + |perdas|."""
+    x = _array(fechamento)
+    if len(x) < periodo + 1:
+        return None
+    return _rsi_nb(x, _alpha_direto(1.0 / periodo), _inicio(len(x), ultimos))
+
+
+@njit(cache=True)
+def _estocastico_bruto_nb(maxima, minima, fechamento, k):
+    menor = _extremo_janela_nb(minima, k, False, 0)
+    maior = _extremo_janela_nb(maxima, k, True, 0)
+    epsilon = EPSILON if _tem_zero(maior, menor) else 0.0
+    return 100.0 * (fechamento - menor) / ((maior - menor) + epsilon)
+
+
+@njit(cache=True)
+def _primeiro_valido(x):
+    for i in range(len(x)):
+        if not np.isnan(x[i]):
+            return i
+    return len(x)
+
+
+def estocastico(maxima, minima, fechamento, k: int = 14, d: int = 3, suavizacao_k: int = 3,
+                ultimos: Optional[int] = None) -> Optional[Estocastico]:
+    """`ta.stoch` (médias simples): %K suavizado, %D e a diferença entre eles."""
+    maxima, minima, fechamento = _array(maxima), _array(minima), _array(fechamento)
+    n = len(fechamento)
+    if n < k + d + suavizacao_k:
+        return None
+    bruto = _estocastico_bruto_nb(maxima, minima, fechamento, k)
+    primeiro = _primeiro_valido(bruto)
+    linha_k = bruto.copy()
+    if suavizacao_k != 1:
+        linha_k[primeiro:] = _sma_nb(bruto[primeiro:], suavizacao_k, 0)
+    primeiro_k = _primeiro_valido(linha_k)
+    linha_d = np.full(n, np.nan)
+    linha_d[primeiro_k:] = _sma_nb(linha_k[primeiro_k:], d, 0)
+    inicio = _inicio(n, ultimos)
+    return Estocastico(linha_k[inicio:], linha_d[inicio:], (linha_k - linha_d)[inicio:])
+
+
+def macd(fechamento, rapida: int = 12, lenta: int = 26, sinal: int = 9,
+         ultimos: Optional[int] = None) -> Optional[MACD]:
+    """`ta.macd`: EMA rápida - EMA lenta, sinal = EMA da linha a partir do primeiro valor válido."""
+    x = _array(fechamento)
+    if lenta < rapida:
+        rapida, lenta = lenta, rapida
+    if len(x) < lenta + sinal - 1:
+        return None
+    linha = ema(x, rapida) - ema(x, lenta)
+    primeiro = _primeiro_valido(linha)
+    linha_sinal = np.full(len(x), np.nan)
+    if len(x) - primeiro >= sinal:
+        linha_sinal[primeiro:] = ema(linha[primeiro:], sinal)
+    inicio = _inicio(len(x), ultimos)
+    return MACD(linha[inicio:], (linha - linha_sinal)[inicio:], linha_sinal[inicio:])
+
+
+# ----------------------------------------------------------------------
+# Volatilidade
+# ----------------------------------------------------------------------
+
+def _atr_completo(maxima, minima, fechamento, periodo, prenan):
+    tr = _true_range_nb(maxima, minima, fechamento, prenan)
+    if _todos_nan(tr):
+        return None
+    return _ewm_nb(_semear_com_sma(tr, periodo), _alpha_direto(1.0 / periodo), False, 0)
+
+
+def atr(maxima, minima, fechamento, periodo: int = 14, ultimos: Optional[int] = None) -> Optional[np.ndarray]:
+    """`ta.atr` (coluna `ATRr_{periodo}`): RMA do true range com semente SMA."""
+    maxima, minima, fechamento = _array(maxima), _array(minima), _array(fechamento)
+    if len(fechamento) < periodo + 1:
+        return None
+    valores = _atr_completo(maxima, minima, fechamento, periodo, False)
+    if valores is None or _todos_nan(valores):
+        return None
+    return valores[_inicio(len(valores), ultimos):]
+
+
+def bandas_bollinger(fechamento, periodo: int = 5, desvios_inferior: float = 2.0, desvios_superior: float = 2.0,
+                     ddof: int = 1, ultimos: Optional[int] = None) -> Optional[Bandas]:
+    """
+    `ta.bbands` com média simples: bandas, largura (BBB) e posição do preço (BBP).
+
+    Como o `non_zero_range` do pandas_ta, soma épsilon à largura/distância se houver
+    algum zero no trecho calculado; com `ultimos=N` o trecho é só o final, então em
+    séries com largura zero antes dele BBB/BBP podem diferir do final da série
+    completa nesse épsilon.
+    """
+    x = _array(fechamento)
+    if len(x) < periodo:
+        return None
+    ddof = ddof if 0 <= ddof < periodo else 1
+    inicio = _inicio(len(x), ultimos)
+    media = _sma_nb(x, periodo, inicio)
+    desvio = _desvio_nb(x, periodo, ddof, inicio)
+    inferior = media - desvios_inferior * desvio
+    superior = media + desvios_superior * desvio
+    largura = superior - inferior
+    if np.any(largura == 0):
+        largura = largura + EPSILON
+    distancia = x[inicio:] - inferior
+    if np.any(distancia == 0):
+        distancia = distancia + EPSILON
+    return Bandas(inferior, media, superior, 100 * largura / media, distancia / largura)
+
+
+# ----------------------------------------------------------------------
+# Tendência
+# ----------------------------------------------------------------------
+
+@njit(cache=True)
+def _movimento_direcional(maxima, minima):
+    n = len(maxima)
+    positivo = np.full(n, np.nan)
+    negativo = np.full(n, np.nan)
+    for i in range(1, n):
+        alta = maxima[i] - maxima[i - 1]
+        baixa = minima[i - 1] - minima[i]
+        p = alta if (alta > baixa and alta > 0) else 0.0
+        q = baixa if (baixa > alta and baixa > 0) else 0.0
+        positivo[i] = 0.0 if abs(p) < EPSILON else p
+        negativo[i] = 0.0 if abs(q) < EPSILON else q
+    return positivo, negativo
+
+
+def adx(maxima, minima, fechamento, periodo: int = 14, periodo_sinal: int = None, periodo_adxr: int = 2,
+        ultimos: Optional[int] = None) -> Optional[ADX]:
+    """`ta.adx`: ADX, ADXR e os direcionais DMP/DMN."""
+    maxima, minima, fechamento = _array(maxima), _array(minima), _array(fechamento)
+    periodo_sinal = periodo_sinal or periodo
+    n = len(fechamento)
+    if n < max(periodo, periodo_sinal, periodo_adxr) or n < periodo + 1:
+        return None
+    atr_ = _atr_completo(maxima, minima, fechamento, periodo, True)
+    if atr_ is None or _todos_nan(atr_):
+        return None
+    k = 100.0 / atr_
+    positivo, negativo = _movimento_direcional(maxima, minima)
+    alpha = _alpha_direto(1.0 / periodo)
+    dmp = k * _ewm_nb(positivo, alpha, False, 0)
+    dmn = k * _ewm_nb(negativo, alpha, False, 0)
+    dx = 100.0 * np.abs(dmp - dmn) / (dmp + dmn)
+    linha = _ewm_nb(dx, _alpha_direto(1.0 / periodo_sinal), False, 0)
+    adxr = np.full(n, np.nan)
+    adxr[periodo_adxr:] = 0.5 * (linha[periodo_adxr:] + linha[:-periodo_adxr])
+    inicio = _inicio(n, ultimos)
+    return ADX(linha[inicio:], adxr[inicio:], dmp[inicio:], dmn[inicio:])
+
+
+@njit(cache=True)
+def _supertrend_nb(maxima, minima, fechamento, atr_, multiplicador, periodo):
+    n = len(fechamento)
+    direcao = np.ones(n)
+    valor = np.zeros(n)
+    longa = np.full(n, np.nan)
+    curta = np.full(n, np.nan)
+    inferior = np.empty(n)
+    superior = np.empty(n)
+    for i in range(n):
+        meio = 0.5 * (maxima[i] + minima[i])
+        faixa = multiplicador * atr_[i]
+        inferior[i] = meio - faixa
+        superior[i] = meio + faixa
+    for i in range(1, n):
+        if fechamento[i] > superior[i - 1]:
+            direcao[i] = 1
+        elif fechamento[i] < inferior[i - 1]:
+            direcao[i] = -1
+        else:
+            direcao[i] = direcao[i - 1]
+            if direcao[i] > 0 and inferior[i] < inferior[i - 1]:
+                inferior[i] = inferior[i - 1]
+            if direcao[i] < 0 and superior[i] > superior[i - 1]:
+                superior[i] = superior[i - 1]
+        if direcao[i] > 0:
+            valor[i] = longa[i] = inferior[i]
+        else:
+            valor[i] = curta[i] = superior[i]
+    valor[0] = np.nan
+    direcao[:periodo] = np.nan
+    return valor, direcao, longa, curta
+
+
+def supertrend(maxima, minima, fechamento, periodo: int = 7, multiplicador: float = 3.0,
+               ultimos: Optional[int] = None) -> Optional[Supertrend]:
+    """`ta.supertrend`: linha, direção (1/-1), e a linha separada por lado."""
+    maxima, minima, fechamento = _array(maxima), _array(minima), _array(fechamento)
+    n = len(fechamento)
+    if n < periodo + 1:
+        return None
+    atr_ = _atr_completo(maxima, minima, fechamento, periodo, False)
+    if atr_ is None:
+        return None
+    valores = _supertrend_nb(maxima, minima, fechamento, atr_, float(multiplicador), periodo)
+    inicio = _inicio(n, ultimos)
+    return Supertrend(*(v[inicio:] for v in valores))
+
+
+@njit(cache=True)
+def _psar_nb(maxima, minima, fechamento, af0, max_af):
+    n = len(maxima)
+    sar = np.zeros(n)
+    longo = np.full(n, np.nan)
+    curto = np.full(n, np.nan)
+    reversao = np.zeros(n)
+    fatores = np.zeros(n)
+    fatores[:2] = af0
+
+    # Direção inicial pelo movimento direcional das duas primeiras velas
+    caindo = False
+    if n > 1:
+        alta = maxima[1] - maxima[0]
+        baixa = minima[0] - minima[1]
+        dmn = baixa if (baixa > alta and baixa > 0) else 0.0
+        caindo = (0.0 if abs(dmn) < EPSILON else dmn) > 0
+    extremo = minima[0] if caindo else maxima[0]
+    sar[0] = fechamento[0]
+    af = af0
+
+    for i in range(1, n):
+        sar[i] = sar[i - 1] + af * (extremo - sar[i - 1])
+        if caindo:
+            reverter = maxima[i] > sar[i]
+            if minima[i] < extremo:
+                extremo = minima[i]
+                af = min(af + af0, max_af)
+            sar[i] = max(maxima[i - 1], sar[i])
+        else:
+            reverter = minima[i] < sar[i]
+            if maxima[i] > extremo:
+                extremo = maxima[i]
+                af = min(af + af0, max_af)
+            sar[i] = min(minima[i - 1], sar[i])
+        if reverter:
+            sar[i] = extremo
+            af = af0
+            caindo = not caindo
+            extremo = minima[i] if caindo else maxima[i]
+        if caindo:
+            curto[i] = sar[i]
+        else:
+            longo[i] = sar[i]
+        fatores[i] = af
+        reversao[i] = 1.0 if reverter else 0.0
+    return longo, curto, fatores, reversao
+
+
+def psar(maxima, minima, fechamento, af0: float = 0.02, max_af: float = 0.2,
+         ultimos: Optional[int] = None) -> Optional[PSAR]:
+    """`ta.psar`: SAR na coluna do lado ativo (`longo` em alta, `curto` em baixa)."""
+    maxima, minima, fechamento = _array(maxima), _array(minima), _array(fechamento)
+    n = len(maxima)
+    if n < 1:
+        return None
+    valores = _psar_nb(maxima, minima, fechamento, float(af0), float(max_af))
+    inicio = _inicio(n, ultimos)
+    return PSAR(*(v[inicio:] for v in valores))
+
+
+def ichimoku(maxima, minima, fechamento, tenkan: int = 9, kijun: int = 26, senkou: int = 52,
+             ultimos: Optional[int] = None) -> Optional[Ichimoku]:
+    """`ta.ichimoku` (primeiro DataFrame, sem a chikou): linhas de conversão/base e spans deslocados."""
+    maxima, minima = _array(maxima), _array(minima)
+    n = len(maxima)
+    if n < max(tenkan, kijun, senkou):
+        return None
+    inicio = _inicio(n, ultimos)
+    # Os spans na barra i vêm do ponto médio de i - (kijun - 1)
+    origem = max(0, inicio - (kijun - 1))
+
+    def ponto_medio(periodo, a_partir):
+        return 0.5 * (_extremo_janela_nb(minima, periodo, False, a_partir)
+                      + _extremo_janela_nb(maxima, periodo, True, a_partir))
+
+    linha_tenkan = ponto_medio(tenkan, origem)
+    linha_kijun = ponto_medio(kijun, origem)
+    span_a_bruto = 0.5 * (linha_tenkan + linha_kijun)
+    span_b_bruto = ponto_medio(senkou, origem)
+
+    deslocamento = kijun - 1
+    span_a = np.full(n - inicio, np.nan)
+    span_b = np.full(n - inicio, np.nan)
+    for destino in range(inicio, n):
+        fonte = destino - deslocamento
+        if fonte >= origem:
+            span_a[destino - inicio] = span_a_bruto[fonte - origem]
+            span_b[destino - inicio] = span_b_bruto[fonte - origem]
+    corte = inicio - origem
+    return Ichimoku(linha_tenkan[corte:], linha_kijun[corte:], span_a, span_b)
+
+
+# ----------------------------------------------------------------------
+# Volume
+# ----------------------------------------------------------------------
+
+@njit(cache=True)
+def _mfi_nb(maxima, minima, fechamento, volume, periodo, inicio):
+    n = len(fechamento)
+    tipico = (maxima + minima + fechamento) / 3.0
+    positivo = np.empty(n)
+    negativo = np.empty(n)
+    for i in range(n):
+        # np.roll: a primeira vela é comparada com a última (e depois descartada)
+        anterior = tipico[i - 1] if i > 0 else tipico[n - 1]
+        fluxo = tipico[i] * volume[i] * (1.0 if tipico[i] > anterior else -1.0)
+        positivo[i] = max(fluxo, 0.0)
+        negativo[i] = max(-fluxo, 0.0)
+    saida = np.full(n - inicio, np.nan)
+    for i in range(max(inicio, periodo), n):
+        ganho = 0.0
+        perda = 0.0
+        for j in range(i - periodo + 1, i + 1):
+            ganho += positivo[j]
+            perda += negativo[j]
+        saida[i - inicio] = 100.0 * ganho / (ganho + perda + EPSILON)
+    return saida
+
+
+def mfi(maxima, minima, fechamento, volume, periodo: int = 14, ultimos: Optional[int] = None) -> Optional[np.ndarray]:
+    """`ta.mfi`: fluxo de dinheiro positivo sobre o total em `periodo` velas (preço típico igual conta como negativo)."""
+    maxima, minima, fechamento, volume = _array(maxima), _array(minima), _array(fechamento), _array(volume)
+    n = len(fechamento)
+    if n < periodo + 1:
+        return None
+    return _mfi_nb(maxima, minima, fechamento, volume, periodo, _inicio(n, ultimos))
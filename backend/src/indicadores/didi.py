@@ -0,0 +1,209 @@
+"""
+Motor compilado do Didi Index (médias 3/8/20) com Bollinger.
+
+Uma passada sobre o histórico calcula as três médias, a agulhada (curta cruza a
+longa com as três médias a menos de `tolerancia` de distância), o punto (curta
+cruza a média ainda do outro lado da longa), a separação curta/longa, as
+bandas de Bollinger e a abertura das bandas (superior subindo e inferior
+descendo na mesma vela).
+
+As médias repetem a aritmética de `Series.rolling(n).mean()` do pandas, então os
+cruzamentos (inclusive empates) saem idênticos aos loops antigos dos scripts
+`analise_didi_*`/`varredura_didi_bollinger`; o desvio das bandas bate com o
+`rolling(n).std()` dentro do erro de arredondamento (numa janela toda igual
+sai 0 exato, onde o pandas deixa um resíduo da ordem de 1e-7).
+
+- `calcular_didi`: uma série (array ou Series de fechamentos);
+- `calcular_didi_lote`: vários símbolos de uma vez (matriz símbolos x velas ou
+  lista de séries de tamanhos diferentes), um símbolo por thread.
+"""
+
+from typing import List, NamedTuple
+
+import numpy as np
+from numba import njit, prange
+
+from indicadores.compilados import _desvio_nb
+
+COMPRA = 1
+VENDA = -1
+
+
+class Didi(NamedTuple):
+    curta: np.ndarray           # média de `curta` períodos (3)
+    media: np.ndarray           # média de `media` períodos (8)
+    longa: np.ndarray           # média de `longa` períodos (20)
+    agulhada: np.ndarray        # por vela: COMPRA/VENDA na vela da agulhada, 0 nas demais
+    punto: np.ndarray           # por vela: COMPRA/VENDA na vela do punto, 0 nas demais
+    spread: np.ndarray          # (maior - menor) / maior das três médias
+    separacao: np.ndarray       # (curta - longa) / longa em %, 0 sem as médias
+    banda_superior: np.ndarray
+    banda_inferior: np.ndarray
+    media_bandas: np.ndarray
+    largura_bandas: np.ndarray  # (superior - inferior) / média em %
+    abertura: np.ndarray        # bandas abrindo: superior sobe e inferior desce na vela
+
+    def agulhadas(self, direcao: int = COMPRA) -> List[int]:
+        return np.flatnonzero(self.agulhada == direcao).tolist()
+
+    def puntos(self, direcao: int = COMPRA) -> List[int]:
+        return np.flatnonzero(self.punto == direcao).tolist()
+
+
+@njit(cache=True)
+def _media_movel_nb(x, periodo, saida):
+    # rolling(periodo).mean() do pandas: soma de Kahan com compensações separadas
+    # para saída e entrada (sai primeiro), média constante quando a janela é
+    # toda igual e corte do sinal quando todos os valores têm o mesmo sinal
+    soma = 0.0
+    compensacao_entrada = 0.0
+    compensacao_saida = 0.0
+    nobs = 0
+    negativos = 0
+    iguais = 0
+    anterior = x[0] if len(x) else np.nan
+    for i in range(len(x)):
+        if i >= periodo:
+            v = x[i - periodo]
+            if v == v:
+                nobs -= 1
+                y = -v - compensacao_saida
+                t = soma + y
+                compensacao_saida = t - soma - y
+                soma = t
+                if np.signbit(v):
+                    negativos -= 1
+        v = x[i]
+        if v == v:
+            nobs += 1
+            y = v - compensacao_entrada
+            t = soma + y
+            compensacao_entrada = t - soma - y
+            soma = t
+            if np.signbit(v):
+                negativos += 1
+            iguais = iguais + 1 if v == anterior else 1
+            anterior = v
+        if nobs >= periodo and nobs > 0:
+            resultado = soma / nobs
+            if iguais >= nobs:
+                resultado = anterior
+            elif negativos == 0 and resultado < 0:
+                resultado = 0.0
+            elif negativos == nobs and resultado > 0:
+                resultado = 0.0
+            saida[i] = resultado
+        else:
+            saida[i] = np.nan
+
+
+@njit(cache=True, error_model='numpy')
+def _didi_nb(fechamento, curta, media, longa, tolerancia, periodo_bandas, desvios,
+             o_curta, o_media, o_longa, o_agulhada, o_punto, o_spread, o_separacao,
+             o_superior, o_inferior, o_media_bandas, o_largura, o_abertura):
+    n = len(fechamento)
+    _media_movel_nb(fechamento, curta, o_curta)
+    _media_movel_nb(fechamento, media, o_media)
+    _media_movel_nb(fechamento, longa, o_longa)
+    _media_movel_nb(fechamento, periodo_bandas, o_media_bandas)
+    desvio = _desvio_nb(fechamento, periodo_bandas, 1, 0)
+    # a agulhada só é procurada a partir da segunda vela com a média longa anterior (21 na 3/8/20)
+    inicio_agulhada = longa + 1
+
+    for i in range(n):
+        c = o_curta[i]
+        m = o_media[i]
+        lo = o_longa[i]
+
+        # max()/min() do Python sobre (curta, media, longa)
+        maior = c
+        if m > maior:
+            maior = m
+        if lo > maior:
+            maior = lo
+        menor = c
+        if m < menor:
+            menor = m
+        if lo < menor:
+            menor = lo
+        spread = (maior - menor) / maior
+        o_spread[i] = spread
+
+        if c == c and lo == lo and lo != 0:
+            o_separacao[i] = (c - lo) / lo * 100
+        else:
+            o_separacao[i] = 0.0
+
+        o_agulhada[i] = 0
+        o_punto[i] = 0
+        if i >= 1:
+            c_ant = o_curta[i - 1]
+            m_ant = o_media[i - 1]
+            lo_ant = o_longa[i - 1]
+            if i >= inicio_agulhada and spread < tolerancia:
+                if c_ant < lo_ant and c > lo:
+                    o_agulhada[i] = COMPRA
+                elif c_ant > lo_ant and c < lo:
+                    o_agulhada[i] = VENDA
+            if i >= 2:
+                if c_ant <= m_ant and c > m and c < lo:
+                    o_punto[i] = COMPRA
+                elif c_ant >= m_ant and c < m and c > lo:
+                    o_punto[i] = VENDA
+
+        centro = o_media_bandas[i]
+        o_superior[i] = centro + desvios * desvio[i]
+        o_inferior[i] = centro - desvios * desvio[i]
+        o_largura[i] = (o_superior[i] - o_inferior[i]) / centro * 100
+        o_abertura[i] = (i >= 1 and o_superior[i] > o_superior[i - 1]
+                         and o_inferior[i] < o_inferior[i - 1])
+
+
+@njit(cache=True, parallel=True, error_model='numpy')
+def _didi_lote_nb(fechamentos, inicios, curta, media, longa, tolerancia, periodo_bandas, desvios,
+                  o_curta, o_media, o_longa, o_agulhada, o_punto, o_spread, o_separacao,
+                  o_superior, o_inferior, o_media_bandas, o_largura, o_abertura):
+    # Séries concatenadas; o símbolo k ocupa [inicios[k], inicios[k + 1])
+    for k in prange(len(inicios) - 1):
+        a = inicios[k]
+        b = inicios[k + 1]
+        _didi_nb(fechamentos[a:b], curta, media, longa, tolerancia, periodo_bandas, desvios,
+                 o_curta[a:b], o_media[a:b], o_longa[a:b], o_agulhada[a:b], o_punto[a:b],
+                 o_spread[a:b], o_separacao[a:b], o_superior[a:b], o_inferior[a:b],
+                 o_media_bandas[a:b], o_largura[a:b], o_abertura[a:b])
+
+
+def _saidas(n: int):
+    return (np.empty(n), np.empty(n), np.empty(n), np.empty(n, dtype=np.int8), np.empty(n, dtype=np.int8),
+            np.empty(n), np.empty(n), np.empty(n), np.empty(n), np.empty(n), np.empty(n),
+            np.empty(n, dtype=np.bool_))
+
+
+def calcular_didi(fechamento, curta: int = 3, media: int = 8, longa: int = 20, tolerancia: float = 0.01,
+                  periodo_bandas: int = 20, desvios: float = 2.0) -> Didi:
+    """Didi Index, agulhadas, puntos e Bollinger de toda a série em uma passada."""
+    x = np.ascontiguousarray(fechamento, dtype=np.float64)
+    saidas = _saidas(len(x))
+    _didi_nb(x, int(curta), int(media), int(longa), float(tolerancia), int(periodo_bandas), float(desvios), *saidas)
+    return Didi(*saidas)
+
+
+def calcular_didi_lote(fechamentos, curta: int = 3, media: int = 8, longa: int = 20, tolerancia: float = 0.01,
+                       periodo_bandas: int = 20, desvios: float = 2.0) -> List[Didi]:
+    """
+    `calcular_didi` para vários símbolos: `fechamentos` é uma matriz (símbolos x
+    velas) ou uma lista de séries, que podem ter tamanhos diferentes. Devolve um
+    `Didi` por símbolo, na mesma ordem (os arrays são fatias de um buffer único).
+    """
+    if isinstance(fechamentos, np.ndarray) and fechamentos.ndim == 2:
+        series = list(fechamentos)
+    else:
+        series = [np.asarray(f, dtype=np.float64) for f in fechamentos]
+    inicios = np.zeros(len(series) + 1, dtype=np.int64)
+    np.cumsum([len(s) for s in series], out=inicios[1:])
+    x = np.concatenate(series).astype(np.float64, copy=False) if series else np.empty(0)
+
+    saidas = _saidas(len(x))
+    _didi_lote_nb(np.ascontiguousarray(x), inicios, int(curta), int(media), int(longa), float(tolerancia),
+                  int(periodo_bandas), float(desvios), *saidas)
+    return [Didi(*(s[inicios[k]:inicios[k + 1]] for s in saidas)) for k in range(len(series))]
@@ -0,0 +1,370 @@
+"""
+Indicadores incrementais para o loop ao vivo.
+
+Cada indicador guarda apenas o estado necessário para avançar uma vela em O(1):
+é semeado uma vez com o histórico e depois recebe `atualizar(..., fechada)`.
+
+- `fechada=False`: atualização de tick da vela em formação. O valor devolvido é
+  provisório e o estado confirmado não muda, então vários ticks da mesma vela
+  sempre partem do mesmo ponto.
+- `fechada=True`: a vela fechou; o valor vira parte do estado confirmado.
+
+Os nomes de colunas e as fórmulas seguem o que `prepare_market_data` produz
+(EMA com `adjust=False`, RSI/ATR com a RMA do pandas_ta, Bollinger com desvio
+padrão amostral, ddof=1, e os mesmos nomes de colunas do `ta.bbands`).
+
+Para RSI/ATR a semeadura só afeta as primeiras velas: com algumas centenas de
+velas de histórico o valor converge para o do pandas_ta.
+"""
+
+import math
+from collections import deque
+from itertools import islice
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+NAN = float('nan')
+
+
+class EMAIncremental:
+    """EMA equivalente a `ewm(span=periodo, adjust=False).mean()`."""
+
+    def __init__(self, periodo: int):
+        self.periodo = periodo
+        self.alpha = 2.0 / (periodo + 1)
+        self._confirmado: Optional[float] = None
+
+    def atualizar(self, valor: float, fechada: bool = True) -> float:
+        if self._confirmado is None:
+            resultado = valor
+        else:
+            resultado = self.alpha * valor + (1 - self.alpha) * self._confirmado
+        if fechada:
+            self._confirmado = resultado
+        return resultado
+
+
+class RMAIncremental:
+    """Média de Wilder como no pandas_ta (`ewm(alpha=1/periodo, min_periods=periodo)`, adjust=True)."""
+
+    def __init__(self, periodo: int):
+        self.periodo = periodo
+        self._decaimento = 1 - 1.0 / periodo
+        self._soma = 0.0
+        self._peso = 0.0
+        self._contagem = 0
+
+    def atualizar(self, valor: float, fechada: bool = True) -> float:
+        soma = valor + self._decaimento * self._soma
+        peso = 1.0 + self._decaimento * self._peso
+        contagem = self._contagem + 1
+        if fechada:
+            self._soma, self._peso, self._contagem = soma, peso, contagem
+        return soma / peso if contagem >= self.periodo else NAN
+
+
+class JanelaIncremental:
+    """
+    Janela deslizante das últimas `periodo` velas: soma, soma de quadrados, mínimo e máximo.
+
+    Guarda as `periodo - 1` velas confirmadas anteriores; a vela atual (provisória ou
+    fechando) completa a janela na hora do cálculo.
+    """
+
+    def __init__(self, periodo: int):
+        self.periodo = periodo
+        self._valores: deque = deque()
+        self._soma = 0.0
+        self._soma_quadrados = 0.0
+        self._fila_min: deque = deque()  # (indice, valor) crescentes
+        self._fila_max: deque = deque()  # (indice, valor) decrescentes
+        self._indice = 0
+
+    def _estatisticas(self, valor: float) -> Tuple[int, float, float, float, float]:
+        quantidade = len(self._valores) + 1
+        soma = self._soma + valor
+        soma_quadrados = self._soma_quadrados + valor * valor
+        minimo = min(self._fila_min[0][1], valor) if self._fila_min else valor
+        maximo = max(self._fila_max[0][1], valor) if self._fila_max else valor
+        return quantidade, soma, soma_quadrados, minimo, maximo
+
+    def _confirmar(self, valor: float) -> None:
+        anteriores = self.periodo - 1
+        if anteriores <= 0:
+            return
+
+        self._valores.append(valor)
+        self._soma += valor
+        self._soma_quadrados += valor * valor
+        while self._fila_min and self._fila_min[-1][1] >= valor:
+            self._fila_min.pop()
+        self._fila_min.append((self._indice, valor))
+        while self._fila_max and self._fila_max[-1][1] <= valor:
+            self._fila_max.pop()
+        self._fila_max.append((self._indice, valor))
+        self._indice += 1
+
+        if len(self._valores) > anteriores:
+            removido = self._valores.popleft()
+            self._soma -= removido
+            self._soma_quadrados -= removido * removido
+            limite = self._indice - anteriores
+            while self._fila_min and self._fila_min[0][0] < limite:
+                self._fila_min.popleft()
+            while self._fila_max and self._fila_max[0][0] < limite:
+                self._fila_max.popleft()
+
+        # Recalcula as somas de tempos em tempos para não acumular erro de ponto flutuante
+        if self._indice % (anteriores * 64) == 0:
+            self._soma = math.fsum(self._valores)
+            self._soma_quadrados = math.fsum(v * v for v in self._valores)
+
+    def atualizar(self, valor: float, fechada: bool = True) -> Tuple[int, float, float, float, float]:
+        """Retorna (quantidade, soma, soma_quadrados, minimo, maximo) da janela incluindo `valor`."""
+        estatisticas = self._estatisticas(valor)
+        if fechada:
+            self._confirmar(valor)
+        return estatisticas
+
+
+class SMAIncremental:
+    """Média simples equivalente a `rolling(window=periodo).mean()`."""
+
+    def __init__(self, periodo: int):
+        self.periodo = periodo
+        self._janela = JanelaIncremental(periodo)
+
+    def atualizar(self, valor: float, fechada: bool = True) -> float:
+        quantidade, soma, _, _, _ = self._janela.atualizar(valor, fechada)
+        return soma / self.periodo if quantidade >= self.periodo else NAN
+
+
+class MinMaxIncremental:
+    """Menor mínima e maior máxima das últimas `periodo` velas (`rolling(periodo).min()/max()`)."""
+
+    def __init__(self, periodo: int):
+        self.periodo = periodo
+        self._janela_minimas = JanelaIncremental(periodo)
+        self._janela_maximas = JanelaIncremental(periodo)
+
+    def atualizar(self, maxima: float, minima: float, fechada: bool = True) -> Tuple[float, float]:
+        quantidade, _, _, minimo, _ = self._janela_minimas.atualizar(minima, fechada)
+        _, _, _, _, maximo = self._janela_maximas.atualizar(maxima, fechada)
+        if quantidade < self.periodo:
+            return NAN, NAN
+        return minimo, maximo
+
+
+class BollingerIncremental:
+    """Bandas de Bollinger do pandas_ta (média simples, desvio padrão amostral com ddof=1)."""
+
+    def __init__(self, periodo: int, desvios: float = 2.0):
+        self.periodo = periodo
+        self.desvios = float(desvios)
+        self._janela = JanelaIncremental(periodo)
+
+    def atualizar(self, valor: float, fechada: bool = True) -> Tuple[float, float, float, float, float]:
+        """Retorna (inferior, media, superior, largura %, posição %B)."""
+        quantidade, soma, soma_quadrados, _, _ = self._janela.atualizar(valor, fechada)
+        if quantidade < self.periodo or self.periodo < 2:  # ddof=1: janela de 1 vela não tem desvio
+            return NAN, NAN, NAN, NAN, NAN
+
+        media = soma / self.periodo
+        desvio = math.sqrt(max((soma_quadrados - self.periodo * media * media) / (self.periodo - 1), 0.0))
+        inferior = media - self.desvios * desvio
+        superior = media + self.desvios * desvio
+        largura = 100 * (superior - inferior) / media if media else NAN
+        posicao = (valor - inferior) / (superior - inferior) if superior != inferior else NAN
+        return inferior, media, superior, largura, posicao
+
+
+class RSIIncremental:
+    """RSI do pandas_ta: RMA dos ganhos sobre RMA dos ganhos + |perdas|."""
+
+    def __init__(self, periodo: int = 14):
+        self.periodo = periodo
+        self._ganhos = RMAIncremental(periodo)
+        self._perdas = RMAIncremental(periodo)
+        self._fechamento_anterior: Optional[float] = None
+
+    def atualizar(self, fechamento: float, fechada: bool = True) -> float:
+        if self._fechamento_anterior is None:
+            if fechada:
+                self._fechamento_anterior = fechamento
+            return NAN
+
+        variacao = fechamento - self._fechamento_anterior
+        ganho = self._ganhos.atualizar(max(variacao, 0.0), fechada)
+        perda = self._perdas.atualizar(max(-variacao, 0.0), fechada)
+        if fechada:
+            self._fechamento_anterior = fechamento
+
+        if math.isnan(ganho) or ganho + perda == 0:
+            return NAN
+        return 100 * ganho / (ganho + perda)
+
+
+class ATRIncremental:
+    """ATR do pandas_ta (`ATRr_{periodo}`): RMA do true range, ignorando a primeira vela."""
+
+    def __init__(self, periodo: int = 14):
+        self.periodo = periodo
+        self._rma = RMAIncremental(periodo)
+        self._fechamento_anterior: Optional[float] = None
+
+    def atualizar(self, maxima: float, minima: float, fechamento: float, fechada: bool = True) -> float:
+        if self._fechamento_anterior is None:
+            if fechada:
+                self._fechamento_anterior = fechamento
+            return NAN
+
+        true_range = max(
+            maxima - minima,
+            abs(maxima - self._fechamento_anterior),
+            abs(self._fechamento_anterior - minima),
+        )
+        resultado = self._rma.atualizar(true_range, fechada)
+        if fechada:
+            self._fechamento_anterior = fechamento
+        return resultado
+
+
+class MotorIndicadores:
+    """
+    Conjunto de indicadores incrementais de um par (símbolo, tempo gráfico).
+
+    Aceita as mesmas opções de `prepare_market_data` para EMAs, média de volume,
+    RSI, ATR e Bollinger (mais menor mínima/maior máxima rolantes) e mantém o histórico dos
+    últimos `capacidade` valores por coluna, alinhado com o buffer de velas: o
+    último valor corresponde à vela em formação.
+    """
+
+    def __init__(
+        self,
+        emas_periods: Iterable[int] = (),
+        volume_sma_period: Optional[int] = None,
+        rsi_period: Optional[int] = None,
+        atr_period: Optional[int] = None,
+        bb_period: Optional[int] = None,
+        bb_stds: Iterable[float] = (1, 2, 3),
+        min_max_period: Optional[int] = None,
+        capacidade: int = 1000,
+    ):
+        self.capacidade = capacidade
+        self._emas = {f'EMA_{p}': EMAIncremental(p) for p in dict.fromkeys(emas_periods)}
+        self._volume_sma = SMAIncremental(volume_sma_period) if volume_sma_period else None
+        self._rsi = RSIIncremental(rsi_period) if rsi_period else None
+        self._atr = ATRIncremental(atr_period) if atr_period else None
+        self._bollinger = [BollingerIncremental(bb_period, std) for std in bb_stds] if bb_period else []
+        self._min_max = MinMaxIncremental(min_max_period) if min_max_period else None
+        self._colunas = self._nomes_colunas()
+        self.configuracao = dict(
+            emas_periods=tuple(ema.periodo for ema in self._emas.values()), volume_sma_period=volume_sma_period, rsi_period=rsi_period,
+            atr_period=atr_period, bb_period=bb_period, bb_stds=tuple(bb_stds), min_max_period=min_max_period,
+        )
+
+        self._historico: Dict[str, deque] = {coluna: deque(maxlen=capacidade) for coluna in self._colunas}
+        self._em_formacao: Optional[Tuple[int, Tuple[float, float, float, float]]] = None
+        self._provisorio: Dict[str, float] = {}
+        self._ultimo_tempo_confirmado: Optional[int] = None
+
+    def _nomes_colunas(self) -> List[str]:
+        colunas = list(self._emas)
+        if self._volume_sma:
+            colunas.append('volume_sma')
+        if self._rsi:
+            colunas.append(f'RSI_{self._rsi.periodo}')
+        if self._atr:
+            colunas.append(f'ATRr_{self._atr.periodo}')
+        for bandas in self._bollinger:
+            sufixo = f'{bandas.periodo}_{bandas.desvios}_{bandas.desvios}'
+            colunas += [f'{prefixo}_{sufixo}' for prefixo in ('BBL', 'BBM', 'BBU', 'BBB', 'BBP')]
+        if self._min_max:
+            colunas += [f'MIN_{self._min_max.periodo}', f'MAX_{self._min_max.periodo}']
+        return colunas
+
+    def colunas(self) -> List[str]:
+        return list(self._colunas)
+
+    def _calcular(self, maxima, minima, fechamento, volume, fechada) -> Dict[str, float]:
+        resultados: List[float] = [ema.atualizar(fechamento, fechada) for ema in self._emas.values()]
+        if self._volume_sma:
+            resultados.append(self._volume_sma.atualizar(volume, fechada))
+        if self._rsi:
+            resultados.append(self._rsi.atualizar(fechamento, fechada))
+        if self._atr:
+            resultados.append(self._atr.atualizar(maxima, minima, fechamento, fechada))
+        for bandas in self._bollinger:
+            resultados += bandas.atualizar(fechamento, fechada)
+        if self._min_max:
+            resultados += self._min_max.atualizar(maxima, minima, fechada)
+        return dict(zip(self._colunas, resultados))
+
+    def atualizar(self, tempo: int, maxima: float, minima: float, fechamento: float, volume: float,
+                  fechada: bool) -> Dict[str, float]:
+        """Avança os indicadores com uma atualização de vela (tick ou fechamento)."""
+        if self._ultimo_tempo_confirmado is not None and tempo <= self._ultimo_tempo_confirmado:
+            return self.valores()  # mensagem atrasada de uma vela já confirmada
+
+        # Vela anterior nunca recebeu `confirm` (ex.: mensagem perdida): confirma com o último tick
+        if self._em_formacao is not None and tempo > self._em_formacao[0]:
+            tempo_anterior, vela_anterior = self._em_formacao
+            self._em_formacao = None
+            self.atualizar(tempo_anterior, *vela_anterior, fechada=True)
+
+        valores = self._calcular(maxima, minima, fechamento, volume, fechada)
+        if fechada:
+            self._registrar(valores)
+            self._ultimo_tempo_confirmado = tempo
+            self._em_formacao = None
+        else:
+            self._em_formacao = (tempo, (maxima, minima, fechamento, volume))
+            self._provisorio = valores
+        return valores
+
+    def _registrar(self, valores: Dict[str, float]) -> None:
+        for coluna, valor in valores.items():
+            self._historico[coluna].append(valor)
+
+    def semear(self, velas: np.ndarray, ultima_em_formacao: bool = True) -> 'MotorIndicadores':
+        """Inicializa com o histórico (array estruturado de `utils.candle_store`)."""
+        confirmadas = velas[:-1] if ultima_em_formacao and len(velas) else velas
+        for vela in confirmadas:
+            self.atualizar(int(vela['tempo_abertura']), float(vela['maxima']), float(vela['minima']),
+                           float(vela['fechamento']), float(vela['volume']), True)
+        if ultima_em_formacao and len(velas):
+            vela = velas[-1]
+            self.atualizar(int(vela['tempo_abertura']), float(vela['maxima']), float(vela['minima']),
+                           float(vela['fechamento']), float(vela['volume']), False)
+        return self
+
+    def reiniciar(self, velas: np.ndarray) -> 'MotorIndicadores':
+        """Descarta o estado e semeia de novo (ex.: após backfill de uma reconexão)."""
+        self.__init__(capacidade=self.capacidade, **self.configuracao)
+        return self.semear(velas)
+
+    def valores(self) -> Dict[str, float]:
+        """Valores mais recentes (provisórios se houver vela em formação)."""
+        if self._em_formacao is not None:
+            return dict(self._provisorio)
+        return {coluna: historico[-1] for coluna, historico in self._historico.items() if historico}
+
+    def serie(self, coluna: str, quantidade: Optional[int] = None) -> np.ndarray:
+        """Últimos valores da coluna, alinhados com as velas do buffer (inclui a vela em formação)."""
+        historico = self._historico.get(coluna, ())
+        provisorio = [self._provisorio[coluna]] if self._em_formacao is not None else []
+        disponiveis = min(len(historico) + len(provisorio), self.capacidade)
+        quantidade = disponiveis if quantidade is None else min(quantidade, disponiveis)
+        # Só o final do histórico é copiado (uma leitura por tick pede poucas velas)
+        do_historico = max(quantidade - len(provisorio), 0)
+        valores = list(islice(reversed(historico), do_historico))[::-1] + provisorio
+        return np.asarray(valores[len(valores) - quantidade:], dtype=np.float64)
+
+    def aplicar(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Preenche as colunas dos indicadores nas últimas linhas de `df` sem recalcular nada."""
+        for coluna in self.colunas():
+            serie = self.serie(coluna, len(df))
+            df[coluna] = np.concatenate([np.full(len(df) - len(serie), NAN), serie])
+        return df
@@ -1,9 +1,10 @@
 import pandas as pd
-import pandas_ta as ta
+from indicadores import compilados
 from scipy.signal import find_peaks
 
 def calcula_rsi(df: pd.DataFrame, periodo=14):
-    return ta.rsi(df['fechamento'], length=periodo)
+    rsi = compilados.rsi(df['fechamento'], periodo)
+    return None if rsi is None else pd.Series(rsi, index=df.index, name=f'RSI_{periodo}')
 
 def encontra_topos_e_fundos(df: pd.DataFrame, dinstance: int=7, prominence: float=0.75) -> tuple:
     """Encontra topos e fundos em uma série temporal.
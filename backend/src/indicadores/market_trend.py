@@ -6,7 +6,7 @@ Autor: Sistema de Análise Profissional
 import pandas as pd
 import numpy as np
 from typing import Tuple, Dict
-import pandas_ta as ta
+from indicadores import compilados
 
 class MarketTrendAnalyzer:
     """
@@ -29,14 +29,14 @@ class MarketTrendAnalyzer:
             ADX 25-50: Tendência moderada
             ADX > 50: Tendência forte
         """
-        adx_result = ta.adx(df['maxima'], df['minima'], df['fechamento'], length=period)
+        adx_result = compilados.adx(df['maxima'], df['minima'], df['fechamento'], period, ultimos=1)
         
-        if adx_result is None or adx_result.empty:
+        if adx_result is None:
             return 0.0, "Não disponível"
         
-        adx_value = adx_result[f'ADX_{period}'].iloc[-1]
-        di_plus = adx_result[f'DMP_{period}'].iloc[-1]
-        di_minus = adx_result[f'DMN_{period}'].iloc[-1]
+        adx_value = adx_result.adx[-1]
+        di_plus = adx_result.dmp[-1]
+        di_minus = adx_result.dmn[-1]
         
         # Interpretação
         if adx_value < 25:
@@ -60,19 +60,20 @@ class MarketTrendAnalyzer:
             trend: 'ALTA' ou 'BAIXA'
             signal_strength: 0-10 (baseado em distância)
         """
-        supertrend_result = ta.supertrend(
+        supertrend_result = compilados.supertrend(
             df['maxima'], 
             df['minima'], 
             df['fechamento'], 
-            length=period, 
-            multiplier=multiplier
+            period, 
+            multiplier,
+            ultimos=1
         )
         
-        if supertrend_result is None or supertrend_result.empty:
+        if supertrend_result is None:
             return "Indefinido", 0.0, 0.0
         
-        st_value = supertrend_result[f'SUPERT_{period}_{multiplier}'].iloc[-1]
-        st_direction = supertrend_result[f'SUPERTd_{period}_{multiplier}'].iloc[-1]
+        st_value = supertrend_result.valor[-1]
+        st_direction = supertrend_result.direcao[-1]
         preco_atual = df['fechamento'].iloc[-1]
         
         trend = "ALTA" if st_direction == 1 else "BAIXA"
@@ -91,9 +92,10 @@ class MarketTrendAnalyzer:
         Returns:
             Dict com todos os componentes e interpretação
         """
-        ichimoku = ta.ichimoku(df['maxima'], df['minima'], df['fechamento'])
+        # Só as últimas 26 posições: a nuvem é lida 26 velas atrás
+        ichimoku = compilados.ichimoku(df['maxima'], df['minima'], df['fechamento'], ultimos=26)
         
-        if ichimoku is None or len(ichimoku) == 0:
+        if ichimoku is None:
             return {
                 'trend': 'Indefinido',
                 'cloud_color': 'Neutro',
@@ -102,10 +104,10 @@ class MarketTrendAnalyzer:
             }
         
         # Componentes do Ichimoku
-        tenkan = ichimoku[0]['ITS_9'].iloc[-1]  # Conversão
-        kijun = ichimoku[0]['IKS_26'].iloc[-1]  # Base
-        senkou_a = ichimoku[0]['ISA_9'].iloc[-26] if len(ichimoku[0]) > 26 else ichimoku[0]['ISA_9'].iloc[-1]  # Leading Span A
-        senkou_b = ichimoku[0]['ISB_26'].iloc[-26] if len(ichimoku[0]) > 26 else ichimoku[0]['ISB_26'].iloc[-1]  # Leading Span B
+        tenkan = ichimoku.tenkan[-1]  # Conversão
+        kijun = ichimoku.kijun[-1]  # Base
+        senkou_a = ichimoku.span_a[-26] if len(df) > 26 else ichimoku.span_a[-1]  # Leading Span A
+        senkou_b = ichimoku.span_b[-26] if len(df) > 26 else ichimoku.span_b[-1]  # Leading Span B
         
         preco_atual = df['fechamento'].iloc[-1]
         
@@ -152,18 +154,18 @@ class MarketTrendAnalyzer:
         Returns:
             (trend, sar_value, is_reversal)
         """
-        sar = ta.psar(df['maxima'], df['minima'], df['fechamento'])
+        sar = compilados.psar(df['maxima'], df['minima'], df['fechamento'], ultimos=2)
         
-        if sar is None or sar.empty:
+        if sar is None:
             return "Indefinido", 0.0, False
         
-        sar_long = sar['PSARl_0.02_0.2'].iloc[-1]
-        sar_short = sar['PSARs_0.02_0.2'].iloc[-1]
+        sar_long = sar.longo[-1]
+        sar_short = sar.curto[-1]
         preco_atual = df['fechamento'].iloc[-1]
         
         # Detectar reversão
-        sar_long_prev = sar['PSARl_0.02_0.2'].iloc[-2]
-        sar_short_prev = sar['PSARs_0.02_0.2'].iloc[-2]
+        sar_long_prev = sar.longo[-2]
+        sar_short_prev = sar.curto[-2]
         
         is_reversal = False
         if pd.notna(sar_long) and pd.isna(sar_long_prev):
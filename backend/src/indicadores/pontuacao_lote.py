@@ -0,0 +1,404 @@
+"""
+Pontuação em lote do AdvancedScoringSystem.
+
+Recebe um painel alinhado (símbolos x velas) e calcula os fatores de todos os
+analisadores (MarketTrend, Structure, Fibonacci, Wyckoff, Didi+Bollinger e RSI)
+para o universo inteiro de uma vez, devolvendo a tabela de scores ranqueada:
+
+- os indicadores recursivos (ADX, Supertrend, PSAR, RSI, média do volume) rodam
+  em um único kernel compilado, um símbolo por thread, com os mesmos kernels de
+  `compilados`/`didi` do caminho por símbolo;
+- os topos/fundos vêm do mesmo find_peaks de `StructureAnalyzer.find_swing_points`;
+- os fatores de janela (Ichimoku, Fibonacci, fase/spring/upthrust do Wyckoff,
+  SOS/SOW, Didi/Bollinger) são operações numpy sobre as colunas do painel.
+
+O score de cada símbolo é o mesmo de `AdvancedScoringSystem.analyze_complete`
+sobre as mesmas velas.
+"""
+
+from typing import Dict, List, NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+from numba import njit, prange
+from scipy.signal import find_peaks
+
+from indicadores.compilados import (
+    _alpha_direto, _ewm_nb, _movimento_direcional, _psar_nb, _rsi_nb, _semear_com_sma,
+    _supertrend_nb, _true_range_nb,
+)
+from indicadores.didi import _media_movel_nb, calcular_didi_lote
+
+# Mínimo de velas: span B do Ichimoku lido 26 velas atrás (52 + 25 + 26) com folga para o ADX
+MINIMO_VELAS = 110
+
+# Colunas da matriz de fatores recursivos
+(_ADX, _DMP, _DMN, _ST_DIRECAO, _ST_VALOR, _SAR_LONGO, _SAR_LONGO_ANT, _SAR_CURTO, _SAR_CURTO_ANT,
+ _RSI, _N_TOPOS, _N_FUNDOS, _TOPO_3, _TOPO_2, _TOPO_1, _FUNDO_3, _FUNDO_2, _FUNDO_1, _VOLUME_MEDIO) = range(19)
+_N_FATORES = 19
+
+FORCA_ESTRUTURA = {'HH_HL': 90, 'LH_LL': 90, 'HH_LL': 50, 'LH_HL': 30, 'MISTO': 20, 'INDEFINIDO': 0}
+NIVEIS_RETRACAO = np.array([0.000, 0.236, 0.382, 0.500, 0.618, 0.786, 1.000])
+NOMES_RETRACAO = ('0.0', '23.6', '38.2', '50.0', '61.8', '78.6', '100.0')
+
+
+class PainelVelas(NamedTuple):
+    simbolos: List[str]
+    abertura: np.ndarray   # (símbolos, velas), mesma vela de fechamento em cada coluna
+    maxima: np.ndarray
+    minima: np.ndarray
+    fechamento: np.ndarray
+    volume: np.ndarray
+    indice: Optional[pd.Index] = None          # timestamps das colunas
+    excluidos: Dict[str, str] = {}              # símbolo -> motivo de ter ficado fora do painel
+
+
+COLUNAS_OHLCV = ('abertura', 'maxima', 'minima', 'fechamento', 'volume')
+
+
+def montar_painel(velas: Dict[str, pd.DataFrame], velas_por_simbolo: Optional[int] = None) -> PainelVelas:
+    """
+    Empilha DataFrames de `busca_velas` (mesmo tempo gráfico) em um painel
+    alinhado pelo índice de tempo.
+
+    A última vela do painel é a mais comum entre os símbolos (velas buscadas
+    depois da virada do período são cortadas nela) e o tamanho é
+    `velas_por_simbolo` (padrão: a mediana dos históricos, no mínimo
+    MINIMO_VELAS). Cada símbolo entra com exatamente essas velas; quem não tem
+    histórico suficiente, está atrasado, tem buracos ou nan fica de fora, com o
+    motivo em `excluidos`, sem afetar os demais.
+    """
+    excluidos: Dict[str, str] = {}
+    validos: Dict[str, pd.DataFrame] = {}
+    for simbolo, df in velas.items():
+        if df is None or len(df) == 0:
+            excluidos[simbolo] = 'sem velas'
+        else:
+            validos[simbolo] = df
+
+    if not validos:
+        vazio = np.empty((0, 0))
+        return PainelVelas([], vazio, vazio, vazio, vazio, vazio, pd.Index([]), excluidos)
+
+    fim = pd.Series([df.index[-1] for df in validos.values()]).mode().iloc[0]
+    n = velas_por_simbolo or max(MINIMO_VELAS, int(np.median([len(df) for df in validos.values()])))
+
+    # Janela de cada símbolo terminando na vela de referência
+    janelas: Dict[str, pd.DataFrame] = {}
+    for simbolo, df in validos.items():
+        janela = df.loc[df.index <= fim].tail(n)
+        if len(janela) == 0 or janela.index[-1] != fim:
+            excluidos[simbolo] = 'velas desalinhadas'
+        elif len(janela) < n:
+            excluidos[simbolo] = f'histórico curto ({len(janela)} de {n} velas)'
+        elif janela[list(COLUNAS_OHLCV)].isna().to_numpy().any():
+            excluidos[simbolo] = 'velas com nan'
+        else:
+            janelas[simbolo] = janela
+
+    # Todos precisam das mesmas velas: vale a sequência de timestamps mais comum
+    indices = {simbolo: tuple(janela.index) for simbolo, janela in janelas.items()}
+    if indices:
+        referencia = pd.Series(list(indices.values())).mode().iloc[0]
+        for simbolo in [s for s, indice in indices.items() if indice != referencia]:
+            excluidos[simbolo] = 'velas desalinhadas'
+            del janelas[simbolo]
+
+    simbolos = list(janelas)
+    indice = janelas[simbolos[0]].index if simbolos else pd.Index([])
+    colunas = {}
+    for coluna in COLUNAS_OHLCV:
+        if simbolos:
+            colunas[coluna] = np.ascontiguousarray(
+                np.vstack([janelas[s][coluna].to_numpy(dtype=np.float64) for s in simbolos]))
+        else:
+            colunas[coluna] = np.empty((0, n))
+    return PainelVelas(simbolos, **colunas, indice=indice, excluidos=excluidos)
+
+
+@njit(cache=True, parallel=True)
+def _fatores_recursivos_nb(maxima, minima, fechamento, volume, alpha_14, alpha_10):
+    n_simbolos, n = fechamento.shape
+    fatores = np.full((n_simbolos, _N_FATORES), np.nan)
+    for s in prange(n_simbolos):
+        h = maxima[s]
+        lo = minima[s]
+        c = fechamento[s]
+
+        # ADX(14), como compilados.adx
+        atr_14 = _ewm_nb(_semear_com_sma(_true_range_nb(h, lo, c, True), 14), alpha_14, False, 0)
+        k = 100.0 / atr_14
+        positivo, negativo = _movimento_direcional(h, lo)
+        dmp = k * _ewm_nb(positivo, alpha_14, False, 0)
+        dmn = k * _ewm_nb(negativo, alpha_14, False, 0)
+        dx = 100.0 * np.abs(dmp - dmn) / (dmp + dmn)
+        fatores[s, _ADX] = _ewm_nb(dx, alpha_14, False, n - 1)[0]
+        fatores[s, _DMP] = dmp[n - 1]
+        fatores[s, _DMN] = dmn[n - 1]
+
+        # Supertrend(10, 3)
+        atr_10 = _ewm_nb(_semear_com_sma(_true_range_nb(h, lo, c, False), 10), alpha_10, False, 0)
+        valor, direcao, _, _ = _supertrend_nb(h, lo, c, atr_10, 3.0, 10)
+        fatores[s, _ST_DIRECAO] = direcao[n - 1]
+        fatores[s, _ST_VALOR] = valor[n - 1]
+
+        # PSAR(0.02, 0.2): lado ativo nas duas últimas velas
+        longo, curto, _, _ = _psar_nb(h, lo, c, 0.02, 0.2)
+        fatores[s, _SAR_LONGO] = longo[n - 1]
+        fatores[s, _SAR_LONGO_ANT] = longo[n - 2]
+        fatores[s, _SAR_CURTO] = curto[n - 1]
+        fatores[s, _SAR_CURTO_ANT] = curto[n - 2]
+
+        fatores[s, _RSI] = _rsi_nb(c, alpha_14, n - 1)[0]
+
+        media_volume = np.empty(n)
+        _media_movel_nb(volume[s], 20, media_volume)
+        fatores[s, _VOLUME_MEDIO] = media_volume[n - 1]
+    return fatores
+
+
+def _preencher_swings(painel: PainelVelas, fatores: np.ndarray) -> None:
+    # Topos/fundos como StructureAnalyzer.find_swing_points (find_peaks, distance=5+5):
+    # quantidade e os três últimos níveis
+    for s in range(len(painel.simbolos)):
+        h, lo = painel.maxima[s], painel.minima[s]
+        topos, _ = find_peaks(h, distance=10)
+        fundos, _ = find_peaks(-lo, distance=10)
+        fatores[s, _N_TOPOS] = len(topos)
+        fatores[s, _N_FUNDOS] = len(fundos)
+        for j in range(min(3, len(topos))):
+            fatores[s, _TOPO_1 - j] = h[topos[len(topos) - 1 - j]]
+        for j in range(min(3, len(fundos))):
+            fatores[s, _FUNDO_1 - j] = lo[fundos[len(fundos) - 1 - j]]
+
+
+def _pontuar_tendencia(painel: PainelVelas, fatores: np.ndarray) -> Dict[str, np.ndarray]:
+    adx = fatores[:, _ADX]
+    supertrend_alta = fatores[:, _ST_DIRECAO] == 1
+
+    # Ichimoku (9, 26, 52): só a cor da nuvem deslocada, lida 26 velas atrás, entra no voto
+    h, lo = painel.maxima, painel.minima
+
+    def ponto_medio(periodo, fim):
+        return 0.5 * (lo[:, fim - periodo:fim].min(axis=1) + h[:, fim - periodo:fim].max(axis=1))
+
+    n = h.shape[1]
+    origem = n - 26 - 25 + 1  # fim exclusivo da janela que origina span[-26]
+    span_a = 0.5 * (ponto_medio(9, origem) + ponto_medio(26, origem))
+    span_b = ponto_medio(52, origem)
+    nuvem_alta = span_a > span_b
+
+    sar_alta = ~np.isnan(fatores[:, _SAR_LONGO])
+
+    votos_alta = supertrend_alta.astype(int) + nuvem_alta + sar_alta
+    votos_baixa = 3 - votos_alta
+    tendencia = np.where(votos_alta > votos_baixa, 'ALTA', np.where(votos_baixa > votos_alta, 'BAIXA', 'LATERAL'))
+    confianca = np.where(votos_alta > votos_baixa, (votos_alta / 3) * 100,
+                         np.where(votos_baixa > votos_alta, (votos_baixa / 3) * 100, 50))
+    return {
+        'score': adx * 0.6 + confianca * 0.4,
+        'trend': tendencia,
+        'adx': adx,
+    }
+
+
+def _pontuar_estrutura(painel: PainelVelas, fatores: np.ndarray) -> Dict[str, np.ndarray]:
+    preco = painel.fechamento[:, -1]
+    n_topos, n_fundos = fatores[:, _N_TOPOS], fatores[:, _N_FUNDOS]
+    t3, t2, t1 = fatores[:, _TOPO_3], fatores[:, _TOPO_2], fatores[:, _TOPO_1]
+    f3, f2, f1 = fatores[:, _FUNDO_3], fatores[:, _FUNDO_2], fatores[:, _FUNDO_1]
+
+    # classify_structure: todos os pares consecutivos entre os (até) três últimos
+    tres_topos, tres_fundos = n_topos >= 3, n_fundos >= 3
+    topos_altos = (t1 > t2) & (~tres_topos | (t2 > t3))
+    topos_baixos = (t1 < t2) & (~tres_topos | (t2 < t3))
+    fundos_altos = (f1 > f2) & (~tres_fundos | (f2 > f3))
+    fundos_baixos = (f1 < f2) & (~tres_fundos | (f2 < f3))
+    suficiente = (n_topos >= 2) & (n_fundos >= 2)
+    tipo = np.select(
+        [~suficiente, topos_altos & fundos_altos, topos_baixos & fundos_baixos,
+         topos_altos & fundos_baixos, topos_baixos & fundos_altos],
+        ['INDEFINIDO', 'HH_HL', 'LH_LL', 'HH_LL', 'LH_HL'], 'MISTO')
+
+    bos = np.select([suficiente & (preco > t1), suficiente & (preco < f1)], ['ALTA', 'BAIXA'], '')
+    choch_baixista = tres_topos & tres_fundos & (t1 < t2) & (t2 > t3)
+    choch_altista = tres_topos & tres_fundos & ~choch_baixista & (f1 > f2) & (f2 < f3)
+    choch = np.select([choch_baixista, choch_altista], ['BAIXISTA', 'ALTISTA'], '')
+
+    forca = np.array([FORCA_ESTRUTURA[t] for t in tipo], dtype=float)
+    score = np.where(suficiente, np.minimum(forca + 10 * (bos != '') + 10 * (choch != ''), 100), 0)
+    return {'score': score, 'structure_type': tipo, 'bos': bos, 'choch': choch}
+
+
+def _pontuar_fibonacci(painel: PainelVelas, lookback: int = 50) -> Dict[str, np.ndarray]:
+    preco = painel.fechamento[:, -1]
+    maximas, minimas = painel.maxima[:, -lookback:], painel.minima[:, -lookback:]
+    indice_topo, indice_fundo = maximas.argmax(axis=1), minimas.argmin(axis=1)
+    topo = maximas[np.arange(len(preco)), indice_topo]
+    fundo = minimas[np.arange(len(preco)), indice_fundo]
+    alta = indice_topo > indice_fundo
+
+    diferenca = (topo - fundo)[:, None]
+    niveis = np.where(alta[:, None], topo[:, None] - (diferenca * NIVEIS_RETRACAO),
+                      fundo[:, None] + (diferenca * NIVEIS_RETRACAO))
+    distancia_pct = np.abs((preco[:, None] - niveis) / preco[:, None]) * 100
+
+    # 38.2 / 50 / 61.8: quanto mais perto, mais pontos
+    chave = distancia_pct[:, 2:5]
+    score = np.where(chave < 0.5, 30, np.where(chave < 1.0, 20, np.where(chave < 2.0, 10, 0))).sum(axis=1)
+
+    # Bônus do golden ratio: 61.8 é a retração mais próxima e está "tocando" (< 0.01%)
+    mais_proximo = np.abs(preco[:, None] - niveis).argmin(axis=1)
+    tocando = distancia_pct[np.arange(len(preco)), mais_proximo] < 0.01
+    score = np.minimum(score + 20 * ((mais_proximo == 4) & tocando), 100)
+    return {
+        'score': score,
+        'last_move': np.where(alta, 'ALTA', 'BAIXA'),
+        'nearest_retracement': np.array(NOMES_RETRACAO)[mais_proximo],
+    }
+
+
+def _pontuar_wyckoff(painel: PainelVelas, fatores: np.ndarray) -> Dict[str, np.ndarray]:
+    a, h, lo, c, v = painel.abertura, painel.maxima, painel.minima, painel.fechamento, painel.volume
+
+    # Fase (lookback 50)
+    faixa_media = (h[:, -50:] - lo[:, -50:]).mean(axis=1)
+    faixa_atual = h[:, -1] - lo[:, -1]
+    volume_medio_50 = v[:, -50:].mean(axis=1)
+    volume_recente = v[:, -10:].mean(axis=1)
+    variacao_pct = ((c[:, -1] - c[:, -50]) / c[:, -50]) * 100
+    lateral = (np.abs(variacao_pct) < 5) & (faixa_atual < faixa_media)
+    fase = np.select(
+        [lateral & (volume_recente >= volume_medio_50),
+         (variacao_pct > 5) & (volume_recente > volume_medio_50),
+         lateral & (volume_recente > volume_medio_50 * 1.5),
+         variacao_pct < -5],
+        ['ACCUMULATION', 'MARKUP', 'DISTRIBUTION', 'MARKDOWN'], 'ACCUMULATION')
+
+    # Clímax de volume: última vela acima de 2x a média móvel de 20
+    media_20 = fatores[:, _VOLUME_MEDIO]
+    climax = np.where(media_20 > 0, v[:, -1] / media_20, 1) > 2.0
+
+    # Spring/upthrust: quebra do extremo das últimas 20 velas nas 4 primeiras das 5 últimas
+    volume_medio_20 = v[:, -20:].mean(axis=1)[:, None]
+    suporte = lo[:, -20:].min(axis=1)[:, None]
+    resistencia = h[:, -20:].max(axis=1)[:, None]
+    atual, seguinte = slice(-5, -1), slice(-4, None)
+    spring = ((lo[:, atual] < suporte) & (v[:, atual] < volume_medio_20)
+              & (c[:, seguinte] > c[:, atual]) & (v[:, seguinte] > v[:, atual] * 1.5)).any(axis=1)
+    upthrust = ((h[:, atual] > resistencia) & (v[:, atual] > volume_medio_20 * 1.5)
+                & (c[:, seguinte] < c[:, atual])).any(axis=1)
+
+    # SOS/SOW na última vela
+    abertura, maxima, minima, fechamento = a[:, -1], h[:, -1], lo[:, -1], c[:, -1]
+    faixa = maxima - minima
+    com_faixa = faixa > 0
+    faixa_segura = np.where(com_faixa, faixa, 1.0)
+    volume_ratio = np.where(volume_medio_20[:, 0] > 0, v[:, -1] / volume_medio_20[:, 0], 1)
+
+    corpo_alta = fechamento - abertura
+    sos = (((corpo_alta / abertura) * 100 > 1.0)
+           & (np.where(com_faixa, corpo_alta / faixa_segura, 0) > 0.6)
+           & (volume_ratio > 1.2)
+           & com_faixa & ((maxima - fechamento) / faixa_segura < 0.2))
+    corpo_baixa = abertura - fechamento
+    sow = (((corpo_baixa / abertura) * 100 > 1.0)
+           & (np.where(com_faixa, corpo_baixa / faixa_segura, 0) > 0.6)
+           & (volume_ratio > 1.2)
+           & com_faixa & ((fechamento - minima) / faixa_segura < 0.2))
+
+    pontos_fase = np.select([fase == 'ACCUMULATION', fase == 'MARKUP', fase == 'DISTRIBUTION', fase == 'MARKDOWN'],
+                            [30, 20, -20, -10], 0)
+    score = pontos_fase + 40 * spring - 30 * upthrust + 20 * sos - 20 * sow + 10 * climax
+    return {
+        'score': np.clip(score, 0, 100),
+        'phase': fase,
+        'spring': spring,
+        'upthrust': upthrust,
+        'sos': sos,
+        'sow': sow,
+    }
+
+
+def _pontuar_didi_bollinger(painel: PainelVelas) -> Dict[str, np.ndarray]:
+    didis = calcular_didi_lote(painel.fechamento)
+    preco = painel.fechamento[:, -1]
+    spread = np.array([d.spread[-1] for d in didis]) * 100
+    inferior = np.array([d.banda_inferior[-1] for d in didis])
+    superior = np.array([d.banda_superior[-1] for d in didis])
+    posicao_bb = ((preco - inferior) / (superior - inferior)) * 100
+    score = (np.where(spread < 3, 30, np.where(spread < 5, 15, 0))
+             + np.where(posicao_bb < 20, 30, np.where(posicao_bb < 40, 15, 0)))
+    return {'score': np.minimum(score, 100), 'spread_didi': spread, 'posicao_bb': posicao_bb}
+
+
+def _pontuar_momentum(fatores: np.ndarray) -> Dict[str, np.ndarray]:
+    rsi = fatores[:, _RSI]
+    score = np.select([rsi < 25, rsi < 30, rsi < 40, rsi > 75, rsi > 70], [90, 70, 50, 10, 30], 50)
+    return {'score': score, 'rsi': rsi}
+
+
+COLUNAS_TABELA = [
+    'simbolo', 'score_final', 'market_trend', 'structure', 'fibonacci', 'wyckoff', 'didi_bollinger', 'momentum',
+    'trend', 'adx', 'structure_type', 'bos', 'choch', 'fib_nearest', 'phase', 'spring', 'upthrust', 'rsi',
+    'price_current',
+]
+
+
+def pontuar_painel(painel: PainelVelas, pesos) -> pd.DataFrame:
+    """
+    Scores de todos os símbolos do painel, do maior para o menor.
+
+    `pesos` é um `IndicatorWeights`. Colunas: score_final, os scores por
+    categoria e os fatores principais (tendência, estrutura, fase, RSI...).
+    """
+    if not painel.simbolos:
+        return pd.DataFrame(columns=COLUNAS_TABELA)
+    if painel.fechamento.shape[1] < MINIMO_VELAS:
+        raise ValueError(f"Painel com {painel.fechamento.shape[1]} velas; mínimo de {MINIMO_VELAS}")
+    if any(np.isnan(getattr(painel, coluna)).any() for coluna in COLUNAS_OHLCV):
+        raise ValueError("Painel com velas faltando (nan); alinhe os históricos antes de pontuar")
+
+    fatores = _fatores_recursivos_nb(painel.maxima, painel.minima, painel.fechamento, painel.volume,
+                                     _alpha_direto(1.0 / 14), _alpha_direto(1.0 / 10))
+    _preencher_swings(painel, fatores)
+    # np.where avalia os dois ramos: divisões por zero dos ramos descartados não são erro
+    with np.errstate(divide='ignore', invalid='ignore'):
+        tendencia = _pontuar_tendencia(painel, fatores)
+        estrutura = _pontuar_estrutura(painel, fatores)
+        fibonacci = _pontuar_fibonacci(painel)
+        wyckoff = _pontuar_wyckoff(painel, fatores)
+        didi_bollinger = _pontuar_didi_bollinger(painel)
+        momentum = _pontuar_momentum(fatores)
+
+    ponderado = (
+        tendencia['score'] * pesos.market_trend +
+        estrutura['score'] * pesos.structure +
+        fibonacci['score'] * pesos.fibonacci +
+        wyckoff['score'] * pesos.wyckoff +
+        didi_bollinger['score'] * pesos.didi_bollinger +
+        momentum['score'] * pesos.momentum
+    )
+
+    tabela = pd.DataFrame({
+        'simbolo': painel.simbolos,
+        'score_final': [round(float(x), 1) for x in ponderado],
+        'market_trend': tendencia['score'],
+        'structure': estrutura['score'],
+        'fibonacci': fibonacci['score'],
+        'wyckoff': wyckoff['score'],
+        'didi_bollinger': didi_bollinger['score'],
+        'momentum': momentum['score'],
+        'trend': tendencia['trend'],
+        'adx': tendencia['adx'],
+        'structure_type': estrutura['structure_type'],
+        'bos': estrutura['bos'],
+        'choch': estrutura['choch'],
+        'fib_nearest': fibonacci['nearest_retracement'],
+        'phase': wyckoff['phase'],
+        'spring': wyckoff['spring'],
+        'upthrust': wyckoff['upthrust'],
+        'rsi': momentum['rsi'],
+        'price_current': painel.fechamento[:, -1],
+    })
+    return tabela.sort_values('score_final', ascending=False, kind='stable').reset_index(drop=True)
@@ -7,6 +7,7 @@ import pandas as pd
 import numpy as np
 from typing import List, Tuple, Dict
 from scipy.signal import find_peaks
+from indicadores.swings import detectar_swings
 
 class StructureAnalyzer:
     """
@@ -18,7 +19,8 @@ class StructureAnalyzer:
     """
     
     @staticmethod
-    def find_swing_points(df: pd.DataFrame, left_bars: int = 5, right_bars: int = 5) -> Tuple[List[int], List[int]]:
+    def find_swing_points(df: pd.DataFrame, left_bars: int = 5, right_bars: int = 5,
+                          confirmados: bool = False) -> Tuple[List[int], List[int]]:
         """
         Identifica swing highs e swing lows
         
@@ -26,10 +28,18 @@ class StructureAnalyzer:
             df: DataFrame com dados OHLCV
             left_bars: Barras à esquerda para validação
             right_bars: Barras à direita para validação
+            confirmados: Usa pivôs confirmados por left_bars/right_bars (`detectar_swings`)
+                         em vez do find_peaks com distance=left_bars+right_bars. Muda os
+                         swings (e os scores do AdvancedScoringSystem), por isso é opcional
             
         Returns:
             (swing_highs_indices, swing_lows_indices)
         """
+        if confirmados:
+            # Topos e fundos confirmados por left_bars velas antes e right_bars depois, numa passada compilada
+            swings = detectar_swings(df['maxima'].values, df['minima'].values, esquerda=left_bars, direita=right_bars)
+            return swings.topos.tolist(), swings.fundos.tolist()
+        
         # Encontrar topos (swing highs)
         highs = df['maxima'].values
         swing_highs, _ = find_peaks(highs, distance=left_bars+right_bars)
@@ -200,8 +210,9 @@ class StructureAnalyzer:
             }
         
         # Preparar dados de swing points com valores
-        swing_highs = [(i, df['maxima'].iloc[i]) for i in swing_high_indices]
-        swing_lows = [(i, df['minima'].iloc[i]) for i in swing_low_indices]
+        maximas, minimas = df['maxima'].values, df['minima'].values
+        swing_highs = [(i, maximas[i]) for i in swing_high_indices]
+        swing_lows = [(i, minimas[i]) for i in swing_low_indices]
         
         # Classificar estrutura
         structure_type = cls.classify_structure(swing_highs, swing_lows)
@@ -0,0 +1,263 @@
+"""
+Motor de topos e fundos (swing points) compilado.
+
+Um pivô de topo na barra `p` é uma máxima estritamente maior que as `esquerda`
+barras anteriores e maior ou igual às `direita` barras seguintes (no empate fica
+a primeira barra do platô); o fundo é o espelho com as mínimas. Perto do início
+da série a janela da esquerda é truncada (a primeira barra nunca é pivô). O pivô
+só é confirmado no fechamento da barra `p + direita`, então tudo o que é
+"conhecido na barra c" (último topo, último fundo, tipo do último pivô) nunca
+olha para o futuro.
+
+- `detectar_swings`: uma passada sobre o histórico inteiro, devolve índices,
+  rótulos HH/LH (topos) e HL/LL (fundos) e os níveis do último topo/fundo por barra;
+- `DetectorSwings`: mesma regra barra a barra para o loop ao vivo, confirmando
+  novos pivôs à medida que as velas fecham sem reprocessar o histórico;
+- `refinar_extremos`: ajuste de ±2 barras em volta de picos já encontrados
+  (colunas top_high/top_close/bottom_low/bottom_close de `prepare_market_data`).
+"""
+
+from typing import List, NamedTuple, Optional
+
+import numpy as np
+from numba import njit
+
+# Tipos de pivô, mesma convenção de peak_type/last_peak_type
+TOPO = -1
+FUNDO = 1
+
+# Rótulos de estrutura
+SEM_ROTULO = 0
+HH = 1  # topo mais alto que o anterior
+LH = 2  # topo mais baixo (ou igual)
+HL = 3  # fundo mais alto (ou igual)
+LL = 4  # fundo mais baixo que o anterior
+NOMES_ROTULOS = ('', 'HH', 'LH', 'HL', 'LL')
+
+
+class Swings(NamedTuple):
+    topos: np.ndarray           # índices dos topos, em ordem
+    fundos: np.ndarray          # índices dos fundos, em ordem
+    rotulos_topos: np.ndarray   # HH/LH por topo (o primeiro fica SEM_ROTULO)
+    rotulos_fundos: np.ndarray  # HL/LL por fundo (o primeiro fica SEM_ROTULO)
+    tipo: np.ndarray            # por barra: TOPO/FUNDO na barra do pivô, 0 nas demais
+    ultimo_topo: np.ndarray     # por barra: nível do último topo confirmado até ela (nan antes do primeiro)
+    ultimo_fundo: np.ndarray    # por barra: nível do último fundo confirmado até ela
+    ultimo_tipo: np.ndarray     # por barra: TOPO/FUNDO do pivô confirmado mais recente, 0 antes do primeiro
+
+
+class SwingConfirmado(NamedTuple):
+    indice: int   # barra do pivô (contando desde a primeira vela recebida)
+    tipo: int     # TOPO ou FUNDO
+    nivel: float
+    rotulo: int
+
+
+@njit(cache=True)
+def _pivo(maximas, minimas, p, inicio, fim):
+    # Classifica a barra p dentro da janela [inicio, fim]: (é topo, é fundo)
+    topo = True
+    fundo = True
+    for j in range(inicio, fim + 1):
+        if j == p:
+            continue
+        if j < p:
+            if maximas[j] >= maximas[p]:
+                topo = False
+            if minimas[j] <= minimas[p]:
+                fundo = False
+        else:
+            if maximas[j] > maximas[p]:
+                topo = False
+            if minimas[j] < minimas[p]:
+                fundo = False
+        if not topo and not fundo:
+            break
+    return topo, fundo
+
+
+@njit(cache=True)
+def _rotulo(tipo, nivel, anterior):
+    if np.isnan(anterior):
+        return SEM_ROTULO
+    if tipo == TOPO:
+        return HH if nivel > anterior else LH
+    return LL if nivel < anterior else HL
+
+
+@njit(cache=True)
+def _swings_nb(maximas, minimas, esquerda, direita):
+    n = len(maximas)
+    tipo = np.zeros(n, dtype=np.int8)
+    ultimo_topo = np.full(n, np.nan)
+    ultimo_fundo = np.full(n, np.nan)
+    ultimo_tipo = np.zeros(n, dtype=np.int8)
+    topos = np.empty(n, dtype=np.int64)
+    fundos = np.empty(n, dtype=np.int64)
+    rotulos_topos = np.empty(n, dtype=np.int8)
+    rotulos_fundos = np.empty(n, dtype=np.int8)
+    n_topos = 0
+    n_fundos = 0
+    nivel_topo = np.nan
+    nivel_fundo = np.nan
+    tipo_atual = 0
+
+    for c in range(n):
+        p = c - direita
+        if p >= 1:
+            eh_topo, eh_fundo = _pivo(maximas, minimas, p, max(0, p - esquerda), c)
+            if eh_fundo:
+                rotulos_fundos[n_fundos] = _rotulo(FUNDO, minimas[p], nivel_fundo)
+                fundos[n_fundos] = p
+                n_fundos += 1
+                nivel_fundo = minimas[p]
+                tipo[p] = FUNDO
+                tipo_atual = FUNDO
+            if eh_topo:
+                rotulos_topos[n_topos] = _rotulo(TOPO, maximas[p], nivel_topo)
+                topos[n_topos] = p
+                n_topos += 1
+                nivel_topo = maximas[p]
+                tipo[p] = TOPO
+                tipo_atual = TOPO
+        ultimo_topo[c] = nivel_topo
+        ultimo_fundo[c] = nivel_fundo
+        ultimo_tipo[c] = tipo_atual
+
+    return (topos[:n_topos], fundos[:n_fundos], rotulos_topos[:n_topos], rotulos_fundos[:n_fundos],
+            tipo, ultimo_topo, ultimo_fundo, ultimo_tipo)
+
+
+def detectar_swings(maximas, minimas=None, esquerda: int = 5, direita: int = 5) -> Swings:
+    """
+    Topos e fundos de toda a série em uma passada.
+
+    Sem `minimas`, a mesma série é usada para topos e fundos (ex.: só fechamentos).
+    Uma barra de amplitude grande pode ser topo e fundo ao mesmo tempo; em `tipo`
+    e `ultimo_tipo` o topo prevalece, como no peak_type.
+    """
+    maximas = np.ascontiguousarray(maximas, dtype=np.float64)
+    minimas = maximas if minimas is None else np.ascontiguousarray(minimas, dtype=np.float64)
+    return Swings(*_swings_nb(maximas, minimas, int(esquerda), int(direita)))
+
+
+class DetectorSwings:
+    """
+    Versão incremental de `detectar_swings` para velas chegando uma a uma.
+
+    Guarda só as últimas `esquerda + direita + 1` velas e o último topo/fundo.
+    `atualizar(..., fechada=False)` não muda nada (pivô só se confirma com vela
+    fechada); com `fechada=True` devolve os pivôs confirmados por essa vela, os
+    mesmos que `detectar_swings` encontraria no histórico completo.
+    """
+
+    def __init__(self, esquerda: int = 5, direita: int = 5):
+        self.esquerda = esquerda
+        self.direita = direita
+        self._janela = esquerda + direita + 1
+        self._maximas = np.empty(self._janela)
+        self._minimas = np.empty(self._janela)
+        self._contagem = 0
+        self.ultimo_topo = float('nan')
+        self.ultimo_fundo = float('nan')
+        self.indice_ultimo_topo: Optional[int] = None
+        self.indice_ultimo_fundo: Optional[int] = None
+        self.ultimo_tipo = 0
+
+    def semear(self, maximas, minimas=None) -> 'DetectorSwings':
+        """Processa o histórico de uma vez (compilado) e deixa o detector pronto para continuar."""
+        maximas = np.ascontiguousarray(maximas, dtype=np.float64)
+        minimas = maximas if minimas is None else np.ascontiguousarray(minimas, dtype=np.float64)
+        swings = detectar_swings(maximas, minimas, self.esquerda, self.direita)
+        self.__init__(self.esquerda, self.direita)
+
+        n = len(maximas)
+        guardar = min(n, self._janela)
+        self._maximas[self._janela - guardar:] = maximas[n - guardar:]
+        self._minimas[self._janela - guardar:] = minimas[n - guardar:]
+        self._contagem = n
+        if len(swings.topos):
+            self.indice_ultimo_topo = int(swings.topos[-1])
+            self.ultimo_topo = float(maximas[self.indice_ultimo_topo])
+        if len(swings.fundos):
+            self.indice_ultimo_fundo = int(swings.fundos[-1])
+            self.ultimo_fundo = float(minimas[self.indice_ultimo_fundo])
+        if n:
+            self.ultimo_tipo = int(swings.ultimo_tipo[-1])
+        return self
+
+    def atualizar(self, maxima: float, minima: float = None, fechada: bool = True) -> List[SwingConfirmado]:
+        if not fechada:
+            return []
+        minima = maxima if minima is None else minima
+
+        self._maximas[:-1] = self._maximas[1:]
+        self._minimas[:-1] = self._minimas[1:]
+        self._maximas[-1] = maxima
+        self._minimas[-1] = minima
+        self._contagem += 1
+
+        c = self._contagem - 1
+        p = c - self.direita
+        if p < 1:
+            return []
+
+        # Posições dentro da janela: a vela c está na última
+        deslocamento = self._janela - 1 - c
+        inicio = max(0, p - self.esquerda) + deslocamento
+        eh_topo, eh_fundo = _pivo(self._maximas, self._minimas, p + deslocamento, inicio, self._janela - 1)
+
+        confirmados = []
+        if eh_fundo:
+            nivel = float(self._minimas[p + deslocamento])
+            confirmados.append(SwingConfirmado(p, FUNDO, nivel, int(_rotulo(FUNDO, nivel, self.ultimo_fundo))))
+            self.ultimo_fundo, self.indice_ultimo_fundo, self.ultimo_tipo = nivel, p, FUNDO
+        if eh_topo:
+            nivel = float(self._maximas[p + deslocamento])
+            confirmados.append(SwingConfirmado(p, TOPO, nivel, int(_rotulo(TOPO, nivel, self.ultimo_topo))))
+            self.ultimo_topo, self.indice_ultimo_topo, self.ultimo_tipo = nivel, p, TOPO
+        return confirmados
+
+
+@njit(cache=True)
+def _arg_extremo(valores, indices, maximo):
+    # np.argmax/np.argmin sobre valores[indices]: primeiro nan, senão primeira ocorrência do extremo
+    melhor = 0
+    for k in range(len(indices)):
+        v = valores[indices[k]]
+        if np.isnan(v):
+            return k
+        if (maximo and v > valores[indices[melhor]]) or (not maximo and v < valores[indices[melhor]]):
+            melhor = k
+    return melhor
+
+
+@njit(cache=True)
+def _refinar_extremos_nb(referencia, fechamento, picos, maximo):
+    n = len(referencia)
+    nivel = np.full(n, np.nan)
+    nivel_fechamento = np.full(n, np.nan)
+    vizinhos = np.empty(5, dtype=np.int64)
+    for idx in picos:
+        vizinhos[0] = idx - 2 if idx - 2 >= 0 else idx
+        vizinhos[1] = idx - 1 if idx - 1 >= 0 else idx
+        vizinhos[2] = idx
+        vizinhos[3] = idx + 1 if idx + 1 < n else idx
+        vizinhos[4] = idx + 2 if idx + 2 < n else idx
+        k = vizinhos[_arg_extremo(referencia, vizinhos, maximo)]
+        nivel[k] = referencia[k]
+        k = vizinhos[_arg_extremo(fechamento, vizinhos, maximo)]
+        nivel_fechamento[k] = fechamento[k]
+    return nivel, nivel_fechamento
+
+
+def refinar_extremos(referencia, fechamento, picos, maximo: bool):
+    """
+    Para cada pico, marca a barra de maior (ou menor) `referencia` e a de maior
+    (ou menor) `fechamento` entre 2 antes e 2 depois. Devolve as duas colunas
+    (nan fora das barras marcadas).
+    """
+    referencia = np.ascontiguousarray(referencia, dtype=np.float64)
+    fechamento = np.ascontiguousarray(fechamento, dtype=np.float64)
+    picos = np.ascontiguousarray(picos, dtype=np.int64)
+    return _refinar_extremos_nb(referencia, fechamento, picos, maximo)
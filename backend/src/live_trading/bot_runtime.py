@@ -0,0 +1,189 @@
+"""
+Runtime assíncrono para várias instâncias de estratégia em um único processo.
+
+Todos os bots rodam como tarefas de um único event loop asyncio, em uma thread
+dedicada. Cada tarefa dorme até o `MarketDataFeed` publicar uma kline do seu par
+(ou até `intervalo_maximo_segundos`, para agendas baseadas em relógio como o
+agente condutor); atualizações que chegam enquanto o bot processa são
+coalescidas em uma única nova passada.
+
+O trabalho bloqueante de cada passada (inicialização, leitura do buffer,
+processamento, encerramento) roda em um pool próprio do runtime, então 50+ bots
+ocupam apenas as threads desse pool enquanto de fato processam, em vez de uma
+thread dormindo por bot; nada bloqueante roda na thread do event loop. O pool de
+I/O do `ClienteBybitAsync` fica livre para as chamadas curtas (assinatura do
+feed, rotas de mercado da API): um bot lento esperando um agente não atrasa o
+I/O dos outros. As ordens e consultas de posição feitas dentro de `processar`
+continuam síncronas (`funcoes_bybit`, limitadas pelos token buckets) e ocupam a
+thread da passada no pool de estratégias, não o `ClienteBybitAsync`. Um erro em uma passada (ex.: falha da corretora) é
+logado e o bot tenta de novo na próxima, em vez de encerrar.
+
+Uma estratégia é qualquer objeto com `bot_id`, `cripto`, `tempo_grafico`,
+`logger` e os métodos `inicializar() -> bool`, `ler_velas(feed)`,
+`processar(df) -> bool` e `encerrar(por_sinal_de_parada)` — ver
+`BotEntryEvaluator`.
+"""
+
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Optional, Set, Tuple
+
+from corretoras.cliente_bybit_async import ClienteBybitAsync, get_cliente_bybit_async
+from corretoras.market_data_feed import MarketDataFeed, get_market_data_feed
+from utils.logging import get_logger, LogCategory
+
+ESPERA_SEM_DADOS_SEGUNDOS = 5.0
+MAX_WORKERS_ESTRATEGIAS = int(os.getenv('BOT_RUNTIME_MAX_WORKERS', '32'))
+
+Chave = Tuple[str, str]
+
+
+class BotRuntime:
+    """Event loop compartilhado em que cada bot é uma tarefa acordada por eventos de mercado."""
+
+    def __init__(self, feed: MarketDataFeed = None, cliente: ClienteBybitAsync = None,
+                 intervalo_maximo_segundos: float = 1.0, max_workers: int = MAX_WORKERS_ESTRATEGIAS):
+        self.feed = feed or get_market_data_feed()
+        self.cliente = cliente or get_cliente_bybit_async()
+        self.intervalo_maximo_segundos = intervalo_maximo_segundos
+        # Passadas das estratégias (podem bloquear em agentes por segundos) fora do pool de I/O
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="BotEstrategia")
+        self.logger = get_logger("BotRuntime")
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+        # Estruturas abaixo só são tocadas dentro do event loop
+        self._eventos: Dict[Chave, Set[asyncio.Event]] = {}
+        self._despertadores: Dict[str, asyncio.Event] = {}
+
+    # ------------------------------------------------------------------
+    # Ciclo de vida
+    # ------------------------------------------------------------------
+
+    def iniciar(self) -> None:
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(target=self._rodar_loop, daemon=True, name="BotRuntime")
+            self._thread.start()
+            self.feed.adicionar_ouvinte(self._ao_receber_vela)
+
+    def _rodar_loop(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+    @property
+    def quantidade_bots(self) -> int:
+        return len(self._despertadores)
+
+    # ------------------------------------------------------------------
+    # API pública (chamada de qualquer thread)
+    # ------------------------------------------------------------------
+
+    def adicionar(self, estrategia, stop_flag: threading.Event) -> Future:
+        """Agenda a estratégia como tarefa do runtime; o Future conclui quando o bot encerra."""
+        self.iniciar()
+        return asyncio.run_coroutine_threadsafe(self._executar(estrategia, stop_flag), self._loop)
+
+    def acordar(self, bot_id: str) -> None:
+        """Faz o bot reavaliar imediatamente (ex.: para enxergar o sinal de parada)."""
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._acordar_no_loop, bot_id)
+
+    # ------------------------------------------------------------------
+    # Internos (event loop)
+    # ------------------------------------------------------------------
+
+    def _ao_receber_vela(self, simbolo: str, intervalo: str, vela, fechada: bool) -> None:
+        # Chamado na thread do WebSocket
+        self._loop.call_soon_threadsafe(self._despertar_par, (simbolo, str(intervalo)))
+
+    def _despertar_par(self, chave: Chave) -> None:
+        for evento in self._eventos.get(chave, ()):
+            evento.set()
+
+    def _acordar_no_loop(self, bot_id: str) -> None:
+        evento = self._despertadores.get(bot_id)
+        if evento is not None:
+            evento.set()
+
+    async def _na_estrategia(self, funcao, *args, **kwargs):
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, functools.partial(funcao, *args, **kwargs))
+
+    async def _executar(self, estrategia, stop_flag: threading.Event) -> None:
+        chave = (estrategia.cripto, str(estrategia.tempo_grafico))
+        evento = asyncio.Event()
+        self._eventos.setdefault(chave, set()).add(evento)
+        self._despertadores[estrategia.bot_id] = evento
+        parada_pela_api = False
+
+        try:
+            if not await self._na_estrategia(estrategia.inicializar):
+                return
+            await self.cliente.executar(self.feed.assinar, *chave)
+
+            while True:
+                if stop_flag.is_set():
+                    parada_pela_api = True
+                    break
+
+                # Limpa antes de ler: o que chegar durante o processamento gera nova passada
+                evento.clear()
+                try:
+                    df = await self._na_estrategia(estrategia.ler_velas, self.feed)
+                    if df.empty:
+                        espera = ESPERA_SEM_DADOS_SEGUNDOS
+                    else:
+                        if not await self._na_estrategia(estrategia.processar, df):
+                            break
+                        espera = self.intervalo_maximo_segundos
+                except Exception as e:
+                    self.logger.error(
+                        LogCategory.EXECUTION_ERROR,
+                        f"❌ Erro na passada do bot (nova tentativa em {ESPERA_SEM_DADOS_SEGUNDOS:.0f}s)",
+                        "bot_runtime",
+                        exception=e,
+                        api_bot_id=estrategia.bot_id
+                    )
+                    espera = ESPERA_SEM_DADOS_SEGUNDOS
+
+                try:
+                    await asyncio.wait_for(evento.wait(), timeout=espera)
+                except asyncio.TimeoutError:
+                    pass
+
+            # Encerrar loga e fala com a corretora: fora da thread do event loop, como as passadas
+            await self._na_estrategia(estrategia.encerrar, por_sinal_de_parada=parada_pela_api)
+        except Exception as e:
+            self.logger.error(
+                LogCategory.EXECUTION_ERROR,
+                f"❌ Erro ao executar bot",
+                "bot_runtime",
+                exception=e,
+                api_bot_id=estrategia.bot_id
+            )
+        finally:
+            self._eventos.get(chave, set()).discard(evento)
+            self._despertadores.pop(estrategia.bot_id, None)
+
+
+# ============= Singleton =============
+
+_runtime_instance: Optional[BotRuntime] = None
+_runtime_lock = threading.Lock()
+
+
+def get_bot_runtime() -> BotRuntime:
+    """Retorna instância singleton do BotRuntime."""
+    global _runtime_instance
+    with _runtime_lock:
+        if _runtime_instance is None:
+            _runtime_instance = BotRuntime()
+        return _runtime_instance
@@ -156,7 +156,7 @@ def start_live_trading_bot(
 
                             logger.trading(LogCategory.POSITION_OPEN, "🟢 Nova posição LONG aberta", MODULE_NAME,
                                 symbol=cripto, tempo_abertura=df.index[-1], preco_entrada=preco_entrada,
-                                preco_stop=preco_stop, preco_alvo=preco_alvo, tamanho_posicao=qtd_cripto_para_operar,
+                                preco_stop=preco_stop, preco_alvo=preco_alvo, tamanho_posicao=qtd_cripto_para_operar, operation="compra",
                                 alavancagem=alavancagem, ema_rapida=ema_rapida, ema_lenta=ema_lenta,
                                 qtd_velas_stop=qtd_velas_stop, risco_retorno=risco_retorno)
                             estado_de_trade = EstadoDeTrade.COMPRADO
@@ -224,7 +224,7 @@ def start_live_trading_bot(
 
                             logger.trading(LogCategory.POSITION_OPEN, "🟢 Nova posição LONG aberta", MODULE_NAME,
                                 symbol=cripto, tempo_abertura=df.index[-1], preco_entrada=preco_entrada,
-                                preco_stop=preco_stop, preco_alvo=preco_alvo, tamanho_posicao=qtd_cripto_para_operar,
+                                preco_stop=preco_stop, preco_alvo=preco_alvo, tamanho_posicao=qtd_cripto_para_operar, operation="compra",
                                 alavancagem=alavancagem, ema_rapida_compra=ema_rapida_compra, ema_lenta_compra=ema_lenta_compra,
                                 qtd_velas_stop_compra=qtd_velas_stop_compra, risco_retorno_compra=risco_retorno_compra)
                             estado_de_trade = EstadoDeTrade.COMPRADO
@@ -245,7 +245,7 @@ def start_live_trading_bot(
 
                             logger.trading(LogCategory.POSITION_OPEN, "🔴 Nova posição SHORT aberta", MODULE_NAME,
                                 symbol=cripto, tempo_abertura=df.index[-1], preco_entrada=preco_entrada,
-                                preco_stop=preco_stop, preco_alvo=preco_alvo, tamanho_posicao=qtd_cripto_para_operar,
+                                preco_stop=preco_stop, preco_alvo=preco_alvo, tamanho_posicao=qtd_cripto_para_operar, operation="venda",
                                 alavancagem=alavancagem, ema_rapida_venda=ema_rapida_venda, ema_lenta_venda=ema_lenta_venda,
                                 qtd_velas_stop_venda=qtd_velas_stop_venda, risco_retorno_venda=risco_retorno_venda)
                             estado_de_trade = EstadoDeTrade.VENDIDO
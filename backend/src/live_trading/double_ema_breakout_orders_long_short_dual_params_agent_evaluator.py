@@ -8,6 +8,7 @@ from entidades.estado_trade import EstadoDeTrade
 from entidades.lado_operacao import LadoOperacao
 from entidades.risco_operacao import RiscoOperacao
 from corretoras.funcoes_bybit import busca_velas, tem_trade_aberto, saldo_da_conta, quantidade_minima_para_operar
+from corretoras.market_data_feed import get_market_data_feed
 # Import absoluto ao invés de relativo
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from live_trading.agent_execution_with_parser import executar_trade_conductor_se_necessario
@@ -270,6 +271,178 @@ def verificar_sinais_de_entrada(
     # Se nenhum trade foi aberto
     return EstadoDeTrade.DE_FORA, None, None, vela_executou_trade_entry_evaluator, 0, 0, 0, 0
 
+class BotEntryEvaluator:
+    """
+    Estado de uma instância da estratégia (um símbolo/subconta).
+
+    Cada chamada de `processar(df)` equivale a uma iteração do loop do bot, então a
+    mesma instância roda tanto no loop síncrono de `start_live_trading_bot` quanto
+    como tarefa do `BotRuntime` assíncrono.
+    """
+
+    def __init__(
+        self,
+        subconta = subconta,
+        cripto = cripto,
+        tempo_grafico = tempo_grafico,
+        lado_operacao = lado_operacao,
+        frequencia_agente_horas = frequencia_agente_horas,
+        executar_agente_no_start = executar_agente_no_start,
+        ema_rapida_compra = ema_rapida_compra,
+        ema_lenta_compra = ema_lenta_compra,
+        ema_rapida_venda = ema_rapida_venda,
+        ema_lenta_venda = ema_lenta_venda,
+        risco_por_operacao = risco_por_operacao,
+        bot_id = None,
+        is_simulator = False
+    ):
+        self.subconta = subconta
+        self.cripto = cripto
+        self.tempo_grafico = tempo_grafico
+        self.lado_operacao = lado_operacao
+        self.frequencia_agente_horas = frequencia_agente_horas
+        self.executar_agente_no_start = executar_agente_no_start
+        self.ema_rapida_compra = ema_rapida_compra
+        self.ema_lenta_compra = ema_lenta_compra
+        self.ema_rapida_venda = ema_rapida_venda
+        self.ema_lenta_venda = ema_lenta_venda
+        self.risco_por_operacao = risco_por_operacao
+        self.bot_id = bot_id or f"{datetime.now().timestamp():.0f}"
+        self.is_simulator = is_simulator
+
+        self.compras_habilitadas = lado_operacao in [LadoOperacao.AMBOS, LadoOperacao.APENAS_COMPRA]
+        self.vendas_habilitadas = lado_operacao in [LadoOperacao.AMBOS, LadoOperacao.APENAS_VENDA]
+        self.logger = get_logger(self.bot_id)
+
+        self.estado_de_trade = EstadoDeTrade.DE_FORA
+        self.preco_entrada, self.preco_stop, self.preco_alvo, self.tamanho_posicao, self.trailing_stop = 0, 0, 0, 0, 0
+        self.qtd_min_para_operar = 0
+        self.vela_abertura_trade = None
+        self.vela_fechou_trade = None
+        self.vela_executou_trade_entry_evaluator = None
+        self.ultima_execucao_trade_conductor = None
+
+    def inicializar(self) -> bool:
+        """Carrega a posição atual da corretora. Retorna False se o bot deve encerrar."""
+        logger = self.logger
+        cripto = self.cripto
+
+        logger.info(LogCategory.BOT_START, "🚀 Bot de trading iniciado com Entry Evaluator", MODULE_NAME,
+            subconta=self.subconta, symbol=cripto, tempo_grafico=self.tempo_grafico, lado_operacao=self.lado_operacao.value,
+            risco_por_operacao=self.risco_por_operacao.value, frequencia_agente_horas=self.frequencia_agente_horas,
+            executar_agente_no_start=self.executar_agente_no_start,
+            compras_habilitadas=self.compras_habilitadas, vendas_habilitadas=self.vendas_habilitadas,
+            ema_rapida_compra=self.ema_rapida_compra if self.compras_habilitadas else None,
+            ema_lenta_compra=self.ema_lenta_compra if self.compras_habilitadas else None,
+            ema_rapida_venda=self.ema_rapida_venda if self.vendas_habilitadas else None,
+            ema_lenta_venda=self.ema_lenta_venda if self.vendas_habilitadas else None,
+            is_simulator=self.is_simulator
+        )
+
+        for tentativa in range(5):
+            try:
+                if not self.is_simulator:
+                    (self.estado_de_trade, self.preco_entrada, self.preco_stop, self.preco_alvo,
+                     self.tamanho_posicao, self.trailing_stop) = tem_trade_aberto(cripto, self.subconta)
+                self.qtd_min_para_operar = quantidade_minima_para_operar(cripto, self.subconta)
+
+                estado_de_trade, preco_entrada, preco_stop, preco_alvo = self.estado_de_trade, self.preco_entrada, self.preco_stop, self.preco_alvo
+                if estado_de_trade in [EstadoDeTrade.COMPRADO, EstadoDeTrade.VENDIDO]:
+                    risco_retorno = None
+                    if estado_de_trade == EstadoDeTrade.COMPRADO and preco_stop < preco_entrada:
+                        risco_retorno = risco_retorno_compra(preco_entrada, preco_stop, preco_alvo)
+                    elif estado_de_trade == EstadoDeTrade.VENDIDO and preco_stop > preco_entrada:
+                        risco_retorno = risco_retorno_venda(preco_entrada, preco_stop, preco_alvo)
+
+                    emoji = "🟢" if estado_de_trade == EstadoDeTrade.COMPRADO else "🔴"
+                    logger.trading(LogCategory.POSITION_STATUS, f"{emoji} Posição {estado_de_trade.value} ativa", MODULE_NAME,
+                        symbol=cripto, estado_de_trade=estado_de_trade, preco_entrada=preco_entrada,
+                        preco_stop=preco_stop, preco_alvo=preco_alvo, tamanho_posicao=self.tamanho_posicao,
+                        trailing_stop=self.trailing_stop, risco_retorno=risco_retorno,
+                        stop_gain_ativo="Stop Gain ativado! Lucro garantido!" if (risco_retorno is None) else "Aguardando ajuste de stop")
+                else:
+                    logger.info(LogCategory.POSITION_STATUS, "🔵 Sem posição aberta", MODULE_NAME,
+                        symbol=cripto, estado_de_trade=estado_de_trade.value)
+                break
+            except Exception as e:
+                logger.error(LogCategory.TRADE_STATUS_ERROR, f"Erro ao buscar trade aberto", MODULE_NAME,
+                    symbol=cripto, tentativa=tentativa+1, erro_message=str(e), exception=e)
+                if tentativa < 4:
+                    time.sleep(2)
+                else:
+                    logger.critical(LogCategory.FATAL_ERROR, "Não foi possível buscar estado do trade. Encerrando.", MODULE_NAME)
+                    return False
+
+        if self.estado_de_trade in [EstadoDeTrade.COMPRADO, EstadoDeTrade.VENDIDO] and not self.executar_agente_no_start:
+            self.ultima_execucao_trade_conductor = datetime.now()
+            next_execution = self.ultima_execucao_trade_conductor + timedelta(hours=self.frequencia_agente_horas)
+            logger.info(LogCategory.AGENT_SCHEDULE, "Agente condutor não será executado no start", MODULE_NAME,
+                proxima_execucao=next_execution.strftime("%Y-%m-%d %H:%M:%S"))
+        else:
+            logger.info(LogCategory.TRADE_SEARCH, "🔍 Procurando oportunidades de trade", MODULE_NAME, symbol=cripto)
+
+        return True
+
+    def ler_velas(self, feed):
+        """Leitura local do buffer do feed (sem I/O de rede a cada iteração)."""
+        unique_emas = set([self.ema_rapida_compra, self.ema_lenta_compra, self.ema_rapida_venda, self.ema_lenta_venda])
+        df = feed.busca_velas(self.cripto, self.tempo_grafico, list(unique_emas))
+
+        if df.empty:
+            self.logger.warning(LogCategory.EMPTY_DATA, "DataFrame vazio", MODULE_NAME, symbol=self.cripto)
+            return df
+
+        # EMAs já vêm do motor incremental do feed (O(1) por mensagem, sem ewm sobre o buffer)
+        df['ema_rapida_compra'] = df[f'EMA_{self.ema_rapida_compra}']
+        df['ema_lenta_compra'] = df[f'EMA_{self.ema_lenta_compra}']
+        df['ema_rapida_venda'] = df[f'EMA_{self.ema_rapida_venda}']
+        df['ema_lenta_venda'] = df[f'EMA_{self.ema_lenta_venda}']
+        return df
+
+    def processar(self, df) -> bool:
+        """Uma iteração da estratégia sobre as velas atuais. Retorna False se o bot deve encerrar."""
+        logger = self.logger
+        cripto = self.cripto
+
+        try:
+            if self.estado_de_trade in [EstadoDeTrade.COMPRADO, EstadoDeTrade.VENDIDO]:
+                (self.estado_de_trade, self.vela_fechou_trade, self.ultima_execucao_trade_conductor,
+                 self.preco_entrada, self.preco_stop, self.preco_alvo, self.tamanho_posicao, self.trailing_stop) = gerenciar_trade_aberto(
+                    self.estado_de_trade, df, cripto, self.subconta, self.tempo_grafico,
+                    self.frequencia_agente_horas, self.ultima_execucao_trade_conductor,
+                    self.vela_abertura_trade, self.qtd_min_para_operar, logger, self.is_simulator,
+                    self.preco_entrada, self.preco_stop, self.preco_alvo, self.tamanho_posicao, self.trailing_stop
+                )
+                if self.vela_fechou_trade:
+                     logger.info(LogCategory.TRADE_SEARCH, "🔍 Procurando novas oportunidades de trade", MODULE_NAME, symbol=cripto)
+
+            elif self.estado_de_trade == EstadoDeTrade.DE_FORA and df.index[-1] != self.vela_fechou_trade:
+                (self.estado_de_trade, self.vela_abertura_trade, self.ultima_execucao_trade_conductor,
+                 self.vela_executou_trade_entry_evaluator, self.preco_entrada, self.preco_stop, self.preco_alvo, self.tamanho_posicao) = verificar_sinais_de_entrada(
+                    df, cripto, self.subconta, self.tempo_grafico, self.lado_operacao, self.risco_por_operacao,
+                    self.compras_habilitadas, self.vendas_habilitadas,
+                    self.ema_rapida_compra, self.ema_lenta_compra, self.ema_rapida_venda, self.ema_lenta_venda,
+                    self.vela_executou_trade_entry_evaluator, self.qtd_min_para_operar, self.frequencia_agente_horas, logger, self.is_simulator
+                 )
+
+        except ConnectionError as ce:
+            logger.error(LogCategory.CONNECTION_ERROR, f"Erro de conexão: {ce}", MODULE_NAME, exception=ce)
+        except ValueError as ve:
+            logger.error(LogCategory.VALUE_ERROR, f"Erro de valor: {ve}", MODULE_NAME, exception=ve)
+        except KeyboardInterrupt:
+            logger.info(LogCategory.SHUTDOWN, "Programa encerrado pelo usuário.", MODULE_NAME)
+            return False
+        except Exception as e:
+            logger.error(LogCategory.UNKNOWN_ERROR, f"Erro inesperado: {e}", MODULE_NAME, exception=e)
+
+        return True
+
+    def encerrar(self, por_sinal_de_parada: bool = False) -> None:
+        if por_sinal_de_parada:
+            self.logger.info(LogCategory.BOT_STOP, "🛑 Bot recebeu sinal de parada da API", MODULE_NAME, bot_id=self.bot_id)
+        self.logger.info(LogCategory.BOT_STOP, "Bot encerrado.", MODULE_NAME, bot_id=self.bot_id)
+
+
 def start_live_trading_bot(
     subconta = subconta,
     cripto = cripto,
@@ -286,125 +459,44 @@ def start_live_trading_bot(
     stop_flag = None,
     is_simulator = False
 ):
-    compras_habilitadas = lado_operacao in [LadoOperacao.AMBOS, LadoOperacao.APENAS_COMPRA]
-    vendas_habilitadas = lado_operacao in [LadoOperacao.AMBOS, LadoOperacao.APENAS_VENDA]
-
-    logger = get_logger(bot_id)
-
-    logger.info(LogCategory.BOT_START, "🚀 Bot de trading iniciado com Entry Evaluator", MODULE_NAME,
-        subconta=subconta, symbol=cripto, tempo_grafico=tempo_grafico, lado_operacao=lado_operacao.value,
-        risco_por_operacao=risco_por_operacao.value, frequencia_agente_horas=frequencia_agente_horas,
-        executar_agente_no_start=executar_agente_no_start,
-        compras_habilitadas=compras_habilitadas, vendas_habilitadas=vendas_habilitadas,
-        ema_rapida_compra=ema_rapida_compra if compras_habilitadas else None, 
-        ema_lenta_compra=ema_lenta_compra if compras_habilitadas else None,
-        ema_rapida_venda=ema_rapida_venda if vendas_habilitadas else None,
-        ema_lenta_venda=ema_lenta_venda if vendas_habilitadas else None,
-        is_simulator=is_simulator
+    """Executa um único bot em loop síncrono (uso via linha de comando); a API usa o `BotRuntime`."""
+    bot = BotEntryEvaluator(
+        subconta=subconta, cripto=cripto, tempo_grafico=tempo_grafico, lado_operacao=lado_operacao,
+        frequencia_agente_horas=frequencia_agente_horas, executar_agente_no_start=executar_agente_no_start,
+        ema_rapida_compra=ema_rapida_compra, ema_lenta_compra=ema_lenta_compra,
+        ema_rapida_venda=ema_rapida_venda, ema_lenta_venda=ema_lenta_venda,
+        risco_por_operacao=risco_por_operacao, bot_id=bot_id, is_simulator=is_simulator
     )
+    if not bot.inicializar():
+        return
 
-    estado_de_trade, preco_entrada, preco_stop, preco_alvo, tamanho_posicao, trailing_stop = EstadoDeTrade.DE_FORA, 0, 0, 0, 0, 0
-    qtd_min_para_operar = 0
-
-    for tentativa in range(5):
-        try:
-            if not is_simulator:
-                estado_de_trade, preco_entrada, preco_stop, preco_alvo, tamanho_posicao, trailing_stop = tem_trade_aberto(cripto, subconta)
-            qtd_min_para_operar = quantidade_minima_para_operar(cripto, subconta)
-            
-            if estado_de_trade in [EstadoDeTrade.COMPRADO, EstadoDeTrade.VENDIDO]:
-                risco_retorno = None
-                if estado_de_trade == EstadoDeTrade.COMPRADO and preco_stop < preco_entrada:
-                    risco_retorno = risco_retorno_compra(preco_entrada, preco_stop, preco_alvo)
-                elif estado_de_trade == EstadoDeTrade.VENDIDO and preco_stop > preco_entrada:
-                    risco_retorno = risco_retorno_venda(preco_entrada, preco_stop, preco_alvo)
-                
-                emoji = "🟢" if estado_de_trade == EstadoDeTrade.COMPRADO else "🔴"
-                logger.trading(LogCategory.POSITION_STATUS, f"{emoji} Posição {estado_de_trade.value} ativa", MODULE_NAME,
-                    symbol=cripto, estado_de_trade=estado_de_trade, preco_entrada=preco_entrada,
-                    preco_stop=preco_stop, preco_alvo=preco_alvo, tamanho_posicao=tamanho_posicao,
-                    trailing_stop=trailing_stop, risco_retorno=risco_retorno, 
-                    stop_gain_ativo="Stop Gain ativado! Lucro garantido!" if (risco_retorno is None) else "Aguardando ajuste de stop")
-            else:
-                logger.info(LogCategory.POSITION_STATUS, "🔵 Sem posição aberta", MODULE_NAME,
-                    symbol=cripto, estado_de_trade=estado_de_trade.value)
-            break
-        except Exception as e:
-            logger.error(LogCategory.TRADE_STATUS_ERROR, f"Erro ao buscar trade aberto", MODULE_NAME,
-                symbol=cripto, tentativa=tentativa+1, erro_message=str(e), exception=e)
-            if tentativa < 4:
-                time.sleep(2)
-            else:
-                logger.critical(LogCategory.FATAL_ERROR, "Não foi possível buscar estado do trade. Encerrando.", MODULE_NAME)
-                return
-
-    vela_abertura_trade = None
-    vela_fechou_trade = None
-    vela_executou_trade_entry_evaluator = None
-    ultima_execucao_trade_conductor = None
-
-    if estado_de_trade in [EstadoDeTrade.COMPRADO, EstadoDeTrade.VENDIDO] and not executar_agente_no_start:
-        ultima_execucao_trade_conductor = datetime.now()
-        next_execution = ultima_execucao_trade_conductor + timedelta(hours=frequencia_agente_horas)
-        logger.info(LogCategory.AGENT_SCHEDULE, "Agente condutor não será executado no start", MODULE_NAME,
-            proxima_execucao=next_execution.strftime("%Y-%m-%d %H:%M:%S"))
-    else:
-        logger.info(LogCategory.TRADE_SEARCH, "🔍 Procurando oportunidades de trade", MODULE_NAME, symbol=cripto)
+    # Velas chegam pelo WebSocket compartilhado; o loop só acorda quando o buffer do par muda
+    feed = get_market_data_feed()
+    feed.assinar(cripto, tempo_grafico)
+    versao_velas = 0
+    parada_pela_api = False
 
     while True:
         if stop_flag and stop_flag.is_set():
-            logger.info(LogCategory.BOT_STOP, "🛑 Bot recebeu sinal de parada da API", MODULE_NAME, bot_id=bot_id)
+            parada_pela_api = True
             break
-        
-        try:
-            # A busca de velas e cálculo de EMA foi movido para dentro do loop principal
-            # para garantir que os dados sejam sempre os mais recentes.
-            unique_emas = set([ema_rapida_compra, ema_lenta_compra, ema_rapida_venda, ema_lenta_venda])
-            df = busca_velas(cripto, tempo_grafico, list(unique_emas))
-
-            if df.empty:
-                logger.warning(LogCategory.EMPTY_DATA, "DataFrame vazio", MODULE_NAME, symbol=cripto)
-                time.sleep(5) # Espera um pouco mais se não houver dados
-                continue
-
-            df['ema_rapida_compra'] = df['fechamento'].ewm(span=ema_rapida_compra, adjust=False).mean()
-            df['ema_lenta_compra'] = df['fechamento'].ewm(span=ema_lenta_compra, adjust=False).mean()
-            df['ema_rapida_venda'] = df['fechamento'].ewm(span=ema_rapida_venda, adjust=False).mean()
-            df['ema_lenta_venda'] = df['fechamento'].ewm(span=ema_lenta_venda, adjust=False).mean()
-
-            if estado_de_trade in [EstadoDeTrade.COMPRADO, EstadoDeTrade.VENDIDO]:
-                (estado_de_trade, vela_fechou_trade, ultima_execucao_trade_conductor, 
-                 preco_entrada, preco_stop, preco_alvo, tamanho_posicao, trailing_stop) = gerenciar_trade_aberto(
-                    estado_de_trade, df, cripto, subconta, tempo_grafico,
-                    frequencia_agente_horas, ultima_execucao_trade_conductor,
-                    vela_abertura_trade, qtd_min_para_operar, logger, is_simulator,
-                    preco_entrada, preco_stop, preco_alvo, tamanho_posicao, trailing_stop
-                )
-                if vela_fechou_trade:
-                     logger.info(LogCategory.TRADE_SEARCH, "🔍 Procurando novas oportunidades de trade", MODULE_NAME, symbol=cripto)
 
-            elif estado_de_trade == EstadoDeTrade.DE_FORA and df.index[-1] != vela_fechou_trade:
-                (estado_de_trade, vela_abertura_trade, ultima_execucao_trade_conductor, 
-                 vela_executou_trade_entry_evaluator, preco_entrada, preco_stop, preco_alvo, tamanho_posicao) = verificar_sinais_de_entrada(
-                    df, cripto, subconta, tempo_grafico, lado_operacao, risco_por_operacao,
-                    compras_habilitadas, vendas_habilitadas,
-                    ema_rapida_compra, ema_lenta_compra, ema_rapida_venda, ema_lenta_venda,
-                    vela_executou_trade_entry_evaluator, qtd_min_para_operar, frequencia_agente_horas, logger, is_simulator
-                 )
-
-        except ConnectionError as ce:
-            logger.error(LogCategory.CONNECTION_ERROR, f"Erro de conexão: {ce}", MODULE_NAME, exception=ce)
-        except ValueError as ve:
-            logger.error(LogCategory.VALUE_ERROR, f"Erro de valor: {ve}", MODULE_NAME, exception=ve)
-        except KeyboardInterrupt:
-            logger.info(LogCategory.SHUTDOWN, "Programa encerrado pelo usuário.", MODULE_NAME)
-            break
+        try:
+            df = bot.ler_velas(feed)
         except Exception as e:
-            logger.error(LogCategory.UNKNOWN_ERROR, f"Erro inesperado: {e}", MODULE_NAME, exception=e)
+            bot.logger.error(LogCategory.UNKNOWN_ERROR, f"Erro ao ler velas: {e}", MODULE_NAME, exception=e)
+            time.sleep(5)
+            continue
+        if df.empty:
+            time.sleep(5) # Espera um pouco mais se não houver dados
+            continue
+
+        if not bot.processar(df):
+            break
 
-        time.sleep(0.25)
+        versao_velas = feed.aguardar_atualizacao(cripto, tempo_grafico, versao_velas, timeout=1.0)
 
-    logger.info(LogCategory.BOT_STOP, "Bot encerrado.", MODULE_NAME, bot_id=bot_id)
+    bot.encerrar(por_sinal_de_parada=parada_pela_api)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,127 @@
+"""
+Laço de backtest compilado para as estratégias procedurais de `strategies/`.
+
+Os scripts procedurais percorriam o DataFrame com `sub_df = df.iloc[:i]` e liam
+cada barra por `.iloc[-1]`/`.iloc[-2]`. Aqui o laço roda em Numba sobre uma
+matriz `dados` (uma linha por coluna do DataFrame, na ordem pedida) e cada
+estratégia só escreve a função de passo, também njit:
+
+    @njit
+    def passo(c, dados, estado, parametros) -> int
+
+- `c` é a barra atual (equivale ao `.iloc[-1]` do `sub_df`; `c - 1` ao `.iloc[-2]`);
+- `estado` é o vetor de estado do trade: `estado[ESTADO]` segue `EstadoDeTrade`
+  (DE_FORA, COMPRADO, VENDIDO) e é mantido pelo motor; a estratégia preenche
+  `PRECO_ENTRADA`/`PRECO_STOP`/`PRECO_ALVO` ao abrir e `PRECO_SAIDA` ao fechar.
+  Posições a partir de `LIVRE` ficam para uso da estratégia;
+- o retorno é a ação da barra: NADA, ABRIR_COMPRA, ABRIR_VENDA,
+  FECHAR_COM_GANHO ou FECHAR_COM_PERDA (mesma distinção de
+  `update_on_gain`/`update_on_loss`).
+
+O resultado é um array estruturado `DTYPE_TRADE`, um registro por trade (o
+último pode estar aberto, com `barra_saida = -1`), consumido por
+`ResultsManager.registrar_trades`.
+"""
+
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+from numba import njit
+
+# Ações devolvidas pela função de passo
+NADA = 0
+ABRIR_COMPRA = 1
+ABRIR_VENDA = 2
+FECHAR_COM_GANHO = 3
+FECHAR_COM_PERDA = 4
+
+# Valores de estado[ESTADO], na ordem de EstadoDeTrade
+DE_FORA = 0
+COMPRADO = 1
+VENDIDO = -1
+
+# Posições do vetor de estado
+ESTADO, PRECO_ENTRADA, PRECO_STOP, PRECO_ALVO, PRECO_SAIDA, BARRA_ENTRADA = 0, 1, 2, 3, 4, 5
+LIVRE = 6
+TAMANHO_ESTADO = 16
+
+# resultado de cada registro
+RESULTADO_GANHO = 1
+RESULTADO_PERDA = -1
+RESULTADO_EM_ABERTO = 0
+
+DTYPE_TRADE = np.dtype([
+    ('barra_entrada', np.int64),
+    ('barra_saida', np.int64),
+    ('lado', np.int8),            # COMPRADO ou VENDIDO
+    ('preco_entrada', np.float64),
+    ('preco_saida', np.float64),
+    ('resultado', np.int8),       # RESULTADO_GANHO, RESULTADO_PERDA ou RESULTADO_EM_ABERTO
+    ('percentual', np.float64),   # valor passado a update_on_gain/update_on_loss
+])
+
+
+@njit(cache=True)
+def _percentual(lado, resultado, preco_entrada, preco_saida):
+    # Mesmas contas de utils.utilidades.calcula_percentual_*
+    if lado == COMPRADO:
+        if resultado == RESULTADO_GANHO:
+            return ((preco_saida - preco_entrada) / preco_entrada) * 100
+        return ((preco_entrada - preco_saida) / preco_entrada) * 100
+    if resultado == RESULTADO_GANHO:
+        return ((preco_entrada - preco_saida) / preco_entrada) * 100
+    return ((preco_saida - preco_entrada) / preco_entrada) * 100
+
+
+@njit
+def executar_backtest_nb(dados, passo, parametros, inicio, fim):
+    estado = np.zeros(TAMANHO_ESTADO)
+    trades = np.empty(max(fim - inicio, 0) // 2 + 1, dtype=DTYPE_TRADE)
+    k = 0
+
+    for c in range(inicio, fim):
+        acao = passo(c, dados, estado, parametros)
+        posicionado = estado[ESTADO] != DE_FORA
+        if (acao == ABRIR_COMPRA or acao == ABRIR_VENDA) and not posicionado:
+            estado[ESTADO] = COMPRADO if acao == ABRIR_COMPRA else VENDIDO
+            estado[BARRA_ENTRADA] = c
+        elif (acao == FECHAR_COM_GANHO or acao == FECHAR_COM_PERDA) and posicionado:
+            lado = int(estado[ESTADO])
+            resultado = RESULTADO_GANHO if acao == FECHAR_COM_GANHO else RESULTADO_PERDA
+            trades[k].barra_entrada = int(estado[BARRA_ENTRADA])
+            trades[k].barra_saida = c
+            trades[k].lado = lado
+            trades[k].preco_entrada = estado[PRECO_ENTRADA]
+            trades[k].preco_saida = estado[PRECO_SAIDA]
+            trades[k].resultado = resultado
+            trades[k].percentual = _percentual(lado, resultado, estado[PRECO_ENTRADA], estado[PRECO_SAIDA])
+            k += 1
+            estado[ESTADO] = DE_FORA
+
+    if estado[ESTADO] != DE_FORA:
+        trades[k].barra_entrada = int(estado[BARRA_ENTRADA])
+        trades[k].barra_saida = -1
+        trades[k].lado = int(estado[ESTADO])
+        trades[k].preco_entrada = estado[PRECO_ENTRADA]
+        trades[k].preco_saida = np.nan
+        trades[k].resultado = RESULTADO_EM_ABERTO
+        trades[k].percentual = np.nan
+        k += 1
+
+    return trades[:k]
+
+
+def executar_backtest(df: pd.DataFrame, colunas: Sequence[str], passo, parametros=(),
+                      inicio: int = 1, fim: int = None) -> np.ndarray:
+    """
+    Roda `passo` sobre as barras `inicio..fim-1` de `df`.
+
+    `colunas` define a ordem das linhas de `dados` dentro da função de passo.
+    Para reproduzir o laço `for i in range(pular_velas, len(df)): sub_df = df.iloc[:i]`
+    use `inicio=pular_velas - 1` e `fim=len(df) - 1`.
+    """
+    fim = len(df) if fim is None else fim
+    dados = np.ascontiguousarray(np.vstack([df[coluna].to_numpy(dtype=np.float64) for coluna in colunas]))
+    parametros = np.asarray(parametros, dtype=np.float64)
+    return executar_backtest_nb(dados, passo, parametros, int(inicio), int(fim))
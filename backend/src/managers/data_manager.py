@@ -1,12 +1,193 @@
 import pandas as pd
 import numpy as np
 from scipy.signal import find_peaks
-import pandas_ta as ta
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
 
 import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from corretoras.funcoes_bybit import busca_velas
+from vectorbt_project.indicator_cache import dataset_fingerprint
+from indicadores.swings import refinar_extremos
+from indicadores import compilados
+
+# ----------------------------------------------------------------------
+# Pipeline declarativo de features
+#
+# O chamador pede um conjunto de `Feature`s; `plan_features` resolve os nós
+# intermediários de que cada uma depende, sem repetição (um único MACD alimenta
+# linha/sinal/histograma, uma média e um desvio rolantes alimentam todas as
+# larguras de Bollinger, um único find_peaks alimenta peak_type e peaks), e
+# `compute_features` calcula cada nó uma vez. Os nós ficam memoizados por versão
+# das velas (impressão digital do índice + OHLCV), então o mesmo DataFrame de
+# W/D/1h pedido de novo por outro sinal ou pelo contexto do agente não é recalculado.
+# ----------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class Feature:
+    kind: str  # ema, volume_sma, rsi, stoch, macd, atr, adx, bbands, peak_type, peaks
+    params: tuple = ()
+
+
+def _node_ema(df, periodo):
+    return df['fechamento'].ewm(span=periodo, adjust=False).mean()
+
+def _node_sma(df, coluna, periodo):
+    return df[coluna].rolling(window=periodo).mean()
+
+def _node_std(df, coluna, periodo, ddof):
+    return df[coluna].rolling(window=periodo).std(ddof=ddof)
+
+def _node_rsi(df, periodo):
+    return pd.Series(compilados.rsi(df['fechamento'], periodo), index=df.index, name=f'RSI_{periodo}')
+
+def _node_stoch(df, k, d, smooth_k):
+    stoch = compilados.estocastico(df['maxima'], df['minima'], df['fechamento'], k, d, smooth_k)
+    sufixo = f'{k}_{d}_{smooth_k}'
+    return pd.DataFrame({f'STOCHk_{sufixo}': stoch.k, f'STOCHd_{sufixo}': stoch.d, f'STOCHh_{sufixo}': stoch.h}, index=df.index)
+
+def _node_macd(df, fast, slow, signal):
+    macd = compilados.macd(df['fechamento'], fast, slow, signal)
+    sufixo = f'{fast}_{slow}_{signal}'
+    return pd.DataFrame({f'MACD_{sufixo}': macd.macd, f'MACDh_{sufixo}': macd.histograma, f'MACDs_{sufixo}': macd.sinal}, index=df.index)
+
+def _node_atr(df, periodo):
+    return pd.Series(compilados.atr(df['maxima'], df['minima'], df['fechamento'], periodo), index=df.index, name=f'ATRr_{periodo}')
+
+def _node_adx(df, periodo):
+    adx = compilados.adx(df['maxima'], df['minima'], df['fechamento'], periodo)
+    return pd.DataFrame({f'ADX_{periodo}': adx.adx, f'ADXR_{periodo}_2': adx.adxr, f'DMP_{periodo}': adx.dmp, f'DMN_{periodo}': adx.dmn}, index=df.index)
+
+def _node_peaks(df, distancia):
+    try:
+        fundos, _ = find_peaks(-df['fechamento'], distance=distancia)
+        topos, _ = find_peaks(df['fechamento'], distance=distancia)
+    except:
+        fundos = np.array([])
+        topos = np.array([])
+    return fundos, topos
+
+_NODES = {
+    'ema': _node_ema, 'sma': _node_sma, 'std': _node_std, 'rsi': _node_rsi, 'stoch': _node_stoch,
+    'macd': _node_macd, 'atr': _node_atr, 'adx': _node_adx, 'peaks': _node_peaks,
+}
+
+
+def _dependencies(feature: Feature) -> list[tuple]:
+    """Nós intermediários de que a feature precisa, como (nome do nó, *parâmetros)."""
+    kind, params = feature.kind, feature.params
+    if kind == 'volume_sma':
+        return [('sma', 'volume', *params)]
+    if kind == 'bbands':
+        periodo, _ = params
+        # Média e desvio amostral (ddof=1, padrão do ta.bbands sem TA-Lib) são os mesmos para qualquer largura
+        return [('sma', 'fechamento', periodo), ('std', 'fechamento', periodo, 1)]
+    if kind in ('peak_type', 'peaks'):
+        return [('peaks', *params)]
+    return [(kind, *params)]
+
+
+def plan_features(features) -> list[tuple]:
+    """Nós a calcular para `features`, sem repetição e na ordem em que são pedidos."""
+    return list(dict.fromkeys(node for feature in dict.fromkeys(features) for node in _dependencies(feature)))
+
+
+# Nós já calculados por versão das velas: (impressão, nó) -> resultado
+_node_cache: 'OrderedDict[tuple, object]' = OrderedDict()
+_node_cache_lock = threading.Lock()
+_NODE_CACHE_MAX = 512
+
+
+def _compute_nodes(df: pd.DataFrame, nodes: list[tuple]) -> dict:
+    versao = dataset_fingerprint(df)
+    resultados = {}
+    for node in nodes:
+        chave = (versao, node)
+        with _node_cache_lock:
+            valor = _node_cache.get(chave)
+            if valor is not None:
+                _node_cache.move_to_end(chave)
+        if valor is None:
+            valor = _NODES[node[0]](df, *node[1:])
+            with _node_cache_lock:
+                _node_cache[chave] = valor
+                while len(_node_cache) > _NODE_CACHE_MAX:
+                    _node_cache.popitem(last=False)
+        resultados[node] = valor
+    return resultados
+
+
+def _join_columns(df: pd.DataFrame, valores) -> None:
+    if isinstance(valores, pd.Series):
+        df[valores.name] = valores
+    else:
+        for coluna in valores.columns:
+            df[coluna] = valores[coluna]
+
+
+def _apply_peaks(df: pd.DataFrame, fundos, topos) -> None:
+    # Para cada topo/fundo, marca a barra de maior máxima/menor mínima (e de fechamento extremo) entre 2 antes e 2 depois
+    df['peaks'] = 0
+    df['top_high'], df['top_close'] = refinar_extremos(df['maxima'], df['fechamento'], topos, maximo=True)
+    df['bottom_low'], df['bottom_close'] = refinar_extremos(df['minima'], df['fechamento'], fundos, maximo=False)
+
+
+def compute_features(df: pd.DataFrame, features) -> pd.DataFrame:
+    """Acrescenta ao `df` as colunas das `features`, calculando cada nó intermediário uma única vez."""
+    features = list(dict.fromkeys(features))
+    nos = _compute_nodes(df, plan_features(features))
+
+    for feature in features:
+        kind, params = feature.kind, feature.params
+        dependencias = [nos[node] for node in _dependencies(feature)]
+
+        if kind == 'ema':
+            df[f'EMA_{params[0]}'] = dependencias[0].round(4)
+        elif kind == 'volume_sma':
+            df['volume_sma'] = dependencias[0].round(4)
+        elif kind == 'rsi':
+            _join_columns(df, dependencias[0].round(2))
+        elif kind == 'stoch':
+            _join_columns(df, dependencias[0].round(2))
+        elif kind == 'macd':
+            macd, sufixo = dependencias[0], '_'.join(str(p) for p in params)
+            df['MACD'] = macd[f'MACD_{sufixo}'].round(4)
+            df['MACD_signal'] = macd[f'MACDs_{sufixo}'].round(4)
+            df['MACD_hist'] = macd[f'MACDh_{sufixo}'].round(4)
+        elif kind == 'atr':
+            _join_columns(df, dependencias[0].round(4))
+        elif kind == 'adx':
+            _join_columns(df, dependencias[0])
+        elif kind == 'bbands':
+            periodo, desvios = params
+            media, desvio = dependencias
+            inferior = media - desvios * desvio
+            superior = media + desvios * desvio
+            largura = superior - inferior
+            # nomes do ta.bbands(lower_std=desvios, upper_std=desvios) do pandas_ta 0.4.71b0
+            sufixo = f'{periodo}_{float(desvios)}_{float(desvios)}'
+            df[f'BBL_{sufixo}'] = inferior
+            df[f'BBM_{sufixo}'] = media
+            df[f'BBU_{sufixo}'] = superior
+            df[f'BBB_{sufixo}'] = 100 * largura / media
+            df[f'BBP_{sufixo}'] = (df['fechamento'] - inferior) / largura
+        elif kind == 'peak_type':
+            fundos, topos = dependencias[0]
+            peak_type = np.zeros(len(df), dtype=int)
+            if len(fundos) > 0:
+                peak_type[fundos] = 1
+            if len(topos) > 0:
+                peak_type[topos] = -1
+            df['peak_type'] = peak_type
+        elif kind == 'peaks':
+            _apply_peaks(df, *dependencias[0])
+        else:
+            raise ValueError(f"Feature desconhecida: {kind}")
+
+    return df
+
 
 def prepare_market_data(
         df: pd.DataFrame,
@@ -30,100 +211,30 @@ def prepare_market_data(
         use_peaks: bool = False,
         peaks_distance: int = 21,
     ) -> pd.DataFrame:
+    features = []
     if use_emas:
-        for ema in emas_periods:
-            df[f'EMA_{ema}'] = df['fechamento'].ewm(span=ema, adjust=False).mean().round(4)
-
+        features += [Feature('ema', (ema,)) for ema in emas_periods]
     if use_volume_sma:
-        df['volume_sma'] = df['volume'].rolling(window=volume_sma_period).mean().round(4)
-
+        features.append(Feature('volume_sma', (volume_sma_period,)))
     if use_rsi:
-        rsi = ta.rsi(close=df['fechamento'], length=rsi_period).round(2)
-        df = df.join(rsi)
-
+        features.append(Feature('rsi', (rsi_period,)))
     if use_stoch:
-        stoch = ta.stoch(high=df['maxima'], low=df['minima'], close=df['fechamento'], k=stoch_config[0], d=stoch_config[1], smooth_k=stoch_config[2]).round(2)
-        df = df.join(stoch)
-
+        features.append(Feature('stoch', tuple(stoch_config)))
     if use_macd:
-        df['MACD'] = ta.macd(close=df['fechamento'], fast=macd_config[0], slow=macd_config[1], signal=macd_config[2])[f'MACD_{macd_config[0]}_{macd_config[1]}_{macd_config[2]}'].round(4)
-        df['MACD_signal'] = ta.macd(close=df['fechamento'], fast=macd_config[0], slow=macd_config[1], signal=macd_config[2])[f'MACDs_{macd_config[0]}_{macd_config[1]}_{macd_config[2]}'].round(4)
-        df['MACD_hist'] = ta.macd(close=df['fechamento'], fast=macd_config[0], slow=macd_config[1], signal=macd_config[2])[f'MACDh_{macd_config[0]}_{macd_config[1]}_{macd_config[2]}'].round(4)
-
-    if use_atr: 
-        atr = ta.atr(high=df['maxima'], low=df['minima'], close=df['fechamento'], length=atr_period).round(4)
-        df = df.join(atr)
-
+        features.append(Feature('macd', tuple(macd_config)))
+    if use_atr:
+        features.append(Feature('atr', (atr_period,)))
     if use_adx:
-        adx = ta.adx(high=df['maxima'], low=df['minima'], close=df['fechamento'], length=adx_period)
-        df = df.join(adx)
-
+        features.append(Feature('adx', (adx_period,)))
     if use_bb:
-        bbands = ta.bbands(close=df['fechamento'], length=bb_period, std=1)
-        df = df.join(bbands)
-        
-        bbands_2std = ta.bbands(close=df['fechamento'], length=bb_period, std=2)
-        df = df.join(bbands_2std)
-
-        bbands_3std = ta.bbands(close=df['fechamento'], length=bb_period, std=3)
-        df = df.join(bbands_3std)
-
+        features += [Feature('bbands', (bb_period, desvios)) for desvios in (1, 2, 3)]
     if use_peak_type:
-        df['peak_type'] = 0
-        try:
-            fundos, _ = find_peaks(-df['fechamento'], distance=peaks_distance)
-            topos, _ = find_peaks(df['fechamento'], distance=peaks_distance)
-        except:
-            fundos = np.array([])
-            topos = np.array([])
-        
-        peak_type = np.zeros(len(df), dtype=int)
-        if len(fundos) > 0:
-            peak_type[fundos] = 1
-        if len(topos) > 0:
-            peak_type[topos] = -1
-        df['peak_type'] = peak_type
-
+        features.append(Feature('peak_type', (peaks_distance,)))
     if use_peaks:
-        df['peaks'] = 0
-        try:
-            fundos, _ = find_peaks(-df['fechamento'], distance=peaks_distance)
-            topos, _ = find_peaks(df['fechamento'], distance=peaks_distance)
-        except:
-            fundos = np.array([])
-            topos = np.array([])
-
-        df['top_high'] = np.nan
-        df['top_close'] = np.nan
-        df['bottom_low'] = np.nan
-        df['bottom_close'] = np.nan
-
-        if len(topos) > 0:
-            # Para cada topo, verifica a máxima de 2 antes, atual e 2 depois e marca o índice da maior
-            for idx in topos:
-                prev2_idx = idx - 2 if idx - 2 >= 0 else idx
-                prev_idx = idx - 1 if idx - 1 >= 0 else idx
-                next_idx = idx + 1 if idx + 1 < len(df) else idx
-                next2_idx = idx + 2 if idx + 2 < len(df) else idx
-                sub_idxs = [prev2_idx, prev_idx, idx, next_idx, next2_idx]
-                max_idx = sub_idxs[np.argmax(df['maxima'].iloc[sub_idxs].values)]
-                close_idx_top = sub_idxs[np.argmax(df['fechamento'].iloc[sub_idxs].values)]
-                df.loc[df.index[max_idx], 'top_high'] = df['maxima'].iloc[max_idx]
-                df.loc[df.index[close_idx_top], 'top_close'] = df['fechamento'].iloc[close_idx_top]
-        if len(fundos) > 0:
-            # Para cada fundo, verifica a mínima de 2 antes, atual e 2 depois e marca o índice da menor
-            for idx in fundos:
-                prev2_idx = idx - 2 if idx - 2 >= 0 else idx
-                prev_idx = idx - 1 if idx - 1 >= 0 else idx
-                next_idx = idx + 1 if idx + 1 < len(df) else idx
-                next2_idx = idx + 2 if idx + 2 < len(df) else idx
-                sub_idxs = [prev2_idx, prev_idx, idx, next_idx, next2_idx]
-                min_idx = sub_idxs[np.argmin(df['minima'].iloc[sub_idxs].values)]
-                close_idx_bottom = sub_idxs[np.argmin(df['fechamento'].iloc[sub_idxs].values)]
-                df.loc[df.index[min_idx], 'bottom_low'] = df['minima'].iloc[min_idx]
-                df.loc[df.index[close_idx_bottom], 'bottom_close'] = df['fechamento'].iloc[close_idx_bottom]
+        features.append(Feature('peaks', (peaks_distance,)))
 
-    return df
+    # Cópia: o DataFrame do chamador não ganha as colunas
+    return compute_features(df.copy(), features)
 
 def prepare_multi_timeframe_technical_data(df: pd.DataFrame, cripto: str) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
     df_1w = busca_velas(cripto, 'W', [9, 21])
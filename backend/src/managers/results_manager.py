@@ -1,7 +1,125 @@
 import pandas as pd
+import numpy as np
 import os
+from numba import njit
+
+# Tipos de evento registrados pelo ResultsManager
+EVENTO_MES = 0       # initialize_month
+EVENTO_ABERTURA = 1  # update_on_trade_open
+EVENTO_GANHO = 2     # update_on_gain
+EVENTO_PERDA = 3     # update_on_loss
+
+
+@njit(cache=True)
+def _simular_saldos_nb(tipos, percentuais, saldo_inicial, taxa, alavancagem):
+    """
+    Aplica os eventos em sequência com as mesmas contas de `update_on_*`.
+
+    Retorna, por evento: saldo antes/depois, percentual real do ganho/perda e o
+    drawdown máximo acumulado depois do evento; além do estado final de máximo/mínimo.
+    """
+    n = tipos.shape[0]
+    saldo_antes = np.empty(n)
+    saldo_depois = np.empty(n)
+    percentual_real = np.zeros(n)
+    drawdown_depois = np.empty(n)
+
+    saldo = saldo_inicial
+    saldo_maximo = saldo_inicial
+    minimo_desde_maximo = saldo_inicial
+    drawdown_maximo = 0.0
+
+    for k in range(n):
+        saldo_antes[k] = saldo
+        tipo = tipos[k]
+
+        if tipo == EVENTO_ABERTURA:
+            if taxa > 0:
+                saldo -= saldo * ((taxa * alavancagem) / 100)
+
+        elif tipo == EVENTO_GANHO:
+            valor_posicao = saldo * alavancagem
+            lucro_bruto = valor_posicao * (percentuais[k] / 100)
+            valor_final_posicao = valor_posicao + lucro_bruto
+            taxa_saida = valor_final_posicao * (taxa / 100)
+            lucro_liquido = lucro_bruto - taxa_saida
+            saldo += lucro_liquido
+            percentual_real[k] = (lucro_liquido / saldo) * 100
+
+            if saldo > saldo_maximo:
+                saldo_maximo = saldo
+                minimo_desde_maximo = saldo
+
+        elif tipo == EVENTO_PERDA:
+            valor_posicao = saldo * alavancagem
+            perda_bruta = valor_posicao * (percentuais[k] / 100)
+            valor_final_posicao = valor_posicao - perda_bruta
+            taxa_saida = valor_final_posicao * (taxa / 100)
+            devolvido_ao_saldo = valor_final_posicao - taxa_saida
+            perda_liquida = saldo - devolvido_ao_saldo
+            saldo -= perda_liquida
+            percentual_real[k] = (perda_liquida / saldo) * 100
+
+            if saldo < minimo_desde_maximo:
+                minimo_desde_maximo = saldo
+
+            drawdown = ((saldo_maximo - minimo_desde_maximo) / saldo_maximo) * 100
+            if drawdown > drawdown_maximo:
+                drawdown_maximo = drawdown
+
+        saldo_depois[k] = saldo
+        drawdown_depois[k] = drawdown_maximo
+
+    return saldo_antes, saldo_depois, percentual_real, drawdown_depois, saldo_maximo, minimo_desde_maximo
+
+
+def _maiores_sequencias(periodos: pd.Series, tipos: pd.Series) -> pd.DataFrame:
+    """Maior sequência de ganhos e de perdas consecutivos dentro de cada período."""
+    if tipos.empty:
+        return pd.DataFrame(columns=['max_winning_streak', 'max_losing_streak'], dtype=int)
+    quebra = (tipos != tipos.shift()) | (periodos != periodos.shift())
+    sequencias = pd.DataFrame({'periodo': periodos, 'tipo': tipos, 'sequencia': quebra.cumsum()})
+    tamanhos = sequencias.groupby('sequencia', sort=False).agg(
+        periodo=('periodo', 'first'), tipo=('tipo', 'first'), tamanho=('tipo', 'size'))
+    maiores = tamanhos.groupby(['periodo', 'tipo'], sort=False)['tamanho'].max().unstack(fill_value=0)
+    return pd.DataFrame({
+        'max_winning_streak': maiores.get(EVENTO_GANHO, 0),
+        'max_losing_streak': maiores.get(EVENTO_PERDA, 0),
+    }, index=maiores.index).astype(int)
+
+
+def _somar_em_ordem(grupos: np.ndarray, valores: pd.Series, n_grupos: int) -> np.ndarray:
+    """Soma por grupo na ordem dos eventos (bincount acumula sequencialmente, como os `+=` originais)."""
+    return np.bincount(grupos, weights=np.asarray(valores, dtype=np.float64), minlength=n_grupos)
+
+
+def _taxas_e_medias(estatisticas: pd.DataFrame) -> pd.DataFrame:
+    """Acrescenta taxa de acerto, ganho médio e perda média (NaN quando o divisor é zero)."""
+    estatisticas = estatisticas.copy()
+    estatisticas['success_rate'] = estatisticas['profitable_trades'] / estatisticas['open_trades'].where(estatisticas['open_trades'] != 0) * 100
+    estatisticas['avg_profit'] = estatisticas['total_percentage_profit'] / estatisticas['profitable_trades'].where(estatisticas['profitable_trades'] != 0)
+    estatisticas['avg_loss'] = estatisticas['total_percentage_loss'] / estatisticas['unprofitable_trades'].where(estatisticas['unprofitable_trades'] != 0)
+    estatisticas['result'] = (estatisticas['final_balance'] / estatisticas['initial_balance'] - 1) * 100
+    return estatisticas
+
 
 class ResultsManager:
+    """
+    Resultados de backtests procedurais por ano/mês.
+
+    Os eventos (aberturas, ganhos, perdas, meses) só são acumulados; saldos,
+    drawdowns e agregados são calculados de uma vez na primeira leitura, com um
+    laço Numba para a parte sequencial (saldo composto) e groupby para os
+    totais mensais/anuais. `registrar_trades` recebe o array de trades inteiro
+    de `managers.backtest_engine` sem nenhum laço Python por trade.
+    """
+
+    COLUNAS_MENSAIS = [
+        'open_trades', 'profitable_trades', 'total_percentage_profit', 'unprofitable_trades',
+        'total_percentage_loss', 'initial_balance', 'final_balance', 'max_drawdown',
+    ]
+    COLUNAS_ESTATISTICAS = COLUNAS_MENSAIS + ['max_winning_streak', 'max_losing_streak']
+
     def __init__(self,
                 initial_balance: float,
                 broker_fee: float,
@@ -12,7 +130,6 @@ class ResultsManager:
                 end_time: str,
                 leverage: float = 1.0,
             ) -> None:
-        self.results = {}
         self.broker_fee = broker_fee
         self.leverage = leverage
         self.setup_name = setup_name
@@ -21,210 +138,295 @@ class ResultsManager:
         self.start_time = start_time
         self.end_time = end_time
         self.initial_balance = initial_balance
-        self.current_balance = initial_balance
-        self.max_balance = initial_balance
-        self.min_balance_since_max = initial_balance
-        self.max_drawdown = 0.0
+
+        # Eventos: blocos numpy já consolidados + eventos avulsos da API incremental
+        self._blocos = []
+        self._tipos_avulsos = []
+        self._meses_avulsos = []
+        self._percentuais_avulsos = []
+        self._meses_vistos = set()
+        self._ultimo_mes = None
+        self._consolidado = None
+
+    # ------------------------------------------------------------------
+    # Registro de eventos
+    # ------------------------------------------------------------------
 
     def initialize_month(self, year: int, month: int) -> None:
-        if year not in self.results:
-            self.results[year] = {}
-        if month not in self.results[year]:
-            self.results[year][month] = {
-                'open_trades': 0,
-                'profitable_trades': 0, #successful trades
-                'total_percentage_profit': 0.0, #lucro
-                'unprofitable_trades': 0, #failed trades
-                'total_percentage_loss': 0.0, #perda percentual total
-                'initial_balance': self.current_balance,
-                'final_balance': self.current_balance,
-                'max_drawdown': self.max_drawdown
-            }
+        codigo = year * 12 + month
+        if codigo == self._ultimo_mes:
+            return
+        self._ultimo_mes = codigo
+        if codigo not in self._meses_vistos:
+            self._meses_vistos.add(codigo)
+            self._adicionar_evento(EVENTO_MES, codigo, np.nan)
 
     def update_on_trade_open(self, year: int, month: int) -> None:
         self.initialize_month(year, month)
-        self.results[year][month]['open_trades'] += 1
-
-        if self.broker_fee > 0:
-            self.current_balance -= self.current_balance * ((self.broker_fee * self.leverage) / 100)
-            self.results[year][month]['final_balance'] = self.current_balance
+        self._adicionar_evento(EVENTO_ABERTURA, year * 12 + month, np.nan)
 
     def update_on_gain(self, year: int, month: int, profit_percentage: float) -> None:
         self.initialize_month(year, month)
-        self.results[year][month]['profitable_trades'] += 1
-        
-        position_value = self.current_balance * self.leverage
-        gross_profit = position_value * (profit_percentage / 100)
-        final_position_value = position_value + gross_profit
-        exit_fee = final_position_value * (self.broker_fee / 100)
-        net_profit = gross_profit - exit_fee
-        self.current_balance += net_profit
-        real_percentage_gain = (net_profit / self.current_balance) * 100
-        self.results[year][month]['total_percentage_profit'] += real_percentage_gain
-        self.results[year][month]['final_balance'] = self.current_balance
-
-        if self.current_balance > self.max_balance:
-            self.max_balance = self.current_balance
-            self.min_balance_since_max = self.current_balance
+        self._adicionar_evento(EVENTO_GANHO, year * 12 + month, profit_percentage)
 
     def update_on_loss(self, year: int, month: int, loss_percentage: float) -> None:
         self.initialize_month(year, month)
-        self.results[year][month]['unprofitable_trades'] += 1
-
-        position_value = self.current_balance * self.leverage
-        gross_loss = position_value * (loss_percentage / 100)
-        final_position_value = position_value - gross_loss
-        exit_fee = final_position_value * (self.broker_fee / 100)
-        returned_to_balance = final_position_value - exit_fee
-        net_loss = self.current_balance - returned_to_balance
-        self.current_balance -= net_loss
-        real_percentage_loss = (net_loss / self.current_balance) * 100
-        self.results[year][month]['total_percentage_loss'] += real_percentage_loss
-        self.results[year][month]['final_balance'] = self.current_balance
-
-        if self.current_balance < self.min_balance_since_max:
-            self.min_balance_since_max = self.current_balance
-
-        drawdown = ((self.max_balance - self.min_balance_since_max) / self.max_balance) * 100
-        self.results[year][month]['max_drawdown'] = max(self.max_drawdown, drawdown)
+        self._adicionar_evento(EVENTO_PERDA, year * 12 + month, loss_percentage)
+
+    def _adicionar_evento(self, tipo: int, codigo_mes: int, percentual: float) -> None:
+        self._tipos_avulsos.append(tipo)
+        self._meses_avulsos.append(codigo_mes)
+        self._percentuais_avulsos.append(percentual)
+        self._consolidado = None
+
+    def _fechar_bloco_avulso(self) -> None:
+        if self._tipos_avulsos:
+            self._blocos.append((
+                np.asarray(self._tipos_avulsos, dtype=np.int8),
+                np.asarray(self._meses_avulsos, dtype=np.int64),
+                np.asarray(self._percentuais_avulsos, dtype=np.float64),
+            ))
+            self._tipos_avulsos, self._meses_avulsos, self._percentuais_avulsos = [], [], []
+
+    def registrar_trades(self, trades: np.ndarray, indice: pd.DatetimeIndex, inicio: int = 0, fim: int = None) -> None:
+        """
+        Consome os registros de `managers.backtest_engine` (DTYPE_TRADE).
+
+        Reproduz a sequência do laço procedural: cada mês das barras `inicio..fim-1`
+        é inicializado na sua primeira barra, e as aberturas/fechamentos são aplicados
+        na barra em que ocorreram.
+        """
+        from managers.backtest_engine import RESULTADO_GANHO, RESULTADO_PERDA
+
+        fim = len(indice) if fim is None else fim
+        codigos_barras = np.asarray(indice.year * 12 + indice.month, dtype=np.int64)
+        codigos = codigos_barras[inicio:fim]
+        primeiras_barras = np.flatnonzero(np.r_[len(codigos) > 0, codigos[1:] != codigos[:-1]]) + inicio
+        primeiras_barras = primeiras_barras[[int(c) not in self._meses_vistos for c in codigos_barras[primeiras_barras]]]
+
+        fechados = np.isin(trades['resultado'], (RESULTADO_GANHO, RESULTADO_PERDA))
+        tipos_fechamento = np.where(trades['resultado'][fechados] == RESULTADO_GANHO, EVENTO_GANHO, EVENTO_PERDA)
+
+        barras = np.concatenate([primeiras_barras, trades['barra_entrada'], trades['barra_saida'][fechados]])
+        # Na mesma barra: inicialização do mês, fechamento do trade anterior e só então a abertura
+        prioridades = np.concatenate([
+            np.zeros(len(primeiras_barras)), np.full(len(trades), 2), np.ones(fechados.sum()),
+        ])
+        tipos = np.concatenate([
+            np.full(len(primeiras_barras), EVENTO_MES), np.full(len(trades), EVENTO_ABERTURA), tipos_fechamento,
+        ]).astype(np.int8)
+        percentuais = np.concatenate([
+            np.full(len(primeiras_barras) + len(trades), np.nan), trades['percentual'][fechados],
+        ])
+
+        ordem = np.lexsort((prioridades, barras))
+        self._fechar_bloco_avulso()
+        self._blocos.append((tipos[ordem], codigos_barras[barras[ordem]], percentuais[ordem]))
+        self._meses_vistos.update(int(c) for c in codigos_barras[primeiras_barras])
+        self._ultimo_mes = int(codigos[-1]) if len(codigos) else self._ultimo_mes
+        self._consolidado = None
+
+    # ------------------------------------------------------------------
+    # Consolidação em lote
+    # ------------------------------------------------------------------
+
+    def _consolidar(self) -> dict:
+        if self._consolidado is not None:
+            return self._consolidado
+
+        self._fechar_bloco_avulso()
+        if self._blocos:
+            tipos = np.concatenate([bloco[0] for bloco in self._blocos])
+            meses = np.concatenate([bloco[1] for bloco in self._blocos])
+            percentuais = np.concatenate([bloco[2] for bloco in self._blocos])
+        else:
+            tipos, meses, percentuais = np.empty(0, np.int8), np.empty(0, np.int64), np.empty(0)
+        self._blocos = [(tipos, meses, percentuais)]
+
+        (saldo_antes, saldo_depois, percentual_real, drawdown_depois, saldo_maximo, minimo_desde_maximo) = _simular_saldos_nb(
+            tipos, percentuais, float(self.initial_balance), float(self.broker_fee), float(self.leverage))
+
+        eventos = pd.DataFrame({
+            'mes': meses,
+            'ganho': np.where(tipos == EVENTO_GANHO, percentual_real, 0.0),
+            'perda': np.where(tipos == EVENTO_PERDA, percentual_real, 0.0),
+            'abertura': tipos == EVENTO_ABERTURA,
+            'lucro': tipos == EVENTO_GANHO,
+            'prejuizo': tipos == EVENTO_PERDA,
+            'saldo_antes': saldo_antes,
+            # Aberturas sem taxa não alteram o saldo final do mês na versão incremental
+            'saldo_registrado': np.where((tipos == EVENTO_ABERTURA) & (self.broker_fee <= 0), np.nan, saldo_depois),
+            # Como na versão incremental, o drawdown do mês é gravado ao inicializá-lo e a cada perda
+            'drawdown_registrado': np.where((tipos == EVENTO_MES) | (tipos == EVENTO_PERDA), drawdown_depois, np.nan),
+        })
+        mensal = eventos.groupby('mes', sort=False).agg(
+            open_trades=('abertura', 'sum'),
+            profitable_trades=('lucro', 'sum'),
+            unprofitable_trades=('prejuizo', 'sum'),
+            initial_balance=('saldo_antes', 'first'),
+            final_balance=('saldo_registrado', 'last'),
+            max_drawdown=('drawdown_registrado', 'last'),
+        )
+        grupos_mes, _ = pd.factorize(eventos['mes'], sort=False)
+        mensal['total_percentage_profit'] = _somar_em_ordem(grupos_mes, eventos['ganho'], len(mensal))
+        mensal['total_percentage_loss'] = _somar_em_ordem(grupos_mes, eventos['perda'], len(mensal))
+        mensal.index = pd.MultiIndex.from_arrays(
+            [(mensal.index - 1) // 12, (mensal.index - 1) % 12 + 1], names=['year', 'month'])
+
+        fechamentos = eventos[eventos['lucro'] | eventos['prejuizo']]
+        tipos_fechamento = pd.Series(tipos[fechamentos.index], index=fechamentos.index)
+        sequencias = _maiores_sequencias(fechamentos['mes'], tipos_fechamento)
+        sequencias.index = pd.MultiIndex.from_arrays(
+            [(sequencias.index - 1) // 12, (sequencias.index - 1) % 12 + 1], names=['year', 'month'])
+        mensal = mensal.join(sequencias).fillna({'max_winning_streak': 0, 'max_losing_streak': 0})
+
+        anos = mensal.index.get_level_values('year')
+        anual = mensal.groupby(anos, sort=False).agg(
+            open_trades=('open_trades', 'sum'),
+            profitable_trades=('profitable_trades', 'sum'),
+            unprofitable_trades=('unprofitable_trades', 'sum'),
+            initial_balance=('initial_balance', 'first'),
+            final_balance=('final_balance', 'last'),
+            max_drawdown=('max_drawdown', 'max'),
+        )
+        grupos_ano, _ = pd.factorize(anos, sort=False)
+        anual['total_percentage_profit'] = _somar_em_ordem(grupos_ano, mensal['total_percentage_profit'], len(anual))
+        anual['total_percentage_loss'] = _somar_em_ordem(grupos_ano, mensal['total_percentage_loss'], len(anual))
+        anual = anual.join(_maiores_sequencias((fechamentos['mes'] - 1) // 12, tipos_fechamento))
+        anual = anual.fillna({'max_winning_streak': 0, 'max_losing_streak': 0})
+        anual.index.name = 'year'
+
+        inteiros = ['open_trades', 'profitable_trades', 'unprofitable_trades', 'max_winning_streak', 'max_losing_streak']
+        mensal[inteiros] = mensal[inteiros].astype(int)
+        anual[inteiros] = anual[inteiros].astype(int)
+
+        geral = _maiores_sequencias(pd.Series(0, index=fechamentos.index), tipos_fechamento)
+        self._consolidado = {
+            'mensal': _taxas_e_medias(mensal[self.COLUNAS_ESTATISTICAS]),
+            'anual': _taxas_e_medias(anual[self.COLUNAS_ESTATISTICAS]),
+            'saldo': float(saldo_depois[-1]) if len(tipos) else float(self.initial_balance),
+            'drawdown_maximo': float(drawdown_depois[-1]) if len(tipos) else 0.0,
+            'saldo_maximo': float(saldo_maximo),
+            'minimo_desde_maximo': float(minimo_desde_maximo),
+            'max_winning_streak': int(geral['max_winning_streak'].max()) if len(geral) else 0,
+            'max_losing_streak': int(geral['max_losing_streak'].max()) if len(geral) else 0,
+        }
+        return self._consolidado
+
+    @property
+    def current_balance(self) -> float:
+        return self._consolidar()['saldo']
+
+    @property
+    def max_drawdown(self) -> float:
+        return self._consolidar()['drawdown_maximo']
+
+    @property
+    def max_balance(self) -> float:
+        return self._consolidar()['saldo_maximo']
+
+    @property
+    def min_balance_since_max(self) -> float:
+        return self._consolidar()['minimo_desde_maximo']
+
+    def monthly_stats(self) -> pd.DataFrame:
+        """Estatísticas por (ano, mês), incluindo taxa de acerto, médias e maiores sequências."""
+        return self._consolidar()['mensal']
+
+    def yearly_stats(self) -> pd.DataFrame:
+        """Estatísticas por ano (drawdown do ano = maior drawdown mensal)."""
+        return self._consolidar()['anual']
+
+    @property
+    def results(self) -> dict:
+        """Resultados no formato aninhado {ano: {mês: {...}}} da versão incremental."""
+        mensal = self.monthly_stats()[self.COLUNAS_MENSAIS]
+        resultados = {}
+        for (year, month), linha in zip(mensal.index, mensal.itertuples(index=False)):
+            resultados.setdefault(int(year), {})[int(month)] = {
+                coluna: (int(valor) if coluna in ('open_trades', 'profitable_trades', 'unprofitable_trades') else float(valor))
+                for coluna, valor in zip(self.COLUNAS_MENSAIS, linha)
+            }
+        return resultados
+
+    def summary(self) -> dict:
+        """Resumo geral do backtest em uma linha (usado no xlsx e para combinar execuções)."""
+        consolidado = self._consolidar()
+        mensal = consolidado['mensal']
+        total_trades = int(mensal['open_trades'].sum())
+        profitable = int(mensal['profitable_trades'].sum())
+        unprofitable = int(mensal['unprofitable_trades'].sum())
+        return {
+            'symbol': self.symbol,
+            'timeframe': self.timeframe,
+            'leverage': self.leverage,
+            'start_time': self.start_time,
+            'end_time': self.end_time,
+            'setup': self.setup_name,
+            'trades': total_trades,
+            'success_rate': profitable / total_trades * 100 if total_trades else np.nan,
+            'profitable_trades': profitable,
+            'avg_profit': sum(mensal['total_percentage_profit'].tolist()) / profitable if profitable else np.nan,
+            'unprofitable_trades': unprofitable,
+            'avg_loss': sum(mensal['total_percentage_loss'].tolist()) / unprofitable if unprofitable else np.nan,
+            'max_drawdown': consolidado['drawdown_maximo'],
+            'result': (consolidado['saldo'] / self.initial_balance - 1) * 100,
+            'initial_balance': self.initial_balance,
+            'final_balance': consolidado['saldo'],
+            'max_winning_streak': consolidado['max_winning_streak'],
+            'max_losing_streak': consolidado['max_losing_streak'],
+        }
 
-        if drawdown > self.max_drawdown:
-            self.max_drawdown = drawdown
+    # ------------------------------------------------------------------
+    # Impressão e exportação (sob demanda, depois do backtest)
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _formatar_percentual(valor: float) -> str:
+        return "0" if pd.isna(valor) else f"{valor:.2f}%"
+
+    def _imprimir_estatisticas(self, recuo: str, linha, rotulo_drawdown: str) -> None:
+        print(f"{recuo}Operações realizadas: {int(linha['open_trades'])}")
+        print(f"{recuo}Taxa de acerto: {self._formatar_percentual(linha['success_rate'])}")
+        print(f"{recuo}Trades de sucesso: {int(linha['profitable_trades'])}")
+        print(f"{recuo}Ganho médio por trade: {self._formatar_percentual(linha['avg_profit'])}")
+        print(f"{recuo}Trades em prejuízo: {int(linha['unprofitable_trades'])}")
+        print(f"{recuo}Perda média por trade: {self._formatar_percentual(linha['avg_loss'])}")
+        print(f"{recuo}{rotulo_drawdown}: {linha['max_drawdown']:.2f}%")
+        print(f"{recuo}Resultado final: {linha['result']:.2f}%")
+        print(f"{recuo}Saldo inicial: {linha['initial_balance']:.2f}")
+        print(f"{recuo}Saldo final: {linha['final_balance']:.2f}")
 
     def get_results(self) -> None:
+        mensal = self.monthly_stats()
+        anual = self.yearly_stats()
+
         print("Resultados por ano e mês:")
-        for year in self.results:
+        for year, linha_ano in anual.iterrows():
             print(f"Ano: {year}")
-            print(f"  Operações realizadas: {sum(self.results[year][month]['open_trades'] for month in self.results[year])}")
-
-            try:
-                print(f"  Taxa de acerto: {sum(
-                        self.results[year][month]['profitable_trades'] for month in self.results[year]
-                    ) / sum(
-                        self.results[year][month]['open_trades'] for month in self.results[year]
-                    ) * 100:.2f}%")
-            except ZeroDivisionError:
-                print("  Taxa de acerto: 0")
-
-            print(f"  Trades de sucesso: {sum(self.results[year][month]['profitable_trades'] for month in self.results[year])}")
-
-            try:
-                avg_profit_per_year_trade = (
-                    sum(self.results[year][month]['total_percentage_profit'] for month in self.results[year])
-                    / sum(self.results[year][month]['profitable_trades'] for month in self.results[year])
-                )
-                print(f"  Ganho médio por trade: {avg_profit_per_year_trade:.2f}%")
-            except ZeroDivisionError:
-                print("  Ganho médio por trade: 0")
-            
-            print(f"  Trades em prejuízo: {sum(self.results[year][month]['unprofitable_trades'] for month in self.results[year])}")
-            
-            try:
-                avg_loss_per_trade = (
-                    sum(self.results[year][month]['total_percentage_loss'] for month in self.results[year])
-                    / sum(self.results[year][month]['unprofitable_trades'] for month in self.results[year])
-                )
-                print(f"  Perda média por trade: {avg_loss_per_trade:.2f}%")
-            except ZeroDivisionError:
-                print("  Perda média por trade: 0")
-
-            print(f"  Drawdown máximo do ano: {max(self.results[year][month]['max_drawdown'] for month in self.results[year]):.2f}%")
-
-            initial_balance = self.results[year][list(self.results[year].keys())[0]]['initial_balance']
-            final_balance = self.results[year][list(self.results[year].keys())[-1]]['final_balance']
-            print(f"  Resultado final: {(final_balance / initial_balance - 1) * 100:.2f}%")
-
-            print(f"  Saldo inicial: {initial_balance:.2f}")
-            print(f"  Saldo final: {final_balance:.2f}")
+            self._imprimir_estatisticas("  ", linha_ano, "Drawdown máximo do ano")
             print("Detalhes mensais:")
-            for month in self.results[year]:
+            for month, linha_mes in mensal.loc[year].iterrows():
                 print(f"  Mês: {month}")
-                print(f"    Operações realizadas: {self.results[year][month]['open_trades']}")
-                month_total_trades = self.results[year][month]['open_trades']
-                month_success_trades = self.results[year][month]['profitable_trades']
-
-                try:
-                    month_success_rate = (month_success_trades / month_total_trades) * 100
-                    print(f"    Taxa de acerto: {month_success_rate:.2f}%")
-                except ZeroDivisionError:
-                    print("    Taxa de acerto: 0")  
-
-                print(f"    Trades de sucesso: {self.results[year][month]['profitable_trades']}")
-
-                try:
-                    avg_profit_per_month_trade = (
-                        self.results[year][month]['total_percentage_profit'] / self.results[year][month]['profitable_trades']
-                    )
-                    print(f"    Ganho médio por trade: {avg_profit_per_month_trade:.2f}%")
-                except ZeroDivisionError:
-                    print("    Ganho médio por trade: 0")
-                
-                print(f"    Trades em prejuízo: {self.results[year][month]['unprofitable_trades']}")
-
-                try:
-                    avg_loss_per_month_trade = (
-                        self.results[year][month]['total_percentage_loss'] / self.results[year][month]['unprofitable_trades']
-                    )
-                    print(f"    Perda média por trade: {avg_loss_per_month_trade:.2f}%")
-                except ZeroDivisionError:
-                    print("    Perda média por trade: 0")
-
-                print(f"    Drawdown máximo: {self.results[year][month]['max_drawdown']:.2f}%")
-                month_initial_balance = self.results[year][month]['initial_balance']
-                month_final_balance = self.results[year][month]['final_balance']
-                print(f"    Resultado final: {(month_final_balance / month_initial_balance - 1) * 100:.2f}%")
-                print(f"    Saldo inicial: {self.results[year][month]['initial_balance']:.2f}")
-                print(f"    Saldo final: {self.results[year][month]['final_balance']:.2f}")
+                self._imprimir_estatisticas("    ", linha_mes, "Drawdown máximo")
                 print("-------------------")
-        print("Resumo geral:")
-        total_trades = sum(
-            self.results[year][month]['open_trades'] for year in self.results for month in self.results[year]
-        )
-        print(f"Operações realizadas: {total_trades}")
 
-        total_successful_trades = sum(
-            self.results[year][month]['profitable_trades'] for year in self.results for month in self.results[year]
-        )
-
-        try:
-            success_rate = (total_successful_trades / total_trades) * 100
-            print(f"Taxa de acerto: {success_rate:.2f}%")
-        except ZeroDivisionError:
-            print("Taxa de acerto: 0")
-
-        print(f"Trades de sucesso: {total_successful_trades}")
-
-        try:
-            avg_profit_per_trade = (
-                sum(
-                    self.results[year][month]['total_percentage_profit'] for year in self.results for month in self.results[year]
-                ) / total_successful_trades
-            )
-            print(f"Ganho médio por trade: {avg_profit_per_trade:.2f}%")
-        except ZeroDivisionError:
-            print("Ganho médio por trade: 0")
-
-        total_failed_trades = sum(
-            self.results[year][month]['unprofitable_trades'] for year in self.results for month in self.results[year]
-        )
-        print(f"Trades em prejuízo: {total_failed_trades}")
-
-        try:
-            avg_loss_per_trade = (
-                sum(
-                    self.results[year][month]['total_percentage_loss'] for year in self.results for month in self.results[year]
-                ) / total_failed_trades
-            )
-            print(f"Perda média por trade: {avg_loss_per_trade:.2f}%")
-        except ZeroDivisionError:
-            print("Perda média por trade: 0")
-            
-        print(f"Drawdown máximo: {self.max_drawdown:.2f}%")
-
-        print(f"Resultado final: {(self.current_balance / self.initial_balance - 1) * 100:.2f}%")
-
-        print(f"Saldo inicial: {self.initial_balance:.2f}")
-        print(f"Saldo final: {self.current_balance:.2f}")
+        resumo = self.summary()
+        print("Resumo geral:")
+        self._imprimir_estatisticas("", {
+            'open_trades': resumo['trades'],
+            'success_rate': resumo['success_rate'],
+            'profitable_trades': resumo['profitable_trades'],
+            'avg_profit': resumo['avg_profit'],
+            'unprofitable_trades': resumo['unprofitable_trades'],
+            'avg_loss': resumo['avg_loss'],
+            'max_drawdown': resumo['max_drawdown'],
+            'result': resumo['result'],
+            'initial_balance': resumo['initial_balance'],
+            'final_balance': resumo['final_balance'],
+        }, "Drawdown máximo")
+        print(f"Maior sequência de ganhos: {resumo['max_winning_streak']}")
+        print(f"Maior sequência de perdas: {resumo['max_losing_streak']}")
         print(f'Cripto: {self.symbol}')
         print(f'Tempo gráfico: {self.timeframe}')
         print(f"Alavancagem: {self.leverage}")
@@ -233,24 +435,15 @@ class ResultsManager:
 
     def summarize_results(self) -> None:
         print("Resumo por ano e geral:")
-        for year in self.results:
-            initial_balance = self.results[year][list(self.results[year].keys())[0]]['initial_balance']
-            final_balance = self.results[year][list(self.results[year].keys())[-1]]['final_balance']
-            total_trades = sum(self.results[year][month]['open_trades'] for month in self.results[year])
-            successful_trades = sum(self.results[year][month]['profitable_trades'] for month in self.results[year])
-
+        for year, linha in self.yearly_stats().iterrows():
             print(f"Ano: {year}")
-            print(f"  Operações realizadas: {total_trades}")
-            print(f"  Trades de sucesso: {successful_trades}")
-            try:
-                success_rate = (successful_trades / total_trades) * 100
-                print(f"  Taxa de acerto: {success_rate:.2f}%")
-            except ZeroDivisionError:
-                print("  Taxa de acerto: 0")
-            print(f"  Drawdown máximo do ano: {max(self.results[year][month]['max_drawdown'] for month in self.results[year]):.2f}%")
-            print(f"  Resultado final do ano: {(final_balance / initial_balance - 1) * 100:.2f}%")
-            print(f"  Saldo inicial: {initial_balance:.2f}")
-            print(f"  Saldo final: {final_balance:.2f}")
+            print(f"  Operações realizadas: {int(linha['open_trades'])}")
+            print(f"  Trades de sucesso: {int(linha['profitable_trades'])}")
+            print(f"  Taxa de acerto: {self._formatar_percentual(linha['success_rate'])}")
+            print(f"  Drawdown máximo do ano: {linha['max_drawdown']:.2f}%")
+            print(f"  Resultado final do ano: {linha['result']:.2f}%")
+            print(f"  Saldo inicial: {linha['initial_balance']:.2f}")
+            print(f"  Saldo final: {linha['final_balance']:.2f}")
             print("-------------------")
 
         print("Resumo geral:")
@@ -261,38 +454,10 @@ class ResultsManager:
         print(f"Setup: {self.setup_name}")
 
     def save_summarized_results_to_xlsx(self, filename: str = 'data/results/procedural/results.xlsx') -> None:
-        total_trades = sum(self.results[year][month]['open_trades'] for year in self.results for month in self.results[year])
-        total_successful_trades = sum(
-            self.results[year][month]['profitable_trades'] for year in self.results for month in self.results[year]
-        )
+        resumo = self.summary()
 
-        try:
-            success_rate = (total_successful_trades / total_trades) * 100
-        except ZeroDivisionError:
-            success_rate = 0
-
-        try:
-            avg_profit_per_trade = (
-                sum(
-                    self.results[year][month]['total_percentage_profit'] for year in self.results for month in self.results[year]
-                ) / total_successful_trades
-            )
-        except ZeroDivisionError:
-            avg_profit_per_trade = 0
-
-        total_failed_trades = sum(
-            self.results[year][month]['unprofitable_trades'] for year in self.results for month in self.results[year]
-        )
-        
-        try:
-            avg_loss_per_trade = (
-                sum(
-                    self.results[year][month]['total_percentage_loss'] for year in self.results for month in self.results[year]
-                ) / total_failed_trades
-            )
-        except ZeroDivisionError:
-            avg_loss_per_trade = 0
-        final_result = (self.current_balance / self.initial_balance - 1) * 100
+        def percentual(valor):
+            return f'{0 if pd.isna(valor) else valor:.2f}%'
 
         data = {
             'Moeda': [self.symbol],
@@ -301,16 +466,16 @@ class ResultsManager:
             'Início': [self.start_time],
             'Fim': [self.end_time],
             'Setup': [self.setup_name],
-            'Trades': [total_trades],
-            'Taxa de acerto': [f'{success_rate:.2f}%'],
-            'Trades c/ lucro': [total_successful_trades],
-            'Ganho médio': [f'{avg_profit_per_trade:.2f}%'],
-            'Trades c/ perda': [total_failed_trades],
-            'Perda média': [f'{avg_loss_per_trade:.2f}%'],
-            'Drawdown máximo': [f'{self.max_drawdown:.2f}%'],
-            'Resultado': [f'{final_result:.2f}%'],
+            'Trades': [resumo['trades']],
+            'Taxa de acerto': [percentual(resumo['success_rate'])],
+            'Trades c/ lucro': [resumo['profitable_trades']],
+            'Ganho médio': [percentual(resumo['avg_profit'])],
+            'Trades c/ perda': [resumo['unprofitable_trades']],
+            'Perda média': [percentual(resumo['avg_loss'])],
+            'Drawdown máximo': [f"{resumo['max_drawdown']:.2f}%"],
+            'Resultado': [f"{resumo['result']:.2f}%"],
             'Saldo inicial': [self.initial_balance],
-            'Saldo final': [f'{self.current_balance:.2f}'],
+            'Saldo final': [f"{resumo['final_balance']:.2f}"],
         }
 
         df = pd.DataFrame(data)
@@ -325,4 +490,30 @@ class ResultsManager:
             os.makedirs("data/results/procedural", exist_ok=True)
             df.to_excel(filename, sheet_name='Resultados', index=False)
 
-        print (f"Resultados salvos em {filename}")
\ No newline at end of file
+        print (f"Resultados salvos em {filename}")
+
+
+def merge_results(managers) -> pd.DataFrame:
+    """
+    Junta várias execuções (ex.: backtests rodados em paralelo) em uma tabela, uma linha por execução.
+
+    Os ResultsManager podem vir de outros processos (são picklable); só o resumo
+    de cada um é consolidado, sem reprocessar trades.
+    """
+    return pd.DataFrame([manager.summary() for manager in managers])
+
+
+def merge_monthly_stats(managers) -> pd.DataFrame:
+    """
+    Estatísticas mensais de várias execuções, com a execução (posição em `managers`),
+    setup, cripto e tempo gráfico como níveis extras do índice.
+
+    A posição entra na chave para que execuções com o mesmo setup (ex.: BTC e ETH
+    rodados com o mesmo nome) não se sobrescrevam.
+    """
+    managers = list(managers)
+    return pd.concat(
+        [manager.monthly_stats() for manager in managers],
+        keys=[(i, manager.setup_name, manager.symbol, manager.timeframe) for i, manager in enumerate(managers)],
+        names=['run', 'setup', 'symbol', 'timeframe'],
+    )
@@ -5,9 +5,11 @@ from pybit.unified_trading import HTTP
 import pandas as pd
 import numpy as np
 from datetime import datetime
+from numba import njit
 from managers.results_manager import ResultsManager
-from entidades.estado_trade import EstadoDeTrade
-from utils.utilidades import calcula_percentual_perda_na_compra, calcula_percentual_lucro_na_compra, calcula_percentual_lucro_na_venda, calcula_percentual_perda_na_venda, verifica_dia_util, verifica_segunda_a_quinta
+from managers.backtest_engine import (executar_backtest, ESTADO, PRECO_ENTRADA, PRECO_STOP, PRECO_ALVO, PRECO_SAIDA,
+                                      DE_FORA, COMPRADO, VENDIDO, NADA, ABRIR_COMPRA, ABRIR_VENDA,
+                                      FECHAR_COM_GANHO, FECHAR_COM_PERDA)
 from corretoras.funcoes_bybit import carregar_dados_historicos
 from indicadores.indicadores_osciladores import calcula_rsi
 
@@ -38,12 +40,71 @@ df = carregar_dados_historicos(cripto, tempo_grafico, emas, start, end, pular_ve
 df['EMA_200'] = df['fechamento'].ewm(span=200, adjust=False).mean()
 df['EMA_90'] = df['fechamento'].ewm(span=90, adjust=False).mean()
 df['RSI'] = calcula_rsi(df, 14)
+df['dia_semana'] = df.index.weekday
 
-estado_de_trade = EstadoDeTrade.DE_FORA
+# Linhas de `dados` na função de passo
+MAXIMA, MINIMA, FECHAMENTO, EMA_RAPIDA, EMA_LENTA, EMA_90, EMA_200, RSI, DIA_SEMANA = range(9)
 
-preco_stop = 0
-preco_alvo = 0
-preco_entrada = 0
+@njit
+def passo(c, dados, estado, parametros):
+    risco_retorno = parametros[0]
+    qtd_velas_stop = int(parametros[1])
+
+    if estado[ESTADO] == COMPRADO:
+        if dados[MAXIMA, c] >= estado[PRECO_ALVO]:
+            estado[PRECO_SAIDA] = estado[PRECO_ALVO]
+            return FECHAR_COM_GANHO
+            
+        elif dados[MINIMA, c] <= estado[PRECO_STOP]:
+            estado[PRECO_SAIDA] = estado[PRECO_STOP]
+            return FECHAR_COM_PERDA
+
+        elif dados[FECHAMENTO, c - 1] < dados[EMA_90, c - 1] and dados[MINIMA, c] < dados[MINIMA, c - 1]:
+            estado[PRECO_SAIDA] = dados[MINIMA, c - 1]
+            if dados[MINIMA, c - 1] > estado[PRECO_ENTRADA]:
+                return FECHAR_COM_GANHO
+            elif dados[MINIMA, c - 1] < estado[PRECO_ENTRADA]:
+                return FECHAR_COM_PERDA
+
+    elif estado[ESTADO] == VENDIDO:
+        if dados[MINIMA, c] <= estado[PRECO_ALVO]:
+            estado[PRECO_SAIDA] = estado[PRECO_ALVO]
+            return FECHAR_COM_GANHO
+            
+        elif dados[MAXIMA, c] >= estado[PRECO_STOP]:
+            estado[PRECO_SAIDA] = estado[PRECO_STOP]
+            return FECHAR_COM_PERDA
+
+        elif dados[FECHAMENTO, c - 1] > dados[EMA_90, c - 1] and dados[MAXIMA, c] > dados[MAXIMA, c - 1]:
+            estado[PRECO_SAIDA] = dados[MAXIMA, c - 1]
+            if dados[MAXIMA, c - 1] < estado[PRECO_ENTRADA]:
+                return FECHAR_COM_GANHO
+            elif dados[MAXIMA, c - 1] > estado[PRECO_ENTRADA]:
+                return FECHAR_COM_PERDA
+
+    elif estado[ESTADO] == DE_FORA:
+        fechamento_anterior = dados[FECHAMENTO, c - 1]
+        dia_util = dados[DIA_SEMANA, c] < 5
+        if fechamento_anterior > dados[EMA_200, c - 1] and fechamento_anterior > dados[EMA_90, c - 1]:
+            if (fechamento_anterior > dados[EMA_RAPIDA, c - 1] 
+                and fechamento_anterior > dados[EMA_LENTA, c - 1]):
+                if dados[MAXIMA, c] > dados[MAXIMA, c - 1]:
+                    if (dados[RSI, c - qtd_velas_stop + 1 : c + 1].min() > 65) and dia_util:
+                        estado[PRECO_ENTRADA] = dados[MAXIMA, c - 1]
+                        estado[PRECO_STOP] = dados[MINIMA, c - qtd_velas_stop + 1 : c + 1].min()
+                        estado[PRECO_ALVO] = ((estado[PRECO_ENTRADA] - estado[PRECO_STOP]) * risco_retorno) + estado[PRECO_ENTRADA]
+                        return ABRIR_COMPRA
+        elif fechamento_anterior < dados[EMA_200, c - 1] and fechamento_anterior < dados[EMA_90, c - 1]:
+            if (fechamento_anterior < dados[EMA_RAPIDA, c - 1] 
+                and fechamento_anterior < dados[EMA_LENTA, c - 1]):
+                if dados[MINIMA, c] < dados[MINIMA, c - 1]:
+                    if (dados[RSI, c - qtd_velas_stop + 1 : c + 1].max() < 35) and dia_util:
+                        estado[PRECO_ENTRADA] = dados[MINIMA, c - 1]
+                        estado[PRECO_STOP] = dados[MAXIMA, c - qtd_velas_stop + 1 : c + 1].max()
+                        estado[PRECO_ALVO] = estado[PRECO_ENTRADA] - ((estado[PRECO_STOP] - estado[PRECO_ENTRADA]) * risco_retorno)
+                        return ABRIR_VENDA
+
+    return NADA
 
 resultados = ResultsManager(
     saldo,
@@ -56,76 +117,15 @@ resultados = ResultsManager(
     alavancagem
 )
 
-for i in range(pular_velas, len(df)):
-    sub_df = df.iloc[:i]
-
-    ano = sub_df.index[-1].year
-    mes = sub_df.index[-1].month
-
-    resultados.initialize_month(ano, mes)
-
-    if estado_de_trade == EstadoDeTrade.COMPRADO:
-        if sub_df['maxima'].iloc[-1] >= preco_alvo:
-            estado_de_trade = EstadoDeTrade.DE_FORA
-            percentual_ganho = calcula_percentual_lucro_na_compra(preco_entrada, preco_alvo)
-            resultados.update_on_gain(ano, mes, percentual_ganho)
-            
-        elif sub_df['minima'].iloc[-1] <= preco_stop:
-            estado_de_trade = EstadoDeTrade.DE_FORA
-            percentual_perda = calcula_percentual_perda_na_compra(preco_entrada, preco_stop)
-            resultados.update_on_loss(ano, mes, percentual_perda)
-
-        elif sub_df['fechamento'].iloc[-2] < sub_df['EMA_90'].iloc[-2] and sub_df['minima'].iloc[-1] < sub_df['minima'].iloc[-2]:
-            if sub_df['minima'].iloc[-2] > preco_entrada:
-                estado_de_trade = EstadoDeTrade.DE_FORA
-                percentual_ganho = calcula_percentual_lucro_na_compra(preco_entrada, sub_df['minima'].iloc[-2])
-                resultados.update_on_gain(ano, mes, percentual_ganho)
-            elif sub_df['minima'].iloc[-2] < preco_entrada:
-                estado_de_trade = EstadoDeTrade.DE_FORA
-                percentual_perda = calcula_percentual_perda_na_compra(preco_entrada, sub_df['minima'].iloc[-2])
-                resultados.update_on_loss(ano, mes, percentual_perda)
-
-    elif estado_de_trade == EstadoDeTrade.VENDIDO:
-        if sub_df['minima'].iloc[-1] <= preco_alvo:
-            estado_de_trade = EstadoDeTrade.DE_FORA
-            percentual_ganho = calcula_percentual_lucro_na_venda(preco_entrada, preco_alvo)
-            resultados.update_on_gain(ano, mes, percentual_ganho)
-            
-        elif sub_df['maxima'].iloc[-1] >= preco_stop:
-            estado_de_trade = EstadoDeTrade.DE_FORA
-            percentual_perda = calcula_percentual_perda_na_venda(preco_entrada, preco_stop)
-            resultados.update_on_loss(ano, mes, percentual_perda)
-        elif sub_df['fechamento'].iloc[-2] > sub_df['EMA_90'].iloc[-2] and sub_df['maxima'].iloc[-1] > sub_df['maxima'].iloc[-2]:
-            if sub_df['maxima'].iloc[-2] < preco_entrada:
-                estado_de_trade = EstadoDeTrade.DE_FORA
-                percentual_ganho = calcula_percentual_lucro_na_venda(preco_entrada, sub_df['maxima'].iloc[-2])
-                resultados.update_on_gain(ano, mes, percentual_ganho)
-            elif sub_df['maxima'].iloc[-2] > preco_entrada:
-                estado_de_trade = EstadoDeTrade.DE_FORA
-                percentual_perda = calcula_percentual_perda_na_venda(preco_entrada, sub_df['maxima'].iloc[-2])
-                resultados.update_on_loss(ano, mes, percentual_perda)
-
-    elif estado_de_trade == EstadoDeTrade.DE_FORA:
-        if sub_df['fechamento'].iloc[-2] > sub_df['EMA_200'].iloc[-2] and sub_df['fechamento'].iloc[-2] > sub_df['EMA_90'].iloc[-2]:
-            if (sub_df['fechamento'].iloc[-2] > sub_df[f'EMA_{ema_rapida}'].iloc[-2] 
-                and sub_df['fechamento'].iloc[-2] > sub_df[f'EMA_{ema_lenta}'].iloc[-2]):
-                if sub_df['maxima'].iloc[-1] > sub_df['maxima'].iloc[-2]:
-                    if (sub_df['RSI'].iloc[-qtd_velas_stop: ].min() > 65) and verifica_dia_util(sub_df['tempo_abertura'].iloc[-1]):
-                        preco_entrada = sub_df['maxima'].iloc[-2]
-                        estado_de_trade = EstadoDeTrade.COMPRADO
-                        preco_stop = sub_df['minima'].iloc[-qtd_velas_stop : ].min()
-                        preco_alvo = ((preco_entrada - preco_stop) * risco_retorno) + preco_entrada   
-                        resultados.update_on_trade_open(ano, mes)
-        elif sub_df['fechamento'].iloc[-2] < sub_df['EMA_200'].iloc[-2] and sub_df['fechamento'].iloc[-2] < sub_df['EMA_90'].iloc[-2]:
-            if (sub_df['fechamento'].iloc[-2] < sub_df[f'EMA_{ema_rapida}'].iloc[-2] 
-                and sub_df['fechamento'].iloc[-2] < sub_df[f'EMA_{ema_lenta}'].iloc[-2]):
-                if sub_df['minima'].iloc[-1] < sub_df['minima'].iloc[-2]:
-                    if (sub_df['RSI'].iloc[-qtd_velas_stop: ].max() < 35) and verifica_dia_util(sub_df['tempo_abertura'].iloc[-1]):
-                        preco_entrada = sub_df['minima'].iloc[-2]
-                        estado_de_trade = EstadoDeTrade.VENDIDO
-                        preco_stop = sub_df['maxima'].iloc[-qtd_velas_stop : ].max()
-                        preco_alvo = preco_entrada - ((preco_stop - preco_entrada) * risco_retorno)
-                        resultados.update_on_trade_open(ano, mes)
+trades = executar_backtest(
+    df,
+    ['maxima', 'minima', 'fechamento', f'EMA_{ema_rapida}', f'EMA_{ema_lenta}', 'EMA_90', 'EMA_200', 'RSI', 'dia_semana'],
+    passo,
+    [risco_retorno, qtd_velas_stop],
+    inicio=pular_velas - 1,
+    fim=len(df) - 1
+)
+resultados.registrar_trades(trades, df.index, pular_velas - 1, len(df) - 1)
 
 resultados.get_results()           
 # resultados.save_summarized_results_to_xlsx()
\ No newline at end of file
@@ -5,9 +5,10 @@ from pybit.unified_trading import HTTP
 import pandas as pd
 import numpy as np
 from datetime import datetime
+from numba import njit
 from managers.results_manager import ResultsManager
-from entidades.estado_trade import EstadoDeTrade
-from utils.utilidades import calcula_percentual_perda_na_compra, calcula_percentual_lucro_na_compra, verifica_dia_util
+from managers.backtest_engine import (executar_backtest, ESTADO, PRECO_ENTRADA, PRECO_STOP, PRECO_ALVO, PRECO_SAIDA,
+                                      DE_FORA, COMPRADO, NADA, ABRIR_COMPRA, FECHAR_COM_GANHO, FECHAR_COM_PERDA)
 from corretoras.funcoes_bybit import carregar_dados_historicos
 
 cliente = HTTP()
@@ -34,11 +35,38 @@ pular_velas = 999
 
 df = carregar_dados_historicos(cripto, tempo_grafico, emas, start, end, pular_velas)
 
-estado_de_trade = EstadoDeTrade.DE_FORA
+# Linhas de `dados` na função de passo
+MAXIMA, MINIMA, FECHAMENTO, EMA_RAPIDA, EMA_LENTA = range(5)
 
-preco_stop = 0
-preco_alvo = 0
-preco_entrada = 0
+@njit
+def passo(c, dados, estado, parametros):
+    risco_retorno = parametros[0]
+    qtd_velas_stop = int(parametros[1])
+
+    if estado[ESTADO] == COMPRADO:
+        if dados[MAXIMA, c] >= estado[PRECO_ALVO]:
+            estado[PRECO_SAIDA] = dados[FECHAMENTO, c]
+            return FECHAR_COM_GANHO
+
+        elif dados[MINIMA, c] <= estado[PRECO_STOP]:
+            estado[PRECO_SAIDA] = dados[FECHAMENTO, c]
+            return FECHAR_COM_PERDA
+
+    elif estado[ESTADO] == DE_FORA:
+        # Lógica para buscar a vela referência
+        fechamento_anterior = dados[FECHAMENTO, c - 1]
+        acima_ema_rapida = fechamento_anterior > dados[EMA_RAPIDA, c - 1]
+        acima_ema_lenta = fechamento_anterior > dados[EMA_LENTA, c - 1]
+        vela_referencia = acima_ema_rapida and acima_ema_lenta
+        gatilho_operacao = dados[MAXIMA, c] > dados[MAXIMA, c - 1]
+
+        if vela_referencia and gatilho_operacao:
+            estado[PRECO_ENTRADA] = dados[FECHAMENTO, c]
+            estado[PRECO_STOP] = dados[MINIMA, c - qtd_velas_stop + 1 : c + 1].min()
+            estado[PRECO_ALVO] = ((estado[PRECO_ENTRADA] - estado[PRECO_STOP]) * risco_retorno) + estado[PRECO_ENTRADA]
+            return ABRIR_COMPRA
+
+    return NADA
 
 resultados = ResultsManager(
     saldo,
@@ -52,44 +80,15 @@ resultados = ResultsManager(
 )
 
 print('Iniciando backtest...')
-for i in range(pular_velas, len(df)):
-    sub_df = df.iloc[:i]
-
-    ano = sub_df.index[-1].year
-    mes = sub_df.index[-1].month
-
-    resultados.initialize_month(ano, mes)
-
-    if estado_de_trade == EstadoDeTrade.COMPRADO:
-        if sub_df['maxima'].iloc[-1] >= preco_alvo:
-            estado_de_trade = EstadoDeTrade.DE_FORA
-            preco_fechamento = sub_df['fechamento'].iloc[-1]
-            percentual_ganho = calcula_percentual_lucro_na_compra(preco_entrada, preco_fechamento)
-            resultados.update_on_gain(ano, mes, percentual_ganho)
-            
-        elif sub_df['minima'].iloc[-1] <= preco_stop:
-            estado_de_trade = EstadoDeTrade.DE_FORA
-            preco_fechamento = sub_df['fechamento'].iloc[-1]
-            percentual_perda = calcula_percentual_perda_na_compra(preco_entrada, preco_fechamento)
-            resultados.update_on_loss(ano, mes, percentual_perda)
-
-    elif estado_de_trade == EstadoDeTrade.DE_FORA:
-            # Lógica para buscar a vela referência
-            fechamento_anterior = sub_df['fechamento'].iloc[-2]
-            acima_ema_rapida = fechamento_anterior > sub_df[f'EMA_{ema_rapida}'].iloc[-2]
-            acima_ema_lenta = fechamento_anterior > sub_df[f'EMA_{ema_lenta}'].iloc[-2]
-            vela_referencia = acima_ema_rapida and acima_ema_lenta
-            gatilho_operação = sub_df['maxima'].iloc[-1] > sub_df['maxima'].iloc[-2]
-            
-            # dia_util = verifica_dia_util(sub_df['tempo_abertura'].iloc[-1])
-            
-            # if vela_referencia and gatilho_operação and dia_util:
-            if vela_referencia and gatilho_operação:
-                preco_entrada = sub_df['fechamento'].iloc[-1]
-                estado_de_trade = EstadoDeTrade.COMPRADO
-                preco_stop = sub_df['minima'].iloc[-qtd_velas_stop : ].min()
-                preco_alvo = ((preco_entrada - preco_stop) * risco_retorno) + preco_entrada   
-                resultados.update_on_trade_open(ano, mes)
+trades = executar_backtest(
+    df,
+    ['maxima', 'minima', 'fechamento', f'EMA_{ema_rapida}', f'EMA_{ema_lenta}'],
+    passo,
+    [risco_retorno, qtd_velas_stop],
+    inicio=pular_velas - 1,
+    fim=len(df) - 1
+)
+resultados.registrar_trades(trades, df.index, pular_velas - 1, len(df) - 1)
 
 resultados.get_results()           
 resultados.save_summarized_results_to_xlsx()
\ No newline at end of file
@@ -5,11 +5,12 @@ from pybit.unified_trading import HTTP
 import pandas as pd
 import numpy as np
 from datetime import datetime
+from numba import njit
 from managers.results_manager import ResultsManager
-from entidades.estado_trade import EstadoDeTrade
+from managers.backtest_engine import (executar_backtest, ESTADO, PRECO_ENTRADA, PRECO_STOP, PRECO_ALVO, PRECO_SAIDA,
+                                      DE_FORA, COMPRADO, NADA, ABRIR_COMPRA, FECHAR_COM_GANHO, FECHAR_COM_PERDA)
 from indicadores.indicadores_osciladores import calcula_rsi
 from indicadores.padroes_velas import engolfo_alta, engolfo_baixa
-from utils.utilidades import ajusta_start_time, calcula_percentual_perda_na_compra, calcula_percentual_lucro_na_compra
 from corretoras.funcoes_bybit import carregar_dados_historicos
 
 cliente = HTTP()
@@ -40,11 +41,39 @@ df['RSI'] =calcula_rsi(df)
 df['engolfo_alta'] = engolfo_alta(df)
 df['engolfo_baixa'] = engolfo_baixa(df)
 
-estado_de_trade = EstadoDeTrade.DE_FORA
+# Linhas de `dados` na função de passo
+MAXIMA, MINIMA, ENGOLFO_ALTA = range(3)
 
-preco_stop = 0
-preco_alvo = 0
-preco_entrada = 0
+@njit
+def passo(c, dados, estado, parametros):
+    risco_retorno = parametros[0]
+    qtd_velas_stop = int(parametros[1])
+
+    if estado[ESTADO] == COMPRADO:
+
+        if dados[MAXIMA, c] >= estado[PRECO_ALVO]:
+            estado[PRECO_SAIDA] = estado[PRECO_ALVO]
+            return FECHAR_COM_GANHO
+
+        elif dados[MINIMA, c] <= estado[PRECO_STOP]:
+            estado[PRECO_SAIDA] = estado[PRECO_STOP]
+            return FECHAR_COM_PERDA
+
+    # Lógica para buscar entrada nas operações, seja de compra ou de venda
+    elif estado[ESTADO] == DE_FORA:
+
+        if dados[ENGOLFO_ALTA, c - 1] == 1:
+
+            # IF - Lógica para buscar o gatílho de compra caso tenha encontrado a vela referência
+            if dados[MAXIMA, c] > dados[MAXIMA, c - 1]:
+                estado[PRECO_ENTRADA] = dados[MAXIMA, c - 1]
+
+                # PARA TESTAR: mudar o c para c + 1 para adicionar a vela gatilho na contagem
+                estado[PRECO_STOP] = dados[MINIMA, c - qtd_velas_stop + 1 : c + 1].min()
+                estado[PRECO_ALVO] = ((estado[PRECO_ENTRADA] - estado[PRECO_STOP]) * risco_retorno) + estado[PRECO_ENTRADA]
+                return ABRIR_COMPRA
+
+    return NADA
 
 resultados = ResultsManager(
     saldo,
@@ -57,47 +86,15 @@ resultados = ResultsManager(
     alavancagem
 )
 
-for i in range(pular_velas, len(df)):
-    sub_df = df.iloc[:i]
-
-    ano = sub_df.index[-1].year
-    mes = sub_df.index[-1].month
-
-    resultados.initialize_month(ano, mes)
-        
-    if estado_de_trade == EstadoDeTrade.COMPRADO:
-
-        if sub_df['maxima'].iloc[-1] >= preco_alvo:
-            estado_de_trade = EstadoDeTrade.DE_FORA
-            percentual_ganho = calcula_percentual_lucro_na_compra(preco_entrada, preco_alvo)
-            resultados.update_on_gain(ano, mes, percentual_ganho)
-            
-        elif sub_df['minima'].iloc[-1] <= preco_stop:
-            estado_de_trade = EstadoDeTrade.DE_FORA
-            percentual_perda = calcula_percentual_perda_na_compra(preco_entrada, preco_stop)
-            resultados.update_on_loss(ano, mes, percentual_perda)
-
-    # Lógica para buscar entrada nas operações, seja de compra ou de venda
-    elif estado_de_trade == EstadoDeTrade.DE_FORA:
-
-            if sub_df['engolfo_alta'].iloc[-2] == True:
-
-                # IF - Lógica para buscar o gatílho de compra caso tenha encontrado a vela referência
-                if sub_df['maxima'].iloc[-1] > sub_df['maxima'].iloc[-2]:
-                    # Tirar comentários dos prints abaixo para visualizar os preços quando precisar testar
-                    # print('comprou na máxima da vela na posição i', i)
-                    preco_entrada = sub_df['maxima'].iloc[-2]
-                    # print('preço de compra:', preco_entrada)
-                    # print('comprou na vela que abriu em:', df['tempo_abertura'].iloc[i])
-                    estado_de_trade = EstadoDeTrade.COMPRADO
-
-                    # PARA TESTAR: mudar o i para i+1 para adicionar a vela gatilho na contagem
-                    preco_stop = sub_df['minima'].iloc[-qtd_velas_stop : ].min()
-                    # print('preço de stop:', preco_stop)
-                    preco_alvo = ((preco_entrada - preco_stop) * risco_retorno) + preco_entrada   
-                    # print('preço de alvo:', preco_alvo)
-                    # print('---------------')
-                    resultados.update_on_trade_open(ano, mes)
+trades = executar_backtest(
+    df,
+    ['maxima', 'minima', 'engolfo_alta'],
+    passo,
+    [risco_retorno, qtd_velas_stop],
+    inicio=pular_velas - 1,
+    fim=len(df) - 1
+)
+resultados.registrar_trades(trades, df.index, pular_velas - 1, len(df) - 1)
 
 resultados.get_results()           
 # resultados.save_summarized_results_to_xlsx()
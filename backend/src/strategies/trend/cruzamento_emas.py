@@ -5,9 +5,10 @@ from pybit.unified_trading import HTTP
 import pandas as pd
 import numpy as np
 from datetime import datetime
+from numba import njit
 from managers.results_manager import ResultsManager
-from entidades.estado_trade import EstadoDeTrade
-from utils.utilidades import ajusta_start_time, calcula_percentual_perda_na_compra, calcula_percentual_lucro_na_compra
+from managers.backtest_engine import (executar_backtest, ESTADO, PRECO_ENTRADA, PRECO_SAIDA, DE_FORA, COMPRADO,
+                                      NADA, ABRIR_COMPRA, FECHAR_COM_GANHO, FECHAR_COM_PERDA)
 from corretoras.funcoes_bybit import carregar_dados_historicos
 
 cliente = HTTP()
@@ -34,11 +35,40 @@ pular_velas = 999
 
 df = carregar_dados_historicos(cripto, tempo_grafico, emas, start, end, pular_velas)
 
-estado_de_trade = EstadoDeTrade.DE_FORA
+# Linhas de `dados` na função de passo
+MAXIMA, FECHAMENTO, EMA_RAPIDA, EMA_LENTA = range(4)
 
-preco_stop = 0
-preco_alvo = 0
-preco_entrada = 0
+@njit
+def passo(c, dados, estado, parametros):
+    if estado[ESTADO] == COMPRADO:
+
+        if dados[EMA_RAPIDA, c] < dados[EMA_LENTA, c]:
+            estado[PRECO_SAIDA] = dados[FECHAMENTO, c]
+            if dados[FECHAMENTO, c] > estado[PRECO_ENTRADA]:
+                return FECHAR_COM_GANHO
+
+            if dados[FECHAMENTO, c] < estado[PRECO_ENTRADA]:
+                return FECHAR_COM_PERDA
+
+    # elif estado[ESTADO] == VENDIDO:
+    #     if dados[EMA_RAPIDA, c] > dados[EMA_LENTA, c]:
+    #         estado[PRECO_SAIDA] = dados[FECHAMENTO, c]
+    #         if dados[FECHAMENTO, c] < estado[PRECO_ENTRADA]:
+    #             return FECHAR_COM_GANHO
+    #         if dados[FECHAMENTO, c] > estado[PRECO_ENTRADA]:
+    #             return FECHAR_COM_PERDA
+
+    elif estado[ESTADO] == DE_FORA:
+        if dados[EMA_RAPIDA, c - 1] > dados[EMA_LENTA, c - 1]:
+            if dados[MAXIMA, c] > dados[MAXIMA, c - 1]:
+                estado[PRECO_ENTRADA] = dados[MAXIMA, c - 1]
+                return ABRIR_COMPRA
+        # elif dados[EMA_RAPIDA, c - 1] < dados[EMA_LENTA, c - 1]:
+        #     if dados[MINIMA, c] < dados[MINIMA, c - 1]:
+        #         estado[PRECO_ENTRADA] = dados[MINIMA, c - 1]
+        #         return ABRIR_VENDA
+
+    return NADA
 
 resultados = ResultsManager(
     saldo,
@@ -51,49 +81,15 @@ resultados = ResultsManager(
     alavancagem
 )
 
-for i in range(pular_velas, len(df)):
-    sub_df = df.iloc[:i]
-
-    ano = sub_df.index[-1].year
-    mes = sub_df.index[-1].month
-
-    resultados.initialize_month(ano, mes)
-        
-    if estado_de_trade == EstadoDeTrade.COMPRADO:
-        
-        if sub_df[f'EMA_{ema_rapida}'].iloc[-1] < sub_df[f'EMA_{ema_lenta}'].iloc[-1]:
-            if sub_df['fechamento'].iloc[-1] > preco_entrada:
-                percentual_ganho = calcula_percentual_lucro_na_compra(preco_entrada, sub_df['fechamento'].iloc[-1])
-                resultados.update_on_gain(ano, mes, percentual_ganho)
-                estado_de_trade = EstadoDeTrade.DE_FORA
-
-            if sub_df['fechamento'].iloc[-1] < preco_entrada:
-                percentual_perda = calcula_percentual_perda_na_compra(preco_entrada, sub_df['fechamento'].iloc[-1])
-                resultados.update_on_loss(ano, mes, percentual_perda)
-                estado_de_trade = EstadoDeTrade.DE_FORA
-
-    # elif estado_de_trade == EstadoDeTrade.VENDIDO:
-    #     if sub_df[f'EMA_{ema_rapida}'].iloc[-1] > sub_df[f'EMA_{ema_lenta}'].iloc[-1]:
-    #         if sub_df['fechamento'].iloc[-1] < preco_entrada:
-    #             percentual_ganho = calcula_percentual_lucro_na_venda(preco_entrada, sub_df['fechamento'].iloc[-1])
-    #             resultados.update_on_gain(ano, mes, percentual_ganho)
-    #             estado_de_trade = EstadoDeTrade.DE_FORA
-    #         if sub_df['fechamento'].iloc[-1] > preco_entrada:
-    #             percentual_perda = calcula_percentual_perda_na_venda(preco_entrada, sub_df['fechamento'].iloc[-1])
-    #             resultados.update_on_loss(ano, mes, percentual_perda)
-    #             estado_de_trade = EstadoDeTrade.DE_FORA
-
-    elif estado_de_trade == EstadoDeTrade.DE_FORA:
-            if sub_df[f'EMA_{ema_rapida}'].iloc[-2] > sub_df[f'EMA_{ema_lenta}'].iloc[-2]:
-                if sub_df['maxima'].iloc[-1] > sub_df['maxima'].iloc[-2]:
-                    preco_entrada = sub_df['maxima'].iloc[-2]
-                    estado_de_trade = EstadoDeTrade.COMPRADO
-                    resultados.update_on_trade_open(ano, mes)
-            # elif sub_df[f'EMA_{ema_rapida}'].iloc[-2] < sub_df[f'EMA_{ema_lenta}'].iloc[-2]:
-            #     if sub_df['minima'].iloc[-1] < sub_df['minima'].iloc[-2]:
-            #         preco_entrada = sub_df['minima'].iloc[-2]
-            #         estado_de_trade = EstadoDeTrade.VENDIDO
-            #         resultados.update_on_trade_open(ano, mes)
+trades = executar_backtest(
+    df,
+    ['maxima', 'fechamento', f'EMA_{ema_rapida}', f'EMA_{ema_lenta}'],
+    passo,
+    [],
+    inicio=pular_velas - 1,
+    fim=len(df) - 1
+)
+resultados.registrar_trades(trades, df.index, pular_velas - 1, len(df) - 1)
 
 resultados.get_results()           
 resultados.save_summarized_results_to_xlsx()
\ No newline at end of file
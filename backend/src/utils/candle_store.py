@@ -0,0 +1,267 @@
+"""
+Armazenamento colunar de velas históricas.
+
+Cada par (símbolo, tempo gráfico) vive em um único arquivo binário de registros
+de tamanho fixo (tempo em int64 ms + OHLCV/turnover em float64), ordenados pelo
+tempo de abertura. O arquivo é lido via memory-map, então servir um intervalo
+[start, end) custa uma busca binária e a cópia apenas das linhas pedidas, sem
+parse de JSON nem conversões `astype(float)`.
+
+Novas velas posteriores à última armazenada são anexadas ao final do arquivo;
+velas que se sobrepõem ou ficam antes do fim atual disparam um merge
+(dedupe + ordenação) regravado de forma atômica.
+"""
+
+import json
+import os
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+PASTA_PADRAO = 'data/velas'
+
+COLUNAS_VELAS = ['tempo_abertura', 'abertura', 'maxima', 'minima', 'fechamento', 'volume', 'turnover']
+
+DTYPE_VELA = np.dtype([
+    ('tempo_abertura', np.int64),
+    ('abertura', np.float64),
+    ('maxima', np.float64),
+    ('minima', np.float64),
+    ('fechamento', np.float64),
+    ('volume', np.float64),
+    ('turnover', np.float64),
+])
+
+_MINUTO_MS = 60_000
+_DURACAO_ESPECIAL_MS = {
+    'D': 24 * 60 * _MINUTO_MS,
+    'W': 7 * 24 * 60 * _MINUTO_MS,
+    'M': 31 * 24 * 60 * _MINUTO_MS,  # limite superior; meses não têm passo fixo (ver `avancar_aberturas`)
+}
+
+# Um lock por arquivo: várias threads do backend (API/otimizador) podem pedir o mesmo símbolo
+_locks: Dict[str, threading.Lock] = {}
+_locks_guard = threading.Lock()
+
+
+def intervalo_em_ms(tempo_grafico) -> int:
+    """Duração de uma vela do tempo gráfico (formato Bybit: '1', '15', '60', 'D', 'W', 'M')."""
+    tempo_grafico = str(tempo_grafico)
+    if tempo_grafico in _DURACAO_ESPECIAL_MS:
+        return _DURACAO_ESPECIAL_MS[tempo_grafico]
+    return int(tempo_grafico) * _MINUTO_MS
+
+
+def avancar_aberturas(tempos, tempo_grafico, velas: int = 1) -> np.ndarray:
+    """
+    Tempo de abertura da vela `velas` posições depois de cada tempo em `tempos`.
+
+    Para 'M' segue o calendário (as velas mensais abrem no dia 1, 00:00 UTC);
+    nos demais tempos gráficos é só somar a duração fixa.
+    """
+    tempos = np.asarray(tempos, dtype=np.int64)
+    if str(tempo_grafico) != 'M':
+        return tempos + velas * intervalo_em_ms(tempo_grafico)
+    datas = pd.to_datetime(tempos.ravel(), unit='ms') + pd.DateOffset(months=velas)
+    return np.asarray(datas.values.astype('datetime64[ms]').astype(np.int64)).reshape(tempos.shape)
+
+
+def velas_para_array(velas: Iterable[Sequence]) -> np.ndarray:
+    """Converte a lista crua da API (listas de strings) em array estruturado."""
+    velas = list(velas)
+    if not velas:
+        return np.empty(0, dtype=DTYPE_VELA)
+
+    bruto = np.asarray(velas, dtype=object)[:, :len(COLUNAS_VELAS)]
+    registros = np.empty(len(bruto), dtype=DTYPE_VELA)
+    registros['tempo_abertura'] = bruto[:, 0].astype(np.int64)
+    for indice, coluna in enumerate(COLUNAS_VELAS[1:], start=1):
+        registros[coluna] = bruto[:, indice].astype(np.float64)
+    return registros
+
+
+def mesclar_velas(*blocos: np.ndarray) -> np.ndarray:
+    """Concatena blocos de velas, remove tempos duplicados (mantém o mais recente) e ordena."""
+    blocos = [bloco for bloco in blocos if len(bloco)]
+    if not blocos:
+        return np.empty(0, dtype=DTYPE_VELA)
+
+    todas = np.concatenate(blocos)
+    # Inverte para que np.unique (que pega a primeira ocorrência) fique com a versão mais nova
+    invertidas = todas[::-1]
+    _, indices = np.unique(invertidas['tempo_abertura'], return_index=True)
+    return invertidas[indices]
+
+
+def array_para_dataframe(registros: np.ndarray) -> pd.DataFrame:
+    """Monta o DataFrame no formato de `busca_velas`/`carregar_dados_historicos`."""
+    df = pd.DataFrame(
+        {coluna: np.asarray(registros[coluna]) for coluna in COLUNAS_VELAS[1:]},
+        index=pd.to_datetime(np.asarray(registros['tempo_abertura']), unit='ms'),
+    )
+    df.index.name = 'tempo_abertura'
+    return df
+
+
+class CandleStore:
+    """Arquivo de velas de um símbolo/tempo gráfico com leitura por memory-map."""
+
+    def __init__(self, cripto: str, tempo_grafico, pasta: str = PASTA_PADRAO):
+        self.cripto = cripto
+        self.tempo_grafico = str(tempo_grafico)
+        self.pasta = pasta
+        self.caminho = os.path.join(pasta, f'{cripto}_{self.tempo_grafico}.bin')
+        # Trechos já consultados na corretora que não têm velas (manutenção, antes da listagem)
+        self.caminho_sem_dados = f'{self.caminho}.sem_dados.json'
+        self.intervalo_ms = intervalo_em_ms(self.tempo_grafico)
+
+        with _locks_guard:
+            self._lock = _locks.setdefault(os.path.abspath(self.caminho), threading.Lock())
+
+    # ------------------------------------------------------------------
+    # Leitura
+    # ------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        if not os.path.exists(self.caminho):
+            return 0
+        # Ignora um eventual registro parcial no final (escrita interrompida)
+        return os.path.getsize(self.caminho) // DTYPE_VELA.itemsize
+
+    def _mapear(self) -> np.ndarray:
+        quantidade = len(self)
+        if quantidade == 0:
+            return np.empty(0, dtype=DTYPE_VELA)
+        return np.memmap(self.caminho, dtype=DTYPE_VELA, mode='r', shape=(quantidade,))
+
+    def primeiro_tempo(self) -> Optional[int]:
+        registros = self._mapear()
+        return int(registros['tempo_abertura'][0]) if len(registros) else None
+
+    def ultimo_tempo(self) -> Optional[int]:
+        registros = self._mapear()
+        return int(registros['tempo_abertura'][-1]) if len(registros) else None
+
+    def ler(self, start_ms: Optional[int] = None, end_ms: Optional[int] = None) -> np.ndarray:
+        """
+        Retorna uma cópia das velas com tempo de abertura em [start_ms, end_ms).
+
+        Só as páginas do intervalo pedido são lidas do disco.
+        """
+        registros = self._mapear()
+        if len(registros) == 0:
+            return registros
+
+        tempos = registros['tempo_abertura']
+        inicio = 0 if start_ms is None else int(np.searchsorted(tempos, start_ms, side='left'))
+        fim = len(registros) if end_ms is None else int(np.searchsorted(tempos, end_ms, side='left'))
+        return np.array(registros[inicio:fim])
+
+    def ler_dataframe(self, start_ms: Optional[int] = None, end_ms: Optional[int] = None) -> pd.DataFrame:
+        return array_para_dataframe(self.ler(start_ms, end_ms))
+
+    def proxima_abertura(self, tempos) -> np.ndarray:
+        """Tempo de abertura da vela seguinte a cada tempo (= fechamento da vela)."""
+        return avancar_aberturas(tempos, self.tempo_grafico)
+
+    def trechos_sem_dados(self) -> List[Tuple[int, int]]:
+        if not os.path.exists(self.caminho_sem_dados):
+            return []
+        with open(self.caminho_sem_dados, 'r') as arquivo:
+            return [tuple(trecho) for trecho in json.load(arquivo)]
+
+    def intervalos_faltantes(self, start_ms: int, end_ms: int) -> List[Tuple[int, int]]:
+        """
+        Lista os trechos [inicio, fim) de [start_ms, end_ms) sem velas no arquivo.
+
+        Lacunas internas são detectadas quando uma vela não abre onde a anterior
+        termina; trechos marcados com `marcar_sem_dados` são descontados.
+        """
+        if start_ms >= end_ms:
+            return []
+
+        tempos = self.ler(start_ms, end_ms)['tempo_abertura']
+        if len(tempos) == 0:
+            faltantes = [(start_ms, end_ms)]
+        else:
+            faltantes = []
+            if tempos[0] > start_ms:
+                faltantes.append((start_ms, int(tempos[0])))
+            proximas = self.proxima_abertura(tempos)
+            saltos = np.flatnonzero(tempos[1:] > proximas[:-1])
+            for indice in saltos:
+                faltantes.append((int(proximas[indice]), int(tempos[indice + 1])))
+            proximo = int(proximas[-1])
+            if proximo < end_ms:
+                faltantes.append((proximo, end_ms))
+
+        for inicio_vazio, fim_vazio in self.trechos_sem_dados():
+            restantes = []
+            for inicio, fim in faltantes:
+                if fim <= inicio_vazio or inicio >= fim_vazio:
+                    restantes.append((inicio, fim))
+                    continue
+                if inicio < inicio_vazio:
+                    restantes.append((inicio, inicio_vazio))
+                if fim > fim_vazio:
+                    restantes.append((fim_vazio, fim))
+            faltantes = restantes
+
+        return faltantes
+
+    # ------------------------------------------------------------------
+    # Escrita
+    # ------------------------------------------------------------------
+
+    def gravar(self, velas) -> int:
+        """
+        Persiste velas (array estruturado ou lista crua da API).
+
+        Velas posteriores à última armazenada são apenas anexadas ao arquivo;
+        qualquer sobreposição força merge + regravação atômica.
+
+        Returns:
+            Quantidade de velas no arquivo após a gravação.
+        """
+        novas = velas if isinstance(velas, np.ndarray) else velas_para_array(velas)
+        if len(novas) == 0:
+            return len(self)
+        novas = mesclar_velas(novas)
+
+        with self._lock:
+            os.makedirs(self.pasta, exist_ok=True)
+            ultimo = self.ultimo_tempo()
+
+            if ultimo is None or novas['tempo_abertura'][0] > ultimo:
+                tamanho_valido = len(self) * DTYPE_VELA.itemsize
+                with open(self.caminho, 'ab') as arquivo:
+                    # Descarta um registro parcial antes de anexar, mantendo o alinhamento
+                    arquivo.truncate(tamanho_valido)
+                    arquivo.write(novas.tobytes())
+            else:
+                mescladas = mesclar_velas(self.ler(), novas)
+                temporario = f'{self.caminho}.tmp'
+                with open(temporario, 'wb') as arquivo:
+                    arquivo.write(mescladas.tobytes())
+                os.replace(temporario, self.caminho)
+
+        return len(self)
+
+    def marcar_sem_dados(self, trechos: Iterable[Tuple[int, int]]) -> None:
+        """Registra trechos confirmados como vazios na corretora para não consultá-los de novo."""
+        novos = [(int(inicio), int(fim)) for inicio, fim in trechos if fim > inicio]
+        if not novos:
+            return
+
+        with self._lock:
+            os.makedirs(self.pasta, exist_ok=True)
+            mesclados: List[List[int]] = []
+            for inicio, fim in sorted(self.trechos_sem_dados() + novos):
+                if mesclados and inicio <= mesclados[-1][1]:
+                    mesclados[-1][1] = max(mesclados[-1][1], fim)
+                else:
+                    mesclados.append([inicio, fim])
+            with open(self.caminho_sem_dados, 'w') as arquivo:
+                json.dump(mesclados, arquivo)
@@ -17,4 +17,14 @@ def carregar_velas_json(caminho_arquivo):
 
 def salvar_velas_json(caminho_arquivo, velas):
     with open(caminho_arquivo, 'w') as f:
-        json.dump(velas, f)
\ No newline at end of file
+        json.dump(velas, f)
+
+def importar_velas_json_legado(store, caminho_arquivo):
+    """Migra um cache JSON antigo (um arquivo por intervalo) para o CandleStore colunar."""
+    velas = carregar_velas_json(caminho_arquivo)
+    if not velas:
+        return 0
+    total = store.gravar(velas)
+    os.replace(caminho_arquivo, f'{caminho_arquivo}.migrado')
+    print(f'Cache JSON migrado para {store.caminho}: {caminho_arquivo}')
+    return total
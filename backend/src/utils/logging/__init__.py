@@ -28,6 +28,8 @@ from .enums import LogLevel, LogCategory
 from .models import LogEvent, LogConfig
 from .logger import TradingLogger, get_logger, setup_logger
 from .config import ConfigManager, load_config
+from .pipeline import LogPipeline, get_log_pipeline
+from .store import LogStore, get_log_store
 from ..notifications.events import get_event_emitter
 from ..notifications.telegram import setup_telegram_notifications
 
@@ -47,6 +49,12 @@ __all__ = [
     # Config
     'ConfigManager',
     'load_config',
+    # Pipeline assíncrono
+    'LogPipeline',
+    'get_log_pipeline',
+    # Store consultável
+    'LogStore',
+    'get_log_store',
     # Notifications
     'setup_telegram_notifications',
     # Funções de conveniência (retrocompatibilidade)
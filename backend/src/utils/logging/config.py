@@ -99,7 +99,15 @@ class ConfigManager:
             master_file_level=data.get('master_file_level', 'DEBUG'),
             telegram_enabled=data.get('telegram_enabled', False),
             telegram_categories=data.get('telegram_categories', []),
-            handlers=handlers
+            handlers=handlers,
+            async_enabled=data.get('async_enabled', True),
+            queue_size=data.get('queue_size', 8192),
+            overflow_policy=data.get('overflow_policy', 'drop_oldest'),
+            batch_size=data.get('batch_size', 256),
+            flush_interval=data.get('flush_interval', 0.2),
+            store_enabled=data.get('store_enabled', True),
+            store_path=data.get('store_path', 'logs/store'),
+            store_keep_days=data.get('store_keep_days', 90)
         )
     
     def save(self, filepath: Optional[str] = None) -> None:
@@ -17,6 +17,53 @@ from .models import LogEvent
 from .enums import LogCategory
 
 
+# Flush em lote: na thread do consumidor do LogPipeline (dentro de `modo_lote`),
+# os handlers de arquivo só escrevem no buffer do arquivo e o flush sai uma vez
+# por lote em `descarregar_lote`; nas demais threads o flush continua por registro
+_lote = threading.local()
+_pendentes: Set[logging.Handler] = set()  # só tocado pela thread em modo lote
+
+
+class modo_lote:
+    """Context manager que adia os flushes dos handlers de arquivo da thread atual."""
+
+    def __enter__(self):
+        _lote.ativo = True
+        return self
+
+    def __exit__(self, *exc):
+        _lote.ativo = False
+        descarregar_lote()
+
+
+def descarregar_lote() -> None:
+    """Faz o flush adiado de todos os arquivos escritos desde o último lote."""
+    while _pendentes:
+        handler = _pendentes.pop()
+        try:
+            super(BatchFlushMixin, handler).flush()
+        except Exception as e:
+            print(f"⚠️ Erro no flush do log: {e}")
+
+
+class BatchFlushMixin:
+    """Adia o flush por registro de `StreamHandler.emit` enquanto a thread está em `modo_lote`."""
+
+    def flush(self) -> None:
+        if getattr(_lote, 'ativo', False):
+            _pendentes.add(self)
+            return
+        super().flush()
+
+
+class BatchedFileHandler(BatchFlushMixin, logging.FileHandler):
+    pass
+
+
+class BatchedTimedRotatingFileHandler(BatchFlushMixin, logging.handlers.TimedRotatingFileHandler):
+    pass
+
+
 class FileHandlerFactory:
     """
     Factory para criar handlers de arquivo com rotação.
@@ -54,7 +101,7 @@ class FileHandlerFactory:
         os.makedirs(os.path.dirname(filepath), exist_ok=True)
         
         # Criar handler
-        handler = logging.handlers.TimedRotatingFileHandler(
+        handler = BatchedTimedRotatingFileHandler(
             filepath,
             when=when,
             interval=1,
@@ -170,7 +217,7 @@ class DailyDateFileHandler(logging.Handler):
         os.makedirs(os.path.dirname(filepath), exist_ok=True)
         
         # Criar novo handler
-        self._current_handler = logging.FileHandler(
+        self._current_handler = BatchedFileHandler(
             filepath,
             encoding=self.encoding
         )
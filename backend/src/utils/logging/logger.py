@@ -5,6 +5,7 @@ Mais simples, type-safe e extensível através de eventos.
 """
 
 import logging
+import os
 from typing import Dict, Any, Optional
 from datetime import datetime
 
@@ -13,6 +14,8 @@ from .enums import LogLevel, LogCategory
 from .formatters import get_formatter
 from .handlers import FileHandlerFactory, CategoryFilterHandler, ConditionalHandler
 from .config import ConfigManager
+from .pipeline import get_log_pipeline
+from .store import get_log_store
 from ..notifications.events import get_event_emitter
 
 
@@ -48,6 +51,18 @@ class TradingLogger:
         
         # Setup handlers
         self._setup_handlers()
+        
+        # Store estruturado consultável (antes do pipeline: no atexit, a fila é drenada antes do store fechar)
+        if self.config.store_enabled:
+            try:
+                get_log_store(self.config)
+            except Exception as e:
+                print(f"⚠️ Erro ao abrir store de logs: {e}")
+        
+        # Pipeline assíncrono (LOG_ASYNC=0 força o modo síncrono, ex.: em scripts curtos)
+        self._pipeline = None
+        if self.config.async_enabled and os.getenv('LOG_ASYNC', '1') != '0':
+            self._pipeline = get_log_pipeline(self.config)
     
     def _setup_handlers(self) -> None:
         """Configura handlers de log."""
@@ -177,18 +192,27 @@ class TradingLogger:
             context=context
         )
         
+        # Modo assíncrono: só enfileira; formatação, arquivos e subscribers ficam no consumidor
+        if self._pipeline is not None:
+            self._pipeline.submit(self, log_event)
+        else:
+            self._dispatch(log_event)
+    
+    def _dispatch(self, log_event: LogEvent) -> None:
+        """Formata e grava o evento nos handlers e o entrega aos subscribers."""
         # Criar LogRecord do Python logging
         record = self._logger.makeRecord(
             name=self._logger.name,
-            level=level.value,
+            level=log_event.level.value,
             fn="",
             lno=0,
-            msg=message,
+            msg=log_event.message,
             args=(),
             exc_info=None
         )
         
-        # Anexar LogEvent ao record
+        # Anexar LogEvent ao record (com o horário da chamada, não o do consumidor)
+        record.created = log_event.timestamp.timestamp()
         record.log_event = log_event
         
         # Log através do Python logging
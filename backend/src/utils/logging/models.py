@@ -20,12 +20,14 @@ except ImportError:
 from .enums import LogLevel, LogCategory
 
 
-@dataclass
+@dataclass(frozen=True)
 class LogEvent:
     """
     Evento de log imutável que representa uma mensagem de log.
     
     Substitui o uso de strings + dicionários por um objeto tipado.
+    Congelado: o mesmo evento passa da thread que loga para o consumidor do
+    LogPipeline e dali para todos os subscribers.
     """
     level: LogLevel
     category: LogCategory
@@ -41,17 +43,17 @@ class LogEvent:
         """Validação após inicialização."""
         # Garantir que level é LogLevel
         if isinstance(self.level, str):
-            self.level = LogLevel[self.level.upper()]
+            object.__setattr__(self, 'level', LogLevel[self.level.upper()])
         elif isinstance(self.level, int):
-            self.level = LogLevel(self.level)
+            object.__setattr__(self, 'level', LogLevel(self.level))
         
         # Garantir que category é LogCategory
         if isinstance(self.category, str):
             try:
-                self.category = LogCategory(self.category)
+                object.__setattr__(self, 'category', LogCategory(self.category))
             except ValueError:
                 # Se não for uma categoria válida, usar genérica
-                self.category = LogCategory.INFO
+                object.__setattr__(self, 'category', LogCategory.INFO)
     
     @property
     def is_error(self) -> bool:
@@ -149,6 +151,24 @@ if PYDANTIC_AVAILABLE:
             default_factory=lambda: ["AGENT_RESPONSE", "AGENT_ACTION", "AGENT_DECISION"]
         )
         handlers: Dict[str, HandlerConfig] = Field(default_factory=dict)
+        # Pipeline assíncrono (LogPipeline): a thread que loga só enfileira o evento
+        async_enabled: bool = True
+        queue_size: int = 8192
+        overflow_policy: str = "drop_oldest"  # drop_oldest | drop_newest | block
+        batch_size: int = 256
+        flush_interval: float = 0.2
+        # Store estruturado (LogStore): segmentos JSON Lines + índice consultável
+        store_enabled: bool = True
+        store_path: str = "logs/store"
+        store_keep_days: int = 90
+        
+        @field_validator('overflow_policy')
+        @classmethod
+        def validate_overflow_policy(cls, v: str) -> str:
+            """Valida a política de fila cheia."""
+            if v not in ("drop_oldest", "drop_newest", "block"):
+                raise ValueError(f"Política de overflow inválida: {v}")
+            return v
         
         @field_validator('log_level', 'console_level', 'master_file_level')
         @classmethod
@@ -248,6 +268,16 @@ else:
             default_factory=lambda: ["AGENT_RESPONSE", "AGENT_ACTION", "AGENT_DECISION"]
         )
         handlers: Dict[str, HandlerConfig] = field(default_factory=dict)
+        # Pipeline assíncrono (LogPipeline): a thread que loga só enfileira o evento
+        async_enabled: bool = True
+        queue_size: int = 8192
+        overflow_policy: str = "drop_oldest"  # drop_oldest | drop_newest | block
+        batch_size: int = 256
+        flush_interval: float = 0.2
+        # Store estruturado (LogStore): segmentos JSON Lines + índice consultável
+        store_enabled: bool = True
+        store_path: str = "logs/store"
+        store_keep_days: int = 90
         
         @classmethod
         def default(cls) -> "LogConfig":
@@ -0,0 +1,198 @@
+"""
+Pipeline assíncrono do TradingLogger.
+
+A thread que loga (bot, ordem, scanner) só cria o LogEvent imutável e o coloca
+em um buffer circular limitado; uma thread consumidora dedicada faz o resto:
+formatação, roteamento por categoria para os handlers, escrita em arquivo em
+lote (flush por tamanho de lote ou a cada `intervalo_flush`) e o despacho para
+os subscribers de 'log_event' (Telegram, MonitorState, LogStreamManager).
+
+Com a fila cheia vale a `politica`:
+- drop_oldest: descarta o evento mais antigo (padrão; quem loga nunca espera);
+- drop_newest: descarta o evento novo;
+- block: espera espaço por até `espera_maxima` segundos e então descarta o novo.
+
+Descartes são contados em `stats()` e avisados no próprio log pelo consumidor.
+"""
+
+import atexit
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+from .enums import LogLevel, LogCategory
+from .handlers import modo_lote, descarregar_lote
+from .models import LogEvent
+
+POLITICAS = ('drop_oldest', 'drop_newest', 'block')
+
+
+class LogPipeline:
+    """Buffer circular de eventos + thread consumidora (ordem de chegada preservada)."""
+
+    def __init__(
+        self,
+        capacidade: int = 8192,
+        politica: str = 'drop_oldest',
+        tamanho_lote: int = 256,
+        intervalo_flush: float = 0.2,
+        espera_maxima: float = 1.0
+    ):
+        if politica not in POLITICAS:
+            raise ValueError(f"Política de overflow inválida: {politica}")
+        self.capacidade = capacidade
+        self.politica = politica
+        self.tamanho_lote = max(1, tamanho_lote)
+        self.intervalo_flush = intervalo_flush
+        self.espera_maxima = espera_maxima
+
+        # deque com maxlen: append/popleft atômicos e descarte do mais antigo sem lock
+        self._fila: deque = deque(maxlen=capacidade)
+        self._acordar = threading.Event()
+        self._espaco = threading.Condition()
+        self._parar = threading.Event()
+        self._ocupado = False
+
+        self.processados = 0
+        self.descartados = 0
+        self.lotes = 0
+        self.maior_fila = 0
+        self._descartes_avisados = 0
+
+        self._thread = threading.Thread(target=self._run, name="LogPipeline", daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def submit(self, logger, evento: LogEvent) -> bool:
+        """Enfileira o evento (caminho quente). Retorna False se ele foi descartado."""
+        fila = self._fila
+        if len(fila) >= self.capacidade and threading.current_thread() is not self._thread:
+            if self.politica == 'drop_newest' or (self.politica == 'block' and not self._esperar_espaco()):
+                self.descartados += 1
+                return False
+            if self.politica == 'drop_oldest':
+                self.descartados += 1
+        fila.append((logger, evento))
+        if len(fila) >= self.tamanho_lote:
+            self._acordar.set()
+        return True
+
+    def _esperar_espaco(self) -> bool:
+        self._acordar.set()
+        with self._espaco:
+            return self._espaco.wait_for(lambda: len(self._fila) < self.capacidade, timeout=self.espera_maxima)
+
+    def _run(self) -> None:
+        while not self._parar.is_set():
+            self._acordar.wait(self.intervalo_flush)
+            self._acordar.clear()
+            self._processar_disponiveis()
+        self._processar_disponiveis()
+
+    def _processar_disponiveis(self) -> None:
+        fila = self._fila
+        if not fila:
+            return
+        self._ocupado = True
+        self.maior_fila = max(self.maior_fila, len(fila))
+        try:
+            with modo_lote():
+                no_lote = 0
+                ultimo_logger = None
+                while fila:
+                    try:
+                        logger, evento = fila.popleft()
+                    except IndexError:
+                        break
+                    try:
+                        logger._dispatch(evento)
+                    except Exception as e:
+                        print(f"⚠️ Erro ao processar log: {e}")
+                    ultimo_logger = logger
+                    self.processados += 1
+                    no_lote += 1
+                    if no_lote == self.tamanho_lote:
+                        descarregar_lote()
+                        self.lotes += 1
+                        no_lote = 0
+                        self._liberar_espaco()
+                if no_lote:
+                    self.lotes += 1
+                self._avisar_descartes(ultimo_logger)
+        finally:
+            self._ocupado = False
+            self._liberar_espaco()
+
+    def _liberar_espaco(self) -> None:
+        if self.politica == 'block':
+            with self._espaco:
+                self._espaco.notify_all()
+
+    def _avisar_descartes(self, logger) -> None:
+        novos = self.descartados - self._descartes_avisados
+        if novos <= 0 or logger is None:
+            return
+        self._descartes_avisados = self.descartados
+        logger._dispatch(LogEvent(
+            level=LogLevel.WARNING,
+            category=LogCategory.PERFORMANCE_METRIC,
+            message=f"⚠️ {novos} logs descartados com a fila cheia (política {self.politica})",
+            module="LogPipeline",
+            bot_id=logger.name,
+            context={'descartados_total': self.descartados, 'capacidade': self.capacidade}
+        ))
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Espera o consumidor esvaziar a fila. Retorna False se estourou o timeout."""
+        limite = time.monotonic() + timeout
+        while self._fila or self._ocupado:
+            if not self._thread.is_alive():
+                self._processar_disponiveis()
+                break
+            if time.monotonic() > limite:
+                return False
+            self._acordar.set()
+            time.sleep(0.001)
+        return True
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Para o consumidor processando o que ainda está na fila."""
+        self._parar.set()
+        self._acordar.set()
+        if self._thread.is_alive() and threading.current_thread() is not self._thread:
+            self._thread.join(timeout)
+        if not self._thread.is_alive():
+            self._processar_disponiveis()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": len(self._fila),
+            "capacity": self.capacidade,
+            "policy": self.politica,
+            "processed": self.processados,
+            "dropped": self.descartados,
+            "batches": self.lotes,
+            "max_queue": self.maior_fila,
+        }
+
+
+_pipeline: Optional[LogPipeline] = None
+_pipeline_lock = threading.Lock()
+
+
+def get_log_pipeline(config=None) -> LogPipeline:
+    """Pipeline único do processo (os parâmetros vêm da config do primeiro logger assíncrono)."""
+    global _pipeline
+    with _pipeline_lock:
+        if _pipeline is None:
+            if config is None:
+                _pipeline = LogPipeline()
+            else:
+                _pipeline = LogPipeline(
+                    capacidade=config.queue_size,
+                    politica=config.overflow_policy,
+                    tamanho_lote=config.batch_size,
+                    intervalo_flush=config.flush_interval
+                )
+        return _pipeline
@@ -0,0 +1,322 @@
+"""
+Store estruturado de logs: segmentos append-only + índice consultável.
+
+Cada LogEvent vira uma linha JSON no segmento do dia do processo
+(`{store_path}/segmentos/{dia}_{pid}_{instancia}_{n}.jsonl`; um arquivo por
+processo, então API, bots e workers do JobService escrevem sem disputar
+arquivo, e o token da instância evita reabrir o segmento de um processo
+anterior com o mesmo pid, comum em containers). Um índice
+SQLite ao lado guarda, por evento, (bot_id, categoria, timestamp, nível) e onde
+ele está no segmento: uma consulta lê só os trechos dos eventos que devolve,
+nunca o arquivo inteiro.
+
+Em segundo plano, segmentos de dias anteriores são compactados em blocos zlib
+independentes, agrupados por (bot_id, categoria, timestamp); o índice passa a
+apontar bloco + posição no bloco. Segmentos mais antigos que `keep_days` são
+apagados.
+"""
+
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+import zlib
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence
+
+from .models import LogEvent
+
+EVENTOS_POR_BLOCO = 256                  # eventos por bloco compactado (e por gravação do índice)
+TAMANHO_MAX_SEGMENTO = 64 * 1024 * 1024  # acima disso o processo abre outro segmento no mesmo dia
+INTERVALO_GRAVACAO = 1.0                 # segundos máximos de um evento fora do índice
+INTERVALO_COMPACTACAO = 3600.0
+
+# estado dos segmentos
+BRUTO, COMPACTANDO, COMPACTADO = 0, 1, 2
+
+
+class LogStore:
+    """Store de LogEvents de um diretório (um por processo; o índice é compartilhado)."""
+
+    def __init__(self, caminho: str = "logs/store", keep_days: int = 90):
+        self.caminho = caminho
+        self.keep_days = keep_days
+        self.dir_segmentos = os.path.join(caminho, 'segmentos')
+        os.makedirs(self.dir_segmentos, exist_ok=True)
+
+        self._lock = threading.RLock()
+        self._conexao = sqlite3.connect(os.path.join(caminho, 'indice.sqlite'), timeout=30,
+                                        check_same_thread=False)
+        self._conexao.execute("PRAGMA journal_mode=WAL")  # leitores não bloqueiam os processos que escrevem
+        self._conexao.execute("PRAGMA synchronous=NORMAL")
+        with self._conexao:
+            self._conexao.execute(
+                "CREATE TABLE IF NOT EXISTS segmentos ("
+                "id INTEGER PRIMARY KEY, arquivo TEXT NOT NULL, dia TEXT NOT NULL, "
+                "pid INTEGER NOT NULL, estado INTEGER NOT NULL DEFAULT 0)")
+            self._conexao.execute(
+                "CREATE TABLE IF NOT EXISTS eventos ("
+                "ts REAL NOT NULL, bot_id TEXT, categoria TEXT NOT NULL, nivel INTEGER NOT NULL, "
+                "segmento INTEGER NOT NULL, posicao INTEGER NOT NULL, tamanho INTEGER NOT NULL, "
+                "item INTEGER NOT NULL DEFAULT -1)")
+            self._conexao.execute("CREATE INDEX IF NOT EXISTS idx_eventos_bot ON eventos (bot_id, categoria, ts)")
+            self._conexao.execute("CREATE INDEX IF NOT EXISTS idx_eventos_bot_ts ON eventos (bot_id, ts)")
+            self._conexao.execute("CREATE INDEX IF NOT EXISTS idx_eventos_ts ON eventos (ts)")
+            self._conexao.execute("CREATE INDEX IF NOT EXISTS idx_eventos_segmento ON eventos (segmento)")
+
+        self._arquivo = None
+        self._segmento_id: Optional[int] = None
+        self._dia: Optional[str] = None
+        self._tamanho = 0
+        self._sequencia = 0
+        self._instancia = uuid.uuid4().hex[:8]
+        self._pendentes: List[tuple] = []
+        self.gravados = 0
+
+        self._parar = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="LogStore", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    # ============= Escrita =============
+
+    def _on_log_event(self, event) -> None:
+        """Subscriber de 'log_event' (roda no consumidor do LogPipeline)."""
+        self.append(event.data)
+
+    def append(self, evento: LogEvent) -> None:
+        linha = (json.dumps(evento.to_dict(), ensure_ascii=False, default=str) + '\n').encode('utf-8')
+        dia = evento.timestamp.strftime('%Y-%m-%d')
+        with self._lock:
+            if self._arquivo is None or dia != self._dia or self._tamanho >= TAMANHO_MAX_SEGMENTO:
+                self._novo_segmento(dia)
+            self._arquivo.write(linha)
+            self._pendentes.append((evento.timestamp.timestamp(), evento.bot_id, evento.category.value,
+                                    evento.level.value, self._segmento_id, self._tamanho, len(linha)))
+            self._tamanho += len(linha)
+            if len(self._pendentes) >= EVENTOS_POR_BLOCO:
+                self._gravar()
+
+    def _novo_segmento(self, dia: str) -> None:
+        self._gravar()
+        if self._arquivo is not None:
+            self._arquivo.close()
+        self._sequencia += 1
+        nome = f"{dia}_{os.getpid()}_{self._instancia}_{self._sequencia}.jsonl"
+        with self._conexao:
+            cursor = self._conexao.execute(
+                "INSERT INTO segmentos (arquivo, dia, pid) VALUES (?, ?, ?)", (nome, dia, os.getpid()))
+        self._segmento_id = cursor.lastrowid
+        self._dia = dia
+        self._arquivo = open(os.path.join(self.dir_segmentos, nome), 'ab')
+        self._tamanho = self._arquivo.tell()
+
+    def _gravar(self) -> None:
+        """Indexa os eventos pendentes (o arquivo é descarregado antes: todo evento indexado é legível)."""
+        if not self._pendentes:
+            return
+        self._arquivo.flush()
+        with self._conexao:
+            self._conexao.executemany("INSERT INTO eventos VALUES (?, ?, ?, ?, ?, ?, ?, -1)", self._pendentes)
+        self.gravados += len(self._pendentes)
+        self._pendentes = []
+
+    # ============= Consulta =============
+
+    def query(
+        self,
+        bot_id: Optional[str] = None,
+        categories: Optional[Sequence[str]] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        min_level: Optional[int] = None,
+        limit: int = 500
+    ) -> List[Dict[str, Any]]:
+        """
+        Eventos do filtro em ordem cronológica (os `limit` mais recentes do intervalo).
+
+        Varre só o índice; dos segmentos lê apenas as linhas (ou blocos) dos eventos devolvidos.
+        """
+        condicoes, parametros = [], []
+        if bot_id is not None:
+            condicoes.append("bot_id = ?")
+            parametros.append(bot_id)
+        if categories:
+            condicoes.append(f"categoria IN ({','.join('?' * len(categories))})")
+            parametros.extend(categories)
+        if start is not None:
+            condicoes.append("ts >= ?")
+            parametros.append(start.timestamp())
+        if end is not None:
+            condicoes.append("ts < ?")
+            parametros.append(end.timestamp())
+        if min_level is not None:
+            condicoes.append("nivel >= ?")
+            parametros.append(min_level)
+        sql = "SELECT segmento, posicao, tamanho, item FROM eventos"
+        if condicoes:
+            sql += " WHERE " + " AND ".join(condicoes)
+        sql += " ORDER BY ts DESC, rowid DESC LIMIT ?"
+        parametros.append(limit)
+
+        for tentativa in range(3):
+            with self._lock:
+                self._gravar()
+                linhas = self._conexao.execute(sql, parametros).fetchall()
+                ids = sorted({linha[0] for linha in linhas})
+                arquivos = dict(self._conexao.execute(
+                    f"SELECT id, arquivo FROM segmentos WHERE id IN ({','.join('?' * len(ids))})", ids).fetchall())
+            try:
+                return self._ler(linhas, arquivos)[::-1]
+            except (FileNotFoundError, KeyError, zlib.error, ValueError):
+                # Segmento compactado ou apagado entre a consulta ao índice e a leitura: consulta de novo
+                if tentativa == 2:
+                    raise
+                time.sleep(0.05)
+
+    def _ler(self, linhas: List[tuple], arquivos: Dict[int, str]) -> List[Dict[str, Any]]:
+        eventos = []
+        abertos: Dict[int, Any] = {}
+        blocos: Dict[tuple, List[bytes]] = {}
+        try:
+            for segmento, posicao, tamanho, item in linhas:
+                arquivo = abertos.get(segmento)
+                if arquivo is None:
+                    arquivo = abertos[segmento] = open(os.path.join(self.dir_segmentos, arquivos[segmento]), 'rb')
+                if item < 0:
+                    arquivo.seek(posicao)
+                    eventos.append(json.loads(arquivo.read(tamanho)))
+                    continue
+                chave = (segmento, posicao)
+                if chave not in blocos:
+                    arquivo.seek(posicao)
+                    blocos[chave] = zlib.decompress(arquivo.read(tamanho)).split(b'\n')
+                eventos.append(json.loads(blocos[chave][item]))
+        finally:
+            for arquivo in abertos.values():
+                arquivo.close()
+        return eventos
+
+    # ============= Manutenção =============
+
+    def compact(self) -> Dict[str, int]:
+        """Apaga segmentos além de `keep_days` e compacta os brutos de antes de ontem."""
+        agora = datetime.now()
+        limite_retencao = (agora - timedelta(days=self.keep_days)).strftime('%Y-%m-%d')
+        # ontem ainda pode receber eventos de um processo que não virou o dia
+        limite_compactacao = (agora - timedelta(days=1)).strftime('%Y-%m-%d')
+        with self._lock:
+            antigos = self._conexao.execute(
+                "SELECT id, arquivo FROM segmentos WHERE dia < ?", (limite_retencao,)).fetchall()
+            for segmento_id, arquivo in antigos:
+                with self._conexao:
+                    self._conexao.execute("DELETE FROM eventos WHERE segmento = ?", (segmento_id,))
+                    self._conexao.execute("DELETE FROM segmentos WHERE id = ?", (segmento_id,))
+                self._remover(arquivo)
+            # o segmento aberto por este processo fica de fora (eventos com data retroativa)
+            brutos = self._conexao.execute(
+                "SELECT id, arquivo FROM segmentos WHERE dia < ? AND estado = ? AND id IS NOT ?",
+                (limite_compactacao, BRUTO, self._segmento_id)).fetchall()
+
+        compactados = sum(1 for segmento_id, arquivo in brutos if self._compactar_segmento(segmento_id, arquivo))
+        return {"removed": len(antigos), "compacted": compactados}
+
+    def _compactar_segmento(self, segmento_id: int, arquivo: str) -> bool:
+        with self._lock:
+            with self._conexao:
+                cursor = self._conexao.execute(
+                    "UPDATE segmentos SET estado = ? WHERE id = ? AND estado = ?", (COMPACTANDO, segmento_id, BRUTO))
+            if cursor.rowcount != 1:
+                return False  # outro processo já está compactando
+            indice = self._conexao.execute(
+                "SELECT rowid, posicao, tamanho FROM eventos WHERE segmento = ? ORDER BY bot_id, categoria, ts",
+                (segmento_id,)).fetchall()
+
+        # Blocos na ordem do índice (bot, categoria, tempo): uma consulta descomprime poucos blocos vizinhos
+        novo = arquivo + '.z'
+        destino = os.path.join(self.dir_segmentos, novo)
+        try:
+            with open(os.path.join(self.dir_segmentos, arquivo), 'rb') as entrada:
+                dados = entrada.read()
+            atualizacoes = []
+            with open(destino + '.tmp', 'wb') as saida:
+                for inicio in range(0, len(indice), EVENTOS_POR_BLOCO):
+                    bloco = indice[inicio:inicio + EVENTOS_POR_BLOCO]
+                    comprimido = zlib.compress(
+                        b'\n'.join(dados[posicao:posicao + tamanho].rstrip(b'\n') for _, posicao, tamanho in bloco), 6)
+                    offset = saida.tell()
+                    saida.write(comprimido)
+                    atualizacoes.extend((offset, len(comprimido), i, rowid) for i, (rowid, _, _) in enumerate(bloco))
+            os.replace(destino + '.tmp', destino)
+            with self._lock, self._conexao:
+                self._conexao.executemany(
+                    "UPDATE eventos SET posicao = ?, tamanho = ?, item = ? WHERE rowid = ?", atualizacoes)
+                self._conexao.execute(
+                    "UPDATE segmentos SET arquivo = ?, estado = ? WHERE id = ?", (novo, COMPACTADO, segmento_id))
+        except Exception as e:
+            print(f"⚠️ Erro ao compactar segmento de log {arquivo}: {e}")
+            with self._lock, self._conexao:
+                self._conexao.execute("UPDATE segmentos SET estado = ? WHERE id = ?", (BRUTO, segmento_id))
+            return False
+        self._remover(arquivo)
+        return True
+
+    def _remover(self, arquivo: str) -> None:
+        try:
+            os.remove(os.path.join(self.dir_segmentos, arquivo))
+        except FileNotFoundError:
+            pass
+
+    def _run(self) -> None:
+        proxima_compactacao = time.monotonic() + 60
+        while not self._parar.wait(INTERVALO_GRAVACAO):
+            try:
+                with self._lock:
+                    self._gravar()
+                if time.monotonic() >= proxima_compactacao:
+                    proxima_compactacao = time.monotonic() + INTERVALO_COMPACTACAO
+                    self.compact()
+            except Exception as e:
+                print(f"⚠️ Erro na manutenção do store de logs: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._gravar()
+            eventos = self._conexao.execute("SELECT COUNT(*) FROM eventos").fetchone()[0]
+            segmentos = dict(self._conexao.execute(
+                "SELECT estado, COUNT(*) FROM segmentos GROUP BY estado").fetchall())
+        return {
+            "events": eventos,
+            "raw_segments": segmentos.get(BRUTO, 0),
+            "compacted_segments": segmentos.get(COMPACTADO, 0),
+            "written_by_process": self.gravados,
+        }
+
+    def close(self) -> None:
+        self._parar.set()
+        with self._lock:
+            self._gravar()
+            if self._arquivo is not None:
+                self._arquivo.close()
+                self._arquivo = None
+
+
+_store: Optional[LogStore] = None
+_store_lock = threading.Lock()
+
+
+def get_log_store(config=None) -> LogStore:
+    """Store único do processo, inscrito em 'log_event' (diretório e retenção da config do primeiro logger)."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            from ..notifications.events import get_event_emitter
+            if config is None:
+                _store = LogStore()
+            else:
+                _store = LogStore(config.store_path, config.store_keep_days)
+            get_event_emitter().subscribe('log_event', _store._on_log_event)
+        return _store
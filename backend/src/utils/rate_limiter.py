@@ -0,0 +1,59 @@
+"""
+Limitador de taxa (token bucket) compartilhado entre threads.
+
+Usado para manter as chamadas REST à corretora dentro do limite por IP quando
+várias tarefas (backfill, scanner, API) disparam requisições em paralelo.
+"""
+
+import asyncio
+import threading
+import time
+
+
+class TokenBucket:
+    """Balde de tokens thread-safe: `taxa_por_segundo` reposição, até `capacidade` de rajada."""
+
+    def __init__(self, taxa_por_segundo: float, capacidade: float = None):
+        if taxa_por_segundo <= 0:
+            raise ValueError("taxa_por_segundo deve ser positiva")
+        self.taxa_por_segundo = float(taxa_por_segundo)
+        self.capacidade = float(capacidade if capacidade is not None else taxa_por_segundo)
+        self._tokens = self.capacidade
+        self._ultima_reposicao = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _repor(self) -> None:
+        agora = time.monotonic()
+        decorrido = agora - self._ultima_reposicao
+        self._ultima_reposicao = agora
+        self._tokens = min(self.capacidade, self._tokens + decorrido * self.taxa_por_segundo)
+
+    def tentar_adquirir(self, tokens: float = 1) -> float:
+        """
+        Tenta consumir `tokens` sem bloquear.
+
+        Returns:
+            0.0 se conseguiu; caso contrário, segundos estimados até haver tokens suficientes.
+        """
+        with self._lock:
+            self._repor()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+            return (tokens - self._tokens) / self.taxa_por_segundo
+
+    def adquirir(self, tokens: float = 1) -> None:
+        """Bloqueia a thread atual até conseguir consumir `tokens`."""
+        while True:
+            espera = self.tentar_adquirir(tokens)
+            if espera == 0.0:
+                return
+            time.sleep(espera)
+
+    async def adquirir_async(self, tokens: float = 1) -> None:
+        """Como `adquirir`, mas cede o event loop enquanto espera."""
+        while True:
+            espera = self.tentar_adquirir(tokens)
+            if espera == 0.0:
+                return
+            await asyncio.sleep(espera)
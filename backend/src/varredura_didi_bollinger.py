@@ -8,7 +8,7 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
 from corretoras.funcoes_bybit import busca_velas
 from indicadores.padroes_velas import engolfo_alta, piercing_line_alta
-from indicadores.bandas_bollinger import bandas_bollinger
+from indicadores.didi import calcular_didi, calcular_didi_lote
 from indicadores.indicadores_osciladores import calcula_rsi
 from utils.notifications.telegram_client import get_telegram_client
 import pandas as pd
@@ -22,57 +22,35 @@ MOEDAS = [
     'NEARUSDT', 'ARBUSDT', 'OPUSDT', 'APTUSDT', 'INJUSDT'
 ]
 
-def calcular_didi_index(df):
-    df['didi_curta'] = df['fechamento'].rolling(window=3).mean()
-    df['didi_media'] = df['fechamento'].rolling(window=8).mean()
-    df['didi_longa'] = df['fechamento'].rolling(window=20).mean()
+def calcular_didi_index(df, didi=None):
+    didi = calcular_didi(df['fechamento']) if didi is None else didi
+    df['didi_curta'] = didi.curta
+    df['didi_media'] = didi.media
+    df['didi_longa'] = didi.longa
     return df
 
 def detectar_agulhada(df, tolerancia=0.01):
-    agulhadas_compra = []
-    for i in range(21, len(df)):
-        curta = df['didi_curta'].iloc[i]
-        media = df['didi_media'].iloc[i]
-        longa = df['didi_longa'].iloc[i]
-        curta_ant = df['didi_curta'].iloc[i-1]
-        longa_ant = df['didi_longa'].iloc[i-1]
-        
-        max_val = max(curta, media, longa)
-        min_val = min(curta, media, longa)
-        spread = (max_val - min_val) / max_val
-        
-        if spread < tolerancia and curta_ant < longa_ant and curta > longa:
-            agulhadas_compra.append(i)
-    
-    return agulhadas_compra
+    return calcular_didi(df['fechamento'], tolerancia=tolerancia).agulhadas()
 
 def detectar_punto(df):
-    puntos_compra = []
-    for i in range(2, len(df)):
-        curta = df['didi_curta'].iloc[i]
-        media = df['didi_media'].iloc[i]
-        longa = df['didi_longa'].iloc[i]
-        curta_ant = df['didi_curta'].iloc[i-1]
-        media_ant = df['didi_media'].iloc[i-1]
-        
-        if curta_ant <= media_ant and curta > media and curta < longa:
-            puntos_compra.append(i)
-    
-    return puntos_compra
+    return calcular_didi(df['fechamento']).puntos()
 
-def analisar_moeda(simbolo):
-    """Analisa uma moeda e retorna score + dados"""
+def analisar_moeda(simbolo, df=None, didi=None):
+    """Analisa uma moeda e retorna score + dados (velas e Didi podem vir prontos da varredura)"""
     try:
         # Buscar dados
-        df = busca_velas(simbolo, '60', [9, 21])
-        
-        # Didi
-        df = calcular_didi_index(df)
-        agulhadas_compra = detectar_agulhada(df)
-        puntos_compra = detectar_punto(df)
+        if df is None:
+            df = busca_velas(simbolo, '60', [9, 21])
         
-        # Bollinger
-        df = bandas_bollinger(df, periodo=20, desvios=2)
+        # Didi + Bollinger (uma passada)
+        if didi is None:
+            didi = calcular_didi(df['fechamento'])
+        df = calcular_didi_index(df, didi)
+        agulhadas_compra = didi.agulhadas()
+        puntos_compra = didi.puntos()
+        df['media_movel'] = didi.media_bandas
+        df['banda_superior'] = didi.banda_superior
+        df['banda_inferior'] = didi.banda_inferior
         
         # RSI
         df['rsi'] = calcula_rsi(df, 14)
@@ -190,20 +168,31 @@ def varredura_completa():
     print("=" * 80)
     print(f"📊 Analisando {len(MOEDAS)} moedas...\n")
     
-    resultados = []
-    
+    # Velas primeiro (rede, com pausa pelo rate limit), depois o Didi de todas de uma vez
+    velas = {}
     for i, moeda in enumerate(MOEDAS, 1):
-        print(f"⏳ [{i}/{len(MOEDAS)}] Analisando {moeda}...", end=' ')
-        resultado = analisar_moeda(moeda)
+        print(f"⏳ [{i}/{len(MOEDAS)}] Buscando {moeda}...", end=' ')
+        try:
+            velas[moeda] = busca_velas(moeda, '60', [9, 21])
+            print("✅")
+        except Exception as e:
+            print(f"❌ Erro: {e}")
+        
+        time.sleep(0.5)  # Evitar rate limit
+    
+    didis = calcular_didi_lote([df['fechamento'].to_numpy() for df in velas.values()])
+    
+    resultados = []
+    print()
+    for (moeda, df), didi in zip(velas.items(), didis):
+        resultado = analisar_moeda(moeda, df, didi)
         
         if resultado:
             resultados.append(resultado)
             emoji = "🟢" if resultado['score'] >= 12 else "🟡" if resultado['score'] >= 6 else "⚪"
-            print(f"{emoji} Score: {resultado['score']}/20")
+            print(f"{emoji} {moeda}: Score {resultado['score']}/20")
         else:
-            print("❌ Erro")
-        
-        time.sleep(0.5)  # Evitar rate limit
+            print(f"❌ {moeda}: Erro")
     
     # Ordenar por score
     resultados.sort(key=lambda x: x['score'], reverse=True)
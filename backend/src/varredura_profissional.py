@@ -8,6 +8,8 @@ import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
 from indicadores.advanced_scoring import get_scoring_system
+from indicadores.pontuacao_lote import montar_painel
+from corretoras.funcoes_bybit import busca_velas
 from utils.notifications.telegram_client import get_telegram_client
 import time
 
@@ -27,31 +29,34 @@ def varredura_profissional():
     print("📈 Market Trend | 🏗️ Structure | 📐 Fibonacci | 🎯 Wyckoff | 💎 Didi+BB\n")
     
     scoring_system = get_scoring_system()
-    resultados = []
+    velas = {}
     
     for i, moeda in enumerate(MOEDAS, 1):
-        print(f"⏳ [{i}/{len(MOEDAS)}] Analisando {moeda}...", end=' ', flush=True)
+        print(f"⏳ [{i}/{len(MOEDAS)}] Buscando {moeda}...", end=' ', flush=True)
         
         try:
-            analise = scoring_system.analyze_complete(moeda)
-            
-            if 'error' not in analise:
-                resultados.append(analise)
-                
-                score = analise['score_final']
-                emoji = analise['classification']['emoji']
-                
-                print(f"{emoji} {score:.1f}/100")
-            else:
-                print(f"❌ Erro: {analise['error']}")
-        
+            velas[moeda] = busca_velas(moeda, '60', [9, 21, 200])  # 1 hora
+            print("✅")
         except Exception as e:
             print(f"❌ Erro: {str(e)}")
         
         time.sleep(0.3)  # Rate limit
     
-    # Ordenar por score
-    resultados.sort(key=lambda x: x['score_final'], reverse=True)
+    # Score de todas as moedas em uma passada sobre o painel (já ordenado por score)
+    painel = montar_painel(velas)
+    ranking = scoring_system.score_panel(painel)
+    print(f"\n📊 {len(ranking)} moedas pontuadas em lote")
+    for moeda, motivo in painel.excluidos.items():
+        print(f"⚠️ {moeda} fora do ranking: {motivo}")
+    
+    # Análise completa (sinais, recomendação, detalhes) só das moedas exibidas, com as mesmas velas
+    resultados = []
+    for moeda in ranking['simbolo'].head(15):
+        analise = scoring_system.analyze_complete(moeda, velas[moeda].loc[painel.indice])
+        if 'error' not in analise:
+            resultados.append(analise)
+        else:
+            print(f"❌ Erro em {moeda}: {analise['error']}")
     
     # ==========================
     # EXIBIR RESULTADOS
@@ -131,9 +136,10 @@ def varredura_profissional():
     moeda_melhor = melhor['simbolo'].replace('USDT', '')
     score_melhor = melhor['score_final']
     
-    excelentes = [r for r in resultados if r['score_final'] >= 90]
-    muito_bons = [r for r in resultados if 75 <= r['score_final'] < 90]
-    bons = [r for r in resultados if 60 <= r['score_final'] < 75]
+    scores = ranking['score_final']
+    excelentes = ranking[scores >= 90]
+    muito_bons = ranking[(scores >= 75) & (scores < 90)]
+    bons = ranking[(scores >= 60) & (scores < 75)]
     
     print(f"\n📊 ESTATÍSTICAS DO MERCADO:")
     print(f"   • Setups EXCELENTES (90-100): {len(excelentes)}")
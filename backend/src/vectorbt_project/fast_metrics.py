@@ -0,0 +1,269 @@
+"""
+Métricas de backtest em uma única passada Numba, no lugar de `vbt.Portfolio.stats()`.
+
+Os otimizadores só usam um punhado de números (retorno, drawdown, win rate,
+trades, Sharpe/Sortino/Calmar). Aqui a carteira de `from_orders` é simulada a
+partir dos arrays que os kernels das estratégias já devolvem (preço da ordem e
+size) e as métricas são acumuladas barra a barra em um registro de tamanho fixo,
+sem montar Portfolio, trades records nem séries pandas.
+
+As definições seguem as do vectorbt (Sharpe com ddof=1, Sortino com downside
+deviation, Calmar com retorno anualizado, ano de 365 dias). Trades são os exit
+trades do vectorbt: cada saída, inclusive a parcial de um rebalanceamento do
+targetpercent, é um trade. Max Drawdown Duration conta as velas abaixo do pico:
+no drawdown recuperado, da primeira vela abaixo até a de recuperação (exclusive);
+no ativo, até o fim da série — o mesmo número que `pf.stats()` dá nos dois casos.
+
+Diferenças deliberadas em relação ao `pf.stats()`:
+- sem drawdown, Max Drawdown é 0 e a duração 0 (o vectorbt dá NaN/NaT), para que
+  fitness como `retorno * (1 - drawdown)` continue definida;
+- Sharpe/Sortino com variância ou downside zero ficam NaN (o vectorbt dá inf).
+
+A paridade é conferida em `backend/tests/test_fast_metrics.py` (carteiras com
+sementes fixas e curvas de drawdown montadas à mão) e, com dados reais da
+corretora, em `vectorbt_project/scripts/validate_fast_metrics.py`.
+
+Os acumuladores (`novo_acumulador`, `acumular_barra`, `registrar_trade`,
+`finalizar_metricas`) são njit e podem ser chamados de outros kernels, como o
+`grid_engine`, para que todas as métricas tenham uma única implementação.
+"""
+
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+from numba import njit
+
+SALDO_INICIAL_PADRAO = 1000.0
+TAXA_PADRAO = 0.00055
+
+METRICAS = [
+    'saldo_final', 'retorno_total', 'max_drawdown', 'max_drawdown_barras', 'trades', 'win_rate',
+    'ganho_medio', 'perda_media', 'melhor_trade', 'pior_trade', 'sharpe_ratio', 'sortino_ratio', 'calmar_ratio',
+]
+N_METRICAS = len(METRICAS)
+
+# abs_tol do `is_close_nb` do vectorbt: ordens menores que isso (resíduo de ponto flutuante
+# ao rebalancear um targetpercent já atingido) são ignoradas em vez de virar trade
+TOLERANCIA_TAMANHO = 1e-12
+
+# Nomes equivalentes em `pf.stats()`, para uso como substituto direto
+NOMES_VECTORBT = {
+    'saldo_final': 'End Value',
+    'retorno_total': 'Total Return [%]',
+    'max_drawdown': 'Max Drawdown [%]',
+    'trades': 'Total Trades',
+    'win_rate': 'Win Rate [%]',
+    'ganho_medio': 'Avg Winning Trade [%]',
+    'perda_media': 'Avg Losing Trade [%]',
+    'melhor_trade': 'Best Trade [%]',
+    'pior_trade': 'Worst Trade [%]',
+    'sharpe_ratio': 'Sharpe Ratio',
+    'sortino_ratio': 'Sortino Ratio',
+    'calmar_ratio': 'Calmar Ratio',
+}
+
+# Posições do acumulador
+_VALOR_ANTERIOR, _PICO, _MAX_DD, _BARRAS_EM_DD, _MAX_BARRAS_DD = 0, 1, 2, 3, 4
+_SOMA_R, _SOMA_R2, _SOMA_BAIXA2, _BARRAS = 5, 6, 7, 8
+_TRADES, _GANHOS, _PERDAS, _SOMA_GANHOS, _SOMA_PERDAS, _MELHOR, _PIOR = 9, 10, 11, 12, 13, 14, 15
+_TAMANHO_ACUMULADOR = 16
+
+
+@njit(cache=True)
+def novo_acumulador(saldo_inicial):
+    acc = np.zeros(_TAMANHO_ACUMULADOR)
+    acc[_VALOR_ANTERIOR] = saldo_inicial
+    acc[_PICO] = saldo_inicial
+    acc[_MELHOR] = -np.inf
+    acc[_PIOR] = np.inf
+    return acc
+
+
+@njit(cache=True)
+def acumular_barra(acc, valor):
+    """Registra o patrimônio marcado no fechamento da barra."""
+    r = valor / acc[_VALOR_ANTERIOR] - 1.0
+    acc[_SOMA_R] += r
+    acc[_SOMA_R2] += r * r
+    if r < 0:
+        acc[_SOMA_BAIXA2] += r * r
+    acc[_BARRAS] += 1
+    acc[_VALOR_ANTERIOR] = valor
+
+    if valor >= acc[_PICO]:
+        acc[_PICO] = valor
+        acc[_BARRAS_EM_DD] = 0
+    else:
+        acc[_BARRAS_EM_DD] += 1
+        acc[_MAX_DD] = max(acc[_MAX_DD], 1.0 - valor / acc[_PICO])
+        acc[_MAX_BARRAS_DD] = max(acc[_MAX_BARRAS_DD], acc[_BARRAS_EM_DD])
+
+
+@njit(cache=True)
+def abrir_trade(acc):
+    acc[_TRADES] += 1
+
+
+@njit(cache=True)
+def registrar_trade(acc, pnl, retorno_pct):
+    """Registra um trade fechado (PnL líquido de taxas e retorno sobre o nocional de entrada)."""
+    if pnl > 0:
+        acc[_GANHOS] += 1
+        acc[_SOMA_GANHOS] += retorno_pct
+    else:
+        acc[_PERDAS] += 1
+        acc[_SOMA_PERDAS] += retorno_pct
+    acc[_MELHOR] = max(acc[_MELHOR], retorno_pct)
+    acc[_PIOR] = min(acc[_PIOR], retorno_pct)
+
+
+@njit(cache=True)
+def finalizar_metricas(acc, saldo_inicial, fator_anual, saida):
+    """Preenche `saida` (tamanho N_METRICAS, na ordem de METRICAS) a partir do acumulador."""
+    saida[:] = np.nan
+    valor_final = acc[_VALOR_ANTERIOR]
+    n = acc[_BARRAS]
+    max_dd = acc[_MAX_DD]
+    ganhos = acc[_GANHOS]
+    perdas = acc[_PERDAS]
+    fechados = ganhos + perdas
+
+    saida[0] = valor_final
+    saida[1] = (valor_final / saldo_inicial - 1.0) * 100.0
+    saida[2] = max_dd * 100.0
+    saida[3] = acc[_MAX_BARRAS_DD]
+    saida[4] = acc[_TRADES]
+    if fechados > 0:
+        saida[5] = ganhos / fechados * 100.0
+        saida[8] = acc[_MELHOR]
+        saida[9] = acc[_PIOR]
+    if ganhos > 0:
+        saida[6] = acc[_SOMA_GANHOS] / ganhos
+    if perdas > 0:
+        saida[7] = acc[_SOMA_PERDAS] / perdas
+
+    if n > 1:
+        media = acc[_SOMA_R] / n
+        variancia = (acc[_SOMA_R2] - n * media * media) / (n - 1)
+        if variancia > 0:
+            saida[10] = media / np.sqrt(variancia) * np.sqrt(fator_anual)
+        if acc[_SOMA_BAIXA2] > 0:
+            saida[11] = media / np.sqrt(acc[_SOMA_BAIXA2] / n) * np.sqrt(fator_anual)
+        if max_dd > 0 and valor_final > 0:
+            retorno_anual = (valor_final / saldo_inicial) ** (fator_anual / n) - 1.0
+            saida[12] = retorno_anual / max_dd
+
+
+@njit(cache=True)
+def metricas_ordens_nb(close, preco_ordem, size, alvo_percentual, saldo_inicial, taxa, fator_anual):
+    """
+    Simula `from_orders` e devolve o registro de métricas (ordem de METRICAS).
+
+    - `alvo_percentual=False`: size_type='percent', longonly (1 = compra com todo o
+      caixa, -1 = vende toda a posição);
+    - `alvo_percentual=True`: size_type='targetpercent', both (1 = 100% comprado,
+      -1 = 100% vendido, 0 = zerado).
+
+    Barras com size ou preço NaN não geram ordem.
+    """
+    acc = novo_acumulador(saldo_inicial)
+    caixa = saldo_inicial
+    quantidade = 0.0  # positiva = comprado, negativa = vendido
+    preco_entrada = 0.0
+    valor_entrada = 0.0
+
+    for i in range(close.shape[0]):
+        alvo = size[i]
+        preco = preco_ordem[i]
+        if not np.isnan(alvo) and not np.isnan(preco):
+            if alvo_percentual:
+                valor = caixa + quantidade * preco
+                alvo_quantidade = alvo * valor / preco
+            elif alvo > 0:
+                alvo_quantidade = quantidade + alvo * caixa / (preco * (1.0 + taxa))
+            else:
+                alvo_quantidade = quantidade * (1.0 + alvo)
+            if abs(alvo_quantidade - quantidade) <= TOLERANCIA_TAMANHO:
+                alvo_quantidade = quantidade
+
+            # Reduz/fecha a posição atual se o alvo está do outro lado ou é menor
+            if quantidade != 0 and (alvo_quantidade == 0 or np.sign(alvo_quantidade) != np.sign(quantidade)
+                                    or abs(alvo_quantidade) < abs(quantidade)):
+                fechar = quantidade if np.sign(alvo_quantidade) != np.sign(quantidade) or alvo_quantidade == 0 \
+                    else quantidade - alvo_quantidade
+                if fechar > 0:
+                    valor_saida = fechar * preco * (1.0 - taxa)
+                    caixa += valor_saida
+                    pnl = valor_saida - valor_entrada * fechar / quantidade
+                else:
+                    valor_saida = -fechar * preco * (1.0 + taxa)
+                    caixa -= valor_saida
+                    pnl = valor_entrada * fechar / quantidade - valor_saida
+                valor_entrada -= valor_entrada * fechar / quantidade
+                quantidade -= fechar
+                # Como nos exit trades do vectorbt, cada saída (inclusive parcial, do rebalanceamento
+                # do targetpercent) é um trade fechado; o que sobra da posição conta como outro trade
+                registrar_trade(acc, pnl, pnl / (abs(fechar) * preco_entrada) * 100.0)
+                if quantidade != 0:
+                    abrir_trade(acc)
+
+            # Abre/aumenta na direção do alvo
+            delta = alvo_quantidade - quantidade
+            if delta != 0 and (quantidade == 0 or np.sign(delta) == np.sign(quantidade)):
+                if delta > 0:
+                    custo = delta * preco * (1.0 + taxa)
+                    if custo > caixa:
+                        delta = max(caixa, 0.0) / (preco * (1.0 + taxa))
+                        custo = delta * preco * (1.0 + taxa)
+                    caixa -= custo
+                    movimento = custo
+                else:
+                    movimento = -delta * preco * (1.0 - taxa)
+                    caixa += movimento
+                if delta != 0:
+                    if quantidade == 0:
+                        abrir_trade(acc)
+                        preco_entrada = preco
+                        valor_entrada = 0.0
+                    else:
+                        preco_entrada = (preco_entrada * abs(quantidade) + preco * abs(delta)) / abs(quantidade + delta)
+                    valor_entrada += movimento
+                    quantidade += delta
+
+        acumular_barra(acc, caixa + quantidade * close[i])
+
+    saida = np.empty(N_METRICAS)
+    finalizar_metricas(acc, saldo_inicial, fator_anual, saida)
+    return saida
+
+
+def fator_anual_do_intervalo(intervalo) -> float:
+    """Barras por ano (365 dias) para o tempo gráfico no formato Bybit ('15', '60', 'D'...)."""
+    intervalo = str(intervalo).replace('min', '')
+    minutos = {'D': 1440.0, 'W': 10080.0, 'M': 43200.0}.get(intervalo) or float(intervalo)
+    return 365 * 24 * 60 / minutos
+
+
+def calcular_metricas(close, preco_ordem, size, alvo_percentual: bool = True, intervalo='15',
+                      saldo_inicial: float = SALDO_INICIAL_PADRAO, taxa: float = TAXA_PADRAO) -> Dict[str, float]:
+    """
+    Substituto direto de `pf.stats()` para os otimizadores.
+
+    Aceita arrays ou Series. Retorna um dict com as chaves de METRICAS e também os
+    nomes do vectorbt (`'Total Return [%]'`, `'Max Drawdown [%]'`...), então código
+    que lia `stats[...]` continua funcionando.
+    """
+    registro = metricas_ordens_nb(
+        np.ascontiguousarray(np.asarray(close, dtype=np.float64)),
+        np.ascontiguousarray(np.asarray(preco_ordem, dtype=np.float64)),
+        np.ascontiguousarray(np.asarray(size, dtype=np.float64)),
+        alvo_percentual, float(saldo_inicial), float(taxa), fator_anual_do_intervalo(intervalo),
+    )
+    metricas = dict(zip(METRICAS, registro.tolist()))
+    metricas['trades'] = int(metricas['trades'])
+    for nome, nome_vectorbt in NOMES_VECTORBT.items():
+        metricas[nome_vectorbt] = metricas[nome]
+    minutos = 365 * 24 * 60 / fator_anual_do_intervalo(intervalo)
+    metricas['Max Drawdown Duration'] = pd.Timedelta(minutes=metricas['max_drawdown_barras'] * minutos)
+    return metricas
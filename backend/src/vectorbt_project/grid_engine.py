@@ -0,0 +1,190 @@
+"""
+Motor de grid search em lote para a família double EMA breakout.
+
+Em vez de montar uma estratégia, séries pandas e um `vbt.Portfolio` por
+combinação, o motor:
+
+1. calcula cada período de EMA distinto do grid uma única vez (matriz
+   períodos × barras);
+2. roda um único kernel Numba paralelo sobre todas as combinações
+   (ema curta, ema longa, stop, rr), simulando a lógica de
+   `double_ema_breakout_nb` / `double_ema_breakout_long_short_nb` e a
+   carteira de `vbt.Portfolio.from_orders` (100% do caixa por trade, taxa nas
+   duas pontas, preço de execução = preço da ordem);
+3. acumula as métricas no próprio laço com os acumuladores de `fast_metrics`
+   (retorno, drawdown, trades, win rate, Sharpe/Sortino/Calmar nas definições do
+   vectorbt), sem guardar a curva de patrimônio de cada combinação.
+
+Uso:
+    combinacoes = gerar_combinacoes(grid_ema_curta, grid_ema_longa, grid_stop, grid_rr)
+    df_resultados = avaliar_grid(df, combinacoes, intervalo='15', permitir_short=False)
+"""
+
+from itertools import product
+from typing import Dict, Iterable, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from numba import njit, prange
+
+from vectorbt_project.fast_metrics import (
+    METRICAS, N_METRICAS, SALDO_INICIAL_PADRAO, TAXA_PADRAO, abrir_trade, acumular_barra,
+    fator_anual_do_intervalo, finalizar_metricas, novo_acumulador, registrar_trade,
+)
+from vectorbt_project.indicator_cache import ema
+
+INICIO_PADRAO = 999  # Mesmo aquecimento dos kernels das estratégias
+TAMANHO_LOTE_PADRAO = 20_000
+
+
+@njit(parallel=True, cache=True)
+def simular_grid_nb(close, high, low, emas, linha_rapida, linha_lenta, q_stops, rrs,
+                    permitir_short, inicio, saldo_inicial, taxa, fator_anual):
+    """
+    Simula todas as combinações de uma vez.
+
+    `emas` tem uma linha por período distinto; `linha_rapida`/`linha_lenta` apontam
+    a linha de cada combinação. Retorna uma matriz combinações × METRICAS.
+    """
+    n = close.shape[0]
+    m = linha_rapida.shape[0]
+    saida = np.empty((m, N_METRICAS))
+
+    for j in prange(m):
+        ema1 = emas[linha_rapida[j]]
+        ema2 = emas[linha_lenta[j]]
+        q_stop = q_stops[j]
+        rr = rrs[j]
+
+        caixa = saldo_inicial
+        quantidade = 0.0
+        posicao = 0  # 0 = fora, 1 = long, -1 = short
+        preco_entrada = 0.0
+        valor_entrada = 0.0
+        stop_value = 0.0
+        target_value = 0.0
+
+        acc = novo_acumulador(saldo_inicial)
+
+        for i in range(n):
+            if i >= inicio:
+                if posicao == 0:
+                    if close[i - 1] > ema1[i - 1] and close[i - 1] > ema2[i - 1] and high[i] > high[i - 1]:
+                        preco_entrada = high[i - 1]
+                        stop_value = low[i - q_stop + 1]
+                        for k in range(i - q_stop + 2, i + 1):
+                            stop_value = min(stop_value, low[k])
+                        target_value = preco_entrada + (preco_entrada - stop_value) * rr
+                        # Compra com todo o caixa, taxa incluída (como `from_orders` com 100%)
+                        quantidade = caixa / (preco_entrada * (1.0 + taxa))
+                        valor_entrada = quantidade * preco_entrada * (1.0 + taxa)
+                        caixa -= valor_entrada
+                        posicao = 1
+                        abrir_trade(acc)
+                    elif permitir_short and close[i - 1] < ema1[i - 1] and close[i - 1] < ema2[i - 1] and low[i] < low[i - 1]:
+                        preco_entrada = low[i - 1]
+                        stop_value = high[i - q_stop + 1]
+                        for k in range(i - q_stop + 2, i + 1):
+                            stop_value = max(stop_value, high[k])
+                        target_value = preco_entrada - (stop_value - preco_entrada) * rr
+                        # Alvo de -100% do patrimônio: vende o equivalente ao caixa
+                        quantidade = caixa / preco_entrada
+                        valor_entrada = quantidade * preco_entrada * (1.0 - taxa)
+                        caixa += valor_entrada
+                        posicao = -1
+                        abrir_trade(acc)
+                else:
+                    preco_saida = -1.0
+                    pnl = 0.0
+                    if posicao == 1:
+                        if high[i] >= target_value:
+                            preco_saida = target_value
+                        elif low[i] <= stop_value:
+                            preco_saida = stop_value
+                        if preco_saida > 0:
+                            valor_saida = quantidade * preco_saida * (1.0 - taxa)
+                            caixa += valor_saida
+                            pnl = valor_saida - valor_entrada
+                    else:
+                        if low[i] <= target_value:
+                            preco_saida = target_value
+                        elif high[i] >= stop_value:
+                            preco_saida = stop_value
+                        if preco_saida > 0:
+                            valor_saida = quantidade * preco_saida * (1.0 + taxa)
+                            caixa -= valor_saida
+                            pnl = valor_entrada - valor_saida
+
+                    if preco_saida > 0:
+                        registrar_trade(acc, pnl, pnl / (quantidade * preco_entrada) * 100.0)
+                        quantidade = 0.0
+                        posicao = 0
+
+            acumular_barra(acc, caixa + posicao * quantidade * close[i])
+
+        finalizar_metricas(acc, saldo_inicial, fator_anual, saida[j])
+
+    return saida
+
+
+def gerar_combinacoes(grid_ema_curta: Iterable[int], grid_ema_longa: Iterable[int],
+                      grid_stop: Iterable[int], grid_rr: Iterable[float]) -> pd.DataFrame:
+    """Produto cartesiano do grid, descartando combinações com ema_longa <= ema_curta."""
+    combinacoes = pd.DataFrame(
+        list(product(grid_ema_curta, grid_ema_longa, grid_stop, grid_rr)),
+        columns=['ema_curta', 'ema_longa', 'stop', 'rr'],
+    )
+    return combinacoes[combinacoes['ema_longa'] > combinacoes['ema_curta']].reset_index(drop=True)
+
+
+def precomputar_emas(close: np.ndarray, periodos: Sequence[int]) -> Tuple[np.ndarray, Dict[int, int]]:
+    """Busca cada EMA distinta no cache de indicadores (mesmo `ewm(span=p)` das estratégias)."""
+    periodos = sorted(set(int(p) for p in periodos))
+    emas = np.empty((len(periodos), len(close)), dtype=np.float64)
+    for linha, periodo in enumerate(periodos):
+        emas[linha] = ema(close, periodo)
+    return emas, {periodo: linha for linha, periodo in enumerate(periodos)}
+
+
+def avaliar_grid(df: pd.DataFrame, combinacoes: pd.DataFrame, intervalo='15', permitir_short: bool = False,
+                 saldo_inicial: float = SALDO_INICIAL_PADRAO, taxa: float = TAXA_PADRAO,
+                 inicio: int = INICIO_PADRAO, tamanho_lote: int = TAMANHO_LOTE_PADRAO,
+                 mostrar_progresso: bool = True) -> pd.DataFrame:
+    """
+    Avalia todas as `combinacoes` (colunas ema_curta, ema_longa, stop, rr) sobre `df`.
+
+    Returns:
+        `combinacoes` acrescido das colunas de METRICAS (e `max_drawdown_duration` como Timedelta).
+    """
+    close = np.ascontiguousarray(df['fechamento'].values, dtype=np.float64)
+    high = np.ascontiguousarray(df['maxima'].values, dtype=np.float64)
+    low = np.ascontiguousarray(df['minima'].values, dtype=np.float64)
+
+    emas, linhas = precomputar_emas(close, pd.concat([combinacoes['ema_curta'], combinacoes['ema_longa']]))
+    linha_rapida = combinacoes['ema_curta'].map(linhas).to_numpy(np.int64)
+    linha_lenta = combinacoes['ema_longa'].map(linhas).to_numpy(np.int64)
+    q_stops = combinacoes['stop'].to_numpy(np.int64)
+    rrs = combinacoes['rr'].to_numpy(np.float64)
+
+    fator_anual = fator_anual_do_intervalo(intervalo)
+    minutos = 365 * 24 * 60 / fator_anual
+    inicio = max(inicio, int(q_stops.max()) if len(q_stops) else 1, 1)
+
+    blocos = []
+    total = len(combinacoes)
+    for lote in range(0, total, tamanho_lote):
+        fim = min(lote + tamanho_lote, total)
+        blocos.append(simular_grid_nb(
+            close, high, low, emas, linha_rapida[lote:fim], linha_lenta[lote:fim],
+            q_stops[lote:fim], rrs[lote:fim], permitir_short, inicio, saldo_inicial, taxa, fator_anual,
+        ))
+        if mostrar_progresso:
+            print(f"\r[grid] {fim}/{total} combinações ({fim / total * 100:.1f}%)", end='', flush=True)
+    if mostrar_progresso:
+        print()
+
+    metricas = np.vstack(blocos) if blocos else np.empty((0, len(METRICAS)))
+    resultado = pd.concat([combinacoes.reset_index(drop=True), pd.DataFrame(metricas, columns=METRICAS)], axis=1)
+    resultado['trades'] = resultado['trades'].astype(int)
+    resultado['max_drawdown_duration'] = pd.to_timedelta(resultado['max_drawdown_barras'] * minutos, unit='min')
+    return resultado
@@ -2,21 +2,14 @@ import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
-from vectorbt_project.utils.telegram_compatibility import apply_vectorbt_telegram_patch
-apply_vectorbt_telegram_patch()
-
 import pandas as pd
-import vectorbt as vbt
-from entidades.estrategias_descritivas.double_ema_breakout import DoubleEmaBreakout, CondicaoEntrada, StopConfig, AlvoConfig
-from vectorbt_project.generator_vectorbt import gerar_por_nome
 from corretoras.funcoes_bybit import carregar_dados_historicos
+from vectorbt_project.grid_engine import gerar_combinacoes, avaliar_grid
 
 from datetime import datetime
 import time
 import os
-from itertools import product
 import psutil
-import numpy as np
 
 # Configurações gerais do grid (Bybit)
 simbolo = 'BTCUSDT'
@@ -46,107 +39,42 @@ df.columns = df.columns.str.lower()
 # Garantir pasta de resultados
 os.makedirs("data/results", exist_ok=True)
 
-# Executar todas as combinações
-resultados = []
-# equity_curves = {}
-
-total = len([
-    (c, l, s, r)
-    for c, l, s, r in product(grid_ema_curta, grid_ema_longa, grid_stop, grid_rr)
-    if l > c
-])
+# Executar todas as combinações em lote: EMAs calculadas uma vez por período e um único kernel Numba
+combinacoes = gerar_combinacoes(grid_ema_curta, grid_ema_longa, grid_stop, grid_rr)
+total = len(combinacoes)
 print(f"Executando {total} combinações...")
 
-testados = 0
 start = time.time()
-
-for ema_curta in grid_ema_curta:
-    for ema_longa in grid_ema_longa:
-        if ema_longa <= ema_curta:
-            continue  # evita combinações incoerentes
-        for stop in grid_stop:
-            for rr in grid_rr:
-                percent = (testados + 1) / total * 100
-                testados += 1
-                bar = '█' * int(percent / 2) + '-' * (50 - int(percent / 2))
-                elapsed = time.time() - start
-                tempo_medio = elapsed / testados
-                estimado_restante = (total - testados) * tempo_medio
-                estimado_str = f"{int(estimado_restante // 60)}m {int(estimado_restante % 60)}s"
-
-                print(f"\r[{bar}] {percent:.2f}% - {testados+1}/{total} | "
-                f"Decorrido: {int(elapsed // 60)}m {int(elapsed % 60)}s | "
-                f"Estimado: {estimado_str} | "
-                f"[RAM] {psutil.virtual_memory().percent}% usada", end='', flush=True)
-
-                nome = f"ema_{ema_curta}_{ema_longa}_stop_{stop}_rr_{rr}"
-                estrategia = DoubleEmaBreakout(
-                    nome=nome,
-                    tipo="long",
-                    condicoes_entrada=[
-                        CondicaoEntrada(tipo="fechamento_acima_ema", parametros={"periodo": ema_curta}),
-                        CondicaoEntrada(tipo="fechamento_acima_ema", parametros={"periodo": ema_longa}),
-                        CondicaoEntrada(tipo="rompe_maxima_anterior", parametros={})
-                    ],
-                    stop=StopConfig(tipo="minima_das_ultimas", parametros={"quantidade": stop}),
-                    alvo=AlvoConfig(tipo="rr", parametros={"multiplicador": rr})
-                )
-
-                try:
-                    # entries, exits, stop_price, target_price = gerar_por_nome("double_ema_breakout", df, estrategia)
-                    entries, exits, _, _ = gerar_por_nome("double_ema_breakout_orders", df, estrategia)
-
-                    size = pd.Series(0, index=df.index, dtype='float64')
-                    size[entries.notna()] = 1.0  # Compra (1)
-                    size[exits.notna()] = -1.0   # Venda (-1)
-                    size = size.where(size != 0, np.nan)
-
-                    order_price = entries.combine_first(exits)
-                    
-                    # Criar portfólio com sinais e preços de execução
-                    pf = vbt.Portfolio.from_orders(
-                        close=df['fechamento'],
-                        price=order_price,
-                        size_type='percent',
-                        size=size,
-                        init_cash=1000,
-                        fees=0.00055,  # Taxa de corretagem
-                        # slippage=0.0001,  # Slippage (diferença entre o preço de entrada e saída)
-                        freq=f'{intervalo}min',  # Frequência de 15 minutos
-                        direction='longonly'
-                    )
-                    stats = pf.stats()
-
-                    resultados.append({
-                        "moeda": simbolo,
-                        "intervalo": intervalo,
-                        "periodo": f"{data_inicio} : {data_fim}",
-                        "estrategia": nome,
-                        "ema_curta": ema_curta,
-                        "ema_longa": ema_longa,
-                        "stop": stop,
-                        "rr": rr,
-                        "saldo_inicial": 1000,
-                        "saldo_final": stats['End Value'],
-                        "fitness": stats['Total Return [%]'] * (1 - stats['Max Drawdown [%]'] / 100),
-                        "retorno_total": stats['Total Return [%]'],
-                        "max_drawdown": stats['Max Drawdown [%]'],
-                        "max_drawdown_duration": stats['Max Drawdown Duration'],
-                        "trades": stats['Total Trades'],
-                        "win_rate": stats['Win Rate [%]'],
-                        "ganho_medio": stats['Avg Winning Trade [%]'],
-                        "perda_media": stats['Avg Losing Trade [%]'],
-                        'melhor_trade': stats['Best Trade [%]'],
-                        'pior_trade': stats['Worst Trade [%]'],
-                        "sharpe_ratio": stats['Sharpe Ratio'],
-                        "sortino_ratio": stats['Sortino Ratio'],
-                        "calmar_ratio": stats['Calmar Ratio'],
-                    })
-
-                    # equity_curves[nome] = pf
-
-                except Exception as e:
-                    print(f"Erro em {nome}: {e}")
+metricas = avaliar_grid(df, combinacoes, intervalo=intervalo, permitir_short=False, saldo_inicial=1000, taxa=0.00055)
+elapsed = time.time() - start
+print(f"Decorrido: {int(elapsed // 60)}m {int(elapsed % 60)}s | [RAM] {psutil.virtual_memory().percent}% usada")
+
+resultados = pd.DataFrame({
+    "moeda": simbolo,
+    "intervalo": intervalo,
+    "periodo": f"{data_inicio} : {data_fim}",
+    "estrategia": [f"ema_{c}_{l}_stop_{s}_rr_{r}" for c, l, s, r in
+                   zip(metricas['ema_curta'], metricas['ema_longa'], metricas['stop'], metricas['rr'])],
+    "ema_curta": metricas['ema_curta'],
+    "ema_longa": metricas['ema_longa'],
+    "stop": metricas['stop'],
+    "rr": metricas['rr'],
+    "saldo_inicial": 1000,
+    "saldo_final": metricas['saldo_final'],
+    "fitness": metricas['retorno_total'] * (1 - metricas['max_drawdown'] / 100),
+    "retorno_total": metricas['retorno_total'],
+    "max_drawdown": metricas['max_drawdown'],
+    "max_drawdown_duration": metricas['max_drawdown_duration'],
+    "trades": metricas['trades'],
+    "win_rate": metricas['win_rate'],
+    "ganho_medio": metricas['ganho_medio'],
+    "perda_media": metricas['perda_media'],
+    'melhor_trade': metricas['melhor_trade'],
+    'pior_trade': metricas['pior_trade'],
+    "sharpe_ratio": metricas['sharpe_ratio'],
+    "sortino_ratio": metricas['sortino_ratio'],
+    "calmar_ratio": metricas['calmar_ratio'],
+})
 
 # Criar subpastas de resultados, se ainda não existirem
 os.makedirs("data/results/grids", exist_ok=True)
@@ -154,7 +82,7 @@ os.makedirs("data/results/tops", exist_ok=True)
 # os.makedirs("data/results/equities", exist_ok=True)
 
 # Salvar resultados por ordem de retorno_total e menor max_drawdown
-df_resultados = pd.DataFrame(resultados).sort_values(by="fitness", ascending=False)
+df_resultados = resultados.sort_values(by="fitness", ascending=False)
 # df_drawdown = pd.DataFrame(resultados).sort_values(by="max_drawdown", ascending=True)
 
 now = datetime.now().strftime("%Y%m%d_%H%M%S")
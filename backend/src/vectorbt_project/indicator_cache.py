@@ -0,0 +1,282 @@
+"""
+Cache de indicadores compartilhado por backtests e otimizadores.
+
+Grids e populações repetem poucos parâmetros distintos (dezenas de períodos de
+EMA para centenas de milhares de combinações), então cada indicador é calculado
+uma vez por dataset e reaproveitado. A chave combina:
+
+- a impressão digital do dataset (índice + OHLCV, a mesma usada pelo cache de fitness);
+- o nome do indicador, a coluna de origem e os parâmetros.
+
+Dois níveis:
+- memória: LRU limitado pelo total de bytes dos arrays;
+- disco (opcional): um `.npy` por indicador em `pasta/<impressão>/`, aberto com
+  `np.load(mmap_mode='r')`. Workers de processos diferentes (ProcessPoolEvaluator,
+  execuções repetidas do otimizador) leem os mesmos arquivos sem recalcular.
+
+Os arrays devolvidos são somente leitura, porque a mesma instância é entregue a
+todos os chamadores. As fórmulas são as mesmas das estratégias (`ewm(span=p)`
+com adjust=True, `rolling`) e do pandas_ta (RSI/ATR com RMA), calculadas com pandas.
+
+Uso:
+    from vectorbt_project.indicator_cache import ema, rsi
+    ema1 = ema(df, 9)             # np.ndarray alinhado com df
+    rsi14 = rsi(df['fechamento'])
+
+O cache padrão é criado na primeira chamada; `CACHE_INDICADORES_PASTA` (variável
+de ambiente) ou `configurar_cache_indicadores(pasta=...)` ativa o nível em disco.
+"""
+
+import hashlib
+import os
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+MAX_BYTES_PADRAO = 512 * 1024 * 1024
+PASTA_PADRAO = 'data/cache/indicadores'
+COLUNAS_IMPRESSAO = ('abertura', 'maxima', 'minima', 'fechamento', 'volume')
+
+Dados = Union[pd.DataFrame, pd.Series, np.ndarray]
+
+
+def dataset_fingerprint(df: pd.DataFrame, columns: Iterable[str] = COLUNAS_IMPRESSAO) -> str:
+    """Hash do índice e das colunas de preço/volume presentes no DataFrame."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(np.ascontiguousarray(df.index.asi8 if isinstance(df.index, pd.DatetimeIndex)
+                                       else df.index.to_numpy()).tobytes())
+    for col in columns:
+        if col in df.columns:
+            digest.update(col.encode())
+            digest.update(np.ascontiguousarray(df[col].to_numpy(dtype=np.float64)).tobytes())
+    return digest.hexdigest()
+
+
+def _impressao_array(valores: np.ndarray) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(b'array')
+    digest.update(np.ascontiguousarray(valores, dtype=np.float64).tobytes())
+    return digest.hexdigest()
+
+
+# Impressões já calculadas por objeto (DataFrame/Series/ndarray), descartadas quando o objeto morre.
+# Os dados são tratados como imutáveis depois da primeira consulta.
+_impressoes: Dict[int, Tuple[weakref.ref, int, str]] = {}
+_impressoes_lock = threading.Lock()
+
+
+def _impressao(objeto, calcular: Callable[[], str]) -> str:
+    chave = id(objeto)
+    with _impressoes_lock:
+        registro = _impressoes.get(chave)
+        if registro is not None and registro[0]() is objeto and registro[1] == len(objeto):
+            return registro[2]
+
+    impressao = calcular()
+    try:
+        referencia = weakref.ref(objeto, lambda _, chave=chave: _impressoes.pop(chave, None))
+    except TypeError:
+        return impressao
+    with _impressoes_lock:
+        _impressoes[chave] = (referencia, len(objeto), impressao)
+    return impressao
+
+
+def _fonte(dados: Dados, coluna: str) -> Tuple[str, np.ndarray, str]:
+    """(impressão do dataset, valores float64 da coluna, nome da coluna) para qualquer entrada aceita."""
+    if isinstance(dados, pd.DataFrame):
+        impressao = _impressao(dados, lambda: dataset_fingerprint(dados))
+        valores = dados[coluna].to_numpy(dtype=np.float64)
+        if coluna not in COLUNAS_IMPRESSAO:
+            # Colunas derivadas (ex.: rsi_1d) não fazem parte da impressão do dataset
+            impressao = f"{impressao}-{_impressao_array(valores)}"
+        return impressao, valores, coluna
+    if isinstance(dados, pd.Series):
+        valores = dados.to_numpy(dtype=np.float64)
+        return _impressao(dados, lambda: _impressao_array(valores)), valores, str(dados.name or 'serie')
+    valores = np.asarray(dados, dtype=np.float64)
+    return _impressao(dados, lambda: _impressao_array(valores)), valores, 'array'
+
+
+class CacheIndicadores:
+    """LRU em memória (limitado em bytes) com nível opcional de `.npy` memory-mapped em disco."""
+
+    def __init__(self, max_bytes: int = MAX_BYTES_PADRAO, pasta: Optional[str] = None):
+        self.max_bytes = max_bytes
+        self.pasta = pasta
+        self.hits = 0
+        self.misses = 0
+        self._memoria: 'OrderedDict[Tuple, np.ndarray]' = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._memoria)
+
+    def obter(self, impressao: str, nome: str, parametros: Tuple, calcular: Callable[[], np.ndarray]) -> np.ndarray:
+        """Valor em cache para (dataset, indicador, parâmetros) ou o resultado de `calcular()`."""
+        chave = (impressao, nome, parametros)
+        with self._lock:
+            valor = self._memoria.get(chave)
+            if valor is not None:
+                self._memoria.move_to_end(chave)
+                self.hits += 1
+                return valor
+
+        caminho = self._caminho(chave)
+        if caminho is not None and os.path.exists(caminho):
+            valor = np.load(caminho, mmap_mode='r')
+            with self._lock:
+                self.hits += 1
+        else:
+            valor = np.ascontiguousarray(calcular(), dtype=np.float64)
+            valor.flags.writeable = False
+            if caminho is not None:
+                self._salvar(caminho, valor)
+            with self._lock:
+                self.misses += 1
+
+        with self._lock:
+            self._guardar(chave, valor)
+        return valor
+
+    def _guardar(self, chave: Tuple, valor: np.ndarray) -> None:
+        anterior = self._memoria.pop(chave, None)
+        if anterior is not None:
+            self._bytes -= anterior.nbytes
+        self._memoria[chave] = valor
+        self._bytes += valor.nbytes
+        while self._bytes > self.max_bytes and len(self._memoria) > 1:
+            _, removido = self._memoria.popitem(last=False)
+            self._bytes -= removido.nbytes
+
+    def _caminho(self, chave: Tuple) -> Optional[str]:
+        if not self.pasta:
+            return None
+        impressao, nome, parametros = chave
+        sufixo = '_'.join(str(parametro) for parametro in parametros)
+        return os.path.join(self.pasta, impressao, f"{nome}_{sufixo}.npy")
+
+    @staticmethod
+    def _salvar(caminho: str, valor: np.ndarray) -> None:
+        # Grava em arquivo temporário e renomeia: outro processo nunca lê um .npy pela metade
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        temporario = f"{caminho}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporario, 'wb') as arquivo:
+            np.save(arquivo, valor)
+        os.replace(temporario, caminho)
+
+    def limpar(self) -> None:
+        """Esvazia o nível em memória (os arquivos em disco continuam válidos)."""
+        with self._lock:
+            self._memoria.clear()
+            self._bytes = 0
+
+
+_instance: Optional[CacheIndicadores] = None
+_instance_lock = threading.Lock()
+
+
+def get_cache_indicadores() -> CacheIndicadores:
+    global _instance
+    if _instance is None:
+        with _instance_lock:
+            if _instance is None:
+                _instance = CacheIndicadores(pasta=os.getenv('CACHE_INDICADORES_PASTA') or None)
+    return _instance
+
+
+def configurar_cache_indicadores(max_bytes: int = MAX_BYTES_PADRAO, pasta: Optional[str] = None) -> CacheIndicadores:
+    """
+    Substitui o cache padrão (ex.: para ativar o nível em disco antes de um otimizador).
+
+    A pasta também vai para `CACHE_INDICADORES_PASTA`, então workers criados depois
+    (fork ou spawn) usam o mesmo nível em disco.
+    """
+    global _instance
+    with _instance_lock:
+        _instance = CacheIndicadores(max_bytes=max_bytes, pasta=pasta)
+        if pasta:
+            os.environ['CACHE_INDICADORES_PASTA'] = pasta
+        else:
+            os.environ.pop('CACHE_INDICADORES_PASTA', None)
+    return _instance
+
+
+# ----------------------------------------------------------------------
+# Indicadores
+# ----------------------------------------------------------------------
+
+def ema(dados: Dados, periodo: int, coluna: str = 'fechamento', adjust: bool = True) -> np.ndarray:
+    """`ewm(span=periodo, adjust=adjust).mean()` (adjust=True é o usado pelas estratégias)."""
+    impressao, valores, coluna = _fonte(dados, coluna)
+    return get_cache_indicadores().obter(
+        impressao, 'ema', (coluna, int(periodo), bool(adjust)),
+        lambda: pd.Series(valores).ewm(span=int(periodo), adjust=adjust).mean().to_numpy())
+
+
+def sma(dados: Dados, periodo: int, coluna: str = 'fechamento') -> np.ndarray:
+    """`rolling(window=periodo).mean()`."""
+    impressao, valores, coluna = _fonte(dados, coluna)
+    return get_cache_indicadores().obter(
+        impressao, 'sma', (coluna, int(periodo)),
+        lambda: pd.Series(valores).rolling(window=int(periodo)).mean().to_numpy())
+
+
+def _rma(serie: pd.Series, periodo: int) -> pd.Series:
+    # RMA do pandas_ta
+    return serie.ewm(alpha=1.0 / periodo, min_periods=periodo).mean()
+
+
+def rsi(dados: Dados, periodo: int = 14, coluna: str = 'fechamento') -> np.ndarray:
+    """RSI do pandas_ta: RMA dos ganhos sobre RMA dos ganhos + |perdas|."""
+    impressao, valores, coluna = _fonte(dados, coluna)
+
+    def calcular():
+        variacao = pd.Series(valores).diff()
+        ganhos = _rma(variacao.clip(lower=0), int(periodo))
+        perdas = _rma((-variacao).clip(lower=0), int(periodo))
+        return (100 * ganhos / (ganhos + perdas)).to_numpy()
+
+    return get_cache_indicadores().obter(impressao, 'rsi', (coluna, int(periodo)), calcular)
+
+
+def atr(df: pd.DataFrame, periodo: int = 14) -> np.ndarray:
+    """ATR do pandas_ta (`ATRr_{periodo}`): RMA do true range, sem a primeira vela."""
+    impressao, fechamento, _ = _fonte(df, 'fechamento')
+
+    def calcular():
+        maxima = pd.Series(df['maxima'].to_numpy(dtype=np.float64))
+        minima = pd.Series(df['minima'].to_numpy(dtype=np.float64))
+        anterior = pd.Series(fechamento).shift(1)
+        true_range = pd.concat([maxima - minima, (maxima - anterior).abs(), (anterior - minima).abs()], axis=1).max(axis=1)
+        true_range.iloc[:1] = np.nan
+        return _rma(true_range, int(periodo)).to_numpy()
+
+    return get_cache_indicadores().obter(impressao, 'atr', (int(periodo),), calcular)
+
+
+def bollinger(dados: Dados, periodo: int = 20, desvios: float = 2.0, coluna: str = 'fechamento',
+              ddof: int = 1) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    (inferior, média, superior) com média e desvio padrão rolantes.
+
+    `ddof=1` (desvio amostral) segue o pandas_ta 0.4.71b0, `indicadores.bandas_bollinger`,
+    `compilados.bandas_bollinger` e o `BollingerIncremental`.
+    """
+    impressao, valores, coluna = _fonte(dados, coluna)
+    cache = get_cache_indicadores()
+    periodo = int(periodo)
+    media = cache.obter(impressao, 'sma', (coluna, periodo),
+                        lambda: pd.Series(valores).rolling(window=periodo).mean().to_numpy())
+    desvio = cache.obter(impressao, 'desvio_padrao', (coluna, periodo, int(ddof)),
+                         lambda: pd.Series(valores).rolling(window=periodo).std(ddof=ddof).to_numpy())
+    inferior = cache.obter(impressao, 'bollinger_inferior', (coluna, periodo, float(desvios), int(ddof)),
+                           lambda: media - desvios * desvio)
+    superior = cache.obter(impressao, 'bollinger_superior', (coluna, periodo, float(desvios), int(ddof)),
+                           lambda: media + desvios * desvio)
+    return inferior, media, superior
@@ -1,8 +1,13 @@
 from entidades.estrategias_descritivas.double_ema_breakout import DoubleEmaBreakout, CondicaoEntrada, StopConfig, AlvoConfig
 from vectorbt_project.generator_vectorbt import gerar_por_nome
+from vectorbt_project.fast_metrics import calcular_metricas
 from vectorbt_project.utils.telegram_compatibility import apply_vectorbt_telegram_patch
 apply_vectorbt_telegram_patch()
-import vectorbt as vbt
+
+# Configuração do backtest (também compõe a chave do cache de fitness)
+INTERVALO = '15'
+SALDO_INICIAL = 1000
+TAXA = 0.00055
 
 def evaluate_individual(df, individual):
     """Evaluate an individual's genome by running the strategy with its parameters"""
@@ -34,19 +39,17 @@ def evaluate_individual(df, individual):
         
         order_price = entries.combine_first(exits)
         
-        pf = vbt.Portfolio.from_orders(
+        # Métricas em uma passada Numba (mesmas chaves de pf.stats())
+        stats = calcular_metricas(
             close=df['fechamento'],
-            price=order_price,
-            size_type='targetpercent',
+            preco_ordem=order_price,
             size=size,
-            init_cash=1000,
-            fees=0.00055,
-            freq='15min',
-            direction='both'
+            alvo_percentual=True,
+            intervalo=INTERVALO,
+            saldo_inicial=SALDO_INICIAL,
+            taxa=TAXA
         )
         
-        stats = pf.stats()
-        
         # Fitness function: weighted combination of return and drawdown
         fitness = stats['Total Return [%]'] * (1 - stats['Max Drawdown [%]'] / 100)
         
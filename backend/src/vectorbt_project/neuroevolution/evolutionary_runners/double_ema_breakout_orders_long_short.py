@@ -5,10 +5,12 @@ import random
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
 
 from vectorbt_project.neuroevolution.population import Population
-from vectorbt_project.neuroevolution.evaluators.double_ema_breakout_orders_long_short import evaluate_individual
+from vectorbt_project.neuroevolution.parallel_evaluator import create_evaluator
+from vectorbt_project.neuroevolution.fitness_cache import FitnessCache, CachedEvaluator, make_scope
+from vectorbt_project.neuroevolution.evaluators.double_ema_breakout_orders_long_short import evaluate_individual, INTERVALO, SALDO_INICIAL, TAXA
 
 class DoubleEMAEvolverLongShort:
-    def __init__(self, df, population_size=50, generations=20, elite_size=5, param_ranges=None):
+    def __init__(self, df, population_size=50, generations=20, elite_size=5, param_ranges=None, n_workers=None, evaluator=None, fitness_cache=None):
         self.df = df
         self.population_size = population_size
         self.generations = generations
@@ -17,22 +19,33 @@ class DoubleEMAEvolverLongShort:
         # Define parameter ranges for evolution
         self.param_ranges = param_ranges
         
+        # Fitness backend (process pool with candles in shared memory by default)
+        self.evaluator = evaluator or create_evaluator(evaluate_individual, df, n_workers)
+        
+        # Genomes already scored on this dataset/fee setup skip the backtest (memory LRU by default)
+        scope = make_scope(evaluate_individual, df, intervalo=INTERVALO, saldo_inicial=SALDO_INICIAL, taxa=TAXA)
+        self.evaluator = CachedEvaluator(self.evaluator, fitness_cache if fitness_cache is not None else FitnessCache(), scope)
+        
         # Initialize population
         self.population = Population(population_size, self.param_ranges)
         self.population.initialize()
     
     def evolve(self):
         """Run the evolutionary process"""
+        try:
+            return self._evolve()
+        finally:
+            self.evaluator.close()
+    
+    def _evolve(self):
         best_fitness = -float('inf')
         generations_without_improvement = 0
         
         print(f"Avaliando {self.population.size} individuos por geração...")
         for generation in range(self.generations):
             print(f"\nAvaliando geração {generation + 1}/{self.generations}...")
-            # Evaluate all individuals
-            for individual in self.population.individuals:
-                if individual.fitness is None:
-                    individual.fitness = evaluate_individual(self.df, individual)
+            # Evaluate all individuals (whole generation at once, results in population order)
+            self.evaluator.evaluate([individual for individual in self.population.individuals if individual.fitness is None])
             
             # Sort population by fitness
             self.population.sort_by_fitness()
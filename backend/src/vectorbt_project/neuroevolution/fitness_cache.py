@@ -0,0 +1,241 @@
+"""
+Cache de fitness por genoma para os evolvers.
+
+Crossover e mutação em ranges inteiros pequenos regeneram com frequência genomas
+já avaliados, e os trainers são rodados de novo sobre a mesma janela de velas.
+A chave de cada entrada combina:
+
+- o escopo: módulo do `evaluate_individual`, versão do código (hash do fonte do
+  módulo do avaliador e de todos os módulos do projeto alcançáveis a partir
+  dele, inclusive as estratégias carregadas por `gerar_por_nome`, mais
+  CACHE_VERSION), impressão digital do dataset (índice + OHLCV) e a configuração
+  do backtest (taxa, saldo inicial, intervalo);
+- o genoma, serializado com as chaves ordenadas.
+
+Dois níveis:
+- memória: LRU com `max_items` entradas;
+- disco (opcional): SQLite em `path`, compartilhado entre execuções. O valor é o
+  par `(fitness, metadata)` em pickle, então `Individual.metadata` volta igual.
+
+`CachedEvaluator` envolve qualquer backend de `parallel_evaluator`: consulta o
+cache, manda ao backend só os genomas ausentes (uma vez cada, mesmo que repetidos
+na geração) e guarda os resultados.
+"""
+
+import ast
+import copy
+import hashlib
+import json
+import os
+import pickle
+import re
+import sqlite3
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import pandas as pd
+
+from vectorbt_project.indicator_cache import dataset_fingerprint
+
+from .individual import Individual
+
+DEFAULT_CACHE_PATH = 'data/cache/fitness_cache.sqlite'
+DEFAULT_MAX_ITEMS = 200_000
+# Incrementar quando o fitness mudar por código fora do alcance de code_version (ex.: vectorbt)
+CACHE_VERSION = 1
+RAIZ_PROJETO = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+Entry = Tuple[float, Dict[str, Any]]
+
+
+# `gerar_por_nome("...")` carrega a estratégia por importlib: o import não aparece no fonte
+_ESTRATEGIA_POR_NOME = re.compile(r"gerar_por_nome\(\s*['\"](\w+)['\"]")
+
+
+def _arquivo_do_projeto(nome_modulo: str) -> Optional[str]:
+    """Arquivo .py do módulo dentro de RAIZ_PROJETO (sem importá-lo), ou None se for de fora."""
+    caminho = os.path.join(RAIZ_PROJETO, *nome_modulo.split('.'))
+    for arquivo in (f'{caminho}.py', os.path.join(caminho, '__init__.py')):
+        if os.path.isfile(arquivo):
+            return arquivo
+    return None
+
+
+def _imports(nome_modulo: str, arquivo: str, fonte: str) -> Set[str]:
+    """Módulos citados pelo fonte: imports (absolutos e relativos) e estratégias de `gerar_por_nome`."""
+    pacote = nome_modulo if arquivo.endswith('__init__.py') else nome_modulo.rpartition('.')[0]
+    nomes = {f'vectorbt_project.strategies.{nome}' for nome in _ESTRATEGIA_POR_NOME.findall(fonte)}
+    for no in ast.walk(ast.parse(fonte)):
+        if isinstance(no, ast.Import):
+            nomes.update(alias.name for alias in no.names)
+        elif isinstance(no, ast.ImportFrom):
+            base = no.module or ''
+            if no.level:
+                partes = pacote.split('.')[:len(pacote.split('.')) - no.level + 1]
+                base = '.'.join(partes + ([base] if base else []))
+            nomes.add(base)
+            # `from pacote import submodulo`
+            nomes.update(f'{base}.{alias.name}' for alias in no.names)
+    return nomes
+
+
+def modulos_do_projeto(evaluate_fn) -> Dict[str, str]:
+    """Módulos do projeto alcançáveis a partir do avaliador (fecho transitivo): nome -> arquivo."""
+    inicial = evaluate_fn.__module__
+    arquivo = _arquivo_do_projeto(inicial) or getattr(sys.modules.get(inicial), '__file__', None)
+    encontrados: Dict[str, str] = {}
+    pendentes = [(inicial, arquivo)] if arquivo else []
+    while pendentes:
+        nome, arquivo = pendentes.pop()
+        if nome in encontrados:
+            continue
+        encontrados[nome] = arquivo
+        with open(arquivo, 'r', encoding='utf-8') as origem:
+            fonte = origem.read()
+        for dependencia in _imports(nome, arquivo, fonte):
+            arquivo_dependencia = _arquivo_do_projeto(dependencia)
+            if arquivo_dependencia and dependencia not in encontrados:
+                pendentes.append((dependencia, arquivo_dependencia))
+    return encontrados
+
+
+def code_version(evaluate_fn) -> str:
+    """Hash do fonte do avaliador e de todos os módulos do projeto de que ele depende."""
+    resumo = hashlib.sha1(f"v{CACHE_VERSION}".encode())
+    modulos = modulos_do_projeto(evaluate_fn)
+    if not modulos:
+        resumo.update(evaluate_fn.__module__.encode())
+    for nome in sorted(modulos):
+        resumo.update(nome.encode())
+        with open(modulos[nome], 'rb') as origem:
+            resumo.update(origem.read())
+    return resumo.hexdigest()[:16]
+
+
+def make_scope(evaluate_fn, df: pd.DataFrame, **settings) -> str:
+    """Escopo das chaves: avaliador + versão do código + dataset + configuração do backtest (taxa, saldo...)."""
+    partes = [f"{evaluate_fn.__module__}.{evaluate_fn.__qualname__}", code_version(evaluate_fn),
+              dataset_fingerprint(df)]
+    partes += [f"{nome}={settings[nome]!r}" for nome in sorted(settings)]
+    return '|'.join(partes)
+
+
+def genome_key(scope: str, genome: Dict[str, Any]) -> str:
+    texto = json.dumps(genome, sort_keys=True, default=lambda valor: valor.item())
+    return hashlib.sha1(f"{scope}|{texto}".encode()).hexdigest()
+
+
+class FitnessCache:
+    """LRU em memória com nível opcional em SQLite."""
+
+    def __init__(self, max_items: int = DEFAULT_MAX_ITEMS, path: Optional[str] = None):
+        self.max_items = max_items
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._memory: 'OrderedDict[str, Entry]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+
+        if path:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute('PRAGMA journal_mode=WAL')
+            self._db.execute('CREATE TABLE IF NOT EXISTS fitness (chave TEXT PRIMARY KEY, valor BLOB NOT NULL)')
+            self._db.commit()
+
+    def __len__(self) -> int:
+        return len(self._memory)
+
+    def get(self, key: str) -> Optional[Entry]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+            elif self._db is not None:
+                row = self._db.execute('SELECT valor FROM fitness WHERE chave = ?', (key,)).fetchone()
+                if row is not None:
+                    entry = pickle.loads(row[0])
+                    self._remember(key, entry)
+
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry
+
+    def put_many(self, entries: Dict[str, Entry]) -> None:
+        if not entries:
+            return
+        with self._lock:
+            for key, entry in entries.items():
+                self._remember(key, entry)
+            if self._db is not None:
+                self._db.executemany(
+                    'INSERT OR REPLACE INTO fitness (chave, valor) VALUES (?, ?)',
+                    [(key, pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL)) for key, entry in entries.items()],
+                )
+                self._db.commit()
+
+    def _remember(self, key: str, entry: Entry) -> None:
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_items:
+            self._memory.popitem(last=False)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+class CachedEvaluator:
+    """Backend de avaliação que consulta o `FitnessCache` antes de rodar o backtest."""
+
+    def __init__(self, evaluator, cache: FitnessCache, scope: str):
+        self.evaluator = evaluator
+        self.cache = cache
+        self.scope = scope
+
+    def evaluate(self, individuals: List[Individual]) -> None:
+        pending: Dict[str, List[Individual]] = {}
+        for individual in individuals:
+            key = genome_key(self.scope, individual.genome)
+            if key in pending:
+                pending[key].append(individual)
+                continue
+            entry = self.cache.get(key)
+            if entry is None:
+                pending[key] = [individual]
+            else:
+                self._apply(individual, entry)
+
+        if not pending:
+            return
+
+        # Cada genoma ausente é avaliado uma única vez
+        first = [group[0] for group in pending.values()]
+        self.evaluator.evaluate(first)
+
+        new_entries = {}
+        for key, group in pending.items():
+            entry = (group[0].fitness, group[0].metadata)
+            for individual in group[1:]:
+                self._apply(individual, entry)
+            # Metadata vazio = genoma inválido ou erro na avaliação: não guarda
+            if entry[1]:
+                new_entries[key] = copy.deepcopy(entry)
+        self.cache.put_many(new_entries)
+
+    @staticmethod
+    def _apply(individual: Individual, entry: Entry) -> None:
+        fitness, metadata = entry
+        individual.fitness = fitness
+        individual.metadata = copy.deepcopy(metadata)
+
+    def close(self) -> None:
+        self.evaluator.close()
+        self.cache.close()
@@ -0,0 +1,143 @@
+"""
+Backends de avaliação de fitness para os evolvers.
+
+Um avaliador recebe a lista de indivíduos de uma geração e preenche `fitness` e
+`metadata` de cada um, na mesma ordem da lista, usando a mesma função
+`evaluate_individual(df, individual)` dos módulos em `evaluators/`.
+
+- `SequentialEvaluator`: um indivíduo por vez no processo atual (comportamento antigo).
+- `ProcessPoolEvaluator`: pool de processos; as colunas float64 do DataFrame
+  de velas ficam em um bloco de shared memory criado uma única vez, e cada worker
+  monta um DataFrame sobre esse bloco no initializer (sem copiar nem serializar
+  as velas a cada tarefa). Só o genoma vai para o worker e só
+  `(fitness, metadata)` volta.
+
+Uso:
+    evaluator = create_evaluator(evaluate_individual, df, n_workers=None)
+    try:
+        evaluator.evaluate(population.individuals)
+    finally:
+        evaluator.close()
+"""
+
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .individual import Individual
+
+EvaluateFn = Callable[[pd.DataFrame, Individual], float]
+
+# Estado de cada worker, preenchido em `_init_worker`
+_worker_df: Optional[pd.DataFrame] = None
+_worker_shm: Optional[SharedMemory] = None
+_worker_evaluate: Optional[EvaluateFn] = None
+
+
+def _evaluate_one(evaluate_fn: EvaluateFn, df: pd.DataFrame, genome: Dict[str, Any]) -> Tuple[float, Dict[str, Any]]:
+    individual = Individual(genome=genome)
+    fitness = evaluate_fn(df, individual)
+    return fitness, individual.metadata
+
+
+class SequentialEvaluator:
+    """Avalia um indivíduo por vez no processo atual."""
+
+    def __init__(self, evaluate_fn: EvaluateFn, df: pd.DataFrame):
+        self.evaluate_fn = evaluate_fn
+        self.df = df
+
+    def evaluate(self, individuals: List[Individual]) -> None:
+        for individual in individuals:
+            individual.fitness = self.evaluate_fn(self.df, individual)
+
+    def close(self) -> None:
+        pass
+
+
+class ProcessPoolEvaluator:
+    """Avalia uma geração inteira em paralelo, com as velas em shared memory."""
+
+    def __init__(self, evaluate_fn: EvaluateFn, df: pd.DataFrame, n_workers: Optional[int] = None):
+        self.evaluate_fn = evaluate_fn
+        self.df = df
+        self.n_workers = n_workers or os.cpu_count() or 1
+        self._shm: Optional[SharedMemory] = None
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _start(self) -> None:
+        numeric = [col for col in self.df.columns if self.df[col].dtype == np.float64]
+        others = self.df.drop(columns=numeric)
+
+        # Uma linha por coluna: cada coluna fica contígua no bloco
+        values = self.df[numeric].to_numpy(dtype=np.float64).T
+        self._shm = SharedMemory(create=True, size=max(values.nbytes, 1))
+        np.ndarray(values.shape, dtype=np.float64, buffer=self._shm.buf)[:] = values
+
+        layout = (self._shm.name, values.shape, numeric, self.df.index, others)
+        # spawn: com o pool de threads do Numba (kernels parallel=True) já iniciado, um fork
+        # deixa o processo pai travado na saída
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.n_workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(layout, self.evaluate_fn),
+        )
+
+    def evaluate(self, individuals: List[Individual]) -> None:
+        if not individuals:
+            return
+        if self._executor is None:
+            self._start()
+
+        chunksize = max(1, math.ceil(len(individuals) / (self.n_workers * 4)))
+        genomes = [individual.genome for individual in individuals]
+        # `map` devolve na ordem de entrada, independente de qual worker terminou primeiro
+        for individual, (fitness, metadata) in zip(
+                individuals, self._executor.map(_evaluate_in_worker, genomes, chunksize=chunksize)):
+            individual.fitness = fitness
+            individual.metadata = metadata
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+
+def _init_worker(layout, evaluate_fn: EvaluateFn) -> None:
+    global _worker_df, _worker_shm, _worker_evaluate
+    name, shape, numeric, index, others = layout
+
+    # Os workers compartilham o resource tracker do pai, que é quem remove o bloco em `close`
+    _worker_shm = SharedMemory(name=name)
+
+    values = np.ndarray(shape, dtype=np.float64, buffer=_worker_shm.buf)
+    values.flags.writeable = False
+    # Um único bloco float64 sobre a shared memory; colunas de outros tipos vêm em cópia
+    df = pd.DataFrame(values.T, index=index, columns=numeric, copy=False)
+    for col in others.columns:
+        df[col] = others[col].values
+    _worker_df = df
+    _worker_evaluate = evaluate_fn
+
+
+def _evaluate_in_worker(genome: Dict[str, Any]) -> Tuple[float, Dict[str, Any]]:
+    return _evaluate_one(_worker_evaluate, _worker_df, genome)
+
+
+def create_evaluator(evaluate_fn: EvaluateFn, df: pd.DataFrame, n_workers: Optional[int] = None):
+    """`n_workers=1` avalia no processo atual; `None` usa todos os núcleos."""
+    n_workers = n_workers or os.cpu_count() or 1
+    if n_workers == 1:
+        return SequentialEvaluator(evaluate_fn, df)
+    return ProcessPoolEvaluator(evaluate_fn, df, n_workers)
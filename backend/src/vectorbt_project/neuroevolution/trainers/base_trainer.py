@@ -3,6 +3,8 @@ from abc import ABC, abstractmethod
 from typing import Dict, Any, List
 import pandas as pd
 from datetime import datetime
+from vectorbt_project.neuroevolution.fitness_cache import DEFAULT_CACHE_PATH
+from vectorbt_project.indicator_cache import PASTA_PADRAO as DEFAULT_INDICATOR_CACHE_PATH, configurar_cache_indicadores
 
 class BaseTrainer(ABC):
     def __init__(
@@ -14,7 +16,10 @@ class BaseTrainer(ABC):
         population_size: int = 500,
         generations: int = 15,
         elite_size: int = 25,
-        param_ranges: Dict[str, tuple] = None
+        param_ranges: Dict[str, tuple] = None,
+        n_workers: int = None,
+        fitness_cache_path: str = DEFAULT_CACHE_PATH,
+        indicator_cache_path: str = DEFAULT_INDICATOR_CACHE_PATH
     ):
         self.symbol = symbol
         self.interval = interval
@@ -24,6 +29,9 @@ class BaseTrainer(ABC):
         self.generations = generations
         self.elite_size = elite_size
         self.param_ranges = param_ranges
+        self.n_workers = n_workers
+        self.fitness_cache_path = fitness_cache_path
+        self.indicator_cache_path = indicator_cache_path
         self.results = []
         
     @abstractmethod
@@ -53,6 +61,10 @@ class BaseTrainer(ABC):
     
     def run(self) -> List[Dict[str, Any]]:
         """Executa o processo completo de treinamento"""
+        # EMAs/RSIs em disco compartilhados entre os workers e entre execuções
+        if self.indicator_cache_path:
+            configurar_cache_indicadores(pasta=self.indicator_cache_path)
+
         # Carrega dados
         df = self.load_data()
         
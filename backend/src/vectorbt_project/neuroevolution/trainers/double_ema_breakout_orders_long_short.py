@@ -11,6 +11,8 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '.
 from corretoras.funcoes_bybit import carregar_dados_historicos
 from vectorbt_project.neuroevolution.evolutionary_runners.double_ema_breakout_orders_long_short import DoubleEMAEvolverLongShort
 from vectorbt_project.neuroevolution.trainers.base_trainer import BaseTrainer
+from vectorbt_project.neuroevolution.fitness_cache import FitnessCache, DEFAULT_CACHE_PATH
+from vectorbt_project.indicator_cache import PASTA_PADRAO as DEFAULT_INDICATOR_CACHE_PATH
 
 class DoubleEMABreakoutLongShortTrainer(BaseTrainer):
     def __init__(
@@ -20,6 +22,9 @@ class DoubleEMABreakoutLongShortTrainer(BaseTrainer):
         start_date: str = '2024-01-01',
         # end_date: str = datetime.now().strftime('%Y-%m-%d'),
         end_date: str = '2024-09-01',
+        n_workers: int = None,  # None = todos os núcleos, 1 = avaliação sequencial
+        fitness_cache_path: str = DEFAULT_CACHE_PATH,  # None = cache só em memória
+        indicator_cache_path: str = DEFAULT_INDICATOR_CACHE_PATH,  # None = indicadores só em memória
         
         # Otimização rápida
         population_size: int = 500,
@@ -57,7 +62,10 @@ class DoubleEMABreakoutLongShortTrainer(BaseTrainer):
             population_size=population_size,
             generations=generations,
             elite_size=elite_size,
-            param_ranges=param_ranges
+            param_ranges=param_ranges,
+            n_workers=n_workers,
+            fitness_cache_path=fitness_cache_path,
+            indicator_cache_path=indicator_cache_path
         )
     
     def load_data(self) -> pd.DataFrame:
@@ -79,7 +87,9 @@ class DoubleEMABreakoutLongShortTrainer(BaseTrainer):
             population_size=self.population_size,
             generations=self.generations,
             elite_size=self.elite_size,
-            param_ranges=self.param_ranges
+            param_ranges=self.param_ranges,
+            n_workers=self.n_workers,
+            fitness_cache=FitnessCache(path=self.fitness_cache_path)
         )
     
     def process_results(self, best_individuals: List[Any]) -> List[Dict[str, Any]]:
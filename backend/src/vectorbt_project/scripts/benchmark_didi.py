@@ -0,0 +1,84 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import time
+import numpy as np
+import pandas as pd
+from indicadores.didi import calcular_didi_lote, COMPRA, VENDA
+
+# Conferência do motor Didi (indicadores.didi) contra os loops com .iloc que os
+# scripts analise_didi_* usavam, e custo de varrer o universo inteiro de uma vez
+
+quantidade_simbolos = 200
+velas = 1000
+tolerancia = 0.01
+semente = 7
+
+
+def didi_referencia(fechamento):
+    # Loops originais de analise_didi_index.py, sem alterações de lógica
+    df = pd.DataFrame({'fechamento': fechamento})
+    df['didi_curta'] = df['fechamento'].rolling(window=3).mean()
+    df['didi_media'] = df['fechamento'].rolling(window=8).mean()
+    df['didi_longa'] = df['fechamento'].rolling(window=20).mean()
+
+    agulhadas_compra, agulhadas_venda = [], []
+    for i in range(21, len(df)):
+        curta = df['didi_curta'].iloc[i]
+        media = df['didi_media'].iloc[i]
+        longa = df['didi_longa'].iloc[i]
+        curta_ant = df['didi_curta'].iloc[i-1]
+        longa_ant = df['didi_longa'].iloc[i-1]
+        max_val = max(curta, media, longa)
+        min_val = min(curta, media, longa)
+        if (max_val - min_val) / max_val < tolerancia:
+            if curta_ant < longa_ant and curta > longa:
+                agulhadas_compra.append(i)
+            elif curta_ant > longa_ant and curta < longa:
+                agulhadas_venda.append(i)
+
+    puntos_compra, puntos_venda = [], []
+    for i in range(2, len(df)):
+        curta = df['didi_curta'].iloc[i]
+        media = df['didi_media'].iloc[i]
+        longa = df['didi_longa'].iloc[i]
+        curta_ant = df['didi_curta'].iloc[i-1]
+        media_ant = df['didi_media'].iloc[i-1]
+        if curta_ant <= media_ant and curta > media and curta < longa:
+            puntos_compra.append(i)
+        elif curta_ant >= media_ant and curta < media and curta > longa:
+            puntos_venda.append(i)
+
+    return agulhadas_compra, agulhadas_venda, puntos_compra, puntos_venda
+
+
+rng = np.random.default_rng(semente)
+# Passeio aleatório arredondado a 0.1 para também haver empates entre as médias
+universo = np.round(1000 + np.cumsum(rng.normal(size=(quantidade_simbolos, velas)), axis=1), 1)
+
+calcular_didi_lote(universo[:2])  # compilação
+
+inicio = time.perf_counter()
+referencias = [didi_referencia(fechamento) for fechamento in universo]
+tempo_referencia = time.perf_counter() - inicio
+
+inicio = time.perf_counter()
+didis = calcular_didi_lote(universo, tolerancia=tolerancia)
+tempo_lote = time.perf_counter() - inicio
+
+divergentes = 0
+sinais = 0
+for referencia, didi in zip(referencias, didis):
+    obtido = (didi.agulhadas(COMPRA), didi.agulhadas(VENDA), didi.puntos(COMPRA), didi.puntos(VENDA))
+    sinais += sum(len(s) for s in obtido)
+    divergentes += obtido != referencia
+
+print(f"{quantidade_simbolos} símbolos x {velas} velas ({sinais} agulhadas/puntos)\n")
+print(f"loops com .iloc:  {tempo_referencia * 1e3:10,.1f} ms")
+print(f"motor em lote:    {tempo_lote * 1e3:10,.1f} ms  ({tempo_referencia / tempo_lote:,.0f}x)")
+
+if divergentes:
+    print(f"\n❌ {divergentes} símbolo(s) com sinais diferentes")
+    sys.exit(1)
+print("\n✅ agulhadas e puntos idênticos aos loops originais")
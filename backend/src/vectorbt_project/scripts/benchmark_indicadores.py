@@ -0,0 +1,132 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import time
+import numpy as np
+import pandas as pd
+import pandas_ta as ta
+from indicadores import compilados
+
+# Conferência de indicadores.compilados contra o pandas_ta e custo por chamada
+# numa janela de 1000 velas para 160 símbolos (velas sintéticas, passeio aleatório)
+
+quantidade_simbolos = 160
+velas = 1000
+tolerancia = 1e-9
+semente = 42
+
+
+def gerar_velas(rng, n):
+    fechamento = 100 + np.cumsum(rng.normal(size=n))
+    maxima = fechamento + rng.random(n)
+    minima = fechamento - rng.random(n)
+    volume = rng.random(n) * 1000
+    return pd.DataFrame({'maxima': maxima, 'minima': minima, 'fechamento': fechamento, 'volume': volume})
+
+
+# nome -> (pandas_ta, compilado completo, compilado só a última vela); todos devolvem uma matriz (colunas, velas)
+casos = {
+    'ema_200': (
+        lambda d: ta.ema(d['fechamento'], length=200).to_numpy(),
+        lambda d: compilados.ema(d['fechamento'], 200),
+        lambda d: compilados.ema(d['fechamento'], 200, ultimos=1),
+    ),
+    'rsi_14': (
+        lambda d: ta.rsi(d['fechamento'], length=14).to_numpy(),
+        lambda d: compilados.rsi(d['fechamento'], 14),
+        lambda d: compilados.rsi(d['fechamento'], 14, ultimos=1),
+    ),
+    'macd_12_26_9': (
+        lambda d: ta.macd(d['fechamento']).to_numpy().T,
+        lambda d: np.vstack(compilados.macd(d['fechamento'])),
+        lambda d: np.vstack(compilados.macd(d['fechamento'], ultimos=1)),
+    ),
+    'bbands_20': (
+        lambda d: ta.bbands(d['fechamento'], length=20).to_numpy().T,
+        lambda d: np.vstack(compilados.bandas_bollinger(d['fechamento'], 20)),
+        lambda d: np.vstack(compilados.bandas_bollinger(d['fechamento'], 20, ultimos=1)),
+    ),
+    'atr_14': (
+        lambda d: ta.atr(d['maxima'], d['minima'], d['fechamento'], length=14).to_numpy(),
+        lambda d: compilados.atr(d['maxima'], d['minima'], d['fechamento'], 14),
+        lambda d: compilados.atr(d['maxima'], d['minima'], d['fechamento'], 14, ultimos=1),
+    ),
+    'adx_14': (
+        lambda d: ta.adx(d['maxima'], d['minima'], d['fechamento'], length=14).to_numpy().T,
+        lambda d: np.vstack(compilados.adx(d['maxima'], d['minima'], d['fechamento'], 14)),
+        lambda d: np.vstack(compilados.adx(d['maxima'], d['minima'], d['fechamento'], 14, ultimos=1)),
+    ),
+    'stoch_14_3_3': (
+        lambda d: ta.stoch(d['maxima'], d['minima'], d['fechamento'], k=14, d=3, smooth_k=3).to_numpy().T,
+        lambda d: np.vstack(compilados.estocastico(d['maxima'], d['minima'], d['fechamento'], 14, 3, 3)),
+        lambda d: np.vstack(compilados.estocastico(d['maxima'], d['minima'], d['fechamento'], 14, 3, 3, ultimos=1)),
+    ),
+    'mfi_14': (
+        lambda d: ta.mfi(d['maxima'], d['minima'], d['fechamento'], d['volume'], length=14).to_numpy(),
+        lambda d: compilados.mfi(d['maxima'], d['minima'], d['fechamento'], d['volume'], 14),
+        lambda d: compilados.mfi(d['maxima'], d['minima'], d['fechamento'], d['volume'], 14, ultimos=1),
+    ),
+    'supertrend_10_3': (
+        lambda d: ta.supertrend(d['maxima'], d['minima'], d['fechamento'], length=10, multiplier=3.0).to_numpy().T,
+        lambda d: np.vstack(compilados.supertrend(d['maxima'], d['minima'], d['fechamento'], 10, 3.0)),
+        lambda d: np.vstack(compilados.supertrend(d['maxima'], d['minima'], d['fechamento'], 10, 3.0, ultimos=1)),
+    ),
+    'psar': (
+        lambda d: ta.psar(d['maxima'], d['minima'], d['fechamento']).to_numpy().T,
+        lambda d: np.vstack(compilados.psar(d['maxima'], d['minima'], d['fechamento'])),
+        lambda d: np.vstack(compilados.psar(d['maxima'], d['minima'], d['fechamento'], ultimos=1)),
+    ),
+    'ichimoku': (
+        lambda d: ta.ichimoku(d['maxima'], d['minima'], d['fechamento'])[0][['ITS_9', 'IKS_26', 'ISA_9', 'ISB_26']].to_numpy().T,
+        lambda d: np.vstack(compilados.ichimoku(d['maxima'], d['minima'], d['fechamento'])),
+        lambda d: np.vstack(compilados.ichimoku(d['maxima'], d['minima'], d['fechamento'], ultimos=1)),
+    ),
+}
+
+rng = np.random.default_rng(semente)
+simbolos = [gerar_velas(rng, velas) for _ in range(quantidade_simbolos)]
+
+
+def cronometrar(funcao):
+    inicio = time.perf_counter()
+    for dados in simbolos:
+        funcao(dados)
+    return (time.perf_counter() - inicio) / len(simbolos) * 1e6
+
+
+linhas = []
+for nome, (referencia, completo, ultimo) in casos.items():
+    # Paridade em todos os símbolos (também aquece a compilação antes de medir)
+    diferenca = 0.0
+    ok = True
+    for dados in simbolos:
+        esperado = np.atleast_2d(np.asarray(referencia(dados), dtype=float))
+        obtido = np.atleast_2d(completo(dados))
+        mesmo_nan = np.array_equal(np.isnan(esperado), np.isnan(obtido))
+        validos = ~np.isnan(esperado)
+        diferenca = max(diferenca, float(np.max(np.abs(esperado[validos] - obtido[validos]), initial=0.0)))
+        ok = ok and mesmo_nan and np.allclose(esperado[validos], obtido[validos], rtol=tolerancia, atol=tolerancia)
+        ok = ok and np.array_equal(np.atleast_2d(ultimo(dados)), obtido[:, -1:], equal_nan=True)
+
+    linhas.append({
+        "indicador": nome,
+        "pandas_ta [us]": cronometrar(referencia),
+        "compilado [us]": cronometrar(completo),
+        "ultimos=1 [us]": cronometrar(ultimo),
+        "maior diferença": diferenca,
+        "ok": ok,
+    })
+
+resultado = pd.DataFrame(linhas)
+resultado["ganho"] = resultado["pandas_ta [us]"] / resultado["ultimos=1 [us]"]
+pd.set_option('display.width', 200)
+print(f"{quantidade_simbolos} símbolos x {velas} velas, custo médio por chamada\n")
+print(resultado.to_string(index=False, float_format=lambda v: f"{v:,.3g}"))
+
+divergentes = resultado[~resultado['ok']]
+if divergentes.empty:
+    print("\n✅ indicadores compilados conferem com o pandas_ta")
+else:
+    print(f"\n❌ {len(divergentes)} indicador(es) divergentes")
+    sys.exit(1)
@@ -0,0 +1,51 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+from utils.logging import LogStore, LogEvent, LogLevel, LogCategory
+
+# Consulta do store de logs (utils.logging.store) com volumes crescentes:
+# o tempo deve acompanhar o tamanho do resultado, não o total de logs
+
+dias = 7
+bots = [f"bot_{i}" for i in range(10)]
+categorias = list(LogCategory)
+agentes = sorted(c.value for c in LogCategory.get_agent_categories())
+rng = random.Random(7)
+
+
+def consultar(store, **filtro):
+    inicio = time.perf_counter()
+    eventos = store.query(**filtro)
+    return len(eventos), (time.perf_counter() - inicio) * 1000
+
+
+for eventos_por_dia in (20_000, 80_000):
+    store = LogStore(tempfile.mkdtemp(prefix='benchmark_log_store_'))
+    agora = datetime.now().replace(microsecond=0)
+    inicio = time.perf_counter()
+    for dia in range(dias, 0, -1):
+        base = agora - timedelta(days=dia)
+        for i in range(eventos_por_dia):
+            store.append(LogEvent(
+                LogLevel.INFO, rng.choice(categorias), f"evento {i}", bot_id=rng.choice(bots),
+                timestamp=base + timedelta(seconds=86400 * i / eventos_por_dia), context={'i': i}))
+    tempo_escrita = time.perf_counter() - inicio
+    total = dias * eventos_por_dia
+    print(f"\n{total} eventos ({total / tempo_escrita:,.0f}/s na escrita)")
+
+    terca = agora - timedelta(days=3)
+    for compactado in (False, True):
+        if compactado:
+            store.compact()
+        rotulo = 'compactado' if compactado else 'bruto'
+        n, ms = consultar(store, bot_id='bot_3', categories=agentes, start=terca, end=terca + timedelta(days=1),
+                          limit=5000)
+        print(f"  [{rotulo:>10}] agentes do bot_3 em um dia: {n:5d} eventos em {ms:6.1f} ms")
+        n, ms = consultar(store, bot_id='bot_3', limit=200)
+        print(f"  [{rotulo:>10}] últimos 200 do bot_3:       {n:5d} eventos em {ms:6.1f} ms")
+    store.close()
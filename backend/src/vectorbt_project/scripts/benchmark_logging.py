@@ -0,0 +1,62 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import json
+import tempfile
+import time
+import numpy as np
+from utils.logging import TradingLogger, LogConfig, LogCategory, get_log_pipeline
+from utils.notifications.events import get_event_emitter
+
+# Latência por chamada de logger.info a 10k logs/s: modo síncrono (formatação,
+# flush do arquivo e subscribers na thread que loga) contra o LogPipeline
+# (a thread só enfileira o evento)
+
+taxa = 10_000        # logs por segundo
+duracao = 2.0        # segundos por modo
+diretorio = tempfile.mkdtemp(prefix='benchmark_logging_')
+
+
+def config(assincrono):
+    return LogConfig(
+        console_enabled=False,
+        master_file_path=os.path.join(diretorio, 'master_{date}.log'),
+        store_path=os.path.join(diretorio, 'store'),
+        handlers={},
+        async_enabled=assincrono
+    )
+
+
+# Subscriber com o custo de serializar o evento, como o LogStreamManager faz
+get_event_emitter().subscribe('log_event', lambda evento: json.dumps(evento.data.to_dict(), default=str))
+
+
+def medir(logger):
+    total = int(taxa * duracao)
+    latencias = np.empty(total)
+    intervalo = 1.0 / taxa
+    inicio = time.perf_counter()
+    for i in range(total):
+        # ritmo fixo: dorme até o horário do próximo log (em rajadas de ~1 ms, liberando a CPU)
+        atraso = inicio + i * intervalo - time.perf_counter()
+        if atraso > 0.001:
+            time.sleep(atraso)
+        t0 = time.perf_counter()
+        logger.info(LogCategory.POSITION_STATUS, f"📊 BTCUSDT preço {100 + i % 7}", symbol='BTCUSDT', indice=i)
+        latencias[i] = time.perf_counter() - t0
+    return latencias
+
+
+for nome, assincrono in (('síncrono', False), ('assíncrono', True)):
+    logger = TradingLogger(f"Benchmark_{nome}", config(assincrono))
+    latencias = medir(logger) * 1e6
+    if assincrono:
+        get_log_pipeline().flush()
+    print(f"{nome:>10}: p50 {np.percentile(latencias, 50):7.1f} µs | p99 {np.percentile(latencias, 99):7.1f} µs"
+          f" | máx {latencias.max():9.1f} µs")
+
+print(f"pipeline: {get_log_pipeline().stats()}")
+linhas = sum(1 for arquivo in os.listdir(diretorio) if arquivo.endswith('.log')
+             for _ in open(os.path.join(diretorio, arquivo)))
+print(f"linhas gravadas: {linhas} de {int(2 * taxa * duracao)}")
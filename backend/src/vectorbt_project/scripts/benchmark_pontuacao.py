@@ -0,0 +1,60 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import time
+import numpy as np
+import pandas as pd
+from indicadores.advanced_scoring import AdvancedScoringSystem
+from indicadores.pontuacao_lote import montar_painel
+
+# Conferência da pontuação em lote (indicadores.pontuacao_lote) contra
+# analyze_complete símbolo a símbolo, e custo de pontuar o universo inteiro
+
+quantidade_simbolos = 160
+velas = 200
+semente = 11
+categorias = ['market_trend', 'structure', 'fibonacci', 'wyckoff', 'didi_bollinger', 'momentum']
+
+
+def gerar_velas(rng, n):
+    fechamento = np.round(100 + np.cumsum(rng.normal(size=n)), 2)
+    abertura = np.r_[fechamento[0], fechamento[:-1]]
+    maxima = np.maximum(abertura, fechamento) + rng.random(n)
+    minima = np.minimum(abertura, fechamento) - rng.random(n)
+    volume = rng.random(n) * 1000
+    volume[rng.random(n) < 0.05] *= 5  # alguns picos de volume para o clímax do Wyckoff
+    return pd.DataFrame({'abertura': abertura, 'maxima': maxima, 'minima': minima,
+                         'fechamento': fechamento, 'volume': volume})
+
+
+rng = np.random.default_rng(semente)
+universo = {f"SIM{i:03d}USDT": gerar_velas(rng, velas) for i in range(quantidade_simbolos)}
+sistema = AdvancedScoringSystem()
+
+sistema.score_panel(montar_painel(dict(list(universo.items())[:2])))  # compilação
+
+inicio = time.perf_counter()
+analises = {simbolo: sistema.analyze_complete(simbolo, df.copy()) for simbolo, df in universo.items()}
+tempo_referencia = time.perf_counter() - inicio
+
+inicio = time.perf_counter()
+ranking = sistema.score_panel(montar_painel(universo))
+tempo_lote = time.perf_counter() - inicio
+
+divergentes = 0
+tabela = ranking.set_index('simbolo')
+for simbolo, analise in analises.items():
+    esperado = [analise['score_final']] + [analise['details'][c]['score'] for c in categorias]
+    obtido = tabela.loc[simbolo, ['score_final'] + categorias].to_numpy(dtype=float)
+    divergentes += not np.allclose(esperado, obtido, rtol=0, atol=1e-9)
+
+print(f"{quantidade_simbolos} símbolos x {velas} velas\n")
+print(f"analyze_complete por símbolo: {tempo_referencia * 1e3:10,.1f} ms")
+print(f"score_panel em lote:          {tempo_lote * 1e3:10,.1f} ms  ({tempo_referencia / tempo_lote:,.0f}x)")
+print(f"\n{ranking.head(10)[['simbolo', 'score_final', 'classification'] + categorias].to_string(index=False)}")
+
+if divergentes:
+    print(f"\n❌ {divergentes} símbolo(s) com scores diferentes")
+    sys.exit(1)
+print("\n✅ scores idênticos aos de analyze_complete")
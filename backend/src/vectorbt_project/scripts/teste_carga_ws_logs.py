@@ -0,0 +1,138 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import asyncio
+import json
+import socket
+import tempfile
+import threading
+import time
+import numpy as np
+import uvicorn
+import websockets
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from api.services.log_stream_manager import get_log_stream_manager
+from utils.logging import TradingLogger, LogConfig, LogCategory
+
+# Teste de carga do fan-out de /ws/logs: centenas de clientes WebSocket locais,
+# parte deles travados (param de ler). Os rápidos devem receber tudo com baixa
+# latência; os travados são amostrados/derrubados sem atrasar ninguém.
+
+porta = 8799
+clientes_rapidos = 270
+clientes_travados = 30
+taxa = 100               # logs por segundo
+duracao = 30.0           # segundos de produção
+medidores = 20           # clientes rápidos que decodificam os frames para medir a latência
+preenchimento = 'x' * 4000  # contexto grande para encher os buffers TCP dos travados
+
+log_manager = get_log_stream_manager()
+
+
+@asynccontextmanager
+async def lifespan(app):
+    log_manager.set_event_loop(asyncio.get_running_loop())
+    yield
+
+
+app = FastAPI(lifespan=lifespan)
+
+
+@app.websocket("/ws/logs")
+async def websocket_logs_all(websocket: WebSocket, batch: bool = False):
+    # Mesma sequência da rota em api/routes/websocket.py
+    await websocket.accept()
+    subscriber = log_manager.connect(websocket.send_text, batch=batch, on_close=websocket.close)
+    try:
+        while True:
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        log_manager.disconnect(subscriber)
+
+
+# sem permessage-deflate, para o preenchimento ocupar de fato os buffers
+servidor = uvicorn.Server(uvicorn.Config(app, port=porta, log_level='warning', ws='websockets',
+                                         ws_per_message_deflate=False))
+threading.Thread(target=servidor.run, daemon=True).start()
+while not servidor.started:
+    time.sleep(0.05)
+
+
+def produzir():
+    diretorio = tempfile.mkdtemp(prefix='teste_carga_ws_')
+    logger = TradingLogger("CargaWS", LogConfig(console_enabled=False, handlers={},
+                                                master_file_path=os.path.join(diretorio, 'master_{date}.log'),
+                                                store_path=os.path.join(diretorio, 'store')))
+    intervalo = 1.0 / taxa
+    inicio = time.perf_counter()
+    for i in range(int(taxa * duracao)):
+        while time.perf_counter() < inicio + i * intervalo:
+            time.sleep(intervalo / 4)
+        logger.info(LogCategory.POSITION_STATUS, f"log {i}", enviado_em=time.time(), indice=i, dados=preenchimento)
+
+
+async def cliente_rapido(resultados, medir):
+    latencias, recebidos = [], 0
+    async with websockets.connect(f"ws://127.0.0.1:{porta}/ws/logs?batch=true", max_size=None) as ws:
+        try:
+            async for frame in ws:
+                if not medir:
+                    # todos os clientes no mesmo processo: só os medidores pagam o json.loads
+                    recebidos += frame.count('"enviado_em"')
+                    continue
+                agora = time.time()
+                for mensagem in json.loads(frame):
+                    enviado_em = (mensagem.get('context') or {}).get('enviado_em')
+                    if enviado_em:
+                        latencias.append(agora - enviado_em)
+                        recebidos += 1
+        except websockets.ConnectionClosed:
+            pass
+    resultados.append((recebidos, latencias))
+
+
+async def cliente_travado():
+    # buffer de recepção mínimo: o envio do servidor trava logo que o cliente para de ler
+    sock = socket.socket()
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+    sock.connect(('127.0.0.1', porta))
+    async with websockets.connect(f"ws://127.0.0.1:{porta}/ws/logs?batch=true", sock=sock, max_queue=1) as ws:
+        await ws.recv()
+        await asyncio.sleep(duracao + 5)  # para de ler
+        try:
+            async for _ in ws:
+                pass
+        except websockets.ConnectionClosed:
+            pass
+
+
+async def main():
+    rapidos = []
+    tarefas = [asyncio.create_task(cliente_rapido(rapidos, i < medidores)) for i in range(clientes_rapidos)]
+    tarefas += [asyncio.create_task(cliente_travado()) for _ in range(clientes_travados)]
+    while log_manager.get_subscribers_count() < clientes_rapidos + clientes_travados:
+        await asyncio.sleep(0.1)
+
+    produtor = threading.Thread(target=produzir)
+    produtor.start()
+    await asyncio.to_thread(produtor.join)
+    await asyncio.sleep(6)
+    stats = log_manager.get_stats()
+    print(f"stats: {stats}")
+    servidor.should_exit = True
+    await asyncio.gather(*tarefas, return_exceptions=True)
+
+    total = int(taxa * duracao)
+    latencias = np.concatenate([np.array(l) for _, l in rapidos if l]) * 1000
+    recebidos = [r for r, _ in rapidos]
+    print(f"clientes rápidos: {len(rapidos)} | recebidos por cliente: mín {min(recebidos)} de {total}")
+    print(f"latência de entrega: p50 {np.percentile(latencias, 50):.1f} ms | p99 {np.percentile(latencias, 99):.1f} ms"
+          f" | máx {latencias.max():.1f} ms")
+    print(f"clientes travados derrubados: {stats['slow_disconnects']} de {clientes_travados}")
+
+
+asyncio.run(main())
@@ -0,0 +1,98 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from vectorbt_project.utils.telegram_compatibility import apply_vectorbt_telegram_patch
+apply_vectorbt_telegram_patch()
+
+import pandas as pd
+import numpy as np
+import vectorbt as vbt
+from entidades.estrategias_descritivas.double_ema_breakout import DoubleEmaBreakout, CondicaoEntrada, StopConfig, AlvoConfig
+from vectorbt_project.generator_vectorbt import gerar_por_nome
+from vectorbt_project.fast_metrics import calcular_metricas, NOMES_VECTORBT
+from corretoras.funcoes_bybit import carregar_dados_historicos
+
+# Conferência do kernel de métricas (fast_metrics) contra pf.stats() em um dataset de referência
+
+simbolo = 'BTCUSDT'
+intervalo = '15'
+data_inicio = '2024-01-01'
+data_fim = '2024-07-01'
+tolerancia_relativa = 1e-6
+
+# (tipo, ema_curta, ema_longa, stop, rr)
+casos = [
+    ('long', 5, 15, 17, 4.1),
+    ('long', 21, 90, 12, 2.3),
+    ('long_short', 9, 21, 10, 3.0),
+    ('long_short', 12, 50, 15, 2.0),
+]
+
+df = carregar_dados_historicos(simbolo, intervalo, [9, 21], data_inicio, data_fim)
+df.columns = df.columns.str.lower()
+
+linhas = []
+for tipo, ema_curta, ema_longa, stop, rr in casos:
+    estrategia = DoubleEmaBreakout(
+        nome=f"ema_{ema_curta}_{ema_longa}_stop_{stop}_rr_{rr}",
+        tipo=tipo,
+        condicoes_entrada=[
+            CondicaoEntrada(tipo="fechamento_acima_ema", parametros={"periodo": ema_curta}),
+            CondicaoEntrada(tipo="fechamento_acima_ema", parametros={"periodo": ema_longa}),
+            CondicaoEntrada(tipo="rompe_maxima_anterior", parametros={})
+        ],
+        stop=StopConfig(tipo="minima_das_ultimas", parametros={"quantidade": stop}),
+        alvo=AlvoConfig(tipo="rr", parametros={"multiplicador": rr})
+    )
+
+    if tipo == 'long':
+        entries, exits, _, _ = gerar_por_nome("double_ema_breakout_orders", df, estrategia)
+        size = pd.Series(np.nan, index=df.index)
+        size[entries.notna()] = 1.0
+        size[exits.notna()] = -1.0
+        size_type, direction, alvo_percentual = 'percent', 'longonly', False
+    else:
+        entries, exits, _, _, size = gerar_por_nome("double_ema_breakout_orders_long_short", df, estrategia)
+        size_type, direction, alvo_percentual = 'targetpercent', 'both', True
+
+    order_price = entries.combine_first(exits)
+
+    pf = vbt.Portfolio.from_orders(
+        close=df['fechamento'],
+        price=order_price,
+        size_type=size_type,
+        size=size,
+        init_cash=1000,
+        fees=0.00055,
+        freq=f'{intervalo}min',
+        direction=direction
+    )
+    stats = pf.stats()
+    rapidas = calcular_metricas(df['fechamento'], order_price, size, alvo_percentual=alvo_percentual,
+                                intervalo=intervalo, saldo_inicial=1000, taxa=0.00055)
+
+    for nome_vectorbt in list(NOMES_VECTORBT.values()) + ['Max Drawdown Duration']:
+        esperado = stats[nome_vectorbt]
+        obtido = rapidas[nome_vectorbt]
+        if isinstance(esperado, pd.Timedelta):
+            ok = esperado == obtido
+        elif pd.isna(esperado) or pd.isna(obtido):
+            ok = pd.isna(esperado) and pd.isna(obtido)
+        else:
+            ok = abs(esperado - obtido) <= tolerancia_relativa * max(1.0, abs(esperado))
+        linhas.append({
+            "caso": estrategia.nome, "tipo": tipo, "metrica": nome_vectorbt,
+            "pf.stats()": esperado, "fast_metrics": obtido, "ok": ok,
+        })
+
+resultado = pd.DataFrame(linhas)
+pd.set_option('display.width', 200)
+print(resultado.to_string(index=False))
+
+divergentes = resultado[~resultado['ok']]
+if divergentes.empty:
+    print("\n✅ fast_metrics confere com pf.stats() em todos os casos")
+else:
+    print(f"\n❌ {len(divergentes)} métrica(s) divergentes")
+    sys.exit(1)
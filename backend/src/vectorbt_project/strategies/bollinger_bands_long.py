@@ -3,7 +3,8 @@ import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..','..')))
 import pandas as pd
 from entidades.estrategias_descritivas.base import BaseEstrategiaDescritiva
-from indicadores.bandas_bollinger import bandas_bollinger, sinal_fffd
+from indicadores.bandas_bollinger import sinal_fffd
+from vectorbt_project.indicator_cache import bollinger
 import numpy as np
 from vectorbt import nb
 
@@ -67,8 +68,11 @@ def gerar_estrategia(df: pd.DataFrame, estrategia: BaseEstrategiaDescritiva):
     periodo_bb = int(estrategia.condicoes_entrada[0].parametros['periodo'])
     desvios_bb = int(estrategia.condicoes_entrada[1].parametros['desvios'])
 
-    # Calcular Bandas de Bollinger
-    df = bandas_bollinger(df, periodo_bb, desvios_bb)
+    # Calcular Bandas de Bollinger (mesmo rolling().std() de indicadores.bandas_bollinger, via cache)
+    banda_inferior, media_movel, banda_superior = bollinger(df, periodo_bb, desvios_bb, ddof=1)
+    df['media_movel'] = media_movel
+    df['banda_superior'] = banda_superior
+    df['banda_inferior'] = banda_inferior
     df, _, _ = sinal_fffd(df)
 
     fffd = df['fffd'].values
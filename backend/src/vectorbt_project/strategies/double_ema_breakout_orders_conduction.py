@@ -3,6 +3,7 @@ import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..','..')))
 import pandas as pd
 from entidades.estrategias_descritivas.double_ema_breakout import DoubleEmaBreakout
+from vectorbt_project.indicator_cache import ema
 import numpy as np
 from vectorbt import nb
 
@@ -75,8 +76,8 @@ def gerar_estrategia(df: pd.DataFrame, estrategia: DoubleEmaBreakout):
     rr = float(estrategia.alvo.parametros['multiplicador'])
 
     # Indicadores
-    ema1 = pd.Series(close).ewm(span=p1).mean().values
-    ema2 = pd.Series(close).ewm(span=p2).mean().values
+    ema1 = ema(df, p1)
+    ema2 = ema(df, p2)
 
     # Chamar a função com Numba
     entries, exits, stop_price, target_price = double_ema_breakout_conduction_nb(
@@ -3,6 +3,7 @@ import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..','..')))
 import pandas as pd
 from entidades.estrategias_descritivas.double_ema_breakout import DoubleEmaBreakout
+from vectorbt_project.indicator_cache import ema
 import numpy as np
 import vectorbt as vbt
 from vectorbt import nb
@@ -111,10 +112,10 @@ def gerar_estrategia(df: pd.DataFrame, estrategia: DoubleEmaBreakout):
     rr_short = float(estrategia.alvo.parametros['multiplicador'][1])
 
     # Indicadores
-    ema1_long = pd.Series(close).ewm(span=p1_long).mean().values
-    ema2_long = pd.Series(close).ewm(span=p2_long).mean().values
-    ema1_short = pd.Series(close).ewm(span=p1_short).mean().values
-    ema2_short = pd.Series(close).ewm(span=p2_short).mean().values
+    ema1_long = ema(df, p1_long)
+    ema2_long = ema(df, p2_long)
+    ema1_short = ema(df, p1_short)
+    ema2_short = ema(df, p2_short)
 
     # Chamar a função com Numba
     entries, exits, stop_price, target_price, size = double_ema_breakout_long_short_nb(
@@ -3,6 +3,7 @@ import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..','..')))
 import pandas as pd
 from entidades.estrategias_descritivas.double_ema_breakout import DoubleEmaBreakout
+from vectorbt_project.indicator_cache import ema, sma
 import numpy as np
 from vectorbt import nb
 
@@ -110,9 +111,9 @@ def gerar_estrategia(df: pd.DataFrame, estrategia: DoubleEmaBreakout):
     rr = float(estrategia.alvo.parametros['multiplicador'])
 
     # Indicadores
-    ema1 = pd.Series(close).ewm(span=p1).mean().values
-    ema2 = pd.Series(close).ewm(span=p2).mean().values
-    volume_ma = pd.Series(volume).rolling(window=20).mean().values # Média móvel de 20 períodos
+    ema1 = ema(df, p1)
+    ema2 = ema(df, p2)
+    volume_ma = sma(df, 20, coluna='volume') # Média móvel de 20 períodos
 
     # Chamar a função com Numba
     entries, exits, stop_price, target_price, size = double_ema_breakout_long_short_nb(
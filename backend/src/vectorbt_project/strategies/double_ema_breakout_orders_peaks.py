@@ -8,10 +8,34 @@ import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..','..')))
 import pandas as pd
 from entidades.estrategias_descritivas.double_ema_breakout import DoubleEmaBreakout
+from vectorbt_project.indicator_cache import ema
 import numpy as np
 from vectorbt import nb
 from scipy.signal import find_peaks
 
+DISTANCIA_PICOS = 21
+ATRASO_PICO = 3  # o loop lê o tipo do pico em i-3
+TOPO = -1
+FUNDO = 1
+
+
+def _pico_no_prefixo(fechamento, i, tipo):
+    """
+    Se a vela i-3 é topo (ou fundo) para `find_peaks(distance=21)` sobre os
+    fechamentos até a vela i, como o loop antigo calculava a cada vela.
+
+    O find_peaks do prefixo só roda quando i-3 pode ser pico (não fica abaixo
+    das vizinhas, ou acima para fundos): a supressão por distância depende dos
+    outros picos do prefixo e não dá para reproduzi-la olhando só a vizinhança.
+    """
+    p = i - ATRASO_PICO
+    serie = fechamento[:i + 1] if tipo == TOPO else -fechamento[:i + 1]
+    if serie[p] < serie[p - 1] or serie[p] < serie[p + 1]:
+        return False
+    picos, _ = find_peaks(serie, distance=DISTANCIA_PICOS)
+    k = np.searchsorted(picos, p)
+    return k < len(picos) and picos[k] == p
+
 # ==========================================
 # Versão completa com Numba (sem vetorização)
 # Entrada no preço de máxima ou mínima da vela referência, saída no preço de stop ou alvo
@@ -122,8 +146,8 @@ def gerar_estrategiaaa(df: pd.DataFrame, estrategia: DoubleEmaBreakout):
     rr = float(estrategia.alvo.parametros['multiplicador'])
 
     # Indicadores
-    ema1 = pd.Series(close).ewm(span=p1).mean().values
-    ema2 = pd.Series(close).ewm(span=p2).mean().values
+    ema1 = ema(df, p1)
+    ema2 = ema(df, p2)
 
     # last_peak_type deve estar no DataFrame
     last_peak_type = df['last_peak_type'].values
@@ -163,8 +187,8 @@ def gerar_estrategia(df: pd.DataFrame, estrategia: DoubleEmaBreakout):
     # last_peak_type = df['last_peak_type'].copy()
     
     # Calcular indicadores
-    ema1 = close.ewm(span=p1).mean()
-    ema2 = close.ewm(span=p2).mean()
+    ema1 = pd.Series(ema(df, p1), index=df.index)
+    ema2 = pd.Series(ema(df, p2), index=df.index)
     
     # Inicializar arrays de resultado
     entries = pd.Series(np.nan, index=df.index)
@@ -180,39 +204,12 @@ def gerar_estrategia(df: pd.DataFrame, estrategia: DoubleEmaBreakout):
     target_value = 0.0
     current_position = 0  # 0 = sem posição, 1 = long, -1 = short
     
-    # Inicializar coluna last_peak_type se não existir
+    fechamento = df['fechamento'].to_numpy(dtype=np.float64)
     if 'last_peak_type' not in df.columns:
         df['last_peak_type'] = 0
     
     # Iterar através das velas a partir do índice 999
     for i in range(999, len(df)):
-        # Validação e criação incremental da coluna 'last_peak_type' até a posição i
-        # Garante que a coluna existe e só atualiza até a vela i (inclusive)
-        
-        fechamento_slice = df['fechamento'].iloc[:i+1].values
-        
-        # Detecta fundos (mínimos locais) com parâmetros ajustados
-        try:
-            fundos, _ = find_peaks(-fechamento_slice, distance=21)
-        except:
-            fundos = np.array([])
-        
-        # Detecta topos (máximos locais) com parâmetros ajustados  
-        try:
-            topos, _ = find_peaks(fechamento_slice, distance=21)
-        except:
-            topos = np.array([])
-        
-        # Cria array temporário para o slice
-        last_peak_type_slice = np.zeros(i+1, dtype=int)
-        if len(fundos) > 0:
-            last_peak_type_slice[fundos] = 1
-        if len(topos) > 0:
-            last_peak_type_slice[topos] = -1
-        
-        # Atualiza apenas o trecho relevante da coluna no DataFrame
-        df.loc[df.index[:i+1], 'last_peak_type'] = last_peak_type_slice
-        
         # Condições para long
         long_cond1 = close.iloc[i-1] > ema1.iloc[i-1]
         long_cond2 = close.iloc[i-1] > ema2.iloc[i-1]
@@ -279,7 +276,7 @@ def gerar_estrategia(df: pd.DataFrame, estrategia: DoubleEmaBreakout):
                     current_position = 0
                     
                 # Verificar saída por topo (last_peak_type == -1)
-                elif df['last_peak_type'].iloc[i-3] == -1:  # topo
+                elif _pico_no_prefixo(fechamento, i, TOPO):
                     exits.iloc[i] = close.iloc[i-1]
                     size.iloc[i] = 0.0  # Saída long (venda)
                     in_trade = False
@@ -295,10 +292,17 @@ def gerar_estrategia(df: pd.DataFrame, estrategia: DoubleEmaBreakout):
                     current_position = 0
                     
                 # Verificar saída por fundo (last_peak_type == 1)
-                elif df['last_peak_type'].iloc[i-3] == 1:  # fundo
+                elif _pico_no_prefixo(fechamento, i, FUNDO):
                     exits.iloc[i] = close.iloc[i-1]
                     size.iloc[i] = 0.0  # Saída short (compra)
                     in_trade = False
                     current_position = 0
     
+    # Mesma coluna que a última passada do loop antigo deixava no df (picos da série inteira)
+    if len(df) > 999:
+        last_peak_type = np.zeros(len(df), dtype=int)
+        last_peak_type[find_peaks(-fechamento, distance=DISTANCIA_PICOS)[0]] = FUNDO
+        last_peak_type[find_peaks(fechamento, distance=DISTANCIA_PICOS)[0]] = TOPO
+        df['last_peak_type'] = last_peak_type
+    
     return entries, exits, stop_price, target_price, size
\ No newline at end of file
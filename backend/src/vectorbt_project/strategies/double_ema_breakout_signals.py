@@ -3,6 +3,7 @@ import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..','..')))
 import pandas as pd
 from entidades.estrategias_descritivas.double_ema_breakout import DoubleEmaBreakout
+from vectorbt_project.indicator_cache import ema
 import numpy as np
 import vectorbt as vbt
 from vectorbt import nb
@@ -67,8 +68,8 @@ def gerar_estrategia(df: pd.DataFrame, estrategia: DoubleEmaBreakout):
     rr = float(estrategia.alvo.parametros['multiplicador'])
 
     # Indicadores
-    ema1 = pd.Series(close).ewm(span=p1).mean().values
-    ema2 = pd.Series(close).ewm(span=p2).mean().values
+    ema1 = ema(df, p1)
+    ema2 = ema(df, p2)
 
     # Chamar a função com Numba
     entries, exits, stop_price, target_price = double_ema_breakout_nb(
@@ -97,8 +98,8 @@ def gerar_estrategia_procedural(df: pd.DataFrame, estrategia: DoubleEmaBreakout)
     rr = float(estrategia.alvo.parametros['multiplicador'])
 
     # Indicadores
-    ema1 = close.ewm(span=p1).mean()
-    ema2 = close.ewm(span=p2).mean()
+    ema1 = pd.Series(ema(df, p1), index=df.index)
+    ema2 = pd.Series(ema(df, p2), index=df.index)
 
     cond1 = close.shift(1) > ema1.shift(1)
     cond2 = close.shift(1) > ema2.shift(1)
@@ -156,8 +157,8 @@ def gerar_estrategia_vetorizada(df: pd.DataFrame, estrategia: DoubleEmaBreakout)
     rr = float(estrategia.alvo.parametros['multiplicador'])
 
     # Indicadores
-    ema1 = close.ewm(span=p1).mean()
-    ema2 = close.ewm(span=p2).mean()
+    ema1 = pd.Series(ema(df, p1), index=df.index)
+    ema2 = pd.Series(ema(df, p2), index=df.index)
 
     # Sinal de entrada (vela anterior fecha acima das EMAs e máxima atual > máxima anterior)
     cond1 = close.vbt.crossed_above(ema1)
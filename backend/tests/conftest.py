@@ -0,0 +1,6 @@
+import os
+import sys
+
+# Os módulos do backend são importados a partir de backend/src, como nos scripts
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+os.environ.setdefault('LOG_ASYNC', '0')
@@ -0,0 +1,144 @@
+import json
+import threading
+
+import pytest
+
+from corretoras.account_state_bybit import CacheInstrumentos, EstadoDaConta
+
+
+def posicao(simbolo, indice=0, lado='Buy', tamanho='1', preco='100', moeda='USDT'):
+    return {'symbol': simbolo, 'positionIdx': indice, 'side': lado, 'size': tamanho, 'avgPrice': preco,
+            'stopLoss': '', 'takeProfit': '', 'trailingStop': '', 'settleCoin': moeda}
+
+
+class ClienteFalso:
+    """`get_positions`/`get_wallet_balance` da pybit; sem api_key, então o WebSocket não sobe."""
+
+    def __init__(self, posicoes, durante_rest=None):
+        self.posicoes = posicoes
+        self.durante_rest = durante_rest
+        self.chamadas = []
+
+    def get_positions(self, **parametros):
+        self.chamadas.append(parametros)
+        if self.durante_rest:
+            self.durante_rest()
+        lista = [dados for dados in self.posicoes if dados['settleCoin'] == parametros['settleCoin']]
+        return {'result': {'list': lista, 'nextPageCursor': ''}}
+
+    def get_wallet_balance(self, **parametros):
+        if self.durante_rest:
+            self.durante_rest()
+        return {'result': {'list': [{'accountType': 'UNIFIED', 'totalEquity': '1000'}]}}
+
+
+def push(estado, topico, dados):
+    estado._processar_mensagem(json.dumps({'topic': topico, 'data': [dados]}))
+
+
+def push_posicao(estado, dados):
+    push(estado, 'position', dict(dados, category='linear'))
+
+
+def test_rest_roda_fora_do_lock():
+    cliente = ClienteFalso([posicao('BTCUSDT')])
+    estado = EstadoDaConta(1, cliente)
+    livre = []
+
+    def durante_rest():
+        # Outra thread (o loop do WebSocket) precisa conseguir o lock enquanto o REST está em curso
+        def tentar():
+            conseguiu = estado._lock.acquire(timeout=1)
+            if conseguiu:
+                estado._lock.release()
+            livre.append(conseguiu)
+
+        thread = threading.Thread(target=tentar)
+        thread.start()
+        thread.join()
+
+    cliente.durante_rest = durante_rest
+    estado.posicao('BTCUSDT')
+    estado.carteira()
+    assert livre and all(livre)
+
+
+def test_push_durante_o_rest_nao_e_desfeito_pelo_snapshot():
+    cliente = ClienteFalso([posicao('BTCUSDT', tamanho='1')])
+    estado = EstadoDaConta(1, cliente)
+
+    def durante_rest():
+        cliente.durante_rest = None
+        push_posicao(estado, posicao('BTCUSDT', tamanho='0', lado=''))
+        push(estado, 'wallet', {'accountType': 'UNIFIED', 'totalEquity': '900'})
+
+    cliente.durante_rest = durante_rest
+    assert estado.posicao('BTCUSDT')['size'] == '0'
+
+    cliente.durante_rest = durante_rest
+    estado._carteira_em = None
+    assert estado.carteira()['totalEquity'] == '900'
+
+
+def test_pernas_do_hedge_nao_se_sobrescrevem():
+    cliente = ClienteFalso([posicao('BTCUSDT', 1, 'Buy', '2'), posicao('BTCUSDT', 2, 'Sell', '3')])
+    estado = EstadoDaConta(1, cliente)
+
+    assert estado.posicao('BTCUSDT', 1)['side'] == 'Buy'
+    assert estado.posicao('BTCUSDT', 2)['side'] == 'Sell'
+    assert set(estado.posicoes()) == {('BTCUSDT', 1), ('BTCUSDT', 2)}
+
+    # Fechar a perna comprada por push mantém a vendida, que passa a ser a posição do símbolo
+    push_posicao(estado, posicao('BTCUSDT', 1, '', '0'))
+    assert estado.posicao('BTCUSDT', 2)['size'] == '3'
+    assert estado.posicao('BTCUSDT')['side'] == 'Sell'
+
+
+def test_inclui_perpetuos_usdc():
+    cliente = ClienteFalso([posicao('BTCUSDT'), posicao('BTCPERP', moeda='USDC', preco='50')])
+    estado = EstadoDaConta(1, cliente)
+
+    assert estado.posicao('BTCPERP')['avgPrice'] == '50'
+    assert {chamada['settleCoin'] for chamada in cliente.chamadas} == {'USDT', 'USDC'}
+    assert estado.posicao('ETHUSDT')['size'] == '0'
+
+
+class ClienteInstrumentos:
+    """`get_instruments_info` da pybit paginado por cursor, com uma página por símbolo."""
+
+    def __init__(self, simbolos):
+        self.simbolos = list(simbolos)
+        self.chamadas = 0
+
+    def get_instruments_info(self, category, limit, cursor=None):
+        self.chamadas += 1
+        pagina = int(cursor or 0)
+        lista = [{'symbol': simbolo} for simbolo in self.simbolos[pagina:pagina + 1]]
+        proximo = str(pagina + 1) if pagina + 1 < len(self.simbolos) else ''
+        return {'result': {'list': lista, 'nextPageCursor': proximo}}
+
+
+def test_simbolo_desconhecido_nao_repagina_ate_o_ttl():
+    cliente = ClienteInstrumentos(['BTCUSDT', 'ETHUSDT'])
+    cache = CacheInstrumentos(cliente, ttl_segundos=3600)
+    assert cache.instrumento('BTCUSDT') == {'symbol': 'BTCUSDT'}
+    assert cliente.chamadas == 2
+
+    # A primeira consulta recarrega (pode ser uma listagem nova); as seguintes não
+    for _ in range(3):
+        with pytest.raises(KeyError):
+            cache.instrumento('XYZUSDT')
+    assert cliente.chamadas == 4
+
+    # Um símbolo listado depois da carga ainda é encontrado na primeira consulta
+    cliente.simbolos.append('SOLUSDT')
+    assert cache.instrumento('SOLUSDT') == {'symbol': 'SOLUSDT'}
+    assert cliente.chamadas == 7
+    with pytest.raises(KeyError):
+        cache.instrumento('XYZUSDT')
+    assert cliente.chamadas == 7
+
+    # Vencido o TTL a listagem é recarregada e o desconhecido volta a ser procurado
+    cliente.simbolos.append('XYZUSDT')
+    cache.ttl_segundos = -1
+    assert cache.instrumento('XYZUSDT') == {'symbol': 'XYZUSDT'}
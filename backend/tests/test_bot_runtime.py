@@ -0,0 +1,57 @@
+import threading
+
+import pandas as pd
+
+from corretoras.cliente_bybit_async import ClienteBybitAsync
+from live_trading import bot_runtime
+from live_trading.bot_runtime import BotRuntime
+
+
+class FeedFalso:
+    def adicionar_ouvinte(self, ouvinte):
+        pass
+
+    def assinar(self, simbolo, intervalo):
+        pass
+
+
+class EstrategiaFalsa:
+    bot_id, cripto, tempo_grafico = "bot_teste", "BTCUSDT", "15"
+
+    def __init__(self, stop_flag):
+        self.stop_flag = stop_flag
+        self.leituras = 0
+        self.threads = set()
+        self.encerrado = None
+        self.logger = None
+
+    def inicializar(self):
+        return True
+
+    def ler_velas(self, feed):
+        self.leituras += 1
+        if self.leituras == 1:
+            raise ConnectionError("corretora fora do ar")
+        return pd.DataFrame({'fechamento': [1.0]})
+
+    def processar(self, df):
+        self.threads.add(threading.current_thread().name)
+        self.stop_flag.set()
+        return True
+
+    def encerrar(self, por_sinal_de_parada=False):
+        self.threads.add(threading.current_thread().name)
+        self.encerrado = por_sinal_de_parada
+
+
+def test_erro_na_passada_nao_encerra_o_bot_e_estrategia_roda_fora_do_pool_de_io(monkeypatch):
+    monkeypatch.setattr(bot_runtime, 'ESPERA_SEM_DADOS_SEGUNDOS', 0.01)
+    stop_flag = threading.Event()
+    estrategia = EstrategiaFalsa(stop_flag)
+    runtime = BotRuntime(feed=FeedFalso(), cliente=ClienteBybitAsync(max_workers=1), intervalo_maximo_segundos=0.01)
+
+    runtime.adicionar(estrategia, stop_flag).result(timeout=5)
+
+    assert estrategia.leituras == 2
+    assert estrategia.encerrado is True
+    assert all(nome.startswith("BotEstrategia") for nome in estrategia.threads)
@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+
+from corretoras.backfill_bybit import LIMITE_VELAS_POR_PAGINA, carregar_periodo
+from utils.candle_store import DTYPE_VELA, CandleStore
+
+INTERVALO_MS = 15 * 60_000
+INICIO_MS = 1_704_067_200_000  # 2024-01-01 00:00 UTC
+
+
+def ms(data):
+    return int(pd.Timestamp(data, tz='UTC').timestamp() * 1000)
+
+
+def gerar_velas(tempos):
+    velas = np.zeros(len(tempos), dtype=DTYPE_VELA)
+    velas['tempo_abertura'] = tempos
+    velas['abertura'] = velas['maxima'] = velas['minima'] = velas['fechamento'] = 100.0
+    velas['volume'] = velas['turnover'] = 1.0
+    return velas
+
+
+class ClienteKline:
+    """`get_kline` da pybit servindo velas de um array; as páginas vêm da mais nova para a mais antiga."""
+
+    def __init__(self, velas):
+        self.velas = velas
+        self.chamadas = []
+
+    def get_kline(self, start, end, limit, **parametros):
+        self.chamadas.append((start, end))
+        tempos = self.velas['tempo_abertura']
+        pagina = self.velas[(tempos >= start) & (tempos <= end)][:limit]
+        lista = [[str(int(v['tempo_abertura']))] + [str(v[campo]) for campo in DTYPE_VELA.names[1:]]
+                 for v in pagina[::-1]]
+        return {'result': {'list': lista}}
+
+
+class LimitadorLivre:
+    def adquirir(self):
+        pass
+
+
+def test_lacunas_mensais_seguem_o_calendario(tmp_path):
+    store = CandleStore('BTCUSDT', 'M', pasta=str(tmp_path))
+    # Falta março; fevereiro de 2024 tem 29 dias, então um passo fixo de 31 dias erraria o início
+    store.gravar(gerar_velas([ms('2024-01-01'), ms('2024-02-01'), ms('2024-04-01'), ms('2024-05-01')]))
+
+    assert store.intervalos_faltantes(ms('2024-01-01'), ms('2024-05-02')) == [(ms('2024-03-01'), ms('2024-04-01'))]
+    # Meses de 30 dias em sequência não são lacuna, e a vela de junho abre antes de 31 dias após maio
+    assert store.intervalos_faltantes(ms('2024-04-01'), ms('2024-06-02')) == [(ms('2024-06-01'), ms('2024-06-02'))]
+
+
+def test_sem_corte_no_fim_devolve_so_a_sobra_da_ultima_pagina(tmp_path):
+    # Arquivo com bem mais velas depois do end do que a última página da busca alcançaria
+    velas = gerar_velas(INICIO_MS + np.arange(4000) * INTERVALO_MS)
+    store = CandleStore('BTCUSDT', '15', pasta=str(tmp_path))
+    store.gravar(velas)
+    end_ms = INICIO_MS + 1500 * INTERVALO_MS
+
+    cortadas, _ = carregar_periodo(store, ClienteKline(velas), LimitadorLivre(), INICIO_MS, end_ms)
+    com_sobra, _ = carregar_periodo(store, ClienteKline(velas), LimitadorLivre(), INICIO_MS, end_ms,
+                                    cortar_no_fim=False)
+
+    np.testing.assert_array_equal(cortadas, velas[:1500])
+    np.testing.assert_array_equal(com_sobra, velas[:2 * LIMITE_VELAS_POR_PAGINA])
+
+
+def test_sem_corte_no_fim_baixa_a_sobra_que_falta(tmp_path):
+    velas = gerar_velas(INICIO_MS + np.arange(4000) * INTERVALO_MS)
+    store = CandleStore('BTCUSDT', '15', pasta=str(tmp_path))
+    cliente = ClienteKline(velas)
+    end_ms = INICIO_MS + 1000 * INTERVALO_MS
+
+    # Com o end exatamente no fim de uma página, a busca antiga ainda trazia a página seguinte inteira
+    obtidas, baixadas = carregar_periodo(store, cliente, LimitadorLivre(), INICIO_MS, end_ms, cortar_no_fim=False)
+
+    np.testing.assert_array_equal(obtidas, velas[:2 * LIMITE_VELAS_POR_PAGINA])
+    assert baixadas == 2 * LIMITE_VELAS_POR_PAGINA
+    assert len(store) == 2 * LIMITE_VELAS_POR_PAGINA
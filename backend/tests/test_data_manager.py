@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip('scipy')
+ta = pytest.importorskip('pandas_ta')
+
+from managers.data_manager import prepare_market_data
+
+
+@pytest.fixture
+def velas():
+    rng = np.random.default_rng(42)
+    fechamento = 100 + rng.normal(0, 1, 600).cumsum()
+    abertura = fechamento + rng.normal(0, 0.3, 600)
+    return pd.DataFrame({
+        'abertura': abertura,
+        'maxima': np.maximum(abertura, fechamento) + rng.uniform(0, 1, 600),
+        'minima': np.minimum(abertura, fechamento) - rng.uniform(0, 1, 600),
+        'fechamento': fechamento,
+        'volume': rng.uniform(100, 1000, 600),
+    }, index=pd.date_range('2024-01-01', periods=600, freq='h'))
+
+
+def _comparar(obtido, esperado, atol):
+    np.testing.assert_allclose(obtido.to_numpy(dtype=float), esperado.to_numpy(dtype=float), rtol=0, atol=atol)
+
+
+def test_bandas_de_bollinger_iguais_ao_ta_bbands(velas):
+    df = prepare_market_data(velas, use_bb=True, bb_period=20)
+    for desvios in (1.0, 2.0, 3.0):
+        esperado = ta.bbands(velas['fechamento'], length=20, lower_std=desvios, upper_std=desvios)
+        for coluna in esperado.columns:
+            _comparar(df[coluna], esperado[coluna], 1e-8)
+
+
+def test_osciladores_iguais_ao_pandas_ta(velas):
+    df = prepare_market_data(velas, use_rsi=True, use_stoch=True, use_macd=True, use_atr=True, use_adx=True)
+    maxima, minima, fechamento = velas['maxima'], velas['minima'], velas['fechamento']
+
+    _comparar(df['RSI_14'], ta.rsi(fechamento, length=14).round(2), 0.01)
+    stoch = ta.stoch(maxima, minima, fechamento, k=14, d=3, smooth_k=3).round(2)
+    for coluna in stoch.columns:
+        _comparar(df[coluna], stoch[coluna], 0.01)
+    macd = ta.macd(fechamento, fast=12, slow=26, signal=9)
+    _comparar(df['MACD'], macd['MACD_12_26_9'].round(4), 1e-4)
+    _comparar(df['MACD_signal'], macd['MACDs_12_26_9'].round(4), 1e-4)
+    _comparar(df['MACD_hist'], macd['MACDh_12_26_9'].round(4), 1e-4)
+    atr = ta.atr(maxima, minima, fechamento, length=14).round(4)
+    _comparar(df[atr.name], atr, 1e-4)
+    adx = ta.adx(maxima, minima, fechamento, length=14)
+    for coluna in adx.columns:
+        _comparar(df[coluna], adx[coluna], 1e-8)
+
+
+def test_nao_altera_o_dataframe_do_chamador(velas):
+    colunas = list(velas.columns)
+    df = prepare_market_data(velas, use_emas=True, emas_periods=[9], use_bb=True, use_peaks=True)
+    assert list(velas.columns) == colunas
+    assert 'EMA_9' in df and 'BBL_20_2.0_2.0' in df
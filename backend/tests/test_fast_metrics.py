@@ -0,0 +1,107 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from vectorbt_project.fast_metrics import NOMES_VECTORBT, calcular_metricas
+
+SALDO_INICIAL = 1000.0
+TAXA = 0.00055
+TOLERANCIA = 1e-9
+
+# (curva de fechamento comprada 100% desde a primeira vela, duração esperada do maior drawdown em velas)
+# Convenção do vectorbt: drawdown recuperado dura da primeira vela abaixo do pico até a de recuperação
+# (exclusive); o ativo no fim da série conta todas as velas abaixo do pico
+CURVAS_DRAWDOWN = {
+    'recupera_no_pico': ([100, 90, 95, 100, 101, 102], 2),
+    'recupera_acima': ([100, 90, 95, 101, 102, 103], 2),
+    'ativo_no_fim': ([100, 101, 99, 98, 97, 96, 95], 5),
+    'ativo_maior_que_recuperado': ([100, 90, 100, 110, 105, 104, 103, 102, 101], 5),
+    'uma_vela': ([100, 99, 100, 101], 1),
+}
+
+
+def carteira_aleatoria(semente, alvo_percentual, n=2000):
+    """Fechamentos em passeio aleatório e ordens esparsas a preço próximo do fechamento."""
+    rng = np.random.default_rng(semente)
+    indice = pd.date_range('2024-01-01', periods=n, freq='15min')
+    close = pd.Series(100 * np.exp(np.cumsum(rng.normal(0, 0.003, n))), index=indice)
+    size = pd.Series(np.nan, index=indice)
+    preco = pd.Series(np.nan, index=indice)
+    comprado = False
+    for i in np.flatnonzero(rng.random(n) < 0.02):
+        if alvo_percentual:
+            # Inclui alvos repetidos: o targetpercent rebalanceia e gera saídas parciais
+            size.iloc[i] = rng.choice([-1.0, 0.0, 1.0])
+        else:
+            size.iloc[i] = -1.0 if comprado else 1.0
+            comprado = not comprado
+        preco.iloc[i] = close.iloc[i] * (1 + rng.normal(0, 0.001))
+    return close, preco, size
+
+
+def estatisticas_vectorbt(vbt, close, preco, size, alvo_percentual, taxa=TAXA):
+    pf = vbt.Portfolio.from_orders(
+        close=close, price=preco, size=size, size_type='targetpercent' if alvo_percentual else 'percent',
+        init_cash=SALDO_INICIAL, fees=taxa, freq='15min', direction='both' if alvo_percentual else 'longonly',
+    )
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        return pf.stats()
+
+
+def comprado_desde_o_inicio(fechamentos):
+    indice = pd.date_range('2024-01-01', periods=len(fechamentos), freq='15min')
+    close = pd.Series(fechamentos, dtype=float, index=indice)
+    size = pd.Series(np.nan, index=indice)
+    size.iloc[0] = 1.0
+    return close, close.where(size.notna()), size
+
+
+@pytest.mark.parametrize('semente', [0, 3, 4, 7])
+@pytest.mark.parametrize('alvo_percentual', [False, True])
+def test_metricas_iguais_ao_pf_stats(semente, alvo_percentual):
+    vbt = pytest.importorskip('vectorbt')
+    close, preco, size = carteira_aleatoria(semente, alvo_percentual)
+    esperado = estatisticas_vectorbt(vbt, close, preco, size, alvo_percentual)
+    obtido = calcular_metricas(close, preco, size, alvo_percentual=alvo_percentual, intervalo='15',
+                               saldo_inicial=SALDO_INICIAL, taxa=TAXA)
+
+    assert obtido['Total Trades'] == esperado['Total Trades']
+    assert obtido['Max Drawdown Duration'] == esperado['Max Drawdown Duration']
+    for nome in NOMES_VECTORBT.values():
+        np.testing.assert_allclose(obtido[nome], esperado[nome], rtol=TOLERANCIA, err_msg=nome)
+
+
+@pytest.mark.parametrize('nome', list(CURVAS_DRAWDOWN))
+def test_duracao_do_max_drawdown(nome):
+    fechamentos, velas = CURVAS_DRAWDOWN[nome]
+    close, preco, size = comprado_desde_o_inicio(fechamentos)
+    obtido = calcular_metricas(close, preco, size, intervalo='15', taxa=0.0)
+
+    assert obtido['max_drawdown_barras'] == velas
+    assert obtido['Max Drawdown Duration'] == pd.Timedelta(minutes=15 * velas)
+
+
+@pytest.mark.parametrize('nome', list(CURVAS_DRAWDOWN))
+def test_duracao_do_max_drawdown_igual_ao_vectorbt(nome):
+    vbt = pytest.importorskip('vectorbt')
+    close, preco, size = comprado_desde_o_inicio(CURVAS_DRAWDOWN[nome][0])
+    esperado = estatisticas_vectorbt(vbt, close, preco, size, True, taxa=0.0)
+    obtido = calcular_metricas(close, preco, size, intervalo='15', taxa=0.0)
+
+    assert obtido['Max Drawdown Duration'] == esperado['Max Drawdown Duration']
+    np.testing.assert_allclose(obtido['Max Drawdown [%]'], esperado['Max Drawdown [%]'], rtol=TOLERANCIA)
+
+
+def test_diferencas_documentadas_sem_drawdown():
+    # pf.stats() dá NaN/NaT para drawdown e inf para Sortino sem velas negativas; aqui drawdown é 0
+    # (a fitness `retorno * (1 - drawdown)` continua definida) e Sortino fica NaN
+    close, preco, size = comprado_desde_o_inicio([100, 101, 102, 103])
+    obtido = calcular_metricas(close, preco, size, intervalo='15', taxa=0.0)
+
+    assert obtido['Max Drawdown [%]'] == 0.0
+    assert obtido['Max Drawdown Duration'] == pd.Timedelta(0)
+    assert np.isnan(obtido['Sortino Ratio'])
+    assert np.isnan(obtido['Calmar Ratio'])
@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from vectorbt_project.neuroevolution import fitness_cache
+from vectorbt_project.neuroevolution.fitness_cache import CachedEvaluator, FitnessCache, make_scope
+from vectorbt_project.neuroevolution.individual import Individual
+from vectorbt_project.neuroevolution.evolutionary_runners.double_ema_breakout_orders import DoubleEMAEvolver
+from vectorbt_project.neuroevolution.evolutionary_runners.double_ema_breakout_orders_long_short import (
+    DoubleEMAEvolverLongShort)
+from vectorbt_project.neuroevolution.evolutionary_runners.double_ema_breakout_orders_long_short_dual_params import (
+    DoubleEMAEvolverLongShortDualParams)
+from vectorbt_project.neuroevolution.evaluators.double_ema_breakout_orders import evaluate_individual
+
+
+class AvaliadorFalso:
+    def __init__(self):
+        self.avaliados = 0
+
+    def evaluate(self, individuals):
+        for individual in individuals:
+            self.avaliados += 1
+            individual.fitness = float(sum(individual.genome.values()))
+            individual.metadata = {'avaliado': True}
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def df():
+    indice = pd.date_range('2024-01-01', periods=50, freq='15min')
+    precos = np.linspace(100, 110, 50)
+    return pd.DataFrame({'abertura': precos, 'maxima': precos + 1, 'minima': precos - 1, 'fechamento': precos,
+                         'volume': np.ones(50)}, index=indice)
+
+
+@pytest.mark.parametrize('evolver', [DoubleEMAEvolver, DoubleEMAEvolverLongShort,
+                                     DoubleEMAEvolverLongShortDualParams])
+def test_evolver_usa_o_cache_injetado_mesmo_vazio(evolver, df):
+    cache = FitnessCache()
+    assert len(cache) == 0
+    instancia = evolver(df, population_size=4, generations=1, param_ranges={'ema_curta': (5, 9)},
+                        evaluator=AvaliadorFalso(), fitness_cache=cache)
+    assert instancia.evaluator.cache is cache
+
+
+def test_cache_em_disco_e_reaproveitado_entre_execucoes(tmp_path, df):
+    caminho = str(tmp_path / 'fitness.sqlite')
+    for esperados in (4, 0):
+        avaliador = AvaliadorFalso()
+        instancia = DoubleEMAEvolver(df, population_size=4, generations=1, param_ranges={'ema_curta': (5, 9)},
+                                     evaluator=avaliador, fitness_cache=FitnessCache(path=caminho))
+        individuos = [Individual(genome={'ema_curta': 5 + i}) for i in range(4)]
+        instancia.evaluator.evaluate(individuos)
+        assert [individuo.fitness for individuo in individuos] == [5.0, 6.0, 7.0, 8.0]
+        instancia.evaluator.cache.close()
+        assert avaliador.avaliados == esperados
+
+
+def test_escopo_muda_com_a_versao_do_codigo(monkeypatch, df):
+    escopo = make_scope(evaluate_individual, df, taxa=0.00055)
+    assert make_scope(evaluate_individual, df, taxa=0.00055) == escopo
+    monkeypatch.setattr(fitness_cache, 'CACHE_VERSION', fitness_cache.CACHE_VERSION + 1)
+    assert make_scope(evaluate_individual, df, taxa=0.00055) != escopo
+
+
+def test_escopo_inclui_a_estrategia_carregada_por_nome_e_suas_dependencias():
+    modulos = fitness_cache.modulos_do_projeto(evaluate_individual)
+    assert 'vectorbt_project.strategies.double_ema_breakout_orders' in modulos
+    assert 'vectorbt_project.indicator_cache' in modulos
+    assert 'vectorbt_project.fast_metrics' in modulos
+
+
+def test_mudanca_no_kernel_invalida_o_cache(tmp_path, monkeypatch, df):
+    # Projeto mínimo: avaliador -> gerar_por_nome("kernel_teste") -> kernel -> módulo de métricas
+    arquivos = {
+        'avaliador_teste.py': 'from vectorbt_project.generator_vectorbt import gerar_por_nome\n\n'
+                              'def evaluate_individual(df, individual):\n'
+                              '    return gerar_por_nome("kernel_teste", df, None)\n',
+        'vectorbt_project/__init__.py': '',
+        'vectorbt_project/generator_vectorbt.py': 'import importlib\n',
+        'vectorbt_project/strategies/__init__.py': '',
+        'vectorbt_project/strategies/kernel_teste.py': 'from ..metricas_teste import calcular\n',
+        'vectorbt_project/metricas_teste.py': 'def calcular():\n    return 1\n',
+    }
+    for nome, fonte in arquivos.items():
+        (tmp_path / nome).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / nome).write_text(fonte)
+    monkeypatch.setattr(fitness_cache, 'RAIZ_PROJETO', str(tmp_path))
+
+    def avaliador():
+        pass
+    avaliador.__module__ = 'avaliador_teste'
+
+    caminho = str(tmp_path / 'fitness.sqlite')
+    escopos = [make_scope(avaliador, df, taxa=0.00055)]
+    for nome, fonte in (('vectorbt_project/strategies/kernel_teste.py', 'from ..metricas_teste import calcular\n# v2\n'),
+                        ('vectorbt_project/metricas_teste.py', 'def calcular():\n    return 2\n')):
+        (tmp_path / nome).write_text(fonte)
+        escopos.append(make_scope(avaliador, df, taxa=0.00055))
+    assert len(set(escopos)) == 3
+
+    # O que foi gravado com o kernel antigo não é servido depois da mudança
+    avaliador_falso = AvaliadorFalso()
+    antes = CachedEvaluator(avaliador_falso, FitnessCache(path=caminho), escopos[0])
+    antes.evaluate([Individual(genome={'ema_curta': 5})])
+    antes.cache.close()
+    depois = CachedEvaluator(avaliador_falso, FitnessCache(path=caminho), escopos[-1])
+    depois.evaluate([Individual(genome={'ema_curta': 5})])
+    depois.cache.close()
+    assert avaliador_falso.avaliados == 2
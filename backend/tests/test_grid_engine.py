@@ -0,0 +1,81 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from vectorbt_project.fast_metrics import NOMES_VECTORBT
+from vectorbt_project.grid_engine import avaliar_grid, gerar_combinacoes
+
+SALDO_INICIAL = 1000
+TAXA = 0.00055
+TOLERANCIA = 1e-9
+
+
+def gerar_velas(semente, n=1600):
+    rng = np.random.default_rng(semente)
+    fechamento = 100 * np.exp(np.cumsum(rng.normal(0, 0.004, n)))
+    abertura = np.r_[fechamento[0], fechamento[:-1]]
+    return pd.DataFrame({
+        'abertura': abertura,
+        'maxima': np.maximum(abertura, fechamento) * (1 + rng.random(n) * 0.003),
+        'minima': np.minimum(abertura, fechamento) * (1 - rng.random(n) * 0.003),
+        'fechamento': fechamento,
+        'volume': rng.random(n) * 1000,
+    }, index=pd.date_range('2024-01-01', periods=n, freq='15min'))
+
+
+def estatisticas_por_combinacao(vbt, df, combinacao, permitir_short):
+    """O caminho que os scripts de grid rodavam para cada combinação antes do motor em lote."""
+    from entidades.estrategias_descritivas.double_ema_breakout import (
+        AlvoConfig, CondicaoEntrada, DoubleEmaBreakout, StopConfig)
+    from vectorbt_project.generator_vectorbt import gerar_por_nome
+
+    estrategia = DoubleEmaBreakout(
+        nome='grid',
+        tipo='long_short' if permitir_short else 'long',
+        condicoes_entrada=[
+            CondicaoEntrada(tipo='fechamento_acima_ema', parametros={'periodo': int(combinacao.ema_curta)}),
+            CondicaoEntrada(tipo='fechamento_acima_ema', parametros={'periodo': int(combinacao.ema_longa)}),
+            CondicaoEntrada(tipo='rompe_maxima_anterior', parametros={}),
+        ],
+        stop=StopConfig(tipo='minima_das_ultimas', parametros={'quantidade': int(combinacao.stop)}),
+        alvo=AlvoConfig(tipo='rr', parametros={'multiplicador': float(combinacao.rr)}),
+    )
+    if permitir_short:
+        entries, exits, _, _, size = gerar_por_nome('double_ema_breakout_orders_long_short', df, estrategia)
+        size_type, direcao = 'targetpercent', 'both'
+    else:
+        entries, exits, _, _ = gerar_por_nome('double_ema_breakout_orders', df, estrategia)
+        size = pd.Series(0, index=df.index, dtype='float64')
+        size[entries.notna()] = 1.0
+        size[exits.notna()] = -1.0
+        size = size.where(size != 0, np.nan)
+        size_type, direcao = 'percent', 'longonly'
+
+    pf = vbt.Portfolio.from_orders(
+        close=df['fechamento'], price=entries.combine_first(exits), size_type=size_type, size=size,
+        init_cash=SALDO_INICIAL, fees=TAXA, freq='15min', direction=direcao,
+    )
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        return pf.stats()
+
+
+@pytest.mark.parametrize('permitir_short', [False, True])
+def test_grid_igual_ao_pf_stats_por_combinacao(permitir_short):
+    vbt = pytest.importorskip('vectorbt')
+    df = gerar_velas(semente=2)
+    combinacoes = gerar_combinacoes([5, 9], [21, 50], [5, 12], [1.5, 3.0])
+    resultado = avaliar_grid(df, combinacoes, intervalo='15', permitir_short=permitir_short,
+                             saldo_inicial=SALDO_INICIAL, taxa=TAXA, mostrar_progresso=False)
+
+    assert len(resultado) == len(combinacoes)
+    for linha in resultado.itertuples():
+        esperado = estatisticas_por_combinacao(vbt, df, linha, permitir_short)
+        assert esperado['Total Trades'] > 0
+        assert linha.trades == esperado['Total Trades']
+        assert linha.max_drawdown_duration == esperado['Max Drawdown Duration']
+        for nome, nome_vectorbt in NOMES_VECTORBT.items():
+            np.testing.assert_allclose(getattr(linha, nome), esperado[nome_vectorbt], rtol=TOLERANCIA,
+                                       equal_nan=True, err_msg=f'{nome} {linha}')
@@ -0,0 +1,149 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from corretoras.market_data_feed import MarketDataFeed, QuadroDeVelas
+from indicadores import compilados
+from indicadores.incremental import MotorIndicadores
+from utils.candle_store import DTYPE_VELA, array_para_dataframe
+
+INTERVALO_MS = 60_000
+CONFIGURACAO = dict(emas_periods=(9, 21), volume_sma_period=20, rsi_period=14, atr_period=14,
+                    bb_period=20, bb_stds=(1.0, 2.0), min_max_period=10)
+
+
+def gerar_velas(n, semente=3):
+    rng = np.random.default_rng(semente)
+    velas = np.zeros(n, dtype=DTYPE_VELA)
+    fechamento = 100 + np.cumsum(rng.normal(size=n))
+    abertura = np.r_[fechamento[0], fechamento[:-1]]
+    velas['tempo_abertura'] = 1_700_000_000_000 + np.arange(n) * INTERVALO_MS
+    velas['abertura'] = abertura
+    velas['maxima'] = np.maximum(abertura, fechamento) + rng.random(n)
+    velas['minima'] = np.minimum(abertura, fechamento) - rng.random(n)
+    velas['fechamento'] = fechamento
+    velas['volume'] = rng.random(n) * 1000
+    velas['turnover'] = velas['volume'] * fechamento
+    return velas
+
+
+def alimentar_com_ticks(motor, velas, semente=5):
+    """Cada vela passa por alguns ticks provisórios antes de fechar."""
+    rng = np.random.default_rng(semente)
+    for vela in velas:
+        tempo = int(vela['tempo_abertura'])
+        for _ in range(3):
+            motor.atualizar(tempo, float(vela['maxima']) + rng.random(), float(vela['minima']) - rng.random(),
+                            float(vela['fechamento']) + rng.normal(), float(vela['volume']) * rng.random(), False)
+        motor.atualizar(tempo, float(vela['maxima']), float(vela['minima']), float(vela['fechamento']),
+                        float(vela['volume']), True)
+
+
+def test_motor_incremental_igual_ao_calculo_em_lote():
+    velas = gerar_velas(600)
+    motor = MotorIndicadores(**CONFIGURACAO)
+    alimentar_com_ticks(motor, velas)
+    df = array_para_dataframe(velas)
+    obtido = motor.aplicar(df.copy())
+
+    fechamento = df['fechamento']
+    esperado = {
+        'EMA_9': fechamento.ewm(span=9, adjust=False).mean(),
+        'EMA_21': fechamento.ewm(span=21, adjust=False).mean(),
+        'volume_sma': df['volume'].rolling(20).mean(),
+        'MIN_10': df['minima'].rolling(10).min(),
+        'MAX_10': df['maxima'].rolling(10).max(),
+    }
+    media, desvio = fechamento.rolling(20).mean(), fechamento.rolling(20).std(ddof=1)
+    for desvios in (1.0, 2.0):
+        sufixo = f'20_{desvios}_{desvios}'
+        inferior, superior = media - desvios * desvio, media + desvios * desvio
+        esperado[f'BBL_{sufixo}'] = inferior
+        esperado[f'BBM_{sufixo}'] = media
+        esperado[f'BBU_{sufixo}'] = superior
+        esperado[f'BBB_{sufixo}'] = 100 * (superior - inferior) / media
+        esperado[f'BBP_{sufixo}'] = (fechamento - inferior) / (superior - inferior)
+
+    for coluna, serie in esperado.items():
+        np.testing.assert_allclose(obtido[coluna], serie, rtol=1e-9, atol=1e-9, equal_nan=True, err_msg=coluna)
+
+    # RSI/ATR: a semente da RMA difere da do lote, mas com centenas de velas o valor converge
+    rsi = compilados.rsi(fechamento, 14)
+    atr = compilados.atr(df['maxima'], df['minima'], fechamento, 14)
+    np.testing.assert_allclose(obtido['RSI_14'].iloc[-300:], rsi[-300:], rtol=1e-8)
+    np.testing.assert_allclose(obtido['ATRr_14'].iloc[-300:], atr[-300:], rtol=1e-8)
+
+
+def test_colunas_de_bollinger_iguais_as_de_prepare_market_data():
+    pytest.importorskip('scipy')
+    from managers.data_manager import prepare_market_data
+
+    velas = gerar_velas(300)
+    motor = MotorIndicadores(bb_period=20, bb_stds=(1.0, 2.0, 3.0))
+    motor.semear(velas, ultima_em_formacao=False)
+    df = array_para_dataframe(velas)
+    lote = prepare_market_data(df, use_emas=False, use_bb=True, bb_period=20)
+    obtido = motor.aplicar(df.copy())
+
+    colunas = [coluna for coluna in lote.columns if coluna.startswith('BB')]
+    assert sorted(colunas) == sorted(motor.colunas())
+    for coluna in colunas:
+        np.testing.assert_allclose(obtido[coluna], lote[coluna], rtol=1e-9, atol=1e-9, equal_nan=True, err_msg=coluna)
+
+
+class ClienteKline:
+    def __init__(self, velas):
+        self.velas = velas
+
+    def get_kline(self, **parametros):
+        lista = [[str(v['tempo_abertura']), v['abertura'], v['maxima'], v['minima'], v['fechamento'],
+                  v['volume'], v['turnover']] for v in self.velas[::-1]]
+        return {'result': {'list': [[str(campo) for campo in vela] for vela in lista]}}
+
+
+class LimitadorLivre:
+    def adquirir(self):
+        pass
+
+
+def mensagem_kline(vela, fechada):
+    return json.dumps({'topic': 'kline.1.BTCUSDT', 'data': [{
+        'start': int(vela['tempo_abertura']), 'open': str(vela['abertura']), 'high': str(vela['maxima']),
+        'low': str(vela['minima']), 'close': str(vela['fechamento']), 'volume': str(vela['volume']),
+        'turnover': str(vela['turnover']), 'confirm': fechada,
+    }]})
+
+
+def test_busca_velas_atualiza_so_as_velas_alteradas(monkeypatch):
+    # 260 velas novas: passa do espaço dobrado da matriz do quadro (2 x 200) e força o deslocamento
+    velas = gerar_velas(460)
+    feed = MarketDataFeed(url='ws://localhost:1', cliente_http=ClienteKline(velas[:200]),
+                          limitador=LimitadorLivre(), capacidade=200)
+    monkeypatch.setattr(feed, 'iniciar', lambda: None)
+    remontagens = []
+    remontar = QuadroDeVelas._remontar
+    monkeypatch.setattr(QuadroDeVelas, '_remontar',
+                        lambda self, *args: remontagens.append(1) or remontar(self, *args))
+
+    feed.busca_velas('BTCUSDT', '1', [9, 21])
+    rng = np.random.default_rng(7)
+    for vela in velas[200:]:
+        tick = vela.copy()
+        tick['fechamento'] += rng.normal()
+        for fechada, registro in ((False, tick), (False, vela), (True, vela)):
+            feed._processar_mensagem(mensagem_kline(registro, fechada))
+            obtido = feed.busca_velas('BTCUSDT', '1', [21, 9])
+
+            # Remontagem completa, como a leitura fazia antes do QuadroDeVelas
+            motor = feed.indicadores('BTCUSDT', '1', emas_periods=(9, 21))
+            esperado = motor.aplicar(array_para_dataframe(feed.obter_velas('BTCUSDT', '1')))
+            pd.testing.assert_frame_equal(obtido, esperado, check_exact=False, rtol=1e-9)
+
+    assert len(obtido) == 200
+    assert len(remontagens) == 1
+
+    # O chamador recebe uma cópia: mexer nela não afeta a próxima leitura
+    obtido['EMA_9'] = 0.0
+    assert feed.busca_velas('BTCUSDT', '1', [9, 21])['EMA_9'].iloc[-1] != 0.0
@@ -0,0 +1,22 @@
+import numpy as np
+import pandas as pd
+
+from indicadores import compilados
+from indicadores.bandas_bollinger import bandas_bollinger
+from vectorbt_project.indicator_cache import bollinger
+
+
+def test_bollinger_padrao_igual_aos_outros_caminhos():
+    rng = np.random.default_rng(5)
+    df = pd.DataFrame({'fechamento': 100 + np.cumsum(rng.normal(size=300))},
+                      index=pd.date_range('2024-01-01', periods=300, freq='15min'))
+    inferior, media, superior = bollinger(df, 20, 2.0)
+
+    esperado = bandas_bollinger(df.copy(), periodo=20, desvios=2)
+    np.testing.assert_allclose(inferior, esperado['banda_inferior'], rtol=1e-12, equal_nan=True)
+    np.testing.assert_allclose(media, esperado['media_movel'], rtol=1e-12, equal_nan=True)
+    np.testing.assert_allclose(superior, esperado['banda_superior'], rtol=1e-12, equal_nan=True)
+
+    bandas = compilados.bandas_bollinger(df['fechamento'], 20, 2.0, 2.0)
+    np.testing.assert_allclose(inferior, bandas[0], rtol=1e-9, equal_nan=True)
+    np.testing.assert_allclose(superior, bandas[2], rtol=1e-9, equal_nan=True)
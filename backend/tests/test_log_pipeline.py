@@ -0,0 +1,205 @@
+import io
+import logging
+import threading
+import time
+
+import pytest
+
+from utils.logging import LogCategory, LogEvent, LogLevel, LogPipeline
+from utils.logging.handlers import BatchFlushMixin
+
+CAPACIDADE = 4
+
+
+class LoggerFalso:
+    """Faz o papel do TradingLogger: o consumidor só chama `_dispatch` e lê `name`."""
+
+    def __init__(self, handler=None):
+        self.name = 'bot_teste'
+        self.handler = handler
+        self.eventos = []
+        self.threads = set()
+        self.entrou = threading.Event()
+        self.liberar = threading.Event()
+
+    def _dispatch(self, evento):
+        self.threads.add(threading.current_thread().name)
+        if evento.context.get('travar'):
+            # Segura o consumidor no meio do processamento, com a fila livre para encher
+            self.entrou.set()
+            self.liberar.wait(5)
+            return
+        self.eventos.append(evento)
+        if self.handler is not None:
+            self.handler.emit(logging.makeLogRecord({'msg': evento.message}))
+
+    def indices(self):
+        return [evento.context['i'] for evento in self.eventos if 'i' in evento.context]
+
+    def avisos(self):
+        return [evento for evento in self.eventos if evento.module == 'LogPipeline']
+
+
+def evento(i=None, **contexto):
+    if i is not None:
+        contexto['i'] = i
+    return LogEvent(LogLevel.INFO, LogCategory.POSITION_STATUS, f"evento {i}", context=contexto)
+
+
+@pytest.fixture
+def criar_pipeline():
+    criados = []
+
+    def criar(**parametros):
+        # Sem acordar por tempo nem por tamanho de lote: o consumidor só roda quando o teste manda
+        parametros.setdefault('intervalo_flush', 60.0)
+        parametros.setdefault('tamanho_lote', 1000)
+        pipeline = LogPipeline(**parametros)
+        criados.append(pipeline)
+        return pipeline
+
+    yield criar
+    for pipeline in criados:
+        pipeline.stop()
+
+
+def travar_consumidor(pipeline, logger):
+    assert pipeline.submit(logger, evento(travar=True))
+    pipeline._acordar.set()
+    assert logger.entrou.wait(5)
+
+
+def test_eventos_saem_na_ordem_de_chegada_pela_thread_consumidora(criar_pipeline):
+    pipeline = criar_pipeline(tamanho_lote=64, intervalo_flush=0.01)
+    logger = LoggerFalso()
+
+    for i in range(2000):
+        assert pipeline.submit(logger, evento(i))
+    assert pipeline.flush()
+
+    assert logger.indices() == list(range(2000))
+    assert logger.threads == {'LogPipeline'}
+    assert pipeline.stats()['processed'] == 2000
+    assert pipeline.stats()['dropped'] == 0
+    assert logger.avisos() == []
+
+
+def test_drop_oldest_descarta_os_mais_antigos_e_avisa(criar_pipeline):
+    pipeline = criar_pipeline(capacidade=CAPACIDADE, politica='drop_oldest')
+    logger = LoggerFalso()
+    travar_consumidor(pipeline, logger)
+
+    # Quem loga nunca espera nem perde o próprio evento
+    assert all(pipeline.submit(logger, evento(i)) for i in range(CAPACIDADE + 2))
+    assert pipeline.stats()['dropped'] == 2
+    logger.liberar.set()
+    assert pipeline.flush()
+
+    assert logger.indices() == [2, 3, 4, 5]
+    aviso, = logger.avisos()
+    assert aviso is logger.eventos[-1]
+    assert aviso.level == LogLevel.WARNING
+    assert '2 logs descartados' in aviso.message
+    assert aviso.context == {'descartados_total': 2, 'capacidade': CAPACIDADE}
+    assert pipeline.stats()['processed'] == 1 + CAPACIDADE
+
+
+def test_drop_newest_descarta_os_novos_e_avisa_uma_vez(criar_pipeline):
+    pipeline = criar_pipeline(capacidade=CAPACIDADE, politica='drop_newest')
+    logger = LoggerFalso()
+    travar_consumidor(pipeline, logger)
+
+    aceitos = [pipeline.submit(logger, evento(i)) for i in range(CAPACIDADE + 3)]
+    assert aceitos == [True] * CAPACIDADE + [False] * 3
+    logger.liberar.set()
+    assert pipeline.flush()
+
+    assert logger.indices() == [0, 1, 2, 3]
+    aviso, = logger.avisos()
+    assert '3 logs descartados' in aviso.message
+    assert pipeline.stats()['dropped'] == 3
+
+    # Descartes já avisados não geram um segundo aviso
+    assert pipeline.submit(logger, evento(99))
+    assert pipeline.flush()
+    assert len(logger.avisos()) == 1
+
+
+def test_block_espera_espaco_e_descarta_so_apos_o_limite(criar_pipeline):
+    pipeline = criar_pipeline(capacidade=CAPACIDADE, politica='block', espera_maxima=0.05)
+    logger = LoggerFalso()
+    travar_consumidor(pipeline, logger)
+    assert all(pipeline.submit(logger, evento(i)) for i in range(CAPACIDADE))
+
+    # Com o consumidor travado a espera estoura e o evento novo é descartado
+    inicio = time.monotonic()
+    assert not pipeline.submit(logger, evento(-1))
+    assert time.monotonic() - inicio >= 0.05
+    assert pipeline.stats()['dropped'] == 1
+
+    # Com espera suficiente o produtor fica bloqueado até o consumidor abrir espaço
+    pipeline.espera_maxima = 5.0
+    aceito = []
+    produtor = threading.Thread(target=lambda: aceito.append(pipeline.submit(logger, evento(CAPACIDADE))))
+    produtor.start()
+    time.sleep(0.05)
+    assert produtor.is_alive()
+    logger.liberar.set()
+    produtor.join(5)
+    assert aceito == [True]
+    assert pipeline.flush()
+
+    assert logger.indices() == list(range(CAPACIDADE + 1))
+    aviso, = logger.avisos()
+    assert '1 logs descartados' in aviso.message
+    assert pipeline.stats()['dropped'] == 1
+
+
+class ArquivoContado(io.StringIO):
+    def __init__(self):
+        super().__init__()
+        self.linhas_no_flush = []
+
+    def flush(self):
+        self.linhas_no_flush.append(self.getvalue().count('\n'))
+        super().flush()
+
+
+class HandlerEmLote(BatchFlushMixin, logging.StreamHandler):
+    pass
+
+
+def test_consumidor_faz_um_flush_por_lote(criar_pipeline):
+    arquivo = ArquivoContado()
+    handler = HandlerEmLote(arquivo)
+    pipeline = criar_pipeline(capacidade=100, tamanho_lote=10)
+    logger = LoggerFalso(handler)
+    travar_consumidor(pipeline, logger)
+
+    for i in range(34):
+        pipeline.submit(logger, evento(i))
+    logger.liberar.set()
+    assert pipeline.flush()
+
+    # 35 eventos (o que travou o consumidor não escreve): flush a cada 10 e o do resto na saída do modo_lote
+    assert arquivo.linhas_no_flush == [9, 19, 29, 34]
+    assert pipeline.stats()['batches'] == 4
+
+    # Fora do consumidor o flush continua por registro
+    handler.emit(logging.makeLogRecord({'msg': 'direto'}))
+    assert arquivo.linhas_no_flush[-1] == 35
+
+
+def test_stop_processa_o_que_ficou_na_fila(criar_pipeline):
+    pipeline = criar_pipeline()
+    logger = LoggerFalso()
+    for i in range(50):
+        pipeline.submit(logger, evento(i))
+    assert pipeline.stats()['queued'] == 50
+
+    pipeline.stop()
+
+    assert not pipeline._thread.is_alive()
+    assert logger.indices() == list(range(50))
+    assert pipeline.stats()['queued'] == 0
+    assert pipeline.stats()['processed'] == 50
@@ -0,0 +1,42 @@
+from datetime import datetime, timedelta
+
+from utils.logging import LogStore, LogEvent, LogLevel, LogCategory
+
+
+def _evento(i, quando):
+    return LogEvent(LogLevel.INFO, LogCategory.POSITION_STATUS, f"evento {i}", bot_id="bot_1",
+                    timestamp=quando + timedelta(seconds=i), context={'i': i})
+
+
+def test_reinicio_no_mesmo_dia_nao_perde_eventos_na_compactacao(tmp_path):
+    # Mesmo processo (mesmo pid) abrindo o store duas vezes no mesmo dia, como um container reiniciado
+    quando = datetime.now().replace(microsecond=0) - timedelta(days=3)
+    primeiro = LogStore(str(tmp_path))
+    for i in range(10):
+        primeiro.append(_evento(i, quando))
+    primeiro.close()
+    segundo = LogStore(str(tmp_path))
+    for i in range(10, 20):
+        segundo.append(_evento(i, quando))
+    # o segmento ainda aberto não é compactado
+    assert segundo.compact()["compacted"] == 1
+    segundo.close()
+
+    terceiro = LogStore(str(tmp_path))
+    assert terceiro.compact()["compacted"] == 1
+    eventos = terceiro.query(bot_id="bot_1", limit=100)
+    assert [e['context']['i'] for e in eventos] == list(range(20))
+    terceiro.close()
+
+
+def test_consulta_filtra_e_devolve_os_mais_recentes(tmp_path):
+    quando = datetime.now().replace(microsecond=0)
+    store = LogStore(str(tmp_path))
+    for i in range(30):
+        store.append(_evento(i, quando))
+    store.append(LogEvent(LogLevel.ERROR, LogCategory.EXECUTION_ERROR, "erro", bot_id="bot_2", timestamp=quando))
+
+    eventos = store.query(bot_id="bot_1", limit=5)
+    assert [e['context']['i'] for e in eventos] == list(range(25, 30))
+    assert len(store.query(min_level=LogLevel.ERROR.value)) == 1
+    store.close()
@@ -0,0 +1,61 @@
+import asyncio
+import json
+import threading
+import time
+
+from api.services import log_stream_manager
+from api.services.log_stream_manager import LogStreamManager
+from utils.logging import LogCategory, LogEvent, LogLevel
+from utils.notifications.events import Event
+
+TOTAL_LOGS = 60
+TAXA = 100  # logs por segundo
+
+
+def produzir(manager):
+    """Loga de outra thread, como o TradingLogger, marcando o instante de envio no contexto."""
+    for i in range(TOTAL_LOGS):
+        evento = LogEvent(LogLevel.INFO, LogCategory.POSITION_STATUS, f"log {i}",
+                          context={'indice': i, 'enviado_em': time.monotonic()})
+        manager._on_log_event(Event('log_event', evento))
+        time.sleep(1 / TAXA)
+
+
+def test_conexao_travada_nao_atrasa_a_rapida(monkeypatch):
+    # Versão reduzida de vectorbt_project/scripts/teste_carga_ws_logs.py, sem sockets: o envio da
+    # conexão travada nunca termina e o close dela também trava (buffer TCP cheio)
+    monkeypatch.setattr(log_stream_manager, 'TIMEOUT_ENVIO', 0.5)
+    monkeypatch.setattr(log_stream_manager, 'TIMEOUT_FECHAMENTO', 0.2)
+    latencias = []
+
+    async def enviar_rapido(frame):
+        agora = time.monotonic()
+        for mensagem in json.loads(frame):
+            latencias.append(agora - mensagem['context']['enviado_em'])
+
+    async def travar(*args):
+        await asyncio.Event().wait()
+
+    async def principal():
+        manager = LogStreamManager()
+        manager.set_event_loop(asyncio.get_running_loop())
+        rapida = manager.connect(enviar_rapido, batch=True)
+        travada = manager.connect(travar, batch=True, on_close=travar)
+
+        produtor = threading.Thread(target=produzir, args=(manager,))
+        produtor.start()
+        await asyncio.to_thread(produtor.join)
+        await asyncio.sleep(3 * log_stream_manager.INTERVALO_FRAME)
+
+        # A task da conexão travada terminou: nem o envio nem o close ficaram pendurados
+        await asyncio.wait_for(travada._task, 1.0)
+        rapida.stop()
+        return manager.get_stats()
+
+    stats = asyncio.run(principal())
+
+    assert len(latencias) == TOTAL_LOGS
+    # Cada log chega à conexão rápida dentro de uma janela de frame, bem antes do timeout da travada
+    assert max(latencias) < log_stream_manager.TIMEOUT_ENVIO / 2
+    assert stats['slow_disconnects'] == 1
+    assert stats['total_global_subscribers'] == 1
@@ -0,0 +1,69 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from api.services.monitor_state import MonitorState
+from utils.logging import LogCategory, LogEvent, LogLevel
+from utils.notifications.events import Event
+
+BOT = "DoubleEMA_BTCUSDT"
+INICIO = datetime(2026, 10, 1, 12, 0)
+
+
+@pytest.fixture
+def monitor():
+    return MonitorState()
+
+
+def _enviar(monitor, segundos, category, level=LogLevel.TRADING, agent_name=None, **context):
+    evento = LogEvent(level, category, category.value, bot_id=BOT, agent_name=agent_name,
+                      timestamp=INICIO + timedelta(seconds=segundos), context=context)
+    monitor._on_log_event(Event("log_event", evento))
+
+
+def test_series_com_os_contextos_dos_bots(monitor):
+    # Mesmos campos de live_trading/double_ema_breakout_orders_long_short_agent_conduction.py
+    _enviar(monitor, 0, LogCategory.BOT_START, LogLevel.INFO, symbol="BTCUSDT", tempo_grafico="15", subconta=1)
+    _enviar(monitor, 1, LogCategory.POSITION_OPEN,
+            symbol="BTCUSDT", tempo_abertura=INICIO, preco_entrada=100.0, preco_stop=95.0, preco_alvo=110.0,
+            tamanho_posicao=2.0, operation="compra", alavancagem=1, ema_rapida=9, ema_lenta=21,
+            qtd_velas_stop=17, risco_retorno=2.0)
+    _enviar(monitor, 2, LogCategory.POSITION_UPDATE, symbol="BTCUSDT", preco_stop=100.0, preco_atual=104.0)
+    _enviar(monitor, 3, LogCategory.TARGET_HIT, symbol="BTCUSDT", tempo_abertura=INICIO, preco_alvo=110.0,
+            preco_atual=110.0)
+    assert monitor.flush()
+
+    bot = monitor.get_bot(BOT)
+    assert bot["trade"]["estado"] == "de fora"
+    assert bot["trade"]["entry_price"] == 100.0 and bot["trade"]["stop_price"] == 100.0
+
+    series = monitor.get_series(BOT, points=10)
+    assert [ponto["value"] for ponto in series["price"]] == [100.0, 104.0, 110.0]
+    # PnL só com a posição aberta: na abertura e no trailing
+    assert [ponto["value"] for ponto in series["pnl"]] == [0.0, 8.0]
+
+
+def test_short_sem_operation_usa_os_precos_da_ordem(monitor):
+    # Abertura no formato anterior (sem operation): stop acima da entrada = venda
+    _enviar(monitor, 0, LogCategory.POSITION_OPEN, symbol="BTCUSDT", preco_entrada=100.0, preco_stop=105.0,
+            preco_alvo=90.0, tamanho_posicao=1.5)
+    _enviar(monitor, 1, LogCategory.POSITION_UPDATE, symbol="BTCUSDT", preco_stop=101.0, preco_atual=96.0)
+    assert monitor.flush()
+
+    assert monitor.get_bot(BOT)["trade"]["side"] == "venda"
+    assert [ponto["value"] for ponto in monitor.get_series(BOT, metrics=["pnl"])["pnl"]] == [0.0, 6.0]
+
+
+def test_abertura_pelo_entry_evaluator(monitor):
+    # Campos de agentes/parsers/trade_entry_evaluator_parser.py
+    _enviar(monitor, 0, LogCategory.POSITION_OPEN, symbol="BTCUSDT", entry_price=50.0, stop_price=48.0,
+            target_price=56.0, position_size=10.0, risk_reward=3.0, operation="compra")
+    _enviar(monitor, 1, LogCategory.POSITION_STATUS, symbol="BTCUSDT", estado_de_trade="comprado",
+            preco_entrada=50.0, preco_stop=48.0, preco_alvo=56.0, tamanho_posicao=10.0, trailing_stop=None,
+            risco_retorno=3.0)
+    _enviar(monitor, 2, LogCategory.POSITION_UPDATE, symbol="BTCUSDT", preco_stop=50.0, preco_atual=53.0)
+    assert monitor.flush()
+
+    trade = monitor.get_bot(BOT)["trade"]
+    assert trade["estado"] == "comprado" and trade["risk_reward"] == 3.0
+    assert [ponto["value"] for ponto in monitor.get_series(BOT, metrics=["pnl"])["pnl"]] == [0.0, 30.0]
@@ -0,0 +1,50 @@
+import asyncio
+
+import pytest
+
+from api.services.job_service import JobService, ResultStore
+
+pytest.importorskip('fastapi')
+
+
+@pytest.fixture
+def optimization(tmp_path, monkeypatch):
+    # A rota cria o JobService padrão (e o SQLite em data/) na importação
+    monkeypatch.chdir(tmp_path)
+    from api.routes import optimization
+    return optimization
+
+
+@pytest.fixture
+def jobs(optimization, tmp_path, monkeypatch):
+    servico = JobService(store=ResultStore(str(tmp_path / 'resultados.sqlite')))
+    monkeypatch.setattr(optimization, 'jobs', servico)
+    yield servico
+    servico.shutdown()
+
+
+def test_otimizacao_que_falhou_responde_sem_sucesso_com_o_job(optimization, jobs, monkeypatch):
+    # Sem partes, `primeiro([])` estoura ao combinar: o job falha sem precisar do pool de processos
+    monkeypatch.setattr(optimization, '_tarefas', lambda symbol, interval, days: [])
+
+    resposta = asyncio.run(optimization.get_top_parameters('BTCUSDT', '15', 7))
+
+    assert resposta['success'] is False
+    assert resposta['message'] == optimization.SEM_RESULTADOS
+    assert resposta['job']['status'] == 'failed'
+    assert 'IndexError' in resposta['job']['error']
+
+    # Em backoff o pedido seguinte devolve o mesmo job que falhou, sem reagendar
+    de_novo = asyncio.run(optimization.get_top_parameters('BTCUSDT', '15', 7))
+    assert de_novo == resposta
+    assert len(jobs.jobs) == 1
+
+
+def test_otimizacao_sem_resultados_inclui_o_job(optimization, jobs, monkeypatch):
+    monkeypatch.setattr(optimization.job_tasks, 'primeiro', lambda resultados: [])
+    monkeypatch.setattr(optimization, '_tarefas', lambda symbol, interval, days: [])
+
+    resposta = asyncio.run(optimization.get_top_parameters('ETHUSDT', '15', 7))
+
+    assert resposta['success'] is False
+    assert resposta['job']['status'] == 'done'
@@ -0,0 +1,106 @@
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from vectorbt_project.neuroevolution.individual import Individual
+from vectorbt_project.neuroevolution.parallel_evaluator import ProcessPoolEvaluator, SequentialEvaluator
+
+# Funções de avaliação no nível do módulo: vão para os workers por referência
+
+
+def avaliar_velas(df, individual):
+    """Devolve o que o worker enxerga das velas montadas sobre a shared memory."""
+    individual.metadata = {'velas': df.copy(), 'genoma': dict(individual.genome)}
+    return float(df['fechamento'].iloc[individual.genome['posicao']])
+
+
+def avaliar_com_erro(df, individual):
+    if individual.genome['posicao'] == 3:
+        raise ValueError('genoma inválido')
+    return 0.0
+
+
+def gerar_velas(n=1200, semente=5):
+    rng = np.random.default_rng(semente)
+    fechamento = 100 * np.exp(np.cumsum(rng.normal(0, 0.004, n)))
+    abertura = np.r_[fechamento[0], fechamento[:-1]]
+    return pd.DataFrame({
+        'abertura': abertura,
+        'maxima': np.maximum(abertura, fechamento) * (1 + rng.random(n) * 0.003),
+        'minima': np.minimum(abertura, fechamento) * (1 - rng.random(n) * 0.003),
+        'fechamento': fechamento,
+        'volume': rng.integers(1, 1000, n),
+    }, index=pd.date_range('2024-01-01', periods=n, freq='15min'))
+
+
+def gerar_populacao(n=17, semente=8):
+    rng = np.random.default_rng(semente)
+    return [Individual(genome={'ema_curta': int(rng.integers(3, 30)), 'ema_longa': int(rng.integers(10, 80)),
+                               'stop': int(rng.integers(2, 20)), 'rr': int(rng.integers(10, 50))})
+            for _ in range(n)]
+
+
+def avaliar_em_paralelo(evaluate_fn, df, individuos):
+    evaluator = ProcessPoolEvaluator(evaluate_fn, df, n_workers=2)
+    try:
+        evaluator.evaluate(individuos)
+        nome = evaluator._shm.name
+    finally:
+        evaluator.close()
+    return nome
+
+
+def assert_shared_memory_removida(nome):
+    with pytest.raises(FileNotFoundError):
+        SharedMemory(name=nome)
+
+
+def test_paralelo_igual_ao_sequencial_na_estrategia_real():
+    pytest.importorskip('vectorbt')
+    from vectorbt_project.neuroevolution.evaluators.double_ema_breakout_orders import evaluate_individual
+
+    df = gerar_velas()
+    sequenciais, paralelos = gerar_populacao(), gerar_populacao()
+    SequentialEvaluator(evaluate_individual, df).evaluate(sequenciais)
+    nome = avaliar_em_paralelo(evaluate_individual, df, paralelos)
+
+    # Inclui genomas inválidos (ema_curta >= ema_longa), que não preenchem metadata
+    assert any(individuo.fitness == -float('inf') for individuo in sequenciais)
+    for sequencial, paralelo in zip(sequenciais, paralelos):
+        assert paralelo.genome == sequencial.genome
+        assert paralelo.fitness == sequencial.fitness
+        assert paralelo.metadata.keys() == sequencial.metadata.keys()
+        if sequencial.metadata:
+            assert paralelo.metadata['params'] == sequencial.metadata['params']
+            pd.testing.assert_series_equal(pd.Series(paralelo.metadata['stats']),
+                                           pd.Series(sequencial.metadata['stats']))
+    assert_shared_memory_removida(nome)
+
+
+def test_workers_recebem_as_velas_e_devolvem_na_ordem_da_populacao():
+    df = gerar_velas()
+    individuos = [Individual(genome={'posicao': posicao}) for posicao in np.random.default_rng(1).permutation(40)]
+
+    nome = avaliar_em_paralelo(avaliar_velas, df, individuos)
+
+    for individuo in individuos:
+        assert individuo.fitness == df['fechamento'].iloc[individuo.genome['posicao']]
+        assert individuo.metadata['genoma'] == individuo.genome
+        # Colunas float64 vêm da shared memory e as demais em cópia; a ordem das colunas pode mudar
+        pd.testing.assert_frame_equal(individuo.metadata['velas'], df, check_like=True)
+    assert_shared_memory_removida(nome)
+
+
+def test_erro_no_worker_propaga_e_close_remove_a_shared_memory():
+    evaluator = ProcessPoolEvaluator(avaliar_com_erro, gerar_velas(), n_workers=2)
+    try:
+        with pytest.raises(ValueError, match='genoma inválido'):
+            evaluator.evaluate([Individual(genome={'posicao': posicao}) for posicao in range(8)])
+        nome = evaluator._shm.name
+    finally:
+        evaluator.close()
+
+    assert_shared_memory_removida(nome)
+    assert evaluator._shm is None and evaluator._executor is None
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip('scipy')
+
+from indicadores.advanced_scoring import AdvancedScoringSystem
+from indicadores.pontuacao_lote import MINIMO_VELAS, montar_painel
+
+
+def _velas(rng, n, fim='2024-06-01 00:00'):
+    fechamento = np.round(100 + np.cumsum(rng.normal(size=n)), 2)
+    abertura = np.r_[fechamento[0], fechamento[:-1]]
+    return pd.DataFrame({
+        'abertura': abertura,
+        'maxima': np.maximum(abertura, fechamento) + rng.random(n),
+        'minima': np.minimum(abertura, fechamento) - rng.random(n),
+        'fechamento': fechamento,
+        'volume': rng.random(n) * 1000,
+    }, index=pd.date_range(end=fim, periods=n, freq='h'))
+
+
+@pytest.fixture
+def universo():
+    rng = np.random.default_rng(3)
+    return {f"SIM{i}USDT": _velas(rng, 300) for i in range(5)}
+
+
+def test_listagem_nova_nao_encurta_o_painel(universo):
+    universo['NOVAUSDT'] = _velas(np.random.default_rng(9), 40)
+    painel = montar_painel(universo)
+
+    assert painel.fechamento.shape == (5, 300)
+    assert 'NOVAUSDT' not in painel.simbolos
+    assert 'histórico curto' in painel.excluidos['NOVAUSDT']
+    assert len(AdvancedScoringSystem().score_panel(painel)) == 5
+
+
+def test_alinha_pelo_tempo_e_exclui_desalinhados(universo):
+    rng = np.random.default_rng(5)
+    universo['ADIANTADAUSDT'] = _velas(rng, 301, fim='2024-06-01 01:00')  # buscada depois da virada da hora
+    universo['ATRASADAUSDT'] = _velas(rng, 300, fim='2024-05-31 23:00')
+    com_buraco = _velas(rng, 301)
+    universo['BURACOUSDT'] = com_buraco.drop(com_buraco.index[150])
+    painel = montar_painel(universo)
+
+    assert 'ADIANTADAUSDT' in painel.simbolos
+    assert painel.indice[-1] == pd.Timestamp('2024-06-01 00:00')
+    assert painel.fechamento[painel.simbolos.index('ADIANTADAUSDT'), -1] == \
+        universo['ADIANTADAUSDT']['fechamento'].iloc[-2]
+    assert painel.excluidos['ATRASADAUSDT'] == 'velas desalinhadas'
+    assert painel.excluidos['BURACOUSDT'] == 'velas desalinhadas'
+
+
+def test_scores_iguais_ao_analyze_complete_sobre_as_mesmas_velas(universo):
+    sistema = AdvancedScoringSystem()
+    painel = montar_painel(universo, velas_por_simbolo=MINIMO_VELAS + 50)
+    tabela = sistema.score_panel(painel).set_index('simbolo')
+    for simbolo in painel.simbolos:
+        analise = sistema.analyze_complete(simbolo, universo[simbolo].loc[painel.indice].copy())
+        assert tabela.loc[simbolo, 'score_final'] == pytest.approx(analise['score_final'], abs=1e-9)
+
+
+def test_painel_vazio():
+    painel = montar_painel({'FALHOUUSDT': pd.DataFrame()})
+    assert painel.simbolos == []
+    assert painel.excluidos == {'FALHOUUSDT': 'sem velas'}
+    tabela = AdvancedScoringSystem().score_panel(painel)
+    assert tabela.empty and 'score_final' in tabela
+    assert montar_painel({}).simbolos == []
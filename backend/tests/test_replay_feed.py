@@ -0,0 +1,84 @@
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from corretoras.market_data_feed import MarketDataFeed
+from corretoras.replay_server_bybit import ServidorReplay
+from utils.candle_store import DTYPE_VELA
+
+INTERVALO_MS = 60_000
+VELAS = 300
+VELAS_INICIAIS = 100
+CAPACIDADE = 200
+
+
+def gerar_velas(n, semente=11):
+    rng = np.random.default_rng(semente)
+    velas = np.zeros(n, dtype=DTYPE_VELA)
+    fechamento = 100 + np.cumsum(rng.normal(size=n))
+    abertura = np.r_[fechamento[0], fechamento[:-1]]
+    velas['tempo_abertura'] = 1_700_000_000_000 + np.arange(n) * INTERVALO_MS
+    velas['abertura'] = abertura
+    velas['maxima'] = np.maximum(abertura, fechamento) + rng.random(n)
+    velas['minima'] = np.minimum(abertura, fechamento) - rng.random(n)
+    velas['fechamento'] = fechamento
+    velas['volume'] = rng.random(n) * 1000
+    velas['turnover'] = velas['volume'] * fechamento
+    return velas
+
+
+class LimitadorLivre:
+    def adquirir(self):
+        pass
+
+
+@pytest.fixture
+def replay():
+    velas = gerar_velas(VELAS)
+    servidor = ServidorReplay({('BTCUSDT', '1'): velas}, velas_iniciais=VELAS_INICIAIS).iniciar()
+    feed = MarketDataFeed(url=servidor.url, cliente_http=servidor.cliente_rest, limitador=LimitadorLivre(),
+                          capacidade=CAPACIDADE)
+    yield velas, servidor, feed
+    feed.parar()
+    servidor.parar()
+
+
+def aguardar(feed, condicao, timeout=10.0):
+    limite = time.monotonic() + timeout
+    versao = 0
+    while not condicao():
+        if time.monotonic() > limite:
+            pytest.fail('o replay não chegou à última vela')
+        versao = feed.aguardar_atualizacao('BTCUSDT', '1', versao, timeout=0.5)
+
+
+def test_feed_acompanha_o_replay_do_rest_ao_streaming(replay):
+    velas, servidor, feed = replay
+    recebidas = []
+    feed.adicionar_ouvinte(lambda simbolo, intervalo, vela, fechada: recebidas.append((int(vela['tempo_abertura']), fechada)))
+
+    # Semeadura: o REST do replay só conhece as velas "do passado"
+    motor = feed.indicadores('BTCUSDT', '1', emas_periods=(9, 21))
+    assert len(feed.obter_velas('BTCUSDT', '1')) == VELAS_INICIAIS
+
+    ultima = (int(velas['tempo_abertura'][-1]), True)
+    aguardar(feed, lambda: ultima in recebidas)
+
+    assert servidor.conexoes == 1
+    # O streaming entrega cada vela em formação e depois fechada, no protocolo v5
+    fechadas = [tempo for tempo, fechada in recebidas if fechada]
+    assert fechadas == [int(tempo) for tempo in velas['tempo_abertura'][VELAS_INICIAIS:]]
+    assert len(recebidas) == 2 * len(fechadas)
+
+    # Buffer circular com as últimas `capacidade` velas, idênticas às do replay
+    np.testing.assert_array_equal(feed.obter_velas('BTCUSDT', '1'), velas[-CAPACIDADE:])
+
+    # EMAs incrementais (semeadas pelo REST, continuadas pelo streaming) iguais ao cálculo sobre a série toda
+    df = feed.busca_velas('BTCUSDT', '1', [9, 21])
+    fechamento = pd.Series(velas['fechamento'])
+    for periodo in (9, 21):
+        esperado = fechamento.ewm(span=periodo, adjust=False).mean().to_numpy()[-CAPACIDADE:]
+        np.testing.assert_allclose(df[f'EMA_{periodo}'].to_numpy(), esperado, rtol=1e-9)
+    assert motor is feed.indicadores('BTCUSDT', '1', emas_periods=(9, 21))
@@ -0,0 +1,20 @@
+from managers.results_manager import ResultsManager, merge_monthly_stats, merge_results
+
+
+def _execucao(symbol, ganho):
+    manager = ResultsManager(1000, 0.00055, 'same', symbol, '15', '2024-01-01', '2024-03-01')
+    manager.update_on_trade_open(2024, 1)
+    manager.update_on_gain(2024, 1, ganho)
+    manager.update_on_trade_open(2024, 2)
+    manager.update_on_loss(2024, 2, -1.0)
+    return manager
+
+
+def test_execucoes_com_o_mesmo_setup_nao_se_sobrescrevem():
+    managers = [_execucao('BTCUSDT', 2.0), _execucao('ETHUSDT', 3.0)]
+    mensal = merge_monthly_stats(managers)
+
+    assert list(mensal.index.names[:4]) == ['run', 'setup', 'symbol', 'timeframe']
+    assert len(mensal) == 4
+    assert sorted(mensal.index.get_level_values('symbol').unique()) == ['BTCUSDT', 'ETHUSDT']
+    assert len(merge_results(managers)) == 2
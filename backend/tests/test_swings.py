@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from indicadores.swings import FUNDO, TOPO, DetectorSwings, detectar_swings
+
+
+def gerar_velas(semente, n=800):
+    rng = np.random.default_rng(semente)
+    # Preços arredondados no tick: platôs e empates aparecem com frequência
+    fechamento = np.round(100 + np.cumsum(rng.normal(0, 0.5, n)), 1)
+    maximas = fechamento + np.round(rng.random(n), 1)
+    minimas = fechamento - np.round(rng.random(n), 1)
+    return maximas, minimas, fechamento
+
+
+def confirmados_em_lote(swings, maximas, minimas):
+    """Pivôs do lote na ordem em que o detector os confirma (fundo antes do topo na mesma barra)."""
+    eventos = [(int(p), FUNDO, float(minimas[p]), int(r)) for p, r in zip(swings.fundos, swings.rotulos_fundos)]
+    eventos += [(int(p), TOPO, float(maximas[p]), int(r)) for p, r in zip(swings.topos, swings.rotulos_topos)]
+    return sorted(eventos, key=lambda evento: (evento[0], evento[1] == TOPO))
+
+
+@pytest.mark.parametrize('semente', [0, 1, 2])
+@pytest.mark.parametrize('esquerda,direita', [(5, 5), (20, 3), (2, 0)])
+def test_detector_incremental_igual_ao_lote(semente, esquerda, direita):
+    maximas, minimas, _ = gerar_velas(semente)
+    swings = detectar_swings(maximas, minimas, esquerda, direita)
+
+    detector = DetectorSwings(esquerda, direita)
+    obtidos = []
+    for maxima, minima in zip(maximas, minimas):
+        assert detector.atualizar(maxima + 5, minima - 5, fechada=False) == []
+        obtidos += [tuple(confirmado) for confirmado in detector.atualizar(maxima, minima)]
+
+    assert obtidos == confirmados_em_lote(swings, maximas, minimas)
+    assert detector.ultimo_tipo == swings.ultimo_tipo[-1]
+    np.testing.assert_equal(detector.ultimo_topo, swings.ultimo_topo[-1])
+    np.testing.assert_equal(detector.ultimo_fundo, swings.ultimo_fundo[-1])
+
+
+@pytest.mark.parametrize('semente', [0, 1])
+def test_detector_semeado_continua_como_o_lote(semente):
+    _, _, fechamento = gerar_velas(semente)
+    swings = detectar_swings(fechamento, esquerda=20, direita=3)
+    corte = 400
+
+    detector = DetectorSwings(20, 3).semear(fechamento[:corte])
+    obtidos = [tuple(confirmado) for valor in fechamento[corte:] for confirmado in detector.atualizar(valor)]
+
+    esperados = [evento for evento in confirmados_em_lote(swings, fechamento, fechamento) if evento[0] + 3 >= corte]
+    assert obtidos == esperados
+    assert detector.indice_ultimo_topo == swings.topos[-1]
+    assert detector.indice_ultimo_fundo == swings.fundos[-1]
+
+
+def test_pico_no_prefixo_igual_ao_find_peaks_por_vela():
+    find_peaks = pytest.importorskip('scipy.signal').find_peaks
+    pytest.importorskip('vectorbt')
+    from vectorbt_project.strategies.double_ema_breakout_orders_peaks import _pico_no_prefixo
+
+    _, _, fechamento = gerar_velas(3, n=700)
+    for i in range(30, len(fechamento)):
+        # O que o loop antigo fazia a cada vela: find_peaks no prefixo inteiro e leitura em i-3
+        fatia = fechamento[:i + 1]
+        tipo = np.zeros(i + 1, dtype=int)
+        tipo[find_peaks(-fatia, distance=21)[0]] = FUNDO
+        tipo[find_peaks(fatia, distance=21)[0]] = TOPO
+        assert _pico_no_prefixo(fechamento, i, TOPO) == (tipo[i - 3] == TOPO), i
+        assert _pico_no_prefixo(fechamento, i, FUNDO) == (tipo[i - 3] == FUNDO), i
+
+
+def test_swing_points_padrao_continuam_os_do_find_peaks():
+    find_peaks = pytest.importorskip('scipy.signal').find_peaks
+    from indicadores.structure_analysis import StructureAnalyzer
+
+    maximas, minimas, fechamento = gerar_velas(4)
+    df = pd.DataFrame({'maxima': maximas, 'minima': minimas, 'fechamento': fechamento})
+
+    topos, fundos = StructureAnalyzer.find_swing_points(df)
+    assert topos == find_peaks(maximas, distance=10)[0].tolist()
+    assert fundos == find_peaks(-minimas, distance=10)[0].tolist()
+
+    swings = detectar_swings(maximas, minimas, 5, 5)
+    assert StructureAnalyzer.find_swing_points(df, confirmados=True) == (swings.topos.tolist(), swings.fundos.tolist())